@@ -0,0 +1,54 @@
+"""add_events_tags_gin_index
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GIN index for the array overlap (&&) tag filter
+    op.create_index("ix_events_tags_gin", "events", ["tags"], postgresql_using="gin")
+
+    # Maintained events-per-tag aggregate
+    op.create_table(
+        "event_tag_counts",
+        sa.Column("tag", sa.String(), nullable=False),
+        sa.Column("events_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("tag"),
+    )
+
+    # Backfill counters from existing events
+    op.execute(
+        """
+        INSERT INTO event_tag_counts (tag, events_count)
+        SELECT tag, count(DISTINCT events.id)
+        FROM events, unnest(tags) AS tag
+        GROUP BY tag
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("event_tag_counts")
+    op.drop_index("ix_events_tags_gin", table_name="events")
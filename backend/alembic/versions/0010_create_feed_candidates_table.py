@@ -0,0 +1,70 @@
+"""create_feed_candidates_table
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create feed_candidates table (precomputed personalized feed scores)
+    op.create_table(
+        "feed_candidates",
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("event_id", sa.String(), nullable=False),
+        sa.Column("friends_going", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("friends_of_friends_going", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("score", sa.Float(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("user_id", "event_id"),
+    )
+    op.create_index(
+        "ix_feed_candidates_user_score",
+        "feed_candidates",
+        ["user_id", "score", "event_id"],
+        unique=False,
+    )
+    op.create_index("ix_feed_candidates_event_id", "feed_candidates", ["event_id"], unique=False)
+    op.create_foreign_key(
+        "fk_feed_candidates_user_id",
+        "feed_candidates",
+        "profiles",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        "fk_feed_candidates_event_id",
+        "feed_candidates",
+        "events",
+        ["event_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("fk_feed_candidates_event_id", "feed_candidates", type_="foreignkey")
+    op.drop_constraint("fk_feed_candidates_user_id", "feed_candidates", type_="foreignkey")
+    op.drop_index("ix_feed_candidates_event_id", table_name="feed_candidates")
+    op.drop_index("ix_feed_candidates_user_score", table_name="feed_candidates")
+    op.drop_table("feed_candidates")
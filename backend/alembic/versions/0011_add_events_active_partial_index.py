@@ -0,0 +1,38 @@
+"""add_events_active_partial_index
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Close events that already ended so the partial index starts small
+    op.execute("UPDATE events SET status = 'E' WHERE status = 'A' AND end_date < current_date")
+
+    # Partial index over active events only - serves the default feed ordering
+    op.create_index(
+        "ix_events_active_created_at",
+        "events",
+        ["created_at", "end_date"],
+        unique=False,
+        postgresql_where=sa.text("status = 'A'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_active_created_at", table_name="events")
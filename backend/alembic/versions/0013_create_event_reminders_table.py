@@ -0,0 +1,55 @@
+"""create_event_reminders_table
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0013"
+down_revision: Union[str, None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create event_reminders table (one reminder per participation)
+    op.create_table(
+        "event_reminders",
+        sa.Column("participation_id", sa.String(), nullable=False),
+        sa.Column("status", sa.String(length=1), nullable=False, server_default="P"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("participation_id"),
+    )
+    op.create_index(
+        "ix_event_reminders_status_next",
+        "event_reminders",
+        ["status", "next_attempt_at"],
+        unique=False,
+    )
+    op.create_foreign_key(
+        "fk_event_reminders_participation_id",
+        "event_reminders",
+        "event_participations",
+        ["participation_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("fk_event_reminders_participation_id", "event_reminders", type_="foreignkey")
+    op.drop_index("ix_event_reminders_status_next", table_name="event_reminders")
+    op.drop_table("event_reminders")
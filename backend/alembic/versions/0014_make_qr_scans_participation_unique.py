@@ -0,0 +1,45 @@
+"""make_qr_scans_participation_unique
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0014"
+down_revision: Union[str, None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep only the first scan of each participation (a participant checks in once)
+    op.execute(
+        """
+        DELETE FROM qr_scans
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT
+                    id,
+                    row_number() OVER (
+                        PARTITION BY participation_id ORDER BY scanned_at, id
+                    ) AS position
+                FROM qr_scans
+            ) AS ranked
+            WHERE position > 1
+        )
+        """
+    )
+    op.drop_index("ix_qr_scans_participation_id", table_name="qr_scans")
+    op.create_index("ix_qr_scans_participation_id", "qr_scans", ["participation_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_qr_scans_participation_id", table_name="qr_scans")
+    op.create_index("ix_qr_scans_participation_id", "qr_scans", ["participation_id"], unique=False)
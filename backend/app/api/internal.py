@@ -0,0 +1,115 @@
+"""
+Internal Endpoints
+Operational endpoints that are not part of the public API (not proxied by nginx).
+"""
+
+# --------------------------------------------------------------------------------
+
+import asyncio
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from ..core.config import settings
+from ..core.metrics import registry
+from ..core.profiler import ProfileStore
+
+# --------------------------------------------------------------------------------
+
+router = APIRouter()
+
+METRICS_PATH = "/internal/metrics"
+PROFILES_PATH = "/internal/profiles"
+
+# Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+profile_store = ProfileStore(settings.PROFILER_DIR, settings.PROFILER_MAX_PROFILES)
+
+# --------------------------------------------------------------------------------
+
+
+def _check_bearer_token(authorization: str, token: str) -> None:
+    """
+    Check a bearer token of an internal endpoint.
+
+    Args:
+        authorization (str): Authorization header.
+        token (str): Expected token; an empty token disables the endpoint.
+
+    Raises:
+        HTTPException: 404 if the endpoint is disabled, 401 if the token is wrong.
+    """
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    expected = f"Bearer {token}"
+    if not hmac.compare_digest(authorization.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+
+# --------------------------------------------------------------------------------
+
+
+@router.get(METRICS_PATH, include_in_schema=False)
+async def get_metrics(authorization: str = Header("")):
+    """
+    Expose metrics aggregated over all workers in Prometheus text format.
+
+    Requires `Authorization: Bearer <METRICS_TOKEN>`; the endpoint does not exist
+    while METRICS_TOKEN is empty.
+
+    Args:
+        authorization (str): Authorization header.
+
+    Returns:
+        PlainTextResponse: Exposition text.
+    """
+    _check_bearer_token(authorization, settings.METRICS_TOKEN)
+
+    # Reading the other workers' snapshots is file I/O - keep it off the loop
+    body = await asyncio.to_thread(registry.render)
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+# --------------------------------------------------------------------------------
+
+
+@router.get(PROFILES_PATH, include_in_schema=False)
+async def list_profiles(authorization: str = Header("")):
+    """
+    List stored request profiles, newest first.
+
+    Requires `Authorization: Bearer <PROFILER_TOKEN>`.
+
+    Args:
+        authorization (str): Authorization header.
+
+    Returns:
+        list[dict]: Profile ID, creation time and size.
+    """
+    _check_bearer_token(authorization, settings.PROFILER_TOKEN)
+    return await asyncio.to_thread(profile_store.list_profiles)
+
+
+@router.get(PROFILES_PATH + "/{profile_id}", include_in_schema=False)
+async def get_profile(profile_id: str, authorization: str = Header("")):
+    """
+    Get a stored request profile in the collapsed stack format.
+
+    The output can be fed to flamegraph.pl, speedscope or inferno. Requires
+    `Authorization: Bearer <PROFILER_TOKEN>`.
+
+    Args:
+        profile_id (str): Profile ID from the X-Profile-Id response header.
+        authorization (str): Authorization header.
+
+    Returns:
+        PlainTextResponse: Collapsed stacks.
+    """
+    _check_bearer_token(authorization, settings.PROFILER_TOKEN)
+    content = await asyncio.to_thread(profile_store.get, profile_id)
+    if content is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return PlainTextResponse(content)
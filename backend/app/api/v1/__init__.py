@@ -7,7 +7,7 @@ Includes all version 1 API endpoint routers.
 
 from fastapi import APIRouter
 
-from .endpoints import events, files, friends, profiles
+from .endpoints import bootstrap, events, files, friends, profiles
 
 # --------------------------------------------------------------------------------
 
@@ -17,3 +17,4 @@ api_router.include_router(profiles.router, prefix="/profiles", tags=["profiles"]
 api_router.include_router(files.router, prefix="/files", tags=["files"])
 api_router.include_router(friends.router, prefix="/friends", tags=["friends"])
 api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(bootstrap.router, prefix="/bootstrap", tags=["bootstrap"])
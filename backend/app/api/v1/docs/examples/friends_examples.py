@@ -345,8 +345,8 @@ create_friends_examples = {
         },
         "already_friends": {
             "summary": "Already Friends",
-            "description": "Users are already friends.",
-            "value": {"detail": "Already friends"},
+            "description": "Users are already friends (e.g. a retried request): same response.",
+            "value": {"id": "inv123-e89b-12d3-a456-426614174004"},
         },
         "cannot_friend_self": {
             "summary": "Cannot Friend Self",
@@ -369,7 +369,9 @@ create_friends_examples = {
         },
         400: {
             "description": "Bad Request",
-            "content": {"application/json": {"example": {"detail": "Already friends"}}},
+            "content": {
+                "application/json": {"example": {"detail": "Cannot become friends with yourself"}}
+            },
         },
     },
     "x-code-samples": [
@@ -3,11 +3,12 @@ API Endpoints Package
 FastAPI route handlers for API endpoints.
 """
 
-from . import events, profiles
+from . import bootstrap, events, profiles
 
 # --------------------------------------------------------------------------------
 
 __all__ = [
     "profiles",
     "events",
+    "bootstrap",
 ]
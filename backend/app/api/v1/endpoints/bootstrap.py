@@ -0,0 +1,148 @@
+"""
+Bootstrap Endpoints
+FastAPI route handler returning the mini-app's initial state in one request.
+"""
+
+# --------------------------------------------------------------------------------
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.core.serialization import dump_json, precompile
+from app.db.crud import events as crud_events
+from app.db.crud import friends as crud_friends
+from app.db.crud import profiles as crud_profiles
+from app.schemas.bootstrap import BootstrapResponse
+from app.schemas.events import EventListResponse
+from app.schemas.profiles import Profile
+
+from ....db.session import get_db
+from .events import get_tags_body, serialize_events_with_participation
+
+# --------------------------------------------------------------------------------
+
+router = APIRouter()
+
+precompile(Optional[Profile], list[Profile], EventListResponse)
+
+# Response keys, in response order
+SECTIONS = ("profile", "friends", "tags", "events", "user_events")
+
+# --------------------------------------------------------------------------------
+
+
+def parse_sections(sections: Optional[str]) -> set[str]:
+    """
+    Parse the comma-separated `sections` query parameter.
+
+    Args:
+        sections (Optional[str]): Section names, None for all sections.
+
+    Returns:
+        set[str]: Requested sections.
+
+    Raises:
+        HTTPException: 400 if a section is unknown.
+    """
+    if sections is None:
+        return set(SECTIONS)
+    requested = {name.strip() for name in sections.split(",") if name.strip()}
+    unknown = requested.difference(SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sections: {', '.join(sorted(unknown))}",
+        )
+    return requested
+
+
+# --------------------------------------------------------------------------------
+
+
+@router.get("", response_model=BootstrapResponse)
+def get_bootstrap(
+    request: Request,
+    db: Session = Depends(get_db),
+    sections: Optional[str] = Query(
+        None, description=f"Comma-separated sections to return (default all): {', '.join(SECTIONS)}"
+    ),
+    limit: int = Query(20, ge=1, le=100, description="Page size of the event lists"),
+):
+    """
+    Get the mini-app's initial state in one request.
+
+    Replaces the start-up calls to `/profiles/my`, `/friends/my`, `/events/tags/`,
+    `/events/global_events/` and `/events/user_events/`: the profile is resolved
+    once and the friend sets are loaded once and shared by the friends list and
+    the friend counters of both event lists, whose viewer fields are fetched in
+    one batch.
+
+    Args:
+        request (Request): FastAPI request object.
+        db (Session): Database session.
+        sections (Optional[str]): Comma-separated sections to return.
+        limit (int): Page size of the event lists.
+
+    Returns:
+        BootstrapResponse: Requested sections; sections needing a profile are
+        omitted if the user has none.
+    """
+    requested = parse_sections(sections)
+    profile = crud_profiles.get_profile_by_max_id(db, request.state.user_id)
+
+    parts: dict[str, bytes] = {}
+    if "profile" in requested:
+        parts["profile"] = dump_json(Optional[Profile], profile)
+    if "tags" in requested:
+        parts["tags"], _hit = get_tags_body(db)
+
+    if profile is not None:
+        friend_ids = None
+        if "friends" in requested:
+            # All friends, as /friends/my returns them to a client that does
+            # not page; they also serve as the friend set of the event counters
+            friends, _next_cursor, _total = crud_friends.get_friends_page(
+                db, profile.id, limit=None
+            )
+            friend_ids = {friend.id for friend in friends}
+            parts["friends"] = dump_json(list[Profile], friends)
+
+        lists = {}
+        if "events" in requested:
+            lists["events"] = crud_events.event.get_multi(
+                db, limit=limit, user_id=profile.id, period="actual"
+            )
+        if "user_events" in requested:
+            lists["user_events"] = crud_events.event.get_user_events(
+                db, user_id=profile.id, limit=limit
+            )
+
+        if lists:
+            if friend_ids is None:
+                friend_ids = crud_friends.get_friend_ids(db, profile.id)
+            # An event may be on both lists: serialize it once
+            events = {event.id: event for page, _total, _more in lists.values() for event in page}
+            serialized = serialize_events_with_participation(
+                db=db,
+                events=list(events.values()),
+                user_id=profile.id,
+                friend_ids=friend_ids,
+                friends_of_friends_ids=crud_friends.get_friends_of_friends_ids(
+                    db, profile.id, direct_friend_ids=friend_ids
+                ),
+            )
+            by_id = {item.event.id: item for item in serialized}
+            for name, (page, total, has_more) in lists.items():
+                parts[name] = dump_json(
+                    EventListResponse,
+                    EventListResponse(
+                        events=[by_id[event.id] for event in page], total=total, has_more=has_more
+                    ),
+                )
+
+    body = b",".join(
+        b'"%s":%s' % (name.encode(), parts[name]) for name in SECTIONS if name in parts
+    )
+    return Response(content=b"{" + body + b"}", media_type="application/json")
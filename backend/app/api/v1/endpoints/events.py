@@ -1,68 +1,153 @@
+import asyncio
+import json
+from datetime import UTC, datetime, time, timedelta
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.config import ALL_TAGS
+from app.core.cache import cached_json_response, response_cache
+from app.core.config import ALL_TAGS, settings
+from app.core.http_cache import etag_matches, make_weak_etag, not_modified, set_cache_headers
+from app.core.max_auth import extract_max_auth_from_header, verify_init_data_and_get_user_id
+from app.core.ranking import GOING_TYPES
+from app.core.serialization import dump_json, json_response, precompile
+from app.core.tickets import TicketError, encoded_event_key, issue_ticket, verify_ticket
 from app.db.crud import events as crud_events
+from app.db.crud import feed as crud_feed
+from app.db.crud import friends as crud_friends
 from app.db.crud import profiles as crud_profiles
 from app.db.crud import qr_scans as crud_qr_scans
 from app.db.models.event import Event as EventModel
 from app.db.models.event import EventParticipation
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_db
 from app.schemas.events import (
+    CapacitySubscription,
     Event,
     EventCreate,
+    EventFeedResponse,
     EventListResponse,
     EventUpdate,
     EventWithParticipation,
 )
-from app.schemas.qr_scans import QRScanCreate, QRScanResponse
+from app.schemas.qr_scans import (
+    QRScanBatch,
+    QRScanBatchResponse,
+    QRScanBatchResult,
+    QRScanCreate,
+    QRScanResponse,
+    QRTicket,
+    QRTicketKey,
+    QRTicketScan,
+    QRTicketScanResponse,
+)
+from app.tasks.capacity import capacity_hub, get_capacities, notify_capacity
+from app.tasks.qr_scans import (
+    RECENT_SCANS,
+    checkin_message,
+    checkin_publisher,
+    flush_scans,
+    notify_checkins,
+    scan_buffer,
+    writer_enabled,
+)
 
 router = APIRouter()
 
+# Seconds between keep-alive comments of an idle check-in stream
+CHECKIN_HEARTBEAT = 15.0
+
+precompile(
+    Event,
+    EventListResponse,
+    EventFeedResponse,
+    QRScanResponse,
+    QRScanBatchResponse,
+    QRTicket,
+    QRTicketKey,
+    QRTicketScanResponse,
+)
+
 
 def _serialize_event(event_model: EventModel) -> Event:
-    """Convert ORM event model to Pydantic schema."""
+    """
+    Convert ORM event model to Pydantic schema.
+
+    This is the only validation of an event: responses are built from these
+    instances and returned through `json_response`, which does not validate
+    them again.
+    """
     return Event.model_validate(event_model, from_attributes=True)
 
 
-def _serialize_event_with_participation(
+def serialize_events_with_participation(
     *,
     db: Session,
-    event_model: EventModel,
+    events: list[EventModel],
     user_id: str,
-) -> EventWithParticipation:
-    """Convert ORM event model to response with participation info."""
-    # Get participation in one query to optimize
-    participation = crud_events.event.get_user_participation(
-        db, event_id=event_model.id, user_id=user_id
-    )
-    participation_type = participation.participation_type if participation else "V"
-    participate_id = participation.id if participation else None
+    friend_ids: Optional[set[str]] = None,
+    friends_of_friends_ids: Optional[set[str]] = None,
+) -> list[EventWithParticipation]:
+    """
+    Convert ORM event models to responses with participation info.
 
-    return EventWithParticipation(
-        event=_serialize_event(event_model),
-        friends_going=crud_events.event.get_friends_going_count(
-            db, event_id=event_model.id, user_id=user_id
-        ),
-        friends_of_friends_going=crud_events.event.get_friends_of_friends_going_count(
-            db, event_id=event_model.id, user_id=user_id
-        ),
-        participation_type=participation_type,
-        participate_id=participate_id,
+    The viewer fields of the whole list are loaded in a fixed number of queries;
+    friend ID sets already loaded by the caller are reused.
+    """
+    viewer_fields = crud_events.event.get_viewer_fields(
+        db,
+        event_ids=[event.id for event in events],
+        user_id=user_id,
+        friend_ids=friend_ids,
+        friends_of_friends_ids=friends_of_friends_ids,
     )
+    return [
+        EventWithParticipation(event=_serialize_event(event), **viewer_fields[event.id])
+        for event in events
+    ]
+
+
+def get_tags_body(db: Session) -> tuple[bytes, bool]:
+    """
+    Get the serialized tags list with per-tag event counts from the response cache.
+
+    Returns:
+        tuple[bytes, bool]: JSON body and whether it was a cache hit.
+    """
+
+    def build() -> bytes:
+        counts = crud_events.event.get_tag_counts(db)
+        return json.dumps(
+            {"tags": ALL_TAGS, "counts": {tag: counts.get(tag, 0) for tag in ALL_TAGS}},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+
+    return response_cache.get_or_set("tags", "all", build, tags=("tags",))
 
 
 @router.get(
     "/tags/",
     summary="Get all available event tags",
 )
-def get_available_tags():
+def get_available_tags(db: Session = Depends(get_db)):
     """
-    Get all available event tags that can be used when creating or updating events.
+    Get all available event tags that can be used when creating or updating events,
+    together with the number of events carrying each tag.
     """
-    return {"tags": ALL_TAGS}
+    return cached_json_response(*get_tags_body(db))
 
 
 @router.get(
@@ -77,9 +162,20 @@ def get_global_events(
     limit: int = Query(20, ge=1, le=100),
     last_event_id: Optional[str] = Query(None),
     tags: Optional[list[str]] = Query(None),
+    period: str = Query("actual", pattern="^(all|actual|upcoming|ongoing|past)$"),
+    event_status: Optional[str] = Query(None, alias="status", pattern="^[AE]$"),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Get global events with pagination and filtering.
+
+    By default only active events that have not ended yet are returned
+    (`period=actual`); use `period=all|upcoming|ongoing|past` and `status=A|E`
+    to query other slices.
+
+    Responses carry a weak ETag built from an aggregate over the matched events and
+    the viewer's friendship network; a matching `If-None-Match` is answered with
+    304 before any event or counter is loaded.
     """
     current_user_id = request.state.user_id
     # Validate that the user exists and get profile ID
@@ -87,21 +183,80 @@ def get_global_events(
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found")
 
+    etag = make_weak_etag(
+        "events",
+        user.id,
+        request.url.query,
+        *crud_events.event.get_multi_signature(
+            db, last_event_id=last_event_id, tags=tags, period=period, status=event_status
+        ),
+        *crud_friends.get_network_signature(db, user.id),
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     events, total, has_more = crud_events.event.get_multi(
         db=db,
         limit=limit,
         last_event_id=last_event_id,
         tags=tags,
         user_id=user.id,
+        period=period,
+        status=event_status,
     )
 
-    # Convert to EventWithParticipation format
-    events_with_participation = [
-        _serialize_event_with_participation(db=db, event_model=event, user_id=user.id)
-        for event in events
-    ]
+    events_with_participation = serialize_events_with_participation(
+        db=db, events=events, user_id=user.id
+    )
+
+    response = json_response(
+        EventListResponse,
+        EventListResponse(events=events_with_participation, total=total, has_more=has_more),
+    )
+    set_cache_headers(response, etag)
+    return response
+
+
+@router.get(
+    "/feed/",
+    response_model=EventFeedResponse,
+    summary="Get personalized event feed ranked by friends activity",
+)
+def get_ranked_feed(
+    *,
+    request: Request,
+    db: Session = Depends(get_db),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+):
+    """
+    Get events that friends and friends of friends attend, ranked by social signal
+    weighted with the user's tag affinity. Scores are precomputed, so the request
+    only reads one page of the user's candidates.
+    """
+    current_user_id = request.state.user_id
+    # Validate that the user exists and get profile ID
+    user = crud_profiles.get_profile_by_max_id(db, max_id=current_user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found")
+
+    try:
+        events, has_more, next_cursor = crud_feed.get_ranked_feed(
+            db, user.id, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    events_with_participation = serialize_events_with_participation(
+        db=db, events=events, user_id=user.id
+    )
 
-    return EventListResponse(events=events_with_participation, total=total, has_more=has_more)
+    return json_response(
+        EventFeedResponse,
+        EventFeedResponse(
+            events=events_with_participation, has_more=has_more, next_cursor=next_cursor
+        ),
+    )
 
 
 @router.get(
@@ -114,9 +269,14 @@ def get_event_detail(
     request: Request,
     db: Session = Depends(get_db),
     event_id: str,
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Get event details with participation information.
+
+    Supports conditional requests: the weak ETag covers the event version, the
+    registration window state and the viewer's friendship network. The
+    viewer-independent event body comes from the response cache.
     """
     event = crud_events.event.get(db, event_id=event_id)
     if not event:
@@ -128,10 +288,36 @@ def get_event_detail(
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found")
 
-    # Create event dict with is_registration_available
-    event_data = _serialize_event_with_participation(db=db, event_model=event, user_id=user.id)
+    window_open = event.is_registration_window_open
+    etag = make_weak_etag(
+        "event",
+        event.id,
+        event.version,
+        user.id,
+        window_open,
+        *crud_friends.get_network_signature(db, user.id),
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    # The event itself is the same for every viewer - serialize it once. The
+    # version in the key keeps the body consistent with the ETag even when
+    # another worker's invalidation has not reached this cache yet.
+    event_json, hit = response_cache.get_or_set(
+        "event",
+        f"{event.id}:{event.version}:{window_open}",
+        lambda: dump_json(Event, event),
+        tags=(f"event:{event.id}", "events"),
+    )
 
-    return event_data
+    viewer_fields = crud_events.event.get_viewer_fields(db, event_ids=[event.id], user_id=user.id)
+    detail = {"event": Event.model_validate_json(event_json), **viewer_fields[event.id]}
+
+    response = json_response(
+        EventWithParticipation, detail, headers={"X-Cache": "HIT" if hit else "MISS"}
+    )
+    set_cache_headers(response, etag)
+    return response
 
 
 @router.post(
@@ -142,6 +328,7 @@ def get_event_detail(
 def create_event(
     *,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     event_in: EventCreate,
 ):
@@ -154,8 +341,10 @@ def create_event(
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found")
 
-    event = crud_events.event.create(db=db, obj_in=event_in, creator_id=user.id)
-    return event
+    event = crud_events.event.create(
+        db=db, obj_in=event_in, creator_id=user.id, background_tasks=background_tasks
+    )
+    return json_response(Event, _serialize_event(event))
 
 
 @router.patch(
@@ -166,6 +355,7 @@ def create_event(
 def update_event(
     *,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     event_id: str,
     event_in: EventUpdate,
@@ -189,13 +379,15 @@ def update_event(
         )
 
     event = crud_events.event.update(db=db, db_obj=event, obj_in=event_in)
-    return event
+    background_tasks.add_task(notify_capacity, [event_id])
+    return json_response(Event, _serialize_event(event))
 
 
 @router.delete("/global_events/{event_id}", summary="Delete an event")
 def delete_event(
     *,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     event_id: str,
 ):
@@ -218,6 +410,7 @@ def delete_event(
         )
 
     event = crud_events.event.delete(db=db, event_id=event_id)
+    background_tasks.add_task(notify_capacity, [event_id])
     return event
 
 
@@ -229,6 +422,7 @@ def delete_event(
 def participate_in_event(
     *,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     event_id: str,
 ):
@@ -262,16 +456,21 @@ def participate_in_event(
         )
 
     # Add user participation
-    crud_events.event.participate_in_event(db, event_id=event_id, user_id=user.id)
+    crud_events.event.participate_in_event(
+        db, event_id=event_id, user_id=user.id, background_tasks=background_tasks
+    )
+    background_tasks.add_task(notify_checkins, [event_id])
+    background_tasks.add_task(notify_capacity, [event_id])
 
     # Return event with is_registration_available
-    return _serialize_event(event)
+    return json_response(Event, _serialize_event(event))
 
 
 @router.delete("/user_events/{event_id}", summary="Leave an event")
 def leave_event(
     *,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     event_id: str,
 ):
@@ -296,11 +495,15 @@ def leave_event(
         )
 
     # Remove user participation
-    success = crud_events.event.leave_event(db, event_id=event_id, user_id=user.id)
+    success = crud_events.event.leave_event(
+        db, event_id=event_id, user_id=user.id, background_tasks=background_tasks
+    )
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User is not participating in this event"
         )
+    background_tasks.add_task(notify_checkins, [event_id])
+    background_tasks.add_task(notify_capacity, [event_id])
 
     return {"message": "Successfully left the event"}
 
@@ -327,59 +530,18 @@ def get_user_events(
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found")
 
-    # Get events where user is creator or participant
-    from datetime import date
-
-    from sqlalchemy import and_
-
-    from app.db.models.event import Event, EventParticipation
-
-    # Query events where user is creator or has participation record
-    # Since creators automatically have participation records (type "C"),
-    # we can simplify the query to just check EventParticipation
-    query = (
-        db.query(Event)
-        .join(
-            EventParticipation,
-            and_(
-                EventParticipation.event_id == Event.id,
-                EventParticipation.user_id == user.id,
-            ),
-        )
-        .distinct()
+    events, total, has_more = crud_events.event.get_user_events(
+        db, user_id=user.id, filter_type=filter_type, limit=limit, last_event_id=last_event_id
     )
 
-    # Apply filters
-    if filter_type == "past":
-        query = query.filter(Event.end_date < date.today())
-    elif filter_type == "actual":
-        query = query.filter(Event.end_date >= date.today())
-
-    # Apply pagination
-    if last_event_id:
-        last_event = db.query(Event).filter(Event.id == last_event_id).first()
-        if last_event:
-            query = query.filter(Event.created_at < last_event.created_at)
-
-    # Get total count before pagination
-    total = query.count()
-
-    # Apply pagination - order by created_at desc for consistent pagination
-    query = query.order_by(Event.created_at.desc()).limit(limit + 1)
-    events = query.all()
-
-    # Check if there are more events
-    has_more = len(events) > limit
-    if has_more:
-        events = events[:-1]
-
-    # Convert to EventWithParticipation format
-    events_with_participation = [
-        _serialize_event_with_participation(db=db, event_model=event, user_id=user.id)
-        for event in events
-    ]
+    events_with_participation = serialize_events_with_participation(
+        db=db, events=events, user_id=user.id
+    )
 
-    return EventListResponse(events=events_with_participation, total=total, has_more=has_more)
+    return json_response(
+        EventListResponse,
+        EventListResponse(events=events_with_participation, total=total, has_more=has_more),
+    )
 
 
 @router.post(
@@ -390,6 +552,7 @@ def get_user_events(
 def scan_qr(
     *,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     scan_data: QRScanCreate,
 ):
@@ -408,10 +571,340 @@ def scan_qr(
     if not participation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Participation not found")
 
-    # Create QR scan record
-    crud_qr_scans.create_qr_scan(
-        db, participation_id=scan_data.participation_id, scanned_by_user_id=current_user_id
-    )
+    # The scan record is written off the request path
+    _record_scan(background_tasks, scan_data.participation_id, current_user_id)
 
     # Return user_id and event_id
-    return QRScanResponse(user_id=participation.user_id, event_id=participation.event_id)
+    return json_response(
+        QRScanResponse,
+        QRScanResponse(user_id=participation.user_id, event_id=participation.event_id),
+    )
+
+
+def _record_scan(background_tasks: BackgroundTasks, participation_id: str, max_id: int) -> None:
+    """Queue a scan record; without the periodic writer, flush it after the response."""
+    scan_buffer.add(participation_id, max_id)
+    if not writer_enabled():
+        background_tasks.add_task(flush_scans)
+
+
+@router.post(
+    "/scan_qr/batch",
+    response_model=QRScanBatchResponse,
+    summary="Scan a batch of QR codes collected by a scanner",
+)
+def scan_qr_batch(
+    *,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    batch: QRScanBatch,
+):
+    """
+    Record up to 1000 scans made by one scanner, e.g. after a burst at the
+    entrance or a connectivity gap.
+
+    The participations are validated in one query and the scans written with
+    one insert. Each participant is checked in once: repeats within the batch
+    are reported as "duplicate" and participants scanned before as
+    "already_scanned", so re-sending a batch is safe. Scan times come from the
+    scanner; times in the future are replaced by the receive time.
+    """
+    now = datetime.now()
+    scans = []
+    for item in batch.scans:
+        scanned_at = item.scanned_at or now
+        if scanned_at.tzinfo is not None:
+            # Scan times are stored as naive server-local time
+            scanned_at = scanned_at.astimezone().replace(tzinfo=None)
+        scans.append((item.participation_id, min(scanned_at, now)))
+
+    results = crud_qr_scans.create_qr_scan_batch(db, scans, request.state.user_id)
+    recorded = [
+        {
+            "participation_id": participation_id,
+            "user_id": target[0],
+            "event_id": target[1],
+            "scanned_at": scanned_at,
+        }
+        for (participation_id, scanned_at), (scan_status, target) in zip(
+            scans, results, strict=True
+        )
+        if scan_status == crud_qr_scans.SCAN_RECORDED
+    ]
+    if recorded:
+        background_tasks.add_task(notify_checkins, (), recorded)
+
+    return json_response(
+        QRScanBatchResponse,
+        QRScanBatchResponse(
+            recorded=len(recorded),
+            results=[
+                QRScanBatchResult(
+                    participation_id=item.participation_id,
+                    status=scan_status,
+                    user_id=target[0] if target else None,
+                    event_id=target[1] if target else None,
+                )
+                for item, (scan_status, target) in zip(batch.scans, results, strict=True)
+            ],
+        ),
+    )
+
+
+@router.get(
+    "/user_events/{event_id}/ticket",
+    response_model=QRTicket,
+    summary="Get a signed check-in ticket for an event",
+)
+def get_ticket(
+    *,
+    request: Request,
+    db: Session = Depends(get_db),
+    event_id: str,
+):
+    """
+    Get the current user's signed check-in ticket for an event.
+
+    The ticket carries the participation, event and user IDs and expires at
+    the midnight UTC after the event's last day, the same instant on every
+    host and not before the day ends in any Russian time zone; scanners verify
+    it without the database.
+    """
+    event = crud_events.event.get(db, event_id=event_id)
+    if not event:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+
+    current_user_id = request.state.user_id
+    # Validate that the user exists and get profile ID
+    user = crud_profiles.get_profile_by_max_id(db, max_id=current_user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found")
+
+    participation = crud_events.event.get_user_participation(db, event_id=event_id, user_id=user.id)
+    if not participation or participation.participation_type not in GOING_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User is not participating in this event"
+        )
+
+    expires_at = datetime.combine(event.end_date + timedelta(days=1), time.min, UTC)
+    ticket = issue_ticket(participation.id, event.id, user.id, int(expires_at.timestamp()))
+    return json_response(QRTicket, QRTicket(ticket=ticket, expires_at=expires_at))
+
+
+@router.get(
+    "/global_events/{event_id}/ticket_key",
+    response_model=QRTicketKey,
+    summary="Get the key for verifying an event's tickets offline",
+)
+def get_ticket_key(
+    *,
+    request: Request,
+    db: Session = Depends(get_db),
+    event_id: str,
+):
+    """
+    Get the key that signs an event's tickets, so a scanner can verify them
+    without connectivity. Only the creator can get it.
+    """
+    current_user_id = request.state.user_id
+    # Validate that the user exists and get profile ID
+    user = crud_profiles.get_profile_by_max_id(db, max_id=current_user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found")
+
+    if not crud_events.event.is_creator(db, event_id=event_id, user_id=user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Only the creator can scan tickets"
+        )
+
+    return json_response(
+        QRTicketKey, QRTicketKey(event_id=event_id, key=encoded_event_key(event_id))
+    )
+
+
+@router.get(
+    "/global_events/{event_id}/checkins",
+    summary="Stream live check-in counters of an event",
+    response_class=StreamingResponse,
+)
+async def stream_checkins(
+    *,
+    request: Request,
+    event_id: str,
+):
+    """
+    Stream the event's registered and checked-in counters and new scans as
+    server-sent events. Only the creator can watch.
+
+    The first event (`counters`) is a snapshot with the latest scans; then a
+    `checkin` or `registration` event follows every change, with absolute
+    counters, and a comment is sent every 15 seconds while idle. All watchers
+    of an event share one notification per change.
+    """
+    # Subscribe before the snapshot so that no change falls between them
+    subscription = checkin_publisher.subscribe(event_id)
+    try:
+        snapshot = await asyncio.to_thread(_checkin_snapshot, event_id, request.state.user_id)
+    except BaseException:
+        subscription.close()
+        raise
+    return StreamingResponse(
+        _checkin_stream(subscription, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _checkin_snapshot(event_id: str, max_id: int) -> dict:
+    """Check that the user created the event and read its current check-in state."""
+    # A short-lived session: the stream must not hold a connection while open
+    db = SessionLocal()
+    try:
+        user = crud_profiles.get_profile_by_max_id(db, max_id=max_id)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found"
+            )
+        if not crud_events.event.is_creator(db, event_id=event_id, user_id=user.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Only the creator can watch check-ins"
+            )
+        counters = crud_qr_scans.get_checkin_counters(db, [event_id])[event_id]
+        scans = crud_qr_scans.get_recent_event_scans(db, event_id, RECENT_SCANS)
+        return checkin_message("counters", event_id, counters, scans)
+    finally:
+        db.close()
+
+
+async def _checkin_stream(subscription, snapshot: dict):
+    """Yield server-sent events until the client disconnects and the stream is cancelled."""
+    try:
+        message = snapshot
+        while True:
+            if message is None:
+                yield b": keep-alive\n\n"
+            else:
+                data = json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+                yield f"event: {message['type']}\ndata: {data}\n\n".encode()
+            message = await subscription.get(CHECKIN_HEARTBEAT)
+    finally:
+        subscription.close()
+
+
+@router.post(
+    "/scan_ticket",
+    response_model=QRTicketScanResponse,
+    summary="Scan a signed check-in ticket",
+)
+def scan_ticket(
+    *,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    scan_data: QRTicketScan,
+):
+    """
+    Scan a signed check-in ticket.
+
+    The ticket is verified from its signature alone - no database query is made
+    on the request path - and the scan record is written in the background, so
+    check-in keeps working at gate rates and through short database outages.
+    A successful response therefore confirms the ticket, not the record: the
+    scan of a participation removed after the ticket was issued is dropped
+    when it is written.
+    """
+    try:
+        ticket = verify_ticket(scan_data.ticket)
+    except TicketError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+    _record_scan(background_tasks, ticket.participation_id, request.state.user_id)
+
+    return json_response(
+        QRTicketScanResponse,
+        QRTicketScanResponse(
+            user_id=ticket.user_id,
+            event_id=ticket.event_id,
+            participation_id=ticket.participation_id,
+        ),
+    )
+
+
+@router.websocket("/capacity")
+async def capacity_updates(websocket: WebSocket):
+    """
+    Push participant counts and registration availability of events.
+
+    Authenticate with the `Authorization: tma <init_data>` header or, where
+    headers cannot be set (browsers), with `{"auth": "tma <init_data>"}` as the
+    first message within CAPACITY_AUTH_TIMEOUT; init data is never put in the
+    URL, which proxies log. Send `{"subscribe": [event_id, ...], "unsubscribe": [...]}` at any time;
+    newly subscribed events are answered at once, and changes follow as
+    `{"type": "capacity", "events": {event_id: EventCapacity | null}}` at most
+    once per CAPACITY_PUSH_INTERVAL, null meaning the event was deleted.
+    A client that stops reading is disconnected with code 1013.
+    """
+    authorization = websocket.headers.get("Authorization")
+    accepted = authorization is None
+    if accepted:
+        await websocket.accept()
+        try:
+            authorization = await _receive_capacity_auth(websocket)
+        except WebSocketDisconnect:
+            return
+    init_data = extract_max_auth_from_header(authorization) if authorization else None
+    if not init_data or not verify_init_data_and_get_user_id(init_data, settings.BOT_TOKEN):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    if not accepted:
+        await websocket.accept()
+    connection = capacity_hub.connect(websocket)
+    receiver = asyncio.create_task(_receive_capacity_subscriptions(connection))
+    sender = asyncio.create_task(connection.send_forever())
+    try:
+        done, _pending = await asyncio.wait({receiver, sender}, return_when=asyncio.FIRST_COMPLETED)
+        error = next((task.exception() for task in done if task.exception()), None)
+        if isinstance(error, TimeoutError):
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        elif error is not None and not isinstance(error, WebSocketDisconnect):
+            raise error
+    finally:
+        receiver.cancel()
+        sender.cancel()
+        capacity_hub.disconnect(connection)
+
+
+async def _receive_capacity_auth(websocket: WebSocket) -> Optional[str]:
+    """Read the `{"auth": ...}` message of a client that sent no header."""
+    try:
+        message = await asyncio.wait_for(
+            websocket.receive_json(), timeout=settings.CAPACITY_AUTH_TIMEOUT
+        )
+    except (TimeoutError, ValueError):
+        return None
+    auth = message.get("auth") if isinstance(message, dict) else None
+    return auth if isinstance(auth, str) else None
+
+
+async def _receive_capacity_subscriptions(connection) -> None:
+    """Apply the client's subscription messages until it disconnects."""
+    try:
+        while True:
+            try:
+                command = CapacitySubscription.model_validate(
+                    await connection.websocket.receive_json()
+                )
+            except (ValueError, KeyError, TypeError):
+                connection.notice({"type": "error", "detail": "Invalid subscription message"})
+                continue
+            capacity_hub.unsubscribe(connection, command.unsubscribe)
+            try:
+                added = capacity_hub.subscribe(connection, command.subscribe)
+            except ValueError as error:
+                connection.notice({"type": "error", "detail": str(error)})
+                continue
+            if added:
+                connection.push(await asyncio.to_thread(get_capacities, added))
+    except WebSocketDisconnect:
+        pass
@@ -6,6 +6,7 @@ FastAPI route handlers for file upload and management API.
 # --------------------------------------------------------------------------------
 
 import uuid
+from functools import cache
 
 from fastapi import APIRouter, Depends
 from fastapi import File as FastAPIFile
@@ -14,6 +15,7 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.image_utils import convert_to_webp_and_resize, is_valid_image
+from app.core.metrics import IMAGE_CONVERSION_DURATION
 from app.core.s3 import create_s3_client
 from app.db.crud import files as crud_files
 from app.db.crud import profiles as crud_profiles
@@ -35,9 +37,13 @@ router = APIRouter()
 # --------------------------------------------------------------------------------
 
 
+@cache
 def get_s3_client():
     """
-    Get S3 client instance.
+    Get the S3 client of this process, created on first use.
+
+    boto3 clients are thread-safe, so one client and its connection pool serve
+    all requests of a worker.
 
     Returns:
         S3Client: Configured S3 client.
@@ -52,6 +58,11 @@ def get_s3_client():
     )
 
 
+def reset_s3_client() -> None:
+    """Drop the process's S3 client, e.g. one inherited from the master after a fork."""
+    get_s3_client.cache_clear()
+
+
 # --------------------------------------------------------------------------------
 
 
@@ -89,7 +100,8 @@ async def upload_file(
         )
 
     # Convert to WebP and resize
-    processed_image = convert_to_webp_and_resize(file_content)
+    with IMAGE_CONVERSION_DURATION.time():
+        processed_image = convert_to_webp_and_resize(file_content)
 
     # Generate filename with .webp extension
     filename = f"{uuid.uuid4()}.webp"
@@ -5,15 +5,29 @@ FastAPI route handlers for friends and invitations API.
 
 # --------------------------------------------------------------------------------
 
-
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from typing import Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 from sqlalchemy.orm import Session
 
+from app.core.cache import cached_json_response, response_cache
+from app.core.serialization import dump_json, json_response, precompile
 from app.db.crud import friends as crud_friends
 from app.db.crud import invitations as crud_invitations
 from app.db.crud import profiles as crud_profiles
+from app.schemas.friends import FriendSuggestion
 from app.schemas.invitations import CreateFriendsRequest, InvitationResponse
 from app.schemas.profiles import Profile
+from app.tasks.feed import rebuild_network_feeds
 
 from ....api.v1.docs.examples.friends_examples import (
     check_invitation_examples,
@@ -29,50 +43,86 @@ from ....db.session import get_db
 
 router = APIRouter()
 
+precompile(Profile, list[Profile], list[FriendSuggestion])
+
+FRIENDS_PAGE_SIZE = 100
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
 # --------------------------------------------------------------------------------
 
 
-def profile_with_avatar_url(profile) -> dict:
+def _friends_page_response(
+    db: Session,
+    user_id: str,
+    order: str,
+    limit: Optional[int],
+    cursor: Optional[str],
+    with_total: bool,
+) -> Response:
     """
-    Convert profile to dict with avatar_url.
+    Serialize one page of friends; paging metadata goes into headers so the body
+    stays a plain list.
+
+    Without `limit` and `cursor` all friends are returned, as clients that do
+    not page expect; a cursor without a limit continues with pages of
+    FRIENDS_PAGE_SIZE.
 
     Args:
-        profile: Profile instance from database.
+        db (Session): Database session.
+        user_id (str): ID of the profile whose friends are listed.
+        order (str): "name" or "created_at".
+        limit (Optional[int]): Page size.
+        cursor (Optional[str]): Cursor from the previous page's X-Next-Cursor.
+        with_total (bool): Whether to count all friends into X-Total-Count.
 
     Returns:
-        dict: Profile data with avatar_url.
+        Response: List of friend profiles.
     """
-    profile_dict = {
-        "id": profile.id,
-        "first_name": profile.first_name,
-        "last_name": profile.last_name,
-        "gender": profile.gender,
-        "birth_date": profile.birth_date,
-        "avatar": profile.avatar,
-        "university": profile.university,
-        "bio": profile.bio,
-        "max_id": profile.max_id,
-        "invited_by": profile.invited_by,
-        "created_at": profile.created_at,
-        "avatar_url": profile.avatar_file.url if profile.avatar_file else None,
-    }
-    return profile_dict
-
+    if limit is None and cursor:
+        limit = FRIENDS_PAGE_SIZE
+    try:
+        friends, next_cursor, total = crud_friends.get_friends_page(
+            db, user_id, order=order, limit=limit, cursor=cursor, with_total=with_total
+        )
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
 
-# --------------------------------------------------------------------------------
+    headers = {}
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    if total is not None:
+        headers[TOTAL_COUNT_HEADER] = str(total)
+    return json_response(list[Profile], friends, headers=headers)
 
 
 @router.get("/my", response_model=list[Profile], openapi_extra=get_friends_examples)
-async def get_my_friends(request: Request, db: Session = Depends(get_db)):
+async def get_my_friends(
+    request: Request,
+    db: Session = Depends(get_db),
+    order: str = Query("name", pattern="^(name|created_at)$"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    with_total: bool = Query(False),
+):
     """
     Get current user's friends list.
 
+    Friends are ordered by name or by friendship time (newest first). All of
+    them are returned unless `limit` is given; the cursor for the next page is
+    then returned in X-Next-Cursor and, with `with_total=true`, the number of
+    friends in X-Total-Count.
+
     Args:
         request (Request): FastAPI request object.
         db (Session): Database session.
+        order (str): "name" or "created_at".
+        limit (Optional[int]): Page size, all friends if not set.
+        cursor (Optional[str]): Cursor from the previous page.
+        with_total (bool): Whether to return X-Total-Count.
 
     Returns:
-        List[FriendsWithProfiles]: List of friends with profile information.
+        List[Profile]: Friends' profiles.
     """
     user_id = request.state.user_id
 
@@ -81,28 +131,33 @@ async def get_my_friends(request: Request, db: Session = Depends(get_db)):
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    friends_with_profiles = crud_friends.get_friends_with_profiles(db, profile.id)
-
-    # Return only the friend's profile (exclude self)
-    friends_only: list[dict] = []
-    for _friend_record, _current_user_profile, friend_profile in friends_with_profiles:
-        friends_only.append(profile_with_avatar_url(friend_profile))
-
-    return friends_only
+    return _friends_page_response(db, profile.id, order, limit, cursor, with_total)
 
 
 @router.get("/list/{profile_id}", response_model=list[Profile])
-async def get_friends(profile_id: str, request: Request, db: Session = Depends(get_db)):
+async def get_friends(
+    profile_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    order: str = Query("name", pattern="^(name|created_at)$"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    with_total: bool = Query(False),
+):
     """
-    Get friends list of profile_id profile.
+    Get friends list of profile_id profile, paginated as `/friends/my`.
 
     Args:
         profile_id (str): id of profile
         request (Request): FastAPI request object.
         db (Session): Database session.
+        order (str): "name" or "created_at".
+        limit (Optional[int]): Page size, all friends if not set.
+        cursor (Optional[str]): Cursor from the previous page.
+        with_total (bool): Whether to return X-Total-Count.
 
     Returns:
-        List[FriendsWithProfiles]: List of friends with profile information.
+        List[Profile]: Friends' profiles.
     """
     user_id = request.state.user_id
 
@@ -118,14 +173,7 @@ async def get_friends(profile_id: str, request: Request, db: Session = Depends(g
             status_code=status.HTTP_400_BAD_REQUEST, detail="Required profile not found"
         )
 
-    friends_with_profiles = crud_friends.get_friends_with_profiles(db, required_profile.id)
-
-    # Return only the friend's profile (exclude self)
-    friends_only: list[dict] = []
-    for _friend_record, _current_user_profile, friend_profile in friends_with_profiles:
-        friends_only.append(profile_with_avatar_url(friend_profile))
-
-    return friends_only
+    return _friends_page_response(db, required_profile.id, order, limit, cursor, with_total)
 
 
 # --------------------------------------------------------------------------------
@@ -154,7 +202,47 @@ async def get_secondary_friends(request: Request, db: Session = Depends(get_db))
 
     secondary_friends = crud_friends.get_secondary_friends(db, profile.id)
 
-    return [profile_with_avatar_url(friend) for friend in secondary_friends]
+    return json_response(list[Profile], secondary_friends)
+
+
+@router.get("/suggestions", response_model=list[FriendSuggestion])
+async def get_friend_suggestions(
+    request: Request,
+    db: Session = Depends(get_db),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+):
+    """
+    Get "people you may know": friends of friends ranked by mutual friend count.
+
+    Unlike `/friends/secondary`, candidates are ranked and paginated in the
+    database; the cursor for the next page is returned in X-Next-Cursor.
+
+    Args:
+        request (Request): FastAPI request object.
+        db (Session): Database session.
+        limit (int): Page size.
+        cursor (Optional[str]): Cursor from the previous page.
+
+    Returns:
+        List[FriendSuggestion]: Candidate profiles with mutual friend counts.
+    """
+    user_id = request.state.user_id
+
+    # Get user profile by Max ID
+    profile = crud_profiles.get_profile_by_max_id(db, user_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    try:
+        suggestions, next_cursor = crud_friends.get_friend_suggestions(
+            db, profile.id, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return json_response(list[FriendSuggestion], suggestions, headers=headers)
 
 
 # --------------------------------------------------------------------------------
@@ -163,13 +251,19 @@ async def get_secondary_friends(request: Request, db: Session = Depends(get_db))
 @router.delete(
     "/{profile_id}", status_code=status.HTTP_204_NO_CONTENT, openapi_extra=delete_friends_examples
 )
-async def delete_friends(profile_id: str, request: Request, db: Session = Depends(get_db)):
+async def delete_friends(
+    profile_id: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
     """
     Delete friendship between current user and specified profile.
 
     Args:
         profile_id (str): ID of the profile to remove friendship with.
         request (Request): FastAPI request object.
+        background_tasks (BackgroundTasks): Tasks run after the response.
         db (Session): Database session.
 
     Returns:
@@ -187,6 +281,9 @@ async def delete_friends(profile_id: str, request: Request, db: Session = Depend
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Friendship not found")
 
     crud_friends.delete_friends(db, profile.id, profile_id)
+
+    # The network changed - rebuild the ranked feeds of both users and their friends
+    background_tasks.add_task(rebuild_network_feeds, [profile.id, profile_id])
     return None
 
 
@@ -198,6 +295,9 @@ async def create_or_get_invitation(request: Request, db: Session = Depends(get_d
     """
     Create or get invitation for current user.
 
+    A user has one invitation for good, so the response is cached per Max ID
+    and repeated calls do not touch the database.
+
     Args:
         request (Request): FastAPI request object.
         db (Session): Database session.
@@ -206,15 +306,21 @@ async def create_or_get_invitation(request: Request, db: Session = Depends(get_d
         InvitationResponse: Invitation information.
     """
     user_id = request.state.user_id
+    # Deleting the invitation or the profile drops the entry; tags are added by build()
+    tags = []
 
-    # Get user profile by Max ID
-    profile = crud_profiles.get_profile_by_max_id(db, user_id)
-    if not profile:
-        raise HTTPException(status_code=404, detail="Profile not found")
+    def build() -> bytes:
+        # Get user profile by Max ID
+        profile = crud_profiles.get_profile_by_max_id(db, user_id)
+        if not profile:
+            raise HTTPException(status_code=404, detail="Profile not found")
 
-    invitation = crud_invitations.get_or_create_invitation(db, profile.id)
+        invitation_id = crud_invitations.get_or_create_invitation_id(db, profile.id)
+        tags.extend((f"invitation:{invitation_id}", f"profile:{profile.id}"))
+        return dump_json(InvitationResponse, InvitationResponse(id=invitation_id))
 
-    return InvitationResponse(id=invitation.id)
+    body, hit = response_cache.get_or_set("invitation_id", str(user_id), build, tags=tags)
+    return cached_json_response(body, hit)
 
 
 # --------------------------------------------------------------------------------
@@ -236,15 +342,25 @@ async def check_invitation(invitation_id: str, db: Session = Depends(get_db)):
     Returns:
         Profile: profile of referrer.
     """
-    invitation = crud_invitations.get_invitation_by_id(db, invitation_id)
-    if not invitation:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="INVALID_INVITATION")
+    # The referrer's tag is appended by build(); tags are stored after it runs
+    tags = [f"invitation:{invitation_id}"]
+
+    def build() -> bytes:
+        invitation = crud_invitations.get_invitation_by_id(db, invitation_id)
+        if not invitation:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="INVALID_INVITATION")
 
-    referrer = crud_profiles.get_profile(db, invitation.user_id)
-    if not referrer:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="INVALID_INVITATION")
+        referrer = crud_profiles.get_profile(db, invitation.user_id)
+        if not referrer:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="INVALID_INVITATION"
+            )
 
-    return profile_with_avatar_url(referrer)
+        tags.append(f"profile:{referrer.id}")
+        return dump_json(Profile, referrer)
+
+    body, hit = response_cache.get_or_set("invitation", invitation_id, build, tags=tags)
+    return cached_json_response(body, hit)
 
 
 # --------------------------------------------------------------------------------
@@ -252,14 +368,21 @@ async def check_invitation(invitation_id: str, db: Session = Depends(get_db)):
 
 @router.post("/new", response_model=InvitationResponse, openapi_extra=create_friends_examples)
 async def create_friends_from_invitation(
-    request_data: CreateFriendsRequest, request: Request, db: Session = Depends(get_db)
+    request_data: CreateFriendsRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
 ):
     """
     Create friendship using invitation.
 
+    Idempotent: accepting an invitation of someone who is already a friend (a
+    double tap or a retried request) returns the same successful response.
+
     Args:
         request_data (CreateFriendsRequest): Request data with invitation ID.
         request (Request): FastAPI request object.
+        background_tasks (BackgroundTasks): Tasks run after the response.
         db (Session): Database session.
 
     Returns:
@@ -267,27 +390,27 @@ async def create_friends_from_invitation(
     """
     user_id = request.state.user_id
 
-    # Get user profile by Max ID
+    friendship = crud_friends.create_friends_from_invitation(
+        db, request_data.invitation_id, user_id
+    )
+    if friendship:
+        # The network changed - rebuild the ranked feeds of both users and their friends
+        background_tasks.add_task(rebuild_network_feeds, list(friendship))
+        return InvitationResponse(id=request_data.invitation_id)
+
+    # Nothing was inserted - find out why
     profile = crud_profiles.get_profile_by_max_id(db, user_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    # Check if invitation exists
     invitation = crud_invitations.get_invitation_by_id(db, request_data.invitation_id)
     if not invitation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="INVALID_INVITATION")
 
-    # Check if trying to become friends with self
     if profile.id == invitation.user_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot become friends with yourself"
         )
 
-    # Check if already friends
-    if crud_friends.are_friends(db, profile.id, invitation.user_id):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Already friends")
-
-    # Create friendship
-    crud_friends.create_friends(db, profile.id, invitation.user_id)
-
+    # Already friends
     return InvitationResponse(id=request_data.invitation_id)
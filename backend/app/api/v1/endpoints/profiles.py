@@ -10,6 +10,8 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
+from app.core.cache import cached_json_response, response_cache
+from app.core.serialization import dump_json, json_response, precompile
 from app.db.crud import files as crud_files
 from app.db.crud import profiles as crud_profiles
 
@@ -27,36 +29,7 @@ from ....schemas.profiles import Profile, ProfileCreate, ProfilePatch
 
 router = APIRouter()
 
-# --------------------------------------------------------------------------------
-
-
-def profile_with_avatar_url(profile) -> dict:
-    """
-    Convert profile to dict with avatar_url.
-
-    Args:
-        profile: Profile instance from database.
-
-    Returns:
-        dict: Profile data with avatar_url.
-    """
-    profile_dict = {
-        "id": profile.id,
-        "first_name": profile.first_name,
-        "last_name": profile.last_name,
-        "gender": profile.gender,
-        "birth_date": profile.birth_date,
-        "avatar": profile.avatar,
-        "university": profile.university,
-        "bio": profile.bio,
-        "max_id": profile.max_id,
-        "invited_by": profile.invited_by,
-        "is_superuser": profile.is_superuser,
-        "created_at": profile.created_at,
-        "avatar_url": profile.avatar_file.url if profile.avatar_file else None,
-    }
-    return profile_dict
-
+precompile(Profile, list[Profile])
 
 # --------------------------------------------------------------------------------
 
@@ -77,7 +50,7 @@ async def read_my_profile(request: Request, db: Session = Depends(get_db)):
     profile = crud_profiles.get_profile_by_max_id(db, user_id)
     if not profile:
         return Response(status_code=status.HTTP_204_NO_CONTENT)
-    return profile_with_avatar_url(profile)
+    return json_response(Profile, profile)
 
 
 # --------------------------------------------------------------------------------
@@ -95,10 +68,17 @@ async def read_profile(profile_id: str, db: Session = Depends(get_db)):
     Returns:
         Profile: Profile schema.
     """
-    profile = crud_profiles.get_profile(db, profile_id)
-    if not profile:
-        raise HTTPException(status_code=404, detail="Profile not found")
-    return profile_with_avatar_url(profile)
+
+    def build() -> bytes:
+        profile = crud_profiles.get_profile(db, profile_id)
+        if not profile:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return dump_json(Profile, profile)
+
+    body, hit = response_cache.get_or_set(
+        "profile", profile_id, build, tags=(f"profile:{profile_id}",)
+    )
+    return cached_json_response(body, hit)
 
 
 # --------------------------------------------------------------------------------
@@ -124,7 +104,7 @@ async def read_invited_profiles(
         List[Profile]: List of invited profile schemas.
     """
     invited_profiles = crud_profiles.get_profiles_by_inviter(db, profile_id, skip=skip, limit=limit)
-    return [profile_with_avatar_url(profile) for profile in invited_profiles]
+    return json_response(list[Profile], invited_profiles)
 
 
 # --------------------------------------------------------------------------------
@@ -167,7 +147,7 @@ async def create_profile(
 
     # Automatic registration - no invitation required
     profile = crud_profiles.create_profile(db, profile_in, max_id=user_id, invited_by=None)
-    return profile_with_avatar_url(profile)
+    return json_response(Profile, profile, status_code=status.HTTP_201_CREATED)
 
 
 # --------------------------------------------------------------------------------
@@ -202,7 +182,7 @@ async def update_profile(profile_in: ProfilePatch, request: Request, db: Session
             )
 
     updated_profile = crud_profiles.update_profile(db, profile.id, profile_in)
-    return profile_with_avatar_url(updated_profile)
+    return json_response(Profile, updated_profile)
 
 
 # --------------------------------------------------------------------------------
@@ -0,0 +1,161 @@
+"""
+Max Bot API
+Rate-limited async client for sending bot messages, with retry of transient errors.
+"""
+
+# --------------------------------------------------------------------------------
+
+import asyncio
+import time
+from typing import Optional
+
+import httpx
+
+from .config import settings
+
+# --------------------------------------------------------------------------------
+
+MAX_RETRY_DELAY = 30.0  # longer waits are left to the caller's next attempt
+
+
+class BotAPIError(Exception):
+    """
+    Bot API request failed.
+
+    Attributes:
+        status (Optional[int]): HTTP status, None for network errors.
+        transient (bool): True if the same request may succeed later.
+        retry_after (Optional[int]): Seconds to wait, as asked by the server.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status: Optional[int] = None,
+        transient: bool = False,
+        retry_after: Optional[int] = None,
+    ):
+        super().__init__(message)
+        self.status = status
+        self.transient = transient
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Token bucket limiting operations per second across concurrent tasks."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate (float): Operations per second.
+            burst (Optional[int]): Bucket size; defaults to one second of operations.
+        """
+        self.rate = rate
+        self.capacity = float(burst or max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until an operation is allowed."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# --------------------------------------------------------------------------------
+
+
+class BotSender:
+    """
+    Sends messages through the Max bot API.
+
+    Every HTTP request, retries included, passes the rate limiter. Rate limit
+    (429), server (5xx) and network errors are retried with exponential backoff,
+    honouring Retry-After; other client errors (e.g. the user blocked the bot)
+    fail at once. Requests share one connection pool; close the sender when done.
+    """
+
+    def __init__(
+        self,
+        *,
+        token: Optional[str] = None,
+        base_url: Optional[str] = None,
+        rate: float = 20.0,
+        retries: int = 3,
+        backoff: float = 1.0,
+        timeout: float = 10.0,
+    ):
+        """
+        Initialize the sender.
+
+        Args:
+            token (Optional[str]): Bot token, BOT_TOKEN by default.
+            base_url (Optional[str]): API base URL, MAX_BOT_API_URL by default.
+            rate (float): Requests per second.
+            retries (int): Retries of a transient error per message.
+            backoff (float): First retry delay in seconds, doubled on each retry.
+            timeout (float): Request timeout in seconds.
+        """
+        self.limiter = RateLimiter(rate)
+        self.retries = retries
+        self.backoff = backoff
+        self.client = httpx.AsyncClient(
+            base_url=(base_url or settings.MAX_BOT_API_URL).rstrip("/"),
+            headers={"Authorization": token or settings.BOT_TOKEN},
+            timeout=timeout,
+        )
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        await self.client.aclose()
+
+    async def send_message(self, user_id: int, text: str) -> None:
+        """
+        Send a text message to a user.
+
+        Args:
+            user_id (int): Max ID of the recipient.
+            text (str): Message text.
+
+        Raises:
+            BotAPIError: If the message was not delivered.
+        """
+        for attempt in range(self.retries + 1):
+            await self.limiter.acquire()
+            try:
+                await self._post(user_id, text)
+                return
+            except BotAPIError as error:
+                delay = (
+                    self.backoff * 2**attempt if error.retry_after is None else error.retry_after
+                )
+                if not error.transient or attempt == self.retries or delay > MAX_RETRY_DELAY:
+                    raise
+                await asyncio.sleep(delay)
+
+    async def _post(self, user_id: int, text: str) -> None:
+        """Make one POST request, raising BotAPIError on failure."""
+        try:
+            response = await self.client.post(
+                "/messages", params={"user_id": user_id}, json={"text": text}
+            )
+        except httpx.TransportError as error:
+            raise BotAPIError(f"Network error: {error}", transient=True) from error
+        if response.is_success:
+            return
+        retry_after = response.headers.get("Retry-After", "")
+        raise BotAPIError(
+            f"HTTP {response.status_code}: {response.text[:200]}",
+            status=response.status_code,
+            transient=response.status_code == 429 or response.status_code >= 500,
+            retry_after=int(retry_after) if retry_after.isdigit() else None,
+        )
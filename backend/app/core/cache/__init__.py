@@ -0,0 +1,73 @@
+"""
+Response cache for shared use
+Pluggable cache backends and the application-wide response cache instance.
+"""
+
+# --------------------------------------------------------------------------------
+
+from ..config import settings
+from ..log_config import logger
+from .backends import CacheBackend, InMemoryLRUCache, NullCache, RedisCache
+from .response_cache import ResponseCache, cached_json_response
+
+# --------------------------------------------------------------------------------
+
+
+def create_cache_backend(
+    backend: str, redis_url: str = "", max_entries: int = 10000
+) -> CacheBackend:
+    """
+    Create a cache backend by name.
+
+    Args:
+        backend (str): "memory", "redis" or "none".
+        redis_url (str): Redis URL for the "redis" backend.
+        max_entries (int): Entry limit for the "memory" backend.
+
+    Returns:
+        CacheBackend: Configured backend; falls back to "memory" if Redis is
+        requested but unavailable.
+    """
+    if backend == "none":
+        return NullCache()
+    if backend == "redis":
+        try:
+            return RedisCache.from_url(redis_url)
+        except RuntimeError:
+            logger.warning("Redis cache backend unavailable, using in-process cache")
+    return InMemoryLRUCache(max_entries=max_entries)
+
+
+# --------------------------------------------------------------------------------
+
+# Per-route TTLs (seconds)
+ROUTE_TTLS = {
+    "tags": settings.CACHE_TTL_TAGS,
+    "event": settings.CACHE_TTL_EVENT,
+    "profile": settings.CACHE_TTL_PROFILE,
+    "invitation": settings.CACHE_TTL_INVITATION,
+    "invitation_id": settings.CACHE_TTL_INVITATION_ID,
+}
+
+response_cache = ResponseCache(
+    create_cache_backend(
+        settings.CACHE_BACKEND,
+        redis_url=settings.CACHE_REDIS_URL,
+        max_entries=settings.CACHE_MAX_ENTRIES,
+    ),
+    ttls=ROUTE_TTLS,
+)
+
+# --------------------------------------------------------------------------------
+
+__all__ = [
+    "CacheBackend",
+    "InMemoryLRUCache",
+    "NullCache",
+    "RedisCache",
+    "ResponseCache",
+    "ROUTE_TTLS",
+    "cached_json_response",
+    "create_cache_backend",
+    "response_cache",
+]
@@ -0,0 +1,234 @@
+"""
+Cache Backends
+Storage backends for the response cache: in-process LRU, Redis protocol, no-op.
+"""
+
+# --------------------------------------------------------------------------------
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable
+from typing import Optional
+
+# --------------------------------------------------------------------------------
+
+
+class CacheBackend(ABC):
+    """
+    Interface of a byte-value cache with tag based invalidation.
+
+    Every entry is stored with a TTL and a set of tags; invalidating a tag drops
+    all entries stored with it.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached value.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Optional[bytes]: Cached value or None on miss.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: int, tags: Iterable[str] = ()) -> None:
+        """
+        Store a value.
+
+        Args:
+            key (str): Cache key.
+            value (bytes): Value to store.
+            ttl (int): Time to live in seconds.
+            tags (Iterable[str]): Invalidation tags of the entry.
+        """
+
+    @abstractmethod
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        """
+        Drop all entries stored with any of the tags.
+
+        Args:
+            tags (Iterable[str]): Tags to invalidate.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop all entries."""
+
+
+# --------------------------------------------------------------------------------
+
+
+class NullCache(CacheBackend):
+    """Backend that stores nothing; every lookup is a miss."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def set(self, key: str, value: bytes, ttl: int, tags: Iterable[str] = ()) -> None:
+        return None
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        return None
+
+    def clear(self) -> None:
+        return None
+
+
+# --------------------------------------------------------------------------------
+
+
+class InMemoryLRUCache(CacheBackend):
+    """
+    Thread-safe in-process LRU cache with per-entry TTL.
+
+    Entries live in the memory of one worker process, so invalidation only
+    reaches the worker that performed the write; other workers serve their
+    copy until its TTL expires.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of entries before LRU eviction.
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes, tuple[str, ...]]] = OrderedDict()
+        self._tag_index: defaultdict[str, set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _tags = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int, tags: Iterable[str] = ()) -> None:
+        tags = tuple(tags)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tag_index[tag].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in self._tag_index.pop(tag, set()):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # --------------------------------------------------------------------------------
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry and its tag index references. Caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+
+# --------------------------------------------------------------------------------
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache stored in a Redis-protocol server shared by all workers.
+
+    Works with any client exposing the redis-py command API (`redis.Redis`, or a
+    local stand-in such as fakeredis in tests). Each tag is a set of the keys
+    stored with it, so invalidation is visible to every worker at once.
+    """
+
+    def __init__(self, client, prefix: str = "cache:"):
+        """
+        Initialize the cache.
+
+        Args:
+            client: redis-py compatible synchronous client.
+            prefix (str): Namespace prepended to every key.
+        """
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "cache:") -> "RedisCache":
+        """
+        Create a cache connected to a Redis URL.
+
+        Args:
+            url (str): Redis connection URL.
+            prefix (str): Namespace prepended to every key.
+
+        Returns:
+            RedisCache: Configured cache.
+
+        Raises:
+            RuntimeError: If the `redis` package is not installed.
+        """
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The redis cache backend requires the `redis` package") from e
+        return cls(redis.Redis.from_url(url), prefix=prefix)
+
+    # --------------------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: int, tags: Iterable[str] = ()) -> None:
+        full_key = self.prefix + key
+        pipe = self.client.pipeline()
+        pipe.set(full_key, value, ex=ttl)
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            pipe.sadd(tag_key, full_key)
+            pipe.expire(tag_key, ttl)
+        pipe.execute()
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            keys = self.client.smembers(tag_key)
+            self.client.delete(tag_key, *keys)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    # --------------------------------------------------------------------------------
+
+    def _tag_key(self, tag: str) -> str:
+        """Build the key of the set holding the keys stored with a tag."""
+        return f"{self.prefix}tag:{tag}"
@@ -0,0 +1,159 @@
+"""
+Response Cache
+Serialized-once caching of viewer-independent response bodies with hit/miss stats.
+"""
+
+# --------------------------------------------------------------------------------
+
+import threading
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+
+from fastapi import Response
+
+from ..log_config import logger
+from .backends import CacheBackend
+
+# --------------------------------------------------------------------------------
+
+
+class ResponseCache:
+    """
+    Route-aware cache of serialized JSON bodies.
+
+    Each route has its own TTL and hit/miss counters. Backend failures are
+    logged and treated as misses, so a cache outage never fails a request.
+    """
+
+    def __init__(self, backend: CacheBackend, ttls: dict[str, int]):
+        """
+        Initialize the cache.
+
+        Args:
+            backend (CacheBackend): Storage backend.
+            ttls (dict[str, int]): Route name to TTL in seconds; routes with a
+                non-positive TTL are not cached.
+        """
+        self.backend = backend
+        self.ttls = ttls
+        self._hits: defaultdict[str, int] = defaultdict(int)
+        self._misses: defaultdict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------------------------------
+
+    def get_or_set(
+        self,
+        route: str,
+        key: str,
+        build: Callable[[], bytes],
+        *,
+        tags: Iterable[str] = (),
+    ) -> tuple[bytes, bool]:
+        """
+        Get a cached body or build, store and return it.
+
+        Exceptions raised by `build` (e.g. HTTPException for 404) propagate and
+        nothing is stored.
+
+        Args:
+            route (str): Route name, selects TTL and counters.
+            key (str): Key within the route.
+            build (Callable[[], bytes]): Produces the serialized body on a miss.
+            tags (Iterable[str]): Invalidation tags of the entry.
+
+        Returns:
+            tuple[bytes, bool]: Body and whether it came from the cache.
+        """
+        ttl = self.ttls.get(route, 0)
+        full_key = f"{route}:{key}"
+
+        if ttl > 0:
+            try:
+                cached = self.backend.get(full_key)
+            except Exception:
+                logger.warning(f"Cache read failed for {full_key}", exc_info=True)
+                cached = None
+            if cached is not None:
+                self._count(self._hits, route)
+                return cached, True
+
+        self._count(self._misses, route)
+        body = build()
+
+        if ttl > 0:
+            try:
+                self.backend.set(full_key, body, ttl, tags)
+            except Exception:
+                logger.warning(f"Cache write failed for {full_key}", exc_info=True)
+        return body, False
+
+    def invalidate(self, *tags: str) -> None:
+        """
+        Drop all entries stored with any of the tags.
+
+        Called by CRUD write paths after commit.
+
+        Args:
+            *tags (str): Tags to invalidate.
+        """
+        try:
+            self.backend.invalidate_tags(tags)
+        except Exception:
+            logger.warning(f"Cache invalidation failed for {tags}", exc_info=True)
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        self.backend.clear()
+        with self._lock:
+            self._hits.clear()
+            self._misses.clear()
+
+    # --------------------------------------------------------------------------------
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """
+        Get hit/miss counters of this process.
+
+        Returns:
+            dict[str, dict[str, float]]: Route name to hits, misses and hit ratio.
+        """
+        with self._lock:
+            routes = set(self._hits) | set(self._misses)
+            result = {}
+            for route in sorted(routes):
+                hits, misses = self._hits[route], self._misses[route]
+                result[route] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+                }
+            return result
+
+    def _count(self, counter: defaultdict[str, int], route: str) -> None:
+        """Increment a per-route counter."""
+        with self._lock:
+            counter[route] += 1
+
+
+# --------------------------------------------------------------------------------
+
+
+def cached_json_response(body: bytes, hit: bool, status_code: int = 200) -> Response:
+    """
+    Wrap a cached JSON body into a response.
+
+    Args:
+        body (bytes): Serialized JSON body.
+        hit (bool): Whether the body came from the cache (sets X-Cache).
+        status_code (int): HTTP status code.
+
+    Returns:
+        Response: JSON response.
+    """
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers={"X-Cache": "HIT" if hit else "MISS"},
+    )
@@ -73,9 +73,11 @@ class Settings(BaseSettings):
     DOCS_USERNAME: str = "admin"
     DOCS_PASSWORD: str = "<PASSWORD>"
     BASE_API_URL: str = "http://localhost:8000"
+    OPENAPI_ASSET_PATH: str = ""  # written by `python -m app.core.openapi`, empty = lazy
 
     # MAX
     BOT_TOKEN: str = "<TOKEN>"
+    MAX_BOT_API_URL: str = "https://platform-api.max.ru"
 
     # S3 Configuration
     S3_ACCESS_KEY: str = ""
@@ -85,6 +87,72 @@ class Settings(BaseSettings):
     S3_PUBLIC_URL: str = ""
     S3_REGION: str = ""
 
+    # Production server (python -m app.server)
+    GUNICORN_BIND: str = "0.0.0.0:8000"
+    GUNICORN_WORKERS: int = 0  # 0 = one per CPU of the container quota
+    GUNICORN_MAX_REQUESTS: int = 10000  # requests before a worker is recycled, 0 disables
+    GUNICORN_MAX_REQUESTS_JITTER: int = 1000  # random extra requests, spreads the restarts
+    GUNICORN_TIMEOUT: int = 60  # seconds
+    GUNICORN_GRACEFUL_TIMEOUT: int = 30  # seconds
+
+    # Background tasks
+    BACKGROUND_TASKS_ENABLED: bool = True
+    EVENT_STATUS_SWEEP_INTERVAL: int = 300  # seconds, 0 disables the sweep
+    QR_SCAN_FLUSH_INTERVAL: float = 1.0  # seconds between scan writes, 0 = after each response
+    QR_SCAN_BUFFER_SIZE: int = 100000  # pending scans kept while the database is unreachable
+
+    # Live updates
+    CAPACITY_PUSH_INTERVAL: float = 1.0  # seconds between capacity pushes to a WebSocket
+    CAPACITY_MAX_SUBSCRIPTIONS: int = 100  # events one WebSocket may subscribe to
+    CAPACITY_AUTH_TIMEOUT: float = 10.0  # seconds to wait for the auth message
+
+    # Event reminders
+    REMINDER_INTERVAL: float = 300.0  # seconds between scheduler passes, 0 disables reminders
+    REMINDER_LEAD_DAYS: int = 1  # remind of events starting within this many days
+    REMINDER_SEND_FROM_HOUR: int = 10  # reminders go out from this local hour...
+    REMINDER_SEND_UNTIL_HOUR: int = 22  # ...until this one (exclusive)
+    REMINDER_RATE_LIMIT: float = 20.0  # bot API messages per second, all workers
+    REMINDER_BATCH_SIZE: int = 200  # reminders claimed and sent per batch
+    REMINDER_MAX_ATTEMPTS: int = 5  # scheduler passes before a reminder is given up
+
+    # QR tickets
+    TICKET_SECRET: str = ""  # signs check-in tickets, empty = derived from BOT_TOKEN
+
+    # Request logging
+    REQUEST_BODY_PREVIEW_BYTES: int = 1000  # 0 disables body previews
+    REQUEST_BODY_PREVIEW_SAMPLE_RATE: float = 1.0
+    # Path prefix -> [max_bytes, sample_rate], e.g. {"/v1/events/": [500, 0.1]}
+    REQUEST_BODY_PREVIEW_ROUTES: dict[str, tuple[int, float]] = {}
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    # Path prefix -> sample rate for hot endpoints, e.g. {"/v1/events/feed/": 0.05}
+    ACCESS_LOG_ROUTES: dict[str, float] = {}
+
+    # SQL query accounting
+    QUERY_STATS_ENABLED: bool = True  # query count/DB time in logs and Server-Timing
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 10  # repeated statements per request, 0 disables
+
+    # On-demand profiling
+    PROFILER_TOKEN: str = ""  # X-Profile header value; also guards /internal/profiles
+    PROFILER_ROUTES: dict[str, float] = {}  # path prefix -> share of requests profiled
+    PROFILER_INTERVAL: float = 0.005  # seconds between stack samples
+    PROFILER_DIR: str = "/tmp/max-events-profiles"
+    PROFILER_MAX_PROFILES: int = 200  # oldest profiles are removed above this
+
+    # Metrics
+    METRICS_TOKEN: str = ""  # Bearer token for /internal/metrics, empty disables it
+    METRICS_MULTIPROC_DIR: str = ""  # shared directory to aggregate gunicorn workers
+    METRICS_FLUSH_INTERVAL: float = 5.0  # seconds between per-worker snapshots
+
+    # Response cache
+    CACHE_BACKEND: str = "memory"  # memory | redis | none
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_TTL_TAGS: int = 60  # seconds, 0 disables caching of the route
+    CACHE_TTL_EVENT: int = 30
+    CACHE_TTL_PROFILE: int = 60
+    CACHE_TTL_INVITATION: int = 60
+    CACHE_TTL_INVITATION_ID: int = 3600  # a user's invitation ID changes only on deletion
+
     model_config = {
         "env_file": str(ENV_FILE),
         "env_file_encoding": "utf-8",
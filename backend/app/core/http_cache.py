@@ -0,0 +1,93 @@
+"""
+HTTP Caching
+Weak ETag generation and conditional GET helpers for polled endpoints.
+"""
+
+# --------------------------------------------------------------------------------
+
+import hashlib
+from typing import Optional
+
+from fastapi import Response, status
+
+# --------------------------------------------------------------------------------
+
+# Viewer-specific data: browsers may store it but must revalidate every time,
+# shared caches (nginx) must not store it.
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+# --------------------------------------------------------------------------------
+
+
+def make_weak_etag(*parts) -> str:
+    """
+    Build a weak ETag from the values a representation depends on.
+
+    Args:
+        *parts: Version markers (ids, counters, timestamps, query params).
+
+    Returns:
+        str: Weak ETag, e.g. W/"3f2a...".
+    """
+    digest = hashlib.blake2b(
+        "\x1f".join("" if part is None else str(part) for part in parts).encode(),
+        digest_size=12,
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag using weak comparison.
+
+    Args:
+        if_none_match (Optional[str]): Raw If-None-Match header value.
+        etag (str): Current ETag.
+
+    Returns:
+        bool: True if the client already has the current representation.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(",")
+    )
+
+
+# --------------------------------------------------------------------------------
+
+
+def set_cache_headers(
+    response: Response, etag: str, cache_control: str = PRIVATE_REVALIDATE
+) -> None:
+    """
+    Attach validator and caching policy headers to a response.
+
+    Args:
+        response (Response): Response to modify.
+        etag (str): Current ETag.
+        cache_control (str): Cache-Control policy.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    response.headers["Vary"] = "Authorization"
+
+
+def not_modified(etag: str, cache_control: str = PRIVATE_REVALIDATE) -> Response:
+    """
+    Build a 304 Not Modified response.
+
+    Args:
+        etag (str): Current ETag.
+        cache_control (str): Cache-Control policy.
+
+    Returns:
+        Response: Empty 304 response carrying the validator headers.
+    """
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag, cache_control)
+    return response
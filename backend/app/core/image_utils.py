@@ -7,7 +7,8 @@ Handles image conversion, resizing, and validation.
 
 import io
 
-from PIL import Image, ImageOps, UnidentifiedImageError
+# Pillow is imported on first use, so workers that never process an image do
+# not load it at boot
 
 # --------------------------------------------------------------------------------
 
@@ -22,6 +23,8 @@ def is_valid_image(file_bytes: bytes) -> bool:
     Returns:
         bool: True if valid image, False otherwise.
     """
+    from PIL import Image, UnidentifiedImageError
+
     try:
         image = Image.open(io.BytesIO(file_bytes))
         # Check if it's a GIF (animated or static)
@@ -46,6 +49,8 @@ def convert_to_webp_and_resize(file_bytes: bytes, max_size: int = 1024) -> bytes
     Returns:
         bytes: Processed image in WebP format.
     """
+    from PIL import Image, ImageOps
+
     # Open image
     image = Image.open(io.BytesIO(file_bytes))
 
@@ -96,5 +101,7 @@ def get_image_info(file_bytes: bytes) -> tuple[int, int, str]:
     Returns:
         Tuple[int, int, str]: Width, height, and format.
     """
+    from PIL import Image
+
     image = Image.open(io.BytesIO(file_bytes))
     return image.size[0], image.size[1], image.format or "Unknown"
@@ -1,5 +1,102 @@
+"""
+Logging Config
+Queue-based structured JSON logging with request context bound via contextvars.
+"""
+
+# --------------------------------------------------------------------------------
+
+import atexit
+import contextvars
 import json
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# --------------------------------------------------------------------------------
+
+# Request context, set by RequestLoggingMiddleware and copied into every record
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "request_id", default=None
+)
+user_id_var: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("user_id", default=None)
+
+# Structured fields copied from LogRecord attributes (passed via `extra=`)
+STRUCTURED_FIELDS = (
+    "request_id",
+    "method",
+    "url",
+    "path",
+    "query",
+    "client_ip",
+    "user_agent",
+    "user_id",
+    "status_code",
+    "process_time",
+    "content_length",
+    "db_queries",
+    "db_time",
+    "route",
+    "statement_count",
+    "statement",
+    "profile_id",
+    "samples",
+    "body_preview",
+    "body_error",
+    "error",
+)
+
+
+def bind_request_context(
+    request_id: Optional[str], user_id: Optional[int] = None
+) -> tuple[contextvars.Token, contextvars.Token]:
+    """
+    Bind request context for all log records emitted in the current context.
+
+    Args:
+        request_id (Optional[str]): Request ID.
+        user_id (Optional[int]): Authenticated Max user ID.
+
+    Returns:
+        tuple[Token, Token]: Tokens for `reset_request_context`.
+    """
+    return request_id_var.set(request_id), user_id_var.set(user_id)
+
+
+def reset_request_context(tokens: tuple[contextvars.Token, contextvars.Token]) -> None:
+    """
+    Restore the request context to its state before `bind_request_context`.
+
+    Args:
+        tokens (tuple[Token, Token]): Tokens returned by `bind_request_context`.
+    """
+    request_id_token, user_id_token = tokens
+    request_id_var.reset(request_id_token)
+    user_id_var.reset(user_id_token)
+
+
+# --------------------------------------------------------------------------------
+
+
+class RequestContextFilter(logging.Filter):
+    """Copy the bound request context into records that do not set it explicitly."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        attributes = record.__dict__
+        if "request_id" not in attributes:
+            request_id = request_id_var.get()
+            if request_id is not None:
+                record.request_id = request_id
+        if "user_id" not in attributes:
+            user_id = user_id_var.get()
+            if user_id is not None:
+                record.user_id = user_id
+        return True
 
 
 class CustomFormatter(logging.Formatter):
@@ -14,45 +111,113 @@ class CustomFormatter(logging.Formatter):
             "message": record.getMessage(),
         }
 
-        # Add extra fields if present
-        if hasattr(record, "request_id"):
-            log_entry["request_id"] = record.request_id
-        if hasattr(record, "method"):
-            log_entry["method"] = record.method
-        if hasattr(record, "url"):
-            log_entry["url"] = record.url
-        if hasattr(record, "path"):
-            log_entry["path"] = record.path
-        if hasattr(record, "query"):
-            log_entry["query"] = record.query
-        if hasattr(record, "client_ip"):
-            log_entry["client_ip"] = record.client_ip
-        if hasattr(record, "user_agent"):
-            log_entry["user_agent"] = record.user_agent
-        if hasattr(record, "user_id"):
-            log_entry["user_id"] = record.user_id
-        if hasattr(record, "status_code"):
-            log_entry["status_code"] = record.status_code
-        if hasattr(record, "process_time"):
-            log_entry["process_time"] = record.process_time
-        if hasattr(record, "content_length"):
-            log_entry["content_length"] = record.content_length
-        if hasattr(record, "body_preview"):
-            log_entry["body_preview"] = record.body_preview
-        if hasattr(record, "body_error"):
-            log_entry["body_error"] = record.body_error
-        if hasattr(record, "error"):
-            log_entry["error"] = record.error
-
-        return json.dumps(log_entry, ensure_ascii=False)
+        # Add extra fields if present (one dict lookup per field)
+        attributes = record.__dict__
+        for field in STRUCTURED_FIELDS:
+            value = attributes.get(field)
+            if value is not None:
+                log_entry[field] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_entry["exc_info"] = record.exc_text
+
+        return dumps_log_entry(log_entry)
+
+
+def dumps_log_entry(log_entry: dict) -> str:
+    """
+    Encode a log entry as a JSON line, using orjson when installed.
+
+    Args:
+        log_entry (dict): Log entry.
+
+    Returns:
+        str: JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(log_entry, default=str).decode()
+    return json.dumps(log_entry, ensure_ascii=False, default=str)
+
+
+# --------------------------------------------------------------------------------
+
+
+class ContextQueueHandler(QueueHandler):
+    """
+    QueueHandler that defers JSON formatting to the listener thread.
+
+    The request thread only resolves the message arguments (and a traceback, if
+    any) so the record is safe to hand over; encoding and the write to stderr
+    happen on the background thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
 
 
 def setup_logging():
-    if not logging.getLogger().handlers:
-        handler = logging.StreamHandler()
-        handler.setFormatter(CustomFormatter())
-        logging.getLogger().addHandler(handler)
-        logging.getLogger().setLevel(logging.INFO)
+    """
+    Install the queue-based logging pipeline on the root logger.
+
+    Records are enqueued by a ContextQueueHandler and written by a QueueListener
+    thread through a StreamHandler with the JSON formatter. Does nothing if the
+    root logger already has handlers.
+    """
+    global _listener
+
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(CustomFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = ContextQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    root.addHandler(queue_handler)
+    root.setLevel(logging.INFO)
+
+
+def restart_logging_after_fork():
+    """
+    Start a new listener thread in a forked child.
+
+    Threads do not survive fork: without this, a worker forked from a
+    preloaded master would enqueue records that nothing ever writes.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener = QueueListener(_listener.queue, *_listener.handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
+# --------------------------------------------------------------------------------
 
 logger = logging.getLogger(__name__)
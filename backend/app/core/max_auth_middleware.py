@@ -41,8 +41,9 @@ class MaxAuthMiddleware(BaseHTTPMiddleware):
         # Skip authentication for ping and documentation endpoints
         # Documentation endpoints (/docs, /redoc, /openapi.json) are handled by DocsAuthMiddleware
         # which runs BEFORE this middleware
+        # Internal endpoints (metrics, profiles) check their own bearer tokens
         path = request.url.path
-        if path in ["/", "/docs", "/redoc", "/openapi.json"]:
+        if path in ["/", "/docs", "/redoc", "/openapi.json"] or path.startswith("/internal/"):
             return await call_next(request)
 
         # Check for Authorization header
@@ -0,0 +1,479 @@
+"""
+Metrics
+In-process metrics registry with Prometheus text exposition and a file based
+store that aggregates samples across gunicorn worker processes.
+"""
+
+# --------------------------------------------------------------------------------
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from .config import settings
+from .log_config import logger
+
+# --------------------------------------------------------------------------------
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+# Counters and histograms of exited workers, folded together by the master
+EXITED_SNAPSHOT = "exited.json"
+
+
+class Metric:
+    """
+    A named metric with a fixed set of label names.
+
+    Values are kept per label-value tuple inside the owning registry.
+    """
+
+    kind = ""
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+    ):
+        """
+        Initialize the metric.
+
+        Args:
+            registry (MetricsRegistry): Owning registry.
+            name (str): Metric name.
+            documentation (str): HELP text.
+            labelnames (tuple[str, ...]): Label names.
+        """
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+
+class Counter(Metric):
+    """Monotonic counter."""
+
+    kind = COUNTER
+
+    def inc(self, labels: tuple = (), amount: float = 1.0) -> None:
+        """
+        Increment the counter.
+
+        Args:
+            labels (tuple): Label values.
+            amount (float): Increment.
+        """
+        self.registry._add(self.name, labels, amount)
+
+
+class Gauge(Metric):
+    """Gauge; across processes the values of live workers are summed."""
+
+    kind = GAUGE
+
+    def inc(self, labels: tuple = (), amount: float = 1.0) -> None:
+        """
+        Increment the gauge.
+
+        Args:
+            labels (tuple): Label values.
+            amount (float): Increment (may be negative).
+        """
+        self.registry._add(self.name, labels, amount)
+
+    def dec(self, labels: tuple = (), amount: float = 1.0) -> None:
+        """
+        Decrement the gauge.
+
+        Args:
+            labels (tuple): Label values.
+            amount (float): Decrement.
+        """
+        self.registry._add(self.name, labels, -amount)
+
+    def set(self, value: float, labels: tuple = ()) -> None:
+        """
+        Set the gauge.
+
+        Args:
+            value (float): New value.
+            labels (tuple): Label values.
+        """
+        self.registry._set(self.name, labels, value)
+
+
+class Histogram(Metric):
+    """Histogram with cumulative buckets, sum and count."""
+
+    kind = HISTOGRAM
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        """
+        Record an observation.
+
+        Args:
+            value (float): Observed value.
+            labels (tuple): Label values.
+        """
+        self.registry._observe(self, labels, value)
+
+    @contextmanager
+    def time(self, labels: tuple = ()) -> Iterator[None]:
+        """
+        Observe the duration of the wrapped block in seconds.
+
+        Args:
+            labels (tuple): Label values.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, labels)
+
+
+# --------------------------------------------------------------------------------
+
+
+class MetricsRegistry:
+    """
+    Registry of metrics of one process.
+
+    With a multiprocess directory configured, each process periodically writes
+    its values to `<dir>/<pid>.json` and rendering merges the files of all
+    processes: counters and histograms are summed (also for exited workers, so
+    they stay monotonic), gauges are summed over live processes only. When a
+    worker exits, the master folds its file into `<dir>/exited.json`
+    (`mark_process_dead`), so recycled workers do not pile up files and a
+    reused PID does not overwrite an earlier process' values.
+    """
+
+    def __init__(self, multiprocess_dir: str = "", flush_interval: float = 5.0):
+        """
+        Initialize the registry.
+
+        Args:
+            multiprocess_dir (str): Directory shared by the worker processes, empty
+                for single-process mode.
+            flush_interval (float): Seconds between snapshot writes.
+        """
+        self.multiprocess_dir = Path(multiprocess_dir) if multiprocess_dir else None
+        self.flush_interval = flush_interval
+        self._metrics: dict[str, Metric] = {}
+        self._values: dict[str, dict[tuple, object]] = {}
+        self._collectors: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._flusher: Optional[threading.Thread] = None
+
+    # --------------------------------------------------------------------------------
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        """Register a counter."""
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        """Register a gauge."""
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Register a histogram."""
+        return self._register(Histogram(self, name, documentation, labelnames, buckets=buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """
+        Register a callback that refreshes gauges before every snapshot or render.
+
+        Args:
+            collector (Callable[[], None]): Callback setting gauge values.
+        """
+        self._collectors.append(collector)
+
+    def _register(self, metric: Metric) -> Metric:
+        """Add a metric to the registry."""
+        self._metrics[metric.name] = metric
+        self._values[metric.name] = {}
+        return metric
+
+    # --------------------------------------------------------------------------------
+
+    def _check_process(self) -> None:
+        """
+        Reset inherited values after a fork and start the snapshot thread.
+        Caller holds the lock.
+        """
+        pid = os.getpid()
+        if pid != self._pid:
+            self._pid = pid
+            self._flusher = None
+            for values in self._values.values():
+                values.clear()
+        if self.multiprocess_dir is not None and self._flusher is None:
+            self._flusher = threading.Thread(
+                target=self._flush_forever, name="metrics-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _add(self, name: str, labels: tuple, amount: float) -> None:
+        with self._lock:
+            self._check_process()
+            values = self._values[name]
+            values[labels] = values.get(labels, 0.0) + amount
+
+    def _set(self, name: str, labels: tuple, value: float) -> None:
+        with self._lock:
+            self._check_process()
+            self._values[name][labels] = value
+
+    def _observe(self, metric: Histogram, labels: tuple, value: float) -> None:
+        with self._lock:
+            self._check_process()
+            values = self._values[metric.name]
+            state = values.get(labels)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                state = values[labels] = [0] * len(metric.buckets) + [0.0, 0]
+            for i, bound in enumerate(metric.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    # --------------------------------------------------------------------------------
+
+    def snapshot(self) -> dict[str, dict[str, object]]:
+        """
+        Get the values of this process in a JSON friendly form.
+
+        Returns:
+            dict[str, dict[str, object]]: Metric name to encoded labels to value.
+        """
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception:
+                logger.warning("Metrics collector failed", exc_info=True)
+        with self._lock:
+            return {
+                name: {json.dumps(list(labels)): value for labels, value in values.items()}
+                for name, values in self._values.items()
+            }
+
+    def write_snapshot(self) -> None:
+        """Atomically write this process' snapshot into the multiprocess directory."""
+        if self.multiprocess_dir is None:
+            return
+        self.multiprocess_dir.mkdir(parents=True, exist_ok=True)
+        path = self.multiprocess_dir / f"{os.getpid()}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp_path, path)
+
+    def _flush_forever(self) -> None:
+        """Write snapshots periodically (runs on a daemon thread)."""
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.write_snapshot()
+            except Exception:
+                logger.warning("Metrics snapshot write failed", exc_info=True)
+
+    def collect(self) -> dict[str, dict[str, object]]:
+        """
+        Get values aggregated over all processes sharing the directory.
+
+        Returns:
+            dict[str, dict[str, object]]: Metric name to encoded labels to value.
+        """
+        if self.multiprocess_dir is None:
+            return self.snapshot()
+
+        self.write_snapshot()
+        merged: dict[str, dict[str, object]] = {name: {} for name in self._metrics}
+        for path in self.multiprocess_dir.glob("*.json"):
+            try:
+                alive = path.name != EXITED_SNAPSHOT and _process_alive(int(path.stem))
+                data = json.loads(path.read_text())
+            except (ValueError, OSError):
+                continue
+            self._merge(merged, data, gauges=alive)
+        return merged
+
+    def mark_process_dead(self, pid: int) -> None:
+        """
+        Fold the snapshot of an exited worker into the exited-workers file.
+
+        Called by the gunicorn master for every exited worker; its counters and
+        histograms keep counting in the totals, its gauges are dropped.
+
+        Args:
+            pid (int): PID of the exited worker.
+        """
+        if self.multiprocess_dir is None:
+            return
+        path = self.multiprocess_dir / f"{pid}.json"
+        try:
+            data = json.loads(path.read_text())
+        except (ValueError, OSError):
+            return
+        exited_path = self.multiprocess_dir / EXITED_SNAPSHOT
+        try:
+            exited = json.loads(exited_path.read_text())
+        except (ValueError, OSError):
+            exited = {}
+        self._merge(exited, data, gauges=False)
+        tmp_path = exited_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(exited))
+        os.replace(tmp_path, exited_path)
+        path.unlink(missing_ok=True)
+
+    def _merge(
+        self, target: dict[str, dict[str, object]], data: dict[str, dict[str, object]], gauges: bool
+    ) -> None:
+        """Add snapshot values into `target`, skipping gauges unless `gauges` is set."""
+        for name, values in data.items():
+            metric = self._metrics.get(name)
+            if metric is None or (metric.kind == GAUGE and not gauges):
+                continue
+            merged = target.setdefault(name, {})
+            for labels, value in values.items():
+                if metric.kind == HISTOGRAM:
+                    current = merged.get(labels)
+                    merged[labels] = (
+                        [a + b for a, b in zip(current, value, strict=True)]
+                        if current
+                        else list(value)
+                    )
+                else:
+                    merged[labels] = merged.get(labels, 0.0) + value
+
+    # --------------------------------------------------------------------------------
+
+    def render(self) -> str:
+        """
+        Render aggregated values in the Prometheus text exposition format.
+
+        Returns:
+            str: Exposition text.
+        """
+        collected = self.collect()
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for encoded, value in sorted(collected.get(name, {}).items()):
+                labels = list(zip(metric.labelnames, json.loads(encoded), strict=True))
+                if metric.kind == HISTOGRAM:
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, value, strict=False):
+                        cumulative += count
+                        bucket_labels = _format_labels(labels + [("le", _format_value(bound))])
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                    total_labels = _format_labels(labels + [("le", "+Inf")])
+                    lines.append(f"{name}_bucket{total_labels} {value[-1]}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value[-2])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {value[-1]}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# --------------------------------------------------------------------------------
+
+
+def _process_alive(pid: int) -> bool:
+    """Check whether a process with the given PID exists."""
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _format_labels(labels: list[tuple[str, object]]) -> str:
+    """Format label pairs as {name="value",...} with Prometheus escaping."""
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels:
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value)
+
+
+# --------------------------------------------------------------------------------
+
+registry = MetricsRegistry(
+    settings.METRICS_MULTIPROC_DIR, flush_interval=settings.METRICS_FLUSH_INTERVAL
+)
+
+REQUESTS_TOTAL = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route template and status",
+    ("method", "route", "status"),
+)
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests being processed")
+DB_POOL_CONNECTIONS = registry.gauge(
+    "db_pool_connections", "Database connection pool state", ("state",)
+)
+S3_UPLOAD_DURATION = registry.histogram("s3_upload_duration_seconds", "S3 upload latency")
+IMAGE_CONVERSION_DURATION = registry.histogram(
+    "image_conversion_duration_seconds", "Image WebP conversion and resize time"
+)
+
+
+def register_pool_collector(engine) -> None:
+    """
+    Report connection pool state of an engine on every snapshot.
+
+    Args:
+        engine: SQLAlchemy engine.
+    """
+
+    def collect() -> None:
+        pool = engine.pool
+        for state in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, state, None)
+            if callable(method):
+                DB_POOL_CONNECTIONS.set(method(), (state,))
+
+    registry.add_collector(collect)
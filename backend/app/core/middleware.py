@@ -5,17 +5,51 @@ Custom middleware for request/response logging and X-Request-Id support.
 
 # --------------------------------------------------------------------------------
 
+import asyncio
+import hmac
+import random
 import time
 import uuid
-from collections.abc import Callable
+from collections.abc import Mapping
+from typing import NamedTuple, Optional
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from .log_config import logger
+from .config import settings
+from .log_config import bind_request_context, logger, reset_request_context
+from .metrics import REQUEST_DURATION, REQUESTS_IN_FLIGHT, REQUESTS_TOTAL
+from .profiler import ProfileStore, SamplingProfiler, profiling_lock, render_collapsed
+from .query_stats import SHAPE_PREVIEW_CHARS, QueryStats, query_stats_var
 
 # --------------------------------------------------------------------------------
 
+# Only textual payloads are previewed; multipart uploads and binary bodies never are
+PREVIEW_CONTENT_TYPES = (
+    "application/json",
+    "application/x-www-form-urlencoded",
+    "application/xml",
+    "text/",
+)
+
+# Documentation endpoints are never previewed
+PREVIEW_EXCLUDED_PATHS = ("/docs", "/redoc", "/openapi.json")
+
+
+class BodyPreviewRule(NamedTuple):
+    """
+    Body preview settings of a route.
+
+    Attributes:
+        max_bytes (int): Bytes of the body to keep, 0 disables the preview.
+        sample_rate (float): Share of requests to preview (0.0 - 1.0).
+    """
+
+    max_bytes: int
+    sample_rate: float
+
 
 def _get_client_ip(request: Request) -> str:
     """
@@ -53,116 +87,509 @@ def _get_client_ip(request: Request) -> str:
 # --------------------------------------------------------------------------------
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+def _by_longest_prefix(rules: Mapping[str, object]) -> list[tuple[str, object]]:
+    """
+    Order path prefix rules so that the first match is the most specific one.
+
+    Args:
+        rules (Mapping[str, object]): Path prefix to rule.
+
+    Returns:
+        list[tuple[str, object]]: Rules sorted by prefix length, longest first.
     """
-    Middleware for logging all incoming requests and responses.
+    return sorted(rules.items(), key=lambda item: len(item[0]), reverse=True)
+
+
+def _match_prefix(rules: list[tuple[str, object]], path: str, default):
+    """
+    Find the rule of the most specific prefix matching a path.
+
+    Args:
+        rules (list[tuple[str, object]]): Rules from `_by_longest_prefix`.
+        path (str): Request path.
+        default: Value returned when nothing matches.
+
+    Returns:
+        The matching rule or `default`.
+    """
+    for prefix, rule in rules:
+        if path.startswith(prefix):
+            return rule
+    return default
+
+
+# --------------------------------------------------------------------------------
+
+
+class RequestLoggingMiddleware:
+    """
+    Pure ASGI middleware for logging all incoming requests and responses.
 
     Features:
     - Logs request details including X-Request-Id
     - Logs response details and timing
     - Handles X-Request-Id header gracefully
+    - Captures a body preview by teeing the first bytes of the receive stream,
+      so the body is never buffered here and streams to the endpoint untouched
+    - Binds request_id/user_id to the logging context for the whole request
+    - Samples access log lines per route; failed (5xx) requests are always logged
+    - Counts SQL statements and DB time per request (Server-Timing header and
+      the completed log line) and warns about probable N+1 query patterns
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        preview_bytes: int = settings.REQUEST_BODY_PREVIEW_BYTES,
+        sample_rate: float = settings.REQUEST_BODY_PREVIEW_SAMPLE_RATE,
+        route_rules: Optional[Mapping[str, tuple[int, float]]] = None,
+        access_log_sample_rate: float = settings.ACCESS_LOG_SAMPLE_RATE,
+        access_log_routes: Optional[Mapping[str, float]] = None,
+        query_stats: bool = settings.QUERY_STATS_ENABLED,
+        n_plus_one_threshold: int = settings.QUERY_N_PLUS_ONE_THRESHOLD,
+    ):
         """
-        Process the request and log details.
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): Wrapped application.
+            preview_bytes (int): Default preview size in bytes, 0 disables previews.
+            sample_rate (float): Default share of requests to preview.
+            route_rules (Optional[Mapping[str, tuple[int, float]]]): Path prefix to
+                (max_bytes, sample_rate) overrides; the longest matching prefix wins.
+            access_log_sample_rate (float): Default share of requests whose access
+                log lines are written.
+            access_log_routes (Optional[Mapping[str, float]]): Path prefix to access
+                log sample rate overrides for hot endpoints.
+            query_stats (bool): Whether to account SQL statements per request.
+            n_plus_one_threshold (int): Executions of one statement shape within a
+                request that are reported as a probable N+1, 0 disables the check.
+        """
+        self.app = app
+        self.default_rule = BodyPreviewRule(preview_bytes, sample_rate)
+        if route_rules is None:
+            route_rules = settings.REQUEST_BODY_PREVIEW_ROUTES
+        self.route_rules = _by_longest_prefix(
+            {prefix: BodyPreviewRule(*rule) for prefix, rule in route_rules.items()}
+        )
+        self.access_log_sample_rate = access_log_sample_rate
+        if access_log_routes is None:
+            access_log_routes = settings.ACCESS_LOG_ROUTES
+        self.access_log_routes = _by_longest_prefix(access_log_routes)
+        self.query_stats = query_stats
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    # --------------------------------------------------------------------------------
+
+    def _preview_limit(self, scope: Scope, headers: Headers) -> int:
+        """
+        Decide how many body bytes to capture for a request.
 
         Args:
-            request: Incoming FastAPI request
-            call_next: Next middleware or endpoint handler
+            scope (Scope): ASGI connection scope.
+            headers (Headers): Request headers.
 
         Returns:
-            Response: The response from the application
+            int: Number of bytes to capture, 0 for no preview.
         """
-        # Extract or generate request ID
-        request_id = request.headers.get("X-Request-Id")
-        if not request_id:
-            request_id = str(uuid.uuid4())
+        path = scope["path"]
+        if scope["method"] in ("GET", "HEAD", "OPTIONS") or path in PREVIEW_EXCLUDED_PATHS:
+            return 0
 
-        # Add request ID to request state for use in endpoints
-        request.state.request_id = request_id
+        content_type = headers.get("content-type", "").lower()
+        if not content_type.startswith(PREVIEW_CONTENT_TYPES):
+            return 0
 
-        # Log request details
-        start_time = time.time()
+        rule = _match_prefix(self.route_rules, path, self.default_rule)
+        if rule.max_bytes <= 0 or rule.sample_rate <= 0:
+            return 0
+        if rule.sample_rate < 1 and random.random() >= rule.sample_rate:
+            return 0
+        return rule.max_bytes
 
-        # Prepare request log data
-        request_data = {
-            "request_id": request_id,
-            "method": request.method,
-            "url": str(request.url),
-            "path": request.url.path,
-            "query": str(request.url.query) if request.url.query else None,
-        }
+    # --------------------------------------------------------------------------------
 
-        # Log request body for non-GET requests (be careful with sensitive data)
-        # Skip body reading for documentation endpoints to avoid consuming the stream
-        if request.method not in ["GET", "HEAD", "OPTIONS"] and request.url.path not in [
-            "/docs",
-            "/redoc",
-            "/openapi.json",
-        ]:
-            try:
-                # Read body only if it's available and not already consumed
-                if hasattr(request, "_body"):
-                    body = request._body
-                else:
-                    body = await request.body()
-                if body:
-                    # Truncate body for logging (first 1000 chars)
-                    body_str = body.decode()[:1000]
-                    request_data["body_preview"] = body_str + ("..." if len(body) > 1000 else "")
-            except Exception as e:
-                request_data["body_error"] = str(e)
-
-        # Add user_id if available (from Telegram auth)
-        user_id_info = ""
-        if hasattr(request.state, "user_id"):
-            user_id_info = f", User: {request.state.user_id}"
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Process the request and log details.
 
-        # Prepare URL info
-        url_info = str(request.url)
-        if request.url.query:
-            url_info = f"{request.url.path}?{request.url.query}"
+        Args:
+            scope (Scope): ASGI connection scope.
+            receive (Receive): ASGI receive callable.
+            send (Send): ASGI send callable.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Log request details
-        logger.info(
-            f"Request started - ID: {request_id}, Method: {request.method}, "
-            f"URL: {url_info}, IP: {_get_client_ip(request)}{user_id_info}"
-        )
+        headers = Headers(scope=scope)
+
+        # Extract or generate request ID
+        request_id = headers.get("x-request-id") or str(uuid.uuid4())
 
-        # Process request
+        # Add request ID to request state for use in endpoints
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+
+        # Bind request_id and user_id (set by MaxAuthMiddleware) to every record
+        context_tokens = bind_request_context(request_id, state.get("user_id"))
         try:
-            response = await call_next(request)
+            await self._handle(scope, receive, send, headers, request_id)
+        finally:
+            reset_request_context(context_tokens)
 
-            # Calculate processing time
-            process_time = time.time() - start_time
+    async def _handle(
+        self, scope: Scope, receive: Receive, send: Send, headers: Headers, request_id: str
+    ) -> None:
+        """
+        Run the wrapped app with preview capture and access logging.
 
+        Args:
+            scope (Scope): ASGI connection scope.
+            receive (Receive): ASGI receive callable.
+            send (Send): ASGI send callable.
+            headers (Headers): Request headers.
+            request_id (str): Request ID.
+        """
+        start_time = time.time()
+        rate = _match_prefix(self.access_log_routes, scope["path"], self.access_log_sample_rate)
+        sampled = rate >= 1 or (rate > 0 and random.random() < rate)
+
+        # Prepare URL info
+        query = scope.get("query_string", b"").decode("latin-1")
+        url_info = f"{scope['path']}?{query}" if query else scope["path"]
+
+        if sampled:
             logger.info(
-                "Request completed - ID: %s, Status: %s, Time: %.4fs, Size: %s",
-                request_id,
-                response.status_code,
-                process_time,
-                response.headers.get("content-length", "unknown"),
+                "Request started",
+                extra={
+                    "method": scope["method"],
+                    "url": url_info,
+                    "client_ip": _get_client_ip(Request(scope)),
+                },
             )
 
-            # Add request ID to response headers
-            response.headers["X-Request-Id"] = request_id
-
-            return response
+        # Tee the beginning of the body while the endpoint consumes the stream
+        preview_limit = self._preview_limit(scope, headers) if sampled else 0
+        captured = bytearray()
+        truncated = False
+
+        async def receive_with_preview() -> Message:
+            nonlocal truncated
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                room = preview_limit - len(captured)
+                if len(chunk) > room:
+                    truncated = True
+                if room > 0 and chunk:
+                    captured.extend(chunk[:room])
+            return message
+
+        response_status = None
+        response_size = "unknown"
+
+        # Statements executed by the endpoint (also from threadpool workers, which
+        # run in a copy of this context) are accounted here
+        stats = QueryStats() if self.query_stats else None
+        stats_token = query_stats_var.set(stats)
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal response_status, response_size
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                response_headers = MutableHeaders(scope=message)
+                response_headers["X-Request-Id"] = request_id
+                if stats is not None:
+                    response_headers.append("Server-Timing", stats.server_timing())
+                response_size = response_headers.get("content-length", "unknown")
+            await send(message)
 
+        try:
+            await self.app(
+                scope,
+                receive_with_preview if preview_limit else receive,
+                send_with_request_id,
+            )
         except Exception as e:
             # Log error with full traceback
             process_time = time.time() - start_time
 
             logger.error(
-                f"Request failed - ID: {request_id}, Error: {str(e)}, Time: {process_time:.4f}s",
+                "Request failed",
                 exc_info=True,
+                extra={
+                    "method": scope["method"],
+                    "url": url_info,
+                    "error": str(e),
+                    "process_time": round(process_time, 4),
+                    **_query_fields(stats),
+                },
             )
+            if response_status is not None:
+                raise
             # Return error response instead of raising
-            from fastapi.responses import JSONResponse
-
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=500,
                 content={"detail": f"Internal server error: {str(e)}"},
                 headers={"X-Request-Id": request_id},
             )
+            await response(scope, receive, send)
+            return
+        finally:
+            query_stats_var.reset(stats_token)
+
+        # Calculate processing time
+        process_time = time.time() - start_time
+
+        if stats is not None:
+            self._report_repeated_queries(scope, stats)
+
+        if not sampled and (response_status or 500) < 500:
+            return
+
+        extra = {
+            "method": scope["method"],
+            "url": url_info,
+            "status_code": response_status,
+            "process_time": round(process_time, 4),
+            "content_length": response_size,
+            **_query_fields(stats),
+        }
+        if captured:
+            extra["body_preview"] = captured.decode(errors="replace") + ("..." if truncated else "")
+
+        logger.info("Request completed", extra=extra)
+
+    def _report_repeated_queries(self, scope: Scope, stats: QueryStats) -> None:
+        """
+        Log a warning for every statement shape repeated above the N+1 threshold.
+
+        Args:
+            scope (Scope): ASGI connection scope after routing.
+            stats (QueryStats): Statements of the request.
+        """
+        repeated = stats.repeated(self.n_plus_one_threshold)
+        if not repeated:
+            return
+        route = f"{scope['method']} {_route_template(scope)}"
+        for shape, executions in repeated:
+            logger.warning(
+                "Probable N+1 query",
+                extra={
+                    "route": route,
+                    "db_queries": stats.count,
+                    "statement_count": executions,
+                    "statement": shape[:SHAPE_PREVIEW_CHARS],
+                },
+            )
+
+
+def _query_fields(stats: Optional[QueryStats]) -> dict:
+    """
+    Get log fields with the query count and DB time of a request.
+
+    Args:
+        stats (Optional[QueryStats]): Statements of the request, None if disabled.
+
+    Returns:
+        dict: `db_queries` and `db_time` (seconds), empty if disabled.
+    """
+    if stats is None:
+        return {}
+    return {"db_queries": stats.count, "db_time": round(stats.duration, 4)}
+
+
+# --------------------------------------------------------------------------------
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    Get the route template of a matched request.
+
+    The router stores the matched route in the scope. Its `path_format` is the
+    template, e.g. `/v1/profiles/{profile_id}`; FastAPI versions that resolve
+    included routers lazily leave out the router prefixes there, and as those
+    are literal, they are taken from the request path.
+
+    Args:
+        scope (Scope): ASGI connection scope after routing.
+
+    Returns:
+        str: Route template, or "unmatched" if no route handled the request.
+    """
+    path_format = getattr(scope.get("route"), "path_format", None)
+    if path_format is None:
+        return "unmatched"
+    depth = path_format.count("/")
+    return "/".join(scope["path"].split("/")[:-depth]) + path_format
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency and in-flight requests.
+
+    Requests are labelled with the matched route template (e.g.
+    `/v1/events/global_events/{event_id}`), never the raw path, to keep label
+    cardinality bounded; unmatched requests share the "unmatched" label.
+    """
+
+    def __init__(self, app: ASGIApp, *, excluded_paths: tuple[str, ...] = ()):
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): Wrapped application.
+            excluded_paths (tuple[str, ...]): Paths not recorded (e.g. the metrics
+                endpoint itself).
+        """
+        self.app = app
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Process the request and record metrics.
+
+        Args:
+            scope (Scope): ASGI connection scope.
+            receive (Receive): ASGI receive callable.
+            send (Send): ASGI send callable.
+        """
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        response_status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_FLIGHT.dec()
+            labels = (scope["method"], _route_template(scope), str(response_status))
+            REQUESTS_TOTAL.inc(labels)
+            REQUEST_DURATION.observe(elapsed, labels)
+
+
+# --------------------------------------------------------------------------------
+
+
+class ProfilerMiddleware:
+    """
+    Pure ASGI middleware profiling selected requests on demand.
+
+    A request is profiled when it carries `X-Profile: <token>` or falls into the
+    sample rate of its route prefix. The collapsed stack profile is stored under
+    a new id, returned in the `X-Profile-Id` response header and retrievable via
+    `/internal/profiles/{profile_id}`. At most one request per process is
+    profiled at a time; others pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        token: str = settings.PROFILER_TOKEN,
+        route_rates: Optional[Mapping[str, float]] = None,
+        interval: float = settings.PROFILER_INTERVAL,
+        store: Optional[ProfileStore] = None,
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): Wrapped application.
+            token (str): Value of the X-Profile header that triggers profiling,
+                empty disables the header trigger.
+            route_rates (Optional[Mapping[str, float]]): Path prefix to share of
+                requests profiled; the longest matching prefix wins.
+            interval (float): Seconds between stack samples.
+            store (Optional[ProfileStore]): Profile storage.
+        """
+        self.app = app
+        self.token = token.encode()
+        if route_rates is None:
+            route_rates = settings.PROFILER_ROUTES
+        self.route_rates = _by_longest_prefix(route_rates)
+        self.interval = interval
+        if store is None:
+            store = ProfileStore(settings.PROFILER_DIR, settings.PROFILER_MAX_PROFILES)
+        self.store = store
+
+    def _should_profile(self, scope: Scope) -> bool:
+        """
+        Decide whether to profile a request.
+
+        Args:
+            scope (Scope): ASGI connection scope.
+
+        Returns:
+            bool: True if requested via header or sampled for the route.
+        """
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == b"x-profile":
+                    return hmac.compare_digest(value, self.token)
+        rate = _match_prefix(self.route_rates, scope["path"], 0.0)
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Process the request, profiling it if selected.
+
+        Args:
+            scope (Scope): ASGI connection scope.
+            receive (Receive): ASGI receive callable.
+            send (Send): ASGI send callable.
+        """
+        if (
+            scope["type"] != "http"
+            or not (self.token or self.route_rates)
+            or not self._should_profile(scope)
+            or not profiling_lock.acquire(blocking=False)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        profiler = SamplingProfiler(self.interval)
+        started = time.perf_counter()
+        try:
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_with_profile_id)
+            finally:
+                samples = profiler.stop()
+        finally:
+            profiling_lock.release()
+
+        elapsed = time.perf_counter() - started
+        try:
+            await asyncio.to_thread(self.store.save, profile_id, render_collapsed(samples))
+        except OSError:
+            logger.warning(f"Failed to store profile {profile_id}", exc_info=True)
+            return
+        logger.info(
+            "Request profiled",
+            extra={
+                "profile_id": profile_id,
+                "route": f"{scope['method']} {_route_template(scope)}",
+                "samples": samples.total(),
+                "process_time": round(elapsed, 4),
+            },
+        )
@@ -0,0 +1,229 @@
+"""
+OpenAPI Asset
+OpenAPI schema generated once (at image build or in the preloading master) and
+served as a precompressed static asset.
+
+Usage:
+    python -m app.core.openapi openapi.json  # writes openapi.json and openapi.json.gz
+"""
+
+# --------------------------------------------------------------------------------
+
+import gzip
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+from fastapi import FastAPI, Request, Response
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+from fastapi.openapi.utils import get_openapi
+
+from .http_cache import etag_matches
+from .log_config import logger
+
+# --------------------------------------------------------------------------------
+
+OPENAPI_PATH = "/openapi.json"
+OPENAPI_VERSION = "3.0.2"  # forced for compatibility of generated clients
+
+# The schema changes only with a deploy: clients may reuse it, but must revalidate
+OPENAPI_CACHE_CONTROL = "no-cache"
+
+
+def build_openapi_schema(app: FastAPI) -> dict:
+    """
+    Generate the OpenAPI schema of an app.
+
+    Args:
+        app (FastAPI): Application with all routers included.
+
+    Returns:
+        dict: OpenAPI schema.
+    """
+    schema = get_openapi(
+        title=app.title,
+        version=app.version,
+        openapi_version=app.openapi_version,
+        description=app.description,
+        routes=app.routes,
+        tags=app.openapi_tags,
+        servers=app.servers,
+    )
+    schema["openapi"] = OPENAPI_VERSION
+    return schema
+
+
+# --------------------------------------------------------------------------------
+
+
+class OpenAPIAsset:
+    """
+    Serialized OpenAPI schema with its gzip variant and ETag.
+
+    The JSON is encoded and compressed once; requests only pick a variant.
+    """
+
+    def __init__(self, body: bytes, gzipped: Optional[bytes] = None):
+        """
+        Initialize the asset.
+
+        Args:
+            body (bytes): Serialized schema.
+            gzipped (Optional[bytes]): Gzip-compressed body, compressed here if omitted.
+        """
+        self.body = body
+        self.gzipped = gzipped if gzipped is not None else gzip.compress(body, 9, mtime=0)
+        self.etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+    @classmethod
+    def from_app(cls, app: FastAPI) -> "OpenAPIAsset":
+        """
+        Generate the asset from an app.
+
+        Args:
+            app (FastAPI): Application with all routers included.
+
+        Returns:
+            OpenAPIAsset: Asset.
+        """
+        schema = build_openapi_schema(app)
+        return cls(json.dumps(schema, ensure_ascii=False, separators=(",", ":")).encode())
+
+    @classmethod
+    def load(cls, path: str) -> Optional["OpenAPIAsset"]:
+        """
+        Load an asset written by `write`.
+
+        Args:
+            path (str): Path of the JSON file; `<path>.gz` is used if present.
+
+        Returns:
+            Optional[OpenAPIAsset]: Asset, None if the file does not exist.
+        """
+        json_path = Path(path)
+        if not path or not json_path.is_file():
+            return None
+        gz_path = json_path.with_name(json_path.name + ".gz")
+        return cls(json_path.read_bytes(), gz_path.read_bytes() if gz_path.is_file() else None)
+
+    def write(self, path: str) -> None:
+        """
+        Write the JSON file and its gzip variant next to it.
+
+        Args:
+            path (str): Path of the JSON file.
+        """
+        json_path = Path(path)
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        json_path.write_bytes(self.body)
+        json_path.with_name(json_path.name + ".gz").write_bytes(self.gzipped)
+
+    @property
+    def schema(self) -> dict:
+        """Decoded schema, for tools that call `app.openapi()`."""
+        return json.loads(self.body)
+
+    def response(self, request: Request) -> Response:
+        """
+        Serve the asset, honoring If-None-Match and Accept-Encoding.
+
+        Args:
+            request (Request): Incoming request.
+
+        Returns:
+            Response: 200 with the (compressed) schema or 304.
+        """
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": OPENAPI_CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzipped, media_type="application/json", headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+# --------------------------------------------------------------------------------
+
+
+def prepare_openapi(app: FastAPI) -> OpenAPIAsset:
+    """
+    Get the app's OpenAPI asset, generating it on first use.
+
+    Call it in the gunicorn master before forking (`--preload`) so workers
+    inherit the asset instead of each generating it.
+
+    Args:
+        app (FastAPI): Application set up with `install_openapi`.
+
+    Returns:
+        OpenAPIAsset: Asset.
+    """
+    if app.state.openapi_asset is None:
+        app.state.openapi_asset = OpenAPIAsset.from_app(app)
+        logger.info(
+            "OpenAPI schema generated",
+            extra={"content_length": len(app.state.openapi_asset.body)},
+        )
+    return app.state.openapi_asset
+
+
+def install_openapi(app: FastAPI, asset_path: str = "") -> None:
+    """
+    Serve the schema, Swagger UI and ReDoc from the precomputed asset.
+
+    The app must be created with `openapi_url=None, docs_url=None,
+    redoc_url=None` so FastAPI does not register its own routes.
+
+    Args:
+        app (FastAPI): Application.
+        asset_path (str): Asset written at build time; generated lazily if
+            empty or missing.
+    """
+    app.state.openapi_asset = OpenAPIAsset.load(asset_path)
+    if asset_path and app.state.openapi_asset is None:
+        logger.warning(f"OpenAPI asset not found, generating on first use: {asset_path}")
+    app.openapi = lambda: prepare_openapi(app).schema
+
+    @app.get(OPENAPI_PATH, include_in_schema=False)
+    async def openapi(request: Request) -> Response:
+        return prepare_openapi(app).response(request)
+
+    @app.get("/docs", include_in_schema=False)
+    async def swagger_ui() -> Response:
+        return get_swagger_ui_html(openapi_url=OPENAPI_PATH, title=f"{app.title} - Swagger UI")
+
+    @app.get("/redoc", include_in_schema=False)
+    async def redoc() -> Response:
+        return get_redoc_html(openapi_url=OPENAPI_PATH, title=f"{app.title} - ReDoc")
+
+
+# --------------------------------------------------------------------------------
+
+
+def main() -> int:
+    """
+    Write the OpenAPI asset of the application.
+
+    Returns:
+        int: Process exit code.
+    """
+    if len(sys.argv) != 2:
+        print(__doc__.split("Usage:")[1].strip(), file=sys.stderr)
+        return 2
+
+    from app.main import app
+
+    asset = prepare_openapi(app)
+    asset.write(sys.argv[1])
+    print(f"{sys.argv[1]}: {len(asset.body)} bytes, {len(asset.gzipped)} gzipped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
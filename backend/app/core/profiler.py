@@ -0,0 +1,248 @@
+"""
+Profiler
+On-demand sampling profiler for single requests with a capped store of
+flamegraph-compatible (collapsed stack) profiles.
+"""
+
+# --------------------------------------------------------------------------------
+
+import os
+import re
+import sys
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Optional
+
+# --------------------------------------------------------------------------------
+
+# Sampled threads: the event loop thread and the threadpool running sync endpoints
+WORKER_THREAD_PREFIX = "AnyIO worker thread"
+
+# Leaf frames of threads that are waiting for work rather than serving a request
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+}
+
+MAX_STACK_DEPTH = 128
+PROFILE_SUFFIX = ".collapsed"
+PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _frame_label(frame: FrameType) -> str:
+    """
+    Format a frame as `function (path:line)` with the path shortened to the
+    package-relative part.
+
+    Args:
+        frame (FrameType): Python frame.
+
+    Returns:
+        str: Frame label without collapsed-format separators.
+    """
+    code = frame.f_code
+    path = code.co_filename
+    index = path.rfind("site-packages/")
+    if index != -1:
+        path = path[index + len("site-packages/") :]
+    elif (index := path.rfind("/app/")) != -1:
+        path = path[index + 1 :]
+    else:
+        path = os.path.basename(path)
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _collapse(frame: FrameType) -> Optional[str]:
+    """
+    Collapse a thread stack root-first into `frame;frame;...`.
+
+    Args:
+        frame (FrameType): Innermost frame of the thread.
+
+    Returns:
+        Optional[str]: Collapsed stack, None if the thread is idle.
+    """
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+        return None
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+# --------------------------------------------------------------------------------
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of request-serving threads from a background thread.
+
+    Python code of a request runs on the event loop thread (async parts) and on
+    threadpool workers (sync endpoints and dependencies), so both are sampled.
+    Samples are process wide: concurrent requests on the same worker show up in
+    the profile as well.
+    """
+
+    def __init__(self, interval: float):
+        """
+        Initialize the profiler.
+
+        Args:
+            interval (float): Seconds between samples.
+        """
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._loop_thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling; must be called from the event loop thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        """
+        Stop sampling.
+
+        Returns:
+            Counter: Collapsed stack to number of samples.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+    def _run(self) -> None:
+        """Sampling loop."""
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                name = names.get(thread_id, "")
+                if thread_id != self._loop_thread_id and not name.startswith(WORKER_THREAD_PREFIX):
+                    continue
+                stack = _collapse(frame)
+                if stack is not None:
+                    self.samples[f"{name};{stack}"] += 1
+
+
+def render_collapsed(samples: Counter) -> str:
+    """
+    Render samples in the collapsed stack format (`frame;frame count` per line)
+    read by flamegraph.pl, speedscope and inferno.
+
+    Args:
+        samples (Counter): Collapsed stack to number of samples.
+
+    Returns:
+        str: Profile text.
+    """
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(samples.items()))
+
+
+# --------------------------------------------------------------------------------
+
+
+class ProfileStore:
+    """
+    Directory of collapsed stack profiles keyed by id.
+
+    The directory may be shared by all workers of a host. The number of stored
+    profiles is capped; the oldest ones are removed on every save.
+    """
+
+    def __init__(self, directory: str, max_profiles: int):
+        """
+        Initialize the store.
+
+        Args:
+            directory (str): Storage directory, created on first save.
+            max_profiles (int): Number of profiles kept.
+        """
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+
+    def save(self, profile_id: str, content: str) -> None:
+        """
+        Store a profile atomically and rotate old ones out.
+
+        Args:
+            profile_id (str): Profile ID.
+            content (str): Collapsed stack text.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(content)
+        os.replace(tmp_path, self.directory / f"{profile_id}{PROFILE_SUFFIX}")
+        self._rotate()
+
+    def get(self, profile_id: str) -> Optional[str]:
+        """
+        Read a stored profile.
+
+        Args:
+            profile_id (str): Profile ID.
+
+        Returns:
+            Optional[str]: Collapsed stack text, None if unknown or rotated out.
+        """
+        if not PROFILE_ID_RE.match(profile_id):
+            return None
+        try:
+            return (self.directory / f"{profile_id}{PROFILE_SUFFIX}").read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def list_profiles(self) -> list[dict]:
+        """
+        List stored profiles, newest first.
+
+        Returns:
+            list[dict]: Profile ID, creation time (unix seconds) and size in bytes.
+        """
+        profiles = []
+        for path in self._paths():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            profiles.append(
+                {
+                    "id": path.name[: -len(PROFILE_SUFFIX)],
+                    "created_at": stat.st_mtime,
+                    "size": stat.st_size,
+                }
+            )
+        return sorted(profiles, key=lambda profile: profile["created_at"], reverse=True)
+
+    def _paths(self) -> list[Path]:
+        """Get paths of stored profiles."""
+        if not self.directory.is_dir():
+            return []
+        return list(self.directory.glob(f"*{PROFILE_SUFFIX}"))
+
+    def _rotate(self) -> None:
+        """Remove the oldest profiles above the cap."""
+        profiles = self.list_profiles()
+        for profile in profiles[self.max_profiles :]:
+            try:
+                (self.directory / f"{profile['id']}{PROFILE_SUFFIX}").unlink()
+            except FileNotFoundError:
+                pass
+
+
+# --------------------------------------------------------------------------------
+
+# Only one request per process is profiled at a time: samples are process wide
+profiling_lock = threading.Lock()
@@ -0,0 +1,240 @@
+"""
+Publish/Subscribe
+In-process fan-out of live updates, with cross-worker delivery through PostgreSQL
+LISTEN/NOTIFY.
+
+Subscribers (open streaming responses) register per key, e.g. an event ID, and
+get a bounded queue. On PostgreSQL a publish is one NOTIFY; every worker that
+has subscribers keeps one LISTEN connection and fans each notification out to
+its local queues, so the cost does not grow with the number of watchers. On
+other databases (SQLite in tests and local runs) delivery is in-process only.
+"""
+
+# --------------------------------------------------------------------------------
+
+import asyncio
+import json
+import threading
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .log_config import logger
+
+# --------------------------------------------------------------------------------
+
+RECONNECT_DELAY = 5.0  # seconds before the listener reconnects after an error
+
+
+class Subscription:
+    """
+    One subscriber's bounded queue of messages.
+
+    A slow subscriber loses its oldest messages instead of making the queue grow;
+    messages carry absolute values, so the latest one is always enough.
+    """
+
+    def __init__(self, publisher: "Publisher", key: str, max_size: int):
+        """
+        Initialize the subscription on the running event loop.
+
+        Args:
+            publisher (Publisher): Publisher the subscription belongs to.
+            key (str): Subscribed key.
+            max_size (int): Maximum number of queued messages.
+        """
+        self.publisher = publisher
+        self.key = key
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(max_size)
+        self.dropped = 0
+
+    def put(self, message: dict) -> None:
+        """
+        Queue a message, dropping the oldest one if the queue is full.
+        Must run on the subscription's event loop.
+
+        Args:
+            message (dict): Message.
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """
+        Wait for the next message.
+
+        Args:
+            timeout (float): Maximum wait in seconds.
+
+        Returns:
+            Optional[dict]: Message, or None if none arrived in time.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+    def close(self) -> None:
+        """Stop receiving messages."""
+        self.publisher.unsubscribe(self)
+
+
+# --------------------------------------------------------------------------------
+
+
+class Publisher:
+    """
+    Fan-out of JSON messages to the subscribers of a key, on one NOTIFY channel.
+    """
+
+    def __init__(self, channel: str, engine: Engine, queue_size: int = 100):
+        """
+        Initialize the publisher.
+
+        Args:
+            channel (str): NOTIFY channel name (a plain identifier).
+            engine (Engine): Engine of the database used for delivery.
+            queue_size (int): Maximum queued messages per subscriber.
+        """
+        self.channel = channel
+        self.engine = engine
+        self.queue_size = queue_size
+        self.uses_notify = engine.dialect.name == "postgresql"
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, key: str) -> Subscription:
+        """
+        Subscribe to a key; must be called on the event loop.
+
+        The first subscription of the process starts the LISTEN connection.
+
+        Args:
+            key (str): Key to receive messages for.
+
+        Returns:
+            Subscription: Subscription; close it when done.
+        """
+        subscription = Subscription(self, key, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(key, set()).add(subscription)
+        if self.uses_notify and (self._listener is None or self._listener.done()):
+            self._listener = subscription.loop.create_task(self._listen())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Remove a subscription.
+
+        Args:
+            subscription (Subscription): Subscription to remove.
+        """
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.key, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.key, None)
+
+    def subscriber_count(self, key: str) -> int:
+        """
+        Count local subscribers of a key.
+
+        Args:
+            key (str): Key.
+
+        Returns:
+            int: Number of subscriptions in this process.
+        """
+        with self._lock:
+            return len(self._subscribers.get(key, ()))
+
+    def deliver(self, key: str, message: dict) -> None:
+        """
+        Hand a message to the local subscribers of a key; safe from any thread.
+
+        Args:
+            key (str): Key.
+            message (dict): Message.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(key, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, message)
+            except RuntimeError:
+                # The subscriber's loop is closed
+                self.unsubscribe(subscription)
+
+    def publish(self, db: Session, key: str, message: dict) -> None:
+        """
+        Publish a message to the subscribers of a key in every worker.
+
+        On PostgreSQL the message is a NOTIFY on `db`, sent when the caller
+        commits (and dropped on rollback); it must fit the 8000-byte NOTIFY
+        payload limit. Otherwise it is delivered in-process at once.
+
+        Args:
+            db (Session): Database session.
+            key (str): Key.
+            message (dict): JSON-serializable message.
+        """
+        if not self.uses_notify:
+            self.deliver(key, message)
+            return
+        payload = json.dumps({"key": key, "message": message}, separators=(",", ":"))
+        db.execute(select(func.pg_notify(self.channel, payload)))
+
+    async def close(self) -> None:
+        """Stop the LISTEN connection, if any."""
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    # --------------------------------------------------------------------------------
+
+    def _connect(self):
+        """Open a dedicated autocommit DB-API connection listening on the channel."""
+        args, kwargs = self.engine.dialect.create_connect_args(self.engine.url)
+        connection = self.engine.dialect.loaded_dbapi.connect(*args, **kwargs)
+        connection.autocommit = True
+        connection.cursor().execute(f'LISTEN "{self.channel}"')
+        return connection
+
+    async def _listen(self) -> None:
+        """Deliver notifications to local subscribers until cancelled, reconnecting on errors."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                connection = await asyncio.to_thread(self._connect)
+            except Exception:
+                logger.error(f"Cannot LISTEN on {self.channel}", exc_info=True)
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+
+            descriptor = connection.fileno()
+            readable = asyncio.Event()
+            loop.add_reader(descriptor, readable.set)
+            try:
+                while True:
+                    await readable.wait()
+                    readable.clear()
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        data = json.loads(notification.payload)
+                        self.deliver(data["key"], data["message"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.error(f"LISTEN on {self.channel} failed, reconnecting", exc_info=True)
+                await asyncio.sleep(RECONNECT_DELAY)
+            finally:
+                loop.remove_reader(descriptor)
+                connection.close()
@@ -0,0 +1,144 @@
+"""
+Query Stats
+Per-request SQL statement counting, DB time accounting and N+1 detection.
+"""
+
+# --------------------------------------------------------------------------------
+
+import contextvars
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import event
+
+# --------------------------------------------------------------------------------
+
+# Bind parameters of all DBAPI paramstyles (qmark, named, pyformat, format, numeric)
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|\?|:\w+|\$\d+")
+# Expanded IN lists, e.g. "(?, ?, ?)" -> "(?)"
+_PARAM_LIST_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Longest statement text kept in N+1 warnings
+SHAPE_PREVIEW_CHARS = 300
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a SQL statement so that executions differing only in bound
+    values or IN-list length share one shape.
+
+    Args:
+        statement (str): SQL statement as sent to the DBAPI cursor.
+
+    Returns:
+        str: Normalized statement.
+    """
+    shape = _PARAM_RE.sub("?", statement)
+    shape = _PARAM_LIST_RE.sub("?", shape)
+    return _WHITESPACE_RE.sub(" ", shape).strip()
+
+
+# --------------------------------------------------------------------------------
+
+
+class QueryStats:
+    """
+    SQL statements executed while serving one request.
+
+    Attributes:
+        count (int): Number of executed statements.
+        duration (float): Total time spent in the DBAPI cursor, in seconds.
+        shapes (Counter): Executions per normalized statement.
+    """
+
+    __slots__ = ("count", "duration", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        """
+        Account one executed statement.
+
+        Args:
+            statement (str): SQL statement.
+            duration (float): Execution time in seconds.
+        """
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Get statement shapes executed at least `threshold` times, the usual
+        signature of an N+1 query pattern.
+
+        Args:
+            threshold (int): Minimum number of executions, 0 disables detection.
+
+        Returns:
+            list[tuple[str, int]]: Shapes and counts, most frequent first.
+        """
+        if threshold <= 0:
+            return []
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        """
+        Render the stats as a Server-Timing metric.
+
+        Returns:
+            str: Header value, e.g. `db;dur=12.3;desc="7 queries"`.
+        """
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+# Stats of the request being served, bound by RequestLoggingMiddleware
+query_stats_var: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "query_stats", default=None
+)
+
+
+# --------------------------------------------------------------------------------
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = query_stats_var.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute is skipped for failed statements
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+
+def instrument_engine(engine) -> None:
+    """
+    Attach cursor execution hooks that account statements to the current request.
+
+    Statements executed outside a request (background tasks, startup) are timed
+    but not recorded. Calling it again for the same engine is a no-op.
+
+    Args:
+        engine: SQLAlchemy engine.
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
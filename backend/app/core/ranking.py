@@ -0,0 +1,115 @@
+"""
+Feed Ranking
+Scoring rules and cursor encoding for the personalized event feed.
+"""
+
+# --------------------------------------------------------------------------------
+
+import base64
+import json
+from collections import Counter
+from collections.abc import Iterable
+from typing import Optional
+
+# --------------------------------------------------------------------------------
+
+# Participation types that count as "going" to an event
+GOING_TYPES = ("C", "P")
+
+# Social signal weights
+FRIEND_WEIGHT = 1.0
+FRIEND_OF_FRIEND_WEIGHT = 0.3
+
+# How much a full tag-affinity match can boost the social score
+AFFINITY_WEIGHT = 1.0
+
+# Only the most recent participations shape a user's tag affinity
+AFFINITY_HISTORY_LIMIT = 200
+
+
+# --------------------------------------------------------------------------------
+
+
+def tag_affinity(tag_lists: Iterable[Optional[list[str]]]) -> dict[str, float]:
+    """
+    Build a normalized tag affinity vector from the tags of attended events.
+
+    Args:
+        tag_lists (Iterable[Optional[list[str]]]): Tags of each attended event.
+
+    Returns:
+        dict[str, float]: Tag to share of attended events carrying it.
+    """
+    counts: Counter = Counter()
+    events = 0
+    for tags in tag_lists:
+        events += 1
+        counts.update(set(tags or []))
+    if not events:
+        return {}
+    return {tag: count / events for tag, count in counts.items()}
+
+
+def score_candidate(
+    friends_going: int,
+    friends_of_friends_going: int,
+    event_tags: Optional[list[str]],
+    affinity: dict[str, float],
+) -> float:
+    """
+    Score an event for a user.
+
+    The social signal (friends and friends of friends going) is the base score;
+    tag affinity multiplies it, so an event nobody in the network attends never
+    outranks one that friends attend.
+
+    Args:
+        friends_going (int): Friends going to the event.
+        friends_of_friends_going (int): Friends of friends going to the event.
+        event_tags (Optional[list[str]]): Event tags.
+        affinity (dict[str, float]): User tag affinity vector.
+
+    Returns:
+        float: Candidate score (rounded to keep cursors compact).
+    """
+    social = FRIEND_WEIGHT * friends_going + FRIEND_OF_FRIEND_WEIGHT * friends_of_friends_going
+    if social <= 0:
+        return 0.0
+    match = min(1.0, sum(affinity.get(tag, 0.0) for tag in set(event_tags or [])))
+    return round(social * (1 + AFFINITY_WEIGHT * match), 6)
+
+
+# --------------------------------------------------------------------------------
+
+
+def encode_cursor(score: float, event_id: str) -> str:
+    """
+    Encode a keyset cursor pointing at the last returned feed item.
+
+    Args:
+        score (float): Score of the last item.
+        event_id (str): Event ID of the last item.
+
+    Returns:
+        str: URL-safe opaque cursor.
+    """
+    raw = json.dumps([score, event_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[tuple[float, str]]:
+    """
+    Decode a keyset cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): Opaque cursor.
+
+    Returns:
+        Optional[tuple[float, str]]: (score, event_id) or None if malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, event_id = json.loads(raw)
+        return float(score), str(event_id)
+    except (ValueError, TypeError):
+        return None
@@ -5,9 +5,9 @@ Handles uploading files to an S3-compatible object storage.
 
 # --------------------------------------------------------------------------------
 
-import boto3
-from botocore.client import Config as BotoConfig
-from botocore.exceptions import NoCredentialsError
+# boto3 is imported when the first client is created: importing it takes about
+# 200ms, which every worker would otherwise pay at boot
+from ..metrics import S3_UPLOAD_DURATION
 
 # --------------------------------------------------------------------------------
 
@@ -43,6 +43,9 @@ class S3Client:
                 "S3 configuration is incomplete. Please check your environment variables."
             )
 
+        import boto3
+        from botocore.client import Config as BotoConfig
+
         self.s3 = boto3.client(
             "s3",
             aws_access_key_id=access_key,
@@ -72,6 +75,8 @@ class S3Client:
         Raises:
             Exception: If S3 credentials are missing.
         """
+        from botocore.exceptions import NoCredentialsError
+
         unique_filename = f"avatars/{filename}"
         try:
             # MinIO may not support ACL parameter, so we omit it
@@ -87,7 +92,8 @@ class S3Client:
             if self.endpoint_url and "minio" not in self.endpoint_url.lower():
                 put_params["ACL"] = "public-read"
 
-            self.s3.put_object(**put_params)
+            with S3_UPLOAD_DURATION.time():
+                self.s3.put_object(**put_params)
             # Construct public URL: public_url should be base URL (e.g., https://domain.com/s3)
             # MinIO path format: /bucket/key
             return f"{self.public_url}/{self.bucket}/{unique_filename}"
@@ -0,0 +1,92 @@
+"""
+Serialization
+Single JSON serialization path for API responses built on precompiled TypeAdapters.
+"""
+
+# --------------------------------------------------------------------------------
+
+from functools import cache
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+# --------------------------------------------------------------------------------
+
+
+@cache
+def type_adapter(schema: Any) -> TypeAdapter:
+    """
+    Get the TypeAdapter of a schema, built once per process.
+
+    Args:
+        schema (Any): Pydantic model or type, e.g. `list[Profile]`.
+
+    Returns:
+        TypeAdapter: Cached adapter.
+    """
+    return TypeAdapter(schema)
+
+
+def precompile(*schemas: Any) -> None:
+    """
+    Build the adapters of response schemas at import time, so the first request
+    of a worker does not pay for core schema generation.
+
+    Args:
+        *schemas (Any): Response schemas.
+    """
+    for schema in schemas:
+        type_adapter(schema)
+
+
+# --------------------------------------------------------------------------------
+
+
+def dump_json(schema: Any, value: Any) -> bytes:
+    """
+    Validate a value against a response schema and serialize it to JSON.
+
+    Produces the same body FastAPI would render for `response_model=schema`.
+    Model instances of the schema pass through without re-validation; ORM
+    objects and dicts are validated once. Encoding is done by pydantic-core.
+
+    Args:
+        schema (Any): Pydantic model or type.
+        value (Any): Dict, ORM object or model instance.
+
+    Returns:
+        bytes: Serialized JSON.
+    """
+    adapter = type_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def json_response(
+    schema: Any,
+    value: Any,
+    *,
+    status_code: int = 200,
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    """
+    Serialize a value into a JSON response.
+
+    Returning a Response makes FastAPI skip its own validation and encoding of
+    the endpoint result; `response_model` is then only used for OpenAPI.
+
+    Args:
+        schema (Any): Response schema, the same as the route's `response_model`.
+        value (Any): Dict, ORM object or model instance.
+        status_code (int): HTTP status code.
+        headers (Optional[dict[str, str]]): Extra response headers.
+
+    Returns:
+        Response: JSON response.
+    """
+    return Response(
+        content=dump_json(schema, value),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
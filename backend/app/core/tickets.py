@@ -0,0 +1,145 @@
+"""
+QR Tickets
+Compact HMAC-signed participation tickets that are verified without the database.
+
+A ticket is `v1.<payload>.<signature>`: the payload is the base64url JSON array
+[participation_id, event_id, user_id, expires_at] and the signature a truncated
+HMAC-SHA256 of `v1.<payload>` under the event's ticket key. The key is derived
+from TICKET_SECRET and the event ID, so the server verifies any ticket from
+configuration alone, and a scanner device given one event's key can verify that
+event's tickets offline.
+"""
+
+# --------------------------------------------------------------------------------
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import NamedTuple, Optional
+
+from .config import settings
+
+# --------------------------------------------------------------------------------
+
+TICKET_VERSION = "v1"
+SIGNATURE_BYTES = 16  # 128-bit tag keeps the QR code small
+
+
+class Ticket(NamedTuple):
+    """Verified ticket contents."""
+
+    participation_id: str
+    event_id: str
+    user_id: str
+    expires_at: int  # Unix time
+
+
+class TicketError(ValueError):
+    """Ticket is malformed, forged or expired; the message is the API error code."""
+
+
+# --------------------------------------------------------------------------------
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _secret() -> bytes:
+    """Ticket master secret: TICKET_SECRET, or one derived from the bot token."""
+    if settings.TICKET_SECRET:
+        return settings.TICKET_SECRET.encode()
+    return hmac.new(b"QRTicket", settings.BOT_TOKEN.encode(), hashlib.sha256).digest()
+
+
+def event_key(event_id: str) -> bytes:
+    """
+    Get the key that signs the tickets of one event.
+
+    Args:
+        event_id (str): Event ID.
+
+    Returns:
+        bytes: 32-byte HMAC key.
+    """
+    return hmac.new(_secret(), event_id.encode(), hashlib.sha256).digest()
+
+
+def encoded_event_key(event_id: str) -> str:
+    """
+    Get the event's ticket key in the form handed to scanner devices.
+
+    Args:
+        event_id (str): Event ID.
+
+    Returns:
+        str: Base64url key without padding.
+    """
+    return _b64encode(event_key(event_id))
+
+
+# --------------------------------------------------------------------------------
+
+
+def issue_ticket(participation_id: str, event_id: str, user_id: str, expires_at: int) -> str:
+    """
+    Sign a ticket for a participation.
+
+    Args:
+        participation_id (str): Participation ID.
+        event_id (str): Event ID.
+        user_id (str): Participant's profile ID.
+        expires_at (int): Unix time after which the ticket is rejected.
+
+    Returns:
+        str: Ticket to encode in the QR code.
+    """
+    payload = json.dumps(
+        [participation_id, event_id, user_id, expires_at], separators=(",", ":")
+    ).encode()
+    signed = f"{TICKET_VERSION}.{_b64encode(payload)}"
+    signature = hmac.new(event_key(event_id), signed.encode(), hashlib.sha256).digest()
+    return f"{signed}.{_b64encode(signature[:SIGNATURE_BYTES])}"
+
+
+def verify_ticket(ticket: str, now: Optional[float] = None) -> Ticket:
+    """
+    Verify a ticket's signature and expiry.
+
+    Args:
+        ticket (str): Ticket from a QR code.
+        now (Optional[float]): Current Unix time, for tests.
+
+    Returns:
+        Ticket: Ticket contents.
+
+    Raises:
+        TicketError: "INVALID_TICKET" or "EXPIRED_TICKET".
+    """
+    try:
+        version, payload, signature = ticket.split(".")
+        participation_id, event_id, user_id, expires_at = json.loads(_b64decode(payload))
+        received = _b64decode(signature)
+    except (ValueError, TypeError):
+        raise TicketError("INVALID_TICKET")
+    if (
+        version != TICKET_VERSION
+        or not all(isinstance(value, str) for value in (participation_id, event_id, user_id))
+        or not isinstance(expires_at, int)
+    ):
+        raise TicketError("INVALID_TICKET")
+
+    expected = hmac.new(
+        event_key(event_id), f"{version}.{payload}".encode(), hashlib.sha256
+    ).digest()
+    if not hmac.compare_digest(expected[:SIGNATURE_BYTES], received):
+        raise TicketError("INVALID_TICKET")
+    if (time.time() if now is None else now) > expires_at:
+        raise TicketError("EXPIRED_TICKET")
+    return Ticket(participation_id, event_id, user_id, expires_at)
@@ -5,7 +5,7 @@ Database operations for all entities.
 
 # --------------------------------------------------------------------------------
 
-from . import events, files, friends, invitations, profiles, qr_scans
+from . import events, feed, files, friends, invitations, profiles, qr_scans
 
 # --------------------------------------------------------------------------------
 
@@ -16,4 +16,5 @@ __all__ = [
     "invitations",
     "events",
     "qr_scans",
+    "feed",
 ]
@@ -1,16 +1,30 @@
+from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import and_, or_
-from sqlalchemy.orm import Session
+from fastapi import BackgroundTasks
+from sqlalchemy import and_, case, exists, func, or_, select, update
+from sqlalchemy.orm import Session, selectinload
 
-from app.db.crud.friends import get_friends_of_friends_ids
+from app.core.cache import response_cache
+from app.core.ranking import GOING_TYPES
+from app.db.crud import feed as crud_feed
+from app.db.crud.friends import get_friend_ids, get_friends_of_friends_ids
+from app.db.dialects import is_postgresql, upsert_insert
 from app.db.models.event import Event, EventParticipation
-from app.db.models.friends import Friends
+from app.db.models.tag_count import EventTagCount
 from app.schemas.events import EventCreate, EventUpdate
+from app.tasks.feed import refresh_participation_feeds
 
 
 class CRUDEvent:
-    def create(self, db: Session, *, obj_in: EventCreate, creator_id: str) -> Event:
+    def create(
+        self,
+        db: Session,
+        *,
+        obj_in: EventCreate,
+        creator_id: str,
+        background_tasks: Optional[BackgroundTasks] = None,
+    ) -> Event:
         """Create a new event."""
         db_obj = Event(
             title=obj_in.title,
@@ -28,8 +42,11 @@ class CRUDEvent:
         # Set tags directly as PostgreSQL array
         db_obj.tags = obj_in.tags if obj_in.tags is not None else []
         db.add(db_obj)
+        self._adjust_tag_counts(db, added=set(db_obj.tags))
         db.commit()
         db.refresh(db_obj)
+        if db_obj.tags:
+            response_cache.invalidate("tags")
 
         # Create creator participation record
         participation = EventParticipation(
@@ -38,6 +55,9 @@ class CRUDEvent:
         db.add(participation)
         db.commit()
 
+        # Creator counts as going for their friends' feeds
+        self._refresh_feeds(db, background_tasks, creator_id, db_obj.id, 1)
+
         return db_obj
 
     def get(self, db: Session, event_id: str) -> Optional[Event]:
@@ -53,9 +73,67 @@ class CRUDEvent:
         last_event_id: Optional[str] = None,
         tags: Optional[list[str]] = None,
         user_id: Optional[str] = None,
+        period: str = "all",
+        status: Optional[str] = None,
     ) -> tuple[list[Event], int, bool]:
-        """Get multiple events with filtering and pagination."""
-        query = db.query(Event)
+        """
+        Get multiple events with filtering and pagination.
+
+        `period` is one of "all", "actual" (active and not yet ended - the default
+        feed, served by the `ix_events_active_created_at` partial index),
+        "upcoming", "ongoing" or "past".
+        """
+        query = self._build_multi_query(
+            db, last_event_id=last_event_id, tags=tags, period=period, status=status
+        )
+
+        # Get total count before pagination
+        total = query.count()
+
+        # Apply pagination - order by created_at desc for consistent pagination
+        query = query.order_by(Event.created_at.desc()).offset(skip).limit(limit + 1)
+        events = self._with_list_loads(query).all()
+
+        # Check if there are more events
+        has_more = len(events) > limit
+        if has_more:
+            events = events[:-1]
+
+        return events, total, has_more
+
+    def get_user_events(
+        self,
+        db: Session,
+        *,
+        user_id: str,
+        filter_type: str = "all",
+        limit: int = 20,
+        last_event_id: Optional[str] = None,
+    ) -> tuple[list[Event], int, bool]:
+        """
+        Get events the user created or participates in, newest first.
+
+        `filter_type` is one of "all", "past" (ended) or "actual" (not yet ended).
+        """
+        # Creators automatically have participation records (type "C"), so
+        # joining EventParticipation covers both
+        query = (
+            db.query(Event)
+            .join(
+                EventParticipation,
+                and_(
+                    EventParticipation.event_id == Event.id,
+                    EventParticipation.user_id == user_id,
+                ),
+            )
+            .distinct()
+        )
+
+        # Apply filters
+        if filter_type == "past":
+            query = query.filter(Event.end_date < date.today())
+        elif filter_type == "actual":
+            query = query.filter(Event.end_date >= date.today())
 
         # Apply cursor-based pagination
         if last_event_id:
@@ -63,26 +141,11 @@ class CRUDEvent:
             if last_event:
                 query = query.filter(Event.created_at < last_event.created_at)
 
-        # Filter by tags - handle both PostgreSQL and SQLite
-        if tags:
-            # Check if we're using PostgreSQL or SQLite
-            if db.bind.dialect.name == "postgresql":
-                # For PostgreSQL, use array overlap operator
-                query = query.filter(Event.tags.op("&&")(tags))
-            else:
-                # For SQLite, check if any tag exists in the JSON array
-                tag_conditions = []
-                for tag in tags:
-                    tag_conditions.append(Event.tags.contains(f'"{tag}"'))
-                if tag_conditions:
-                    query = query.filter(or_(*tag_conditions))
-
         # Get total count before pagination
         total = query.count()
 
-        # Apply pagination - order by created_at desc for consistent pagination
-        query = query.order_by(Event.created_at.desc()).offset(skip).limit(limit + 1)
-        events = query.all()
+        query = query.order_by(Event.created_at.desc()).limit(limit + 1)
+        events = self._with_list_loads(query).all()
 
         # Check if there are more events
         has_more = len(events) > limit
@@ -91,29 +154,193 @@ class CRUDEvent:
 
         return events, total, has_more
 
+    def _with_list_loads(self, query):
+        """
+        Load what event serialization reads (participant counts, photo URL) for
+        the whole page in one query per relationship instead of one per event.
+        """
+        return query.options(selectinload(Event.participations), selectinload(Event.photo_file))
+
+    def get_multi_signature(
+        self,
+        db: Session,
+        *,
+        last_event_id: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        period: str = "all",
+        status: Optional[str] = None,
+    ) -> tuple:
+        """
+        Get a cheap change marker for the events matched by `get_multi`.
+
+        A single aggregate over the filtered rows: any insert, delete, version bump
+        or registration window opening/closing changes the result, so it can serve
+        as the basis of a list ETag without loading the events.
+        """
+        query = self._build_multi_query(
+            db, last_event_id=last_event_id, tags=tags, period=period, status=status
+        )
+        now = datetime.now()
+        window_open = and_(
+            or_(Event.registration_start_date.is_(None), Event.registration_start_date <= now),
+            or_(Event.registration_end_date.is_(None), Event.registration_end_date >= now),
+        )
+        return tuple(
+            query.with_entities(
+                func.count(Event.id),
+                func.coalesce(func.sum(Event.version), 0),
+                func.max(Event.created_at),
+                func.max(Event.updated_at),
+                func.coalesce(func.sum(case((window_open, 1), else_=0)), 0),
+            ).one()
+        )
+
+    def _build_multi_query(
+        self,
+        db: Session,
+        *,
+        last_event_id: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        period: str = "all",
+        status: Optional[str] = None,
+    ):
+        """Build the filtered (unordered, unpaginated) events query."""
+        query = self._filter_period(db.query(Event), period)
+        if status:
+            query = query.filter(Event.status == status)
+
+        # Apply cursor-based pagination
+        if last_event_id:
+            last_event = db.query(Event).filter(Event.id == last_event_id).first()
+            if last_event:
+                query = query.filter(Event.created_at < last_event.created_at)
+
+        # Filter by tags - handle both PostgreSQL and SQLite
+        if tags:
+            query = query.filter(self._tags_overlap(db, tags))
+        return query
+
     def update(self, db: Session, *, db_obj: Event, obj_in: EventUpdate) -> Event:
         """Update an event."""
         update_data = obj_in.model_dump(exclude_unset=True)
 
         # Handle tags separately - set directly as PostgreSQL array
+        tags_changed = False
         if "tags" in update_data:
-            db_obj.tags = update_data.pop("tags")
+            old_tags = set(db_obj.tags or [])
+            new_tags = update_data.pop("tags") or []
+            db_obj.tags = new_tags
+            tags_changed = set(new_tags) != old_tags
+            self._adjust_tag_counts(
+                db, added=set(new_tags) - old_tags, removed=old_tags - set(new_tags)
+            )
 
         for field, value in update_data.items():
             setattr(db_obj, field, value)
+        db_obj.version = (db_obj.version or 0) + 1
 
         db.add(db_obj)
+        if tags_changed:
+            db.flush()
+            crud_feed.rescore_event_candidates(db, db_obj.id)
         db.commit()
         db.refresh(db_obj)
+        response_cache.invalidate(f"event:{db_obj.id}", *(["tags"] if tags_changed else []))
         return db_obj
 
     def delete(self, db: Session, *, event_id: str) -> Event:
         """Delete an event."""
         obj = db.get(Event, event_id)
+        self._adjust_tag_counts(db, removed=set(obj.tags or []))
+        crud_feed.delete_event_candidates(db, event_id)
         db.delete(obj)
         db.commit()
+        response_cache.invalidate(f"event:{event_id}", "tags")
         return obj
 
+    def end_past_events(self, db: Session, *, today: Optional[date] = None) -> int:
+        """
+        Mark active events whose end date has passed as ended ("E").
+        Returns the number of updated events.
+        """
+        today = today or date.today()
+        result = db.execute(
+            update(Event)
+            .where(Event.status == "A", Event.end_date < today)
+            .values(status="E", version=Event.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if result.rowcount:
+            response_cache.invalidate("events")
+        return result.rowcount
+
+    def _filter_period(self, query, period: str):
+        """Apply a date period filter to an events query."""
+        today = date.today()
+        if period == "actual":
+            return query.filter(Event.status == "A", Event.end_date >= today)
+        if period == "upcoming":
+            return query.filter(Event.start_date > today)
+        if period == "ongoing":
+            return query.filter(Event.start_date <= today, Event.end_date >= today)
+        if period == "past":
+            return query.filter(Event.end_date < today)
+        return query
+
+    def _bump_version(self, db: Session, event_id: str) -> None:
+        """
+        Increment the event version inside the caller's transaction, so cached
+        representations (ETags) of the event are invalidated.
+        """
+        db.execute(
+            update(Event)
+            .where(Event.id == event_id)
+            .values(version=Event.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    def get_tag_counts(self, db: Session) -> dict[str, int]:
+        """Get events-per-tag counters from the maintained aggregate."""
+        rows = db.execute(select(EventTagCount.tag, EventTagCount.events_count)).all()
+        return {tag: count for tag, count in rows}
+
+    def _tags_overlap(self, db: Session, tags: list[str]):
+        """
+        Build an "event has any of the tags" condition.
+
+        PostgreSQL uses the array overlap operator, which is served by the
+        `ix_events_tags_gin` index. SQLite stores tags as a JSON string, so the
+        array is expanded with `json_each` and matched exactly per element.
+        """
+        if is_postgresql(db):
+            return Event.tags.op("&&")(tags)
+
+        tag_values = func.json_each(Event.tags).table_valued("value")
+        return exists().select_from(tag_values).where(tag_values.c.value.in_(tags))
+
+    def _adjust_tag_counts(
+        self, db: Session, *, added: set[str] = frozenset(), removed: set[str] = frozenset()
+    ) -> None:
+        """
+        Apply tag additions/removals to the events-per-tag aggregate.
+        Runs inside the caller's transaction; the caller commits.
+        """
+        for tag in added:
+            stmt = upsert_insert(db, EventTagCount).values(tag=tag, events_count=1)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[EventTagCount.tag],
+                set_={"events_count": EventTagCount.events_count + 1},
+            )
+            db.execute(stmt)
+
+        if removed:
+            db.execute(
+                update(EventTagCount)
+                .where(EventTagCount.tag.in_(removed), EventTagCount.events_count > 0)
+                .values(events_count=EventTagCount.events_count - 1)
+            )
+
     def is_creator(self, db: Session, *, event_id: str, user_id: str) -> bool:
         """Check if user is the creator of the event."""
         event = db.query(Event).filter(Event.id == event_id).first()
@@ -152,61 +379,116 @@ class CRUDEvent:
         participation = self.get_user_participation(db, event_id=event_id, user_id=user_id)
         return participation.id if participation else None
 
-    def get_friends_going_count(self, db: Session, *, event_id: str, user_id: str) -> int:
-        """Get count of friends going to the event."""
-        # Get user's friends
-        friends_query = db.query(Friends).filter(
-            or_(Friends.user_1 == user_id, Friends.user_2 == user_id)
+    def get_viewer_fields(
+        self,
+        db: Session,
+        *,
+        event_ids: list[str],
+        user_id: str,
+        friend_ids: Optional[set[str]] = None,
+        friends_of_friends_ids: Optional[set[str]] = None,
+    ) -> dict[str, dict]:
+        """
+        Get the viewer-dependent fields of EventWithParticipation for several events.
+
+        Takes one query for the viewer's participations and one grouped count per
+        friend circle, however many events there are. Friend ID sets the caller
+        has already loaded are reused instead of being queried again.
+
+        Returns a dict of fields per event ID.
+        """
+        fields = {
+            event_id: {
+                "friends_going": 0,
+                "friends_of_friends_going": 0,
+                "participation_type": "V",
+                "participate_id": None,
+            }
+            for event_id in event_ids
+        }
+        if not fields:
+            return fields
+
+        participations = db.query(
+            EventParticipation.event_id,
+            EventParticipation.id,
+            EventParticipation.participation_type,
+        ).filter(
+            EventParticipation.event_id.in_(list(fields)), EventParticipation.user_id == user_id
         )
-        friend_ids = set()
-        for friendship in friends_query.all():
-            if friendship.user_1 == user_id:
-                friend_ids.add(friendship.user_2)
-            else:
-                friend_ids.add(friendship.user_1)
-
-        if not friend_ids:
-            return 0
-
-        # Count friends participating in the event
-        friends_participating = (
-            db.query(EventParticipation)
+        for event_id, participation_id, participation_type in participations:
+            fields[event_id]["participation_type"] = participation_type
+            fields[event_id]["participate_id"] = participation_id
+
+        if friend_ids is None:
+            friend_ids = get_friend_ids(db, user_id)
+        if friends_of_friends_ids is None:
+            friends_of_friends_ids = get_friends_of_friends_ids(
+                db, user_id=user_id, direct_friend_ids=friend_ids
+            )
+        for field, member_ids in (
+            ("friends_going", friend_ids),
+            ("friends_of_friends_going", friends_of_friends_ids),
+        ):
+            for event_id, count in self._going_counts(db, list(fields), member_ids):
+                fields[event_id][field] = count
+        return fields
+
+    def _going_counts(self, db: Session, event_ids: list[str], member_ids: set[str]):
+        """Count the members going to each of the events (events without any are skipped)."""
+        if not member_ids:
+            return []
+        return (
+            db.query(EventParticipation.event_id, func.count(EventParticipation.id))
             .filter(
-                and_(
-                    EventParticipation.event_id == event_id,
-                    EventParticipation.user_id.in_(friend_ids),
-                    EventParticipation.participation_type.in_(["C", "P"]),
-                )
+                EventParticipation.event_id.in_(event_ids),
+                EventParticipation.user_id.in_(member_ids),
+                EventParticipation.participation_type.in_(GOING_TYPES),
             )
-            .count()
+            .group_by(EventParticipation.event_id)
+            .all()
         )
 
-        return friends_participating
-
-    def get_friends_of_friends_going_count(
-        self, db: Session, *, event_id: str, user_id: str
-    ) -> int:
-        """Get count of friends of friends going to the event."""
-        # Get friends of friends IDs
-        friends_of_friends_ids = get_friends_of_friends_ids(db, user_id=user_id)
-
-        if not friends_of_friends_ids:
-            return 0
+    def get_capacities(self, db: Session, event_ids: list[str]) -> dict[str, Optional[dict]]:
+        """
+        Get the `participants` and `is_registration_available` fields of several
+        events in one grouped query, computed as the Event model does on read.
 
-        # Count friends of friends participating in the event
-        friends_of_friends_participating = (
-            db.query(EventParticipation)
-            .filter(
+        Returns a dict of fields per event ID; None for events that do not exist.
+        """
+        capacities: dict[str, Optional[dict]] = dict.fromkeys(event_ids)
+        if not event_ids:
+            return capacities
+
+        going = func.count(EventParticipation.id)
+        rows = (
+            db.query(
+                Event.id,
+                Event.max_participants,
+                Event.registration_start_date,
+                Event.registration_end_date,
+                going,
+            )
+            .outerjoin(
+                EventParticipation,
                 and_(
-                    EventParticipation.event_id == event_id,
-                    EventParticipation.user_id.in_(friends_of_friends_ids),
-                    EventParticipation.participation_type.in_(["C", "P"]),
-                )
+                    EventParticipation.event_id == Event.id,
+                    EventParticipation.participation_type.in_(GOING_TYPES),
+                ),
             )
-            .count()
+            .filter(Event.id.in_(event_ids))
+            .group_by(Event.id)
         )
-
-        return friends_of_friends_participating
+        now = datetime.now()
+        for event_id, max_participants, start, end, participants in rows:
+            window_open = not (start and now < start) and not (end and now > end)
+            capacities[event_id] = {
+                "participants": participants,
+                "max_participants": max_participants,
+                "is_registration_available": window_open
+                and not (max_participants and participants >= max_participants),
+            }
+        return capacities
 
     def participate_in_event(
         self,
@@ -215,6 +497,7 @@ class CRUDEvent:
         event_id: str,
         user_id: str,
         participation_type: Optional[str] = None,
+        background_tasks: Optional[BackgroundTasks] = None,
     ) -> EventParticipation:
         """Add user participation to an event."""
         if participation_type is None:
@@ -229,13 +512,18 @@ class CRUDEvent:
             .first()
         )
 
+        was_going = bool(
+            existing_participation and existing_participation.participation_type in GOING_TYPES
+        )
+        self._bump_version(db, event_id)
+
         if existing_participation:
             # Update existing participation
             existing_participation.participation_type = participation_type
             db.add(existing_participation)
             db.commit()
             db.refresh(existing_participation)
-            return existing_participation
+            participation = existing_participation
         else:
             # Create new participation
             participation = EventParticipation(
@@ -244,9 +532,22 @@ class CRUDEvent:
             db.add(participation)
             db.commit()
             db.refresh(participation)
-            return participation
+        response_cache.invalidate(f"event:{event_id}")
+
+        # Keep the friends' ranked feeds in sync
+        is_going = participation_type in GOING_TYPES
+        if is_going != was_going:
+            self._refresh_feeds(db, background_tasks, user_id, event_id, 1 if is_going else -1)
+        return participation
 
-    def leave_event(self, db: Session, *, event_id: str, user_id: str) -> bool:
+    def leave_event(
+        self,
+        db: Session,
+        *,
+        event_id: str,
+        user_id: str,
+        background_tasks: Optional[BackgroundTasks] = None,
+    ) -> bool:
         """Remove user participation from an event."""
         participation = (
             db.query(EventParticipation)
@@ -257,10 +558,35 @@ class CRUDEvent:
         )
 
         if participation:
+            was_going = participation.participation_type in GOING_TYPES
             db.delete(participation)
+            self._bump_version(db, event_id)
             db.commit()
+            response_cache.invalidate(f"event:{event_id}")
+            if was_going:
+                self._refresh_feeds(db, background_tasks, user_id, event_id, -1)
             return True
         return False
 
+    def _refresh_feeds(
+        self,
+        db: Session,
+        background_tasks: Optional[BackgroundTasks],
+        user_id: str,
+        event_id: str,
+        delta: int,
+    ) -> None:
+        """
+        Update the feeds of the user's network after a participation change.
+
+        The refresh reads the user's whole two-hop network, so requests hand it
+        to `background_tasks` to run after the response; without them it runs
+        at once.
+        """
+        if background_tasks is not None:
+            background_tasks.add_task(refresh_participation_feeds, user_id, event_id, delta)
+        else:
+            crud_feed.refresh_for_participation(db, user_id=user_id, event_id=event_id, delta=delta)
+
 
 event = CRUDEvent()
@@ -0,0 +1,462 @@
+"""
+Feed CRUD
+Maintenance and reads of the precomputed personalized event feed.
+"""
+
+# --------------------------------------------------------------------------------
+
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import and_, bindparam, case, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.ranking import (
+    AFFINITY_HISTORY_LIMIT,
+    GOING_TYPES,
+    decode_cursor,
+    encode_cursor,
+    score_candidate,
+    tag_affinity,
+)
+from app.db.crud.friends import get_friend_ids, get_friends_of_friends_ids
+from app.db.dialects import upsert_insert
+from app.db.models import Event, EventParticipation, FeedCandidate
+
+# --------------------------------------------------------------------------------
+
+# Upper bound for IN (...) lists in a single statement
+CHUNK_SIZE = 1000
+
+
+def _chunks(values: Iterable[str], size: int = CHUNK_SIZE) -> Iterator[list[str]]:
+    """
+    Split values into lists of at most `size` items.
+
+    Args:
+        values (Iterable[str]): Values to split.
+        size (int): Chunk size.
+
+    Yields:
+        list[str]: Chunk of values.
+    """
+    chunk: list[str] = []
+    for value in values:
+        chunk.append(value)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# --------------------------------------------------------------------------------
+
+
+def get_tag_affinities(db: Session, user_ids: Iterable[str]) -> dict[str, dict[str, float]]:
+    """
+    Get tag affinity vectors for several users in one query per chunk.
+
+    Args:
+        db (Session): Database session.
+        user_ids (Iterable[str]): User IDs.
+
+    Returns:
+        dict[str, dict[str, float]]: User ID to tag affinity vector.
+    """
+    history: dict[str, list] = defaultdict(list)
+    for chunk in _chunks(user_ids):
+        # Number each user's participations newest first, so only the last
+        # AFFINITY_HISTORY_LIMIT of them leave the database
+        ranked = (
+            db.query(
+                EventParticipation.user_id.label("user_id"),
+                Event.tags.label("tags"),
+                func.row_number()
+                .over(
+                    partition_by=EventParticipation.user_id,
+                    order_by=EventParticipation.created_at.desc(),
+                )
+                .label("position"),
+            )
+            .join(Event, Event.id == EventParticipation.event_id)
+            .filter(
+                EventParticipation.user_id.in_(chunk),
+                EventParticipation.participation_type.in_(GOING_TYPES),
+            )
+            .subquery()
+        )
+        rows = (
+            db.query(ranked.c.user_id, ranked.c.tags)
+            .filter(ranked.c.position <= AFFINITY_HISTORY_LIMIT)
+            .order_by(ranked.c.user_id, ranked.c.position)
+            .all()
+        )
+        for user_id, tags in rows:
+            history[user_id].append(tags)
+    return {user_id: tag_affinity(tag_lists) for user_id, tag_lists in history.items()}
+
+
+# --------------------------------------------------------------------------------
+
+
+def refresh_for_participation(db: Session, *, user_id: str, event_id: str, delta: int) -> None:
+    """
+    Incrementally update feed candidates after a participation change.
+
+    When `user_id` starts (delta=+1) or stops (delta=-1) going to `event_id`, the
+    event gains or loses one friend for every direct friend of the user and one
+    friend of a friend for every secondary friend. Only those rows are touched;
+    the acting user's own candidates are rescored because their tag affinity
+    changed. Counters are shifted in SQL, so refreshes running concurrently for
+    the same event do not lose updates. Commits the session.
+
+    Args:
+        db (Session): Database session.
+        user_id (str): ID of the user whose participation changed.
+        event_id (str): Event ID.
+        delta (int): +1 when the user started going, -1 when they stopped.
+    """
+    event = db.get(Event, event_id)
+    friend_ids = get_friend_ids(db, user_id)
+    friends_of_friends_ids = get_friends_of_friends_ids(db, user_id, friend_ids) - friend_ids
+
+    if event is not None:
+        for ids, counter in (
+            (friend_ids, FeedCandidate.friends_going),
+            (friends_of_friends_ids, FeedCandidate.friends_of_friends_going),
+        ):
+            for chunk in _chunks(ids):
+                _shift_counter(db, event_id, chunk, counter, delta)
+        for chunk in _chunks(friend_ids | friends_of_friends_ids):
+            _rescore_candidates(db, event, chunk)
+
+    rescore_user_feed(db, user_id)
+    db.commit()
+
+
+def _shift_counter(db: Session, event_id: str, user_ids: list[str], counter, delta: int) -> None:
+    """
+    Add `delta` to one counter of the users' candidates for an event, creating
+    missing rows when it grows and deleting rows left without friends going
+    when it shrinks. Does not commit.
+
+    Args:
+        db (Session): Database session.
+        event_id (str): Event ID.
+        user_ids (list[str]): Feed owners.
+        counter: FeedCandidate.friends_going or FeedCandidate.friends_of_friends_going.
+        delta (int): Counter change.
+    """
+    if delta > 0:
+        stmt = upsert_insert(db, FeedCandidate).values(
+            [
+                {
+                    "user_id": affected_id,
+                    "event_id": event_id,
+                    "friends_going": 0,
+                    "friends_of_friends_going": 0,
+                    "score": 0.0,
+                    counter.key: delta,
+                }
+                for affected_id in user_ids
+            ]
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[FeedCandidate.user_id, FeedCandidate.event_id],
+                set_={counter.key: counter + stmt.excluded[counter.key]},
+            )
+        )
+        return
+
+    rows = and_(FeedCandidate.event_id == event_id, FeedCandidate.user_id.in_(user_ids))
+    db.execute(
+        update(FeedCandidate)
+        .where(rows)
+        .values({counter: case((counter + delta > 0, counter + delta), else_=0)})
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        delete(FeedCandidate)
+        .where(
+            rows,
+            FeedCandidate.friends_going == 0,
+            FeedCandidate.friends_of_friends_going == 0,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _rescore_candidates(db: Session, event: Event, user_ids: list[str]) -> None:
+    """
+    Recompute scores of the users' candidates for an event from their current
+    counters. A score is written only if the counters it was computed from are
+    unchanged; a concurrent refresh that changed them rescores the row itself.
+    Does not commit.
+
+    Args:
+        db (Session): Database session.
+        event (Event): Candidate event.
+        user_ids (list[str]): Feed owners.
+    """
+    counters = db.execute(
+        select(
+            FeedCandidate.user_id,
+            FeedCandidate.friends_going,
+            FeedCandidate.friends_of_friends_going,
+        ).where(FeedCandidate.event_id == event.id, FeedCandidate.user_id.in_(user_ids))
+    ).all()
+    if not counters:
+        return
+    affinities = get_tag_affinities(db, [row.user_id for row in counters])
+    table = FeedCandidate.__table__
+    db.execute(
+        table.update()
+        .where(
+            table.c.event_id == event.id,
+            table.c.user_id == bindparam("candidate_user_id"),
+            table.c.friends_going == bindparam("candidate_friends_going"),
+            table.c.friends_of_friends_going == bindparam("candidate_fof_going"),
+        )
+        .values(score=bindparam("candidate_score")),
+        [
+            {
+                "candidate_user_id": row.user_id,
+                "candidate_friends_going": row.friends_going,
+                "candidate_fof_going": row.friends_of_friends_going,
+                "candidate_score": score_candidate(
+                    row.friends_going,
+                    row.friends_of_friends_going,
+                    event.tags,
+                    affinities.get(row.user_id, {}),
+                ),
+            }
+            for row in counters
+        ],
+    )
+
+
+# --------------------------------------------------------------------------------
+
+
+def rescore_user_feed(db: Session, user_id: str) -> None:
+    """
+    Recompute scores of a user's candidates from their current tag affinity.
+    Does not commit.
+
+    Args:
+        db (Session): Database session.
+        user_id (str): User ID.
+    """
+    affinity = get_tag_affinities(db, [user_id]).get(user_id, {})
+    rows = (
+        db.query(FeedCandidate, Event.tags)
+        .join(Event, Event.id == FeedCandidate.event_id)
+        .filter(FeedCandidate.user_id == user_id)
+        .all()
+    )
+    for row, tags in rows:
+        row.score = score_candidate(row.friends_going, row.friends_of_friends_going, tags, affinity)
+
+
+# --------------------------------------------------------------------------------
+
+
+def rescore_event_candidates(db: Session, event_id: str) -> None:
+    """
+    Recompute scores of all candidates of an event after its tags changed.
+    Does not commit.
+
+    Args:
+        db (Session): Database session.
+        event_id (str): Event ID.
+    """
+    event = db.get(Event, event_id)
+    rows = db.query(FeedCandidate).filter(FeedCandidate.event_id == event_id).all()
+    if event is None or not rows:
+        return
+    affinities = get_tag_affinities(db, [row.user_id for row in rows])
+    for row in rows:
+        row.score = score_candidate(
+            row.friends_going,
+            row.friends_of_friends_going,
+            event.tags,
+            affinities.get(row.user_id, {}),
+        )
+
+
+# --------------------------------------------------------------------------------
+
+
+def _going_counts(db: Session, user_ids: set[str]) -> dict[str, int]:
+    """
+    Count participations of the given users per event.
+
+    Args:
+        db (Session): Database session.
+        user_ids (set[str]): User IDs.
+
+    Returns:
+        dict[str, int]: Event ID to number of users going.
+    """
+    counts: dict[str, int] = defaultdict(int)
+    for chunk in _chunks(user_ids):
+        rows = (
+            db.query(EventParticipation.event_id, func.count(EventParticipation.id))
+            .filter(
+                EventParticipation.user_id.in_(chunk),
+                EventParticipation.participation_type.in_(GOING_TYPES),
+            )
+            .group_by(EventParticipation.event_id)
+            .all()
+        )
+        for event_id, count in rows:
+            counts[event_id] += count
+    return counts
+
+
+def rebuild_user_feed(db: Session, user_id: str) -> int:
+    """
+    Rebuild all feed candidates of a user from the friendship graph.
+
+    Used when the user's network changes (friendship created or removed), where
+    incremental deltas are not known. Commits the session.
+
+    Args:
+        db (Session): Database session.
+        user_id (str): User ID.
+
+    Returns:
+        int: Number of candidates written.
+    """
+    friend_ids = get_friend_ids(db, user_id)
+    friends_of_friends_ids = get_friends_of_friends_ids(db, user_id, friend_ids)
+
+    friends_going = _going_counts(db, friend_ids)
+    friends_of_friends_going = _going_counts(db, friends_of_friends_ids)
+    event_ids = set(friends_going) | set(friends_of_friends_going)
+
+    event_tags: dict[str, Optional[list[str]]] = {}
+    for chunk in _chunks(event_ids):
+        event_tags.update(db.query(Event.id, Event.tags).filter(Event.id.in_(chunk)).all())
+    affinity = get_tag_affinities(db, [user_id]).get(user_id, {})
+
+    db.query(FeedCandidate).filter(FeedCandidate.user_id == user_id).delete(
+        synchronize_session=False
+    )
+    rows = [
+        FeedCandidate(
+            user_id=user_id,
+            event_id=event_id,
+            friends_going=friends_going.get(event_id, 0),
+            friends_of_friends_going=friends_of_friends_going.get(event_id, 0),
+            score=score_candidate(
+                friends_going.get(event_id, 0),
+                friends_of_friends_going.get(event_id, 0),
+                event_tags[event_id],
+                affinity,
+            ),
+        )
+        for event_id in event_ids
+        if event_id in event_tags
+    ]
+    db.add_all(rows)
+    db.commit()
+    return len(rows)
+
+
+def rebuild_network_feeds(db: Session, user_ids: Iterable[str]) -> int:
+    """
+    Rebuild the feeds of users whose friendship changed and of their direct friends.
+
+    A friendship between A and B changes the friends of A and B and the friends
+    of friends of every direct friend of A or B (who gain or lose B or A); users
+    further away are unaffected. Commits the session.
+
+    Args:
+        db (Session): Database session.
+        user_ids (Iterable[str]): Users whose friendship was created or removed.
+
+    Returns:
+        int: Number of candidates written.
+    """
+    affected = set(user_ids)
+    for user_id in list(affected):
+        affected |= get_friend_ids(db, user_id)
+    return sum(rebuild_user_feed(db, user_id) for user_id in sorted(affected))
+
+
+# --------------------------------------------------------------------------------
+
+
+def delete_event_candidates(db: Session, event_id: str) -> None:
+    """
+    Delete all feed candidates of an event. Does not commit.
+
+    Args:
+        db (Session): Database session.
+        event_id (str): Event ID.
+    """
+    db.query(FeedCandidate).filter(FeedCandidate.event_id == event_id).delete(
+        synchronize_session=False
+    )
+
+
+# --------------------------------------------------------------------------------
+
+
+def get_ranked_feed(
+    db: Session, user_id: str, *, limit: int = 20, cursor: Optional[str] = None
+) -> tuple[list[Event], bool, Optional[str]]:
+    """
+    Get a page of the ranked feed using keyset pagination.
+
+    The cursor encodes the (score, event_id) of the last item of the previous
+    page, so pages stay stable while scores of other events change.
+
+    Args:
+        db (Session): Database session.
+        user_id (str): Feed owner ID.
+        limit (int): Page size.
+        cursor (Optional[str]): Cursor returned with the previous page.
+
+    Returns:
+        tuple[list[Event], bool, Optional[str]]: Events, has_more flag, next cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    query = (
+        db.query(Event, FeedCandidate.score)
+        .join(
+            FeedCandidate,
+            and_(FeedCandidate.event_id == Event.id, FeedCandidate.user_id == user_id),
+        )
+        .filter(Event.status == "A", Event.end_date >= date.today())
+    )
+
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            raise ValueError("Invalid cursor")
+        last_score, last_event_id = position
+        query = query.filter(
+            or_(
+                FeedCandidate.score < last_score,
+                and_(FeedCandidate.score == last_score, FeedCandidate.event_id < last_event_id),
+            )
+        )
+
+    rows = (
+        query.order_by(FeedCandidate.score.desc(), FeedCandidate.event_id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1][1], rows[-1][0].id) if has_more else None
+    return [event for event, _score in rows], has_more, next_cursor
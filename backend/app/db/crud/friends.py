@@ -5,12 +5,16 @@ CRUD operations for Friends model in the database.
 
 # --------------------------------------------------------------------------------
 
+import base64
+import json
 import uuid
 from typing import Optional
 
+from sqlalchemy import Row, case, exists, func, literal, select, tuple_, union_all
 from sqlalchemy.orm import Session, joinedload
 
-from app.db.models import Friends, Profile
+from app.db.dialects import upsert_insert
+from app.db.models import File, Friends, Invitations, Profile
 
 # --------------------------------------------------------------------------------
 
@@ -47,6 +51,52 @@ def create_friends(db: Session, user_1_id: str, user_2_id: str) -> Friends:
 # --------------------------------------------------------------------------------
 
 
+def create_friends_from_invitation(
+    db: Session, invitation_id: str, max_id: int
+) -> Optional[tuple[str, str]]:
+    """
+    Make the invitation's owner and the user with the given Max ID friends.
+
+    One `INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING` resolves the
+    invitation and the user's profile, orders the pair as `create_friends` does
+    and inserts it, so concurrent or retried requests cannot fail on the unique
+    constraint.
+
+    Args:
+        db (Session): Database session.
+        invitation_id (str): Invitation ID.
+        max_id (int): Max ID of the user accepting the invitation.
+
+    Returns:
+        Optional[tuple[str, str]]: (user_1, user_2) of the created friendship;
+        None if nothing was inserted (unknown invitation or profile, own
+        invitation, or already friends).
+    """
+    inviter_first = Invitations.user_id < Profile.id
+    source = (
+        select(
+            literal(str(uuid.uuid4())),
+            case((inviter_first, Invitations.user_id), else_=Profile.id),
+            case((inviter_first, Profile.id), else_=Invitations.user_id),
+        )
+        .select_from(Invitations)
+        .join(Profile, Profile.max_id == max_id)
+        .where(Invitations.id == invitation_id, Invitations.user_id != Profile.id)
+    )
+    stmt = (
+        upsert_insert(db, Friends)
+        .from_select(["id", "user_1", "user_2"], source)
+        .on_conflict_do_nothing(index_elements=["user_1", "user_2"])
+        .returning(Friends.user_1, Friends.user_2)
+    )
+    row = db.execute(stmt).first()
+    db.commit()
+    return tuple(row) if row else None
+
+
+# --------------------------------------------------------------------------------
+
+
 def get_friends_by_user(db: Session, user_id: str) -> list[Friends]:
     """
     Get all friends records for a specific user.
@@ -64,79 +114,273 @@ def get_friends_by_user(db: Session, user_id: str) -> list[Friends]:
 # --------------------------------------------------------------------------------
 
 
-def get_friends_with_profiles(db: Session, user_id: str) -> list[tuple[Friends, Profile, Profile]]:
+def get_friends_page(
+    db: Session,
+    user_id: str,
+    *,
+    order: str = "name",
+    limit: Optional[int] = 100,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+) -> tuple[list[Row], Optional[str], Optional[int]]:
     """
-    Get friends with profile information for a specific user.
+    Get one page of a user's friends with their avatar URLs.
+
+    A single query over the friendships selects only the other side's profile
+    columns and the avatar URL. Pages are keyset-paginated: by name (last name,
+    first name) or by friendship creation time, newest first; the cursor holds
+    the last friend's name or the last friendship's ID.
 
     Args:
         db (Session): Database session.
         user_id (str): User ID.
+        order (str): "name" or "created_at".
+        limit (Optional[int]): Page size, None for all friends.
+        cursor (Optional[str]): Cursor returned with the previous page.
+        with_total (bool): Also count all friends (one more query).
 
     Returns:
-        List[Tuple[Friends, Profile, Profile]]: List of friends with profiles.
+        tuple[list[Row], Optional[str], Optional[int]]: Friend rows with the
+        Profile schema attributes, next cursor (None on the last page) and total
+        (None unless requested).
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another order.
     """
-    friends_records = (
-        db.query(Friends)
-        .options(joinedload(Friends.profile_1), joinedload(Friends.profile_2))
-        .filter((Friends.user_1 == user_id) | (Friends.user_2 == user_id))
-        .all()
+    is_member = (Friends.user_1 == user_id) | (Friends.user_2 == user_id)
+    friend_id = case((Friends.user_1 == user_id, Friends.user_2), else_=Friends.user_1)
+    if order == "name":
+        sort_keys = (Profile.last_name, Profile.first_name, Profile.id)
+    else:
+        sort_keys = (Friends.created_at, Friends.id)
+
+    query = (
+        db.query(
+            *Profile.__table__.columns,
+            File.url.label("avatar_url"),
+            Friends.id.label("friendship_id"),
+        )
+        .select_from(Friends)
+        .join(Profile, Profile.id == friend_id)
+        .outerjoin(File, File.id == Profile.avatar)
+        .filter(is_member)
     )
-
-    result = []
-    for friend_record in friends_records:
-        if friend_record.user_1 == user_id:
-            # Current user is user_1, friend is user_2
-            current_user_profile = friend_record.profile_1
-            friend_profile = friend_record.profile_2
+    if cursor:
+        position = _decode_friends_cursor(cursor, order, 3 if order == "name" else 1)
+        if order == "name":
+            query = query.filter(tuple_(*sort_keys) > tuple_(*position))
+        else:
+            # Compare with the stored timestamp, not a round-tripped copy of it
+            (friendship_id,) = position
+            since = select(Friends.created_at).where(Friends.id == friendship_id).scalar_subquery()
+            query = query.filter(
+                (Friends.created_at < since)
+                | ((Friends.created_at == since) & (Friends.id < friendship_id))
+            )
+
+    if order == "name":
+        query = query.order_by(*sort_keys)
+    else:
+        query = query.order_by(*(key.desc() for key in sort_keys))
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = query.all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if order == "name":
+            next_cursor = _encode_friends_cursor(order, last.last_name, last.first_name, last.id)
         else:
-            # Current user is user_2, friend is user_1
-            current_user_profile = friend_record.profile_2
-            friend_profile = friend_record.profile_1
+            next_cursor = _encode_friends_cursor(order, last.friendship_id)
+
+    total = None
+    if with_total:
+        total = db.query(func.count(Friends.id)).filter(is_member).scalar()
+    return rows, next_cursor, total
+
 
-        result.append((friend_record, current_user_profile, friend_profile))
+def _encode_friends_cursor(order: str, *values: str) -> str:
+    """Encode the sort key of the last returned friend as an opaque cursor."""
+    raw = json.dumps([order, *values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
-    return result
+
+def _decode_friends_cursor(cursor: str, order: str, size: int) -> tuple:
+    """Decode a cursor of `_encode_friends_cursor` into its `size` sort key values."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_order, *values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if (
+        cursor_order != order
+        or len(values) != size
+        or not all(isinstance(value, str) for value in values)
+    ):
+        raise ValueError("Invalid cursor")
+    return tuple(values)
 
 
 # --------------------------------------------------------------------------------
 
 
-def get_friends_of_friends_ids(db: Session, user_id: str) -> set[str]:
+def get_friend_ids(db: Session, user_id: str) -> set[str]:
+    """
+    Get IDs of direct friends for a specific user.
+
+    Args:
+        db (Session): Database session.
+        user_id (str): User ID.
+
+    Returns:
+        Set[str]: Set of direct friends IDs.
+    """
+    rows = (
+        db.query(Friends.user_1, Friends.user_2)
+        .filter((Friends.user_1 == user_id) | (Friends.user_2 == user_id))
+        .all()
+    )
+    return {user_2 if user_1 == user_id else user_1 for user_1, user_2 in rows}
+
+
+# --------------------------------------------------------------------------------
+
+
+def get_friends_of_friends_ids(
+    db: Session, user_id: str, direct_friend_ids: Optional[set[str]] = None
+) -> set[str]:
     """
     Get IDs of friends of friends (secondary friends) for a specific user.
 
     Args:
         db (Session): Database session.
         user_id (str): User ID.
+        direct_friend_ids (Optional[Set[str]]): Already loaded direct friends IDs.
 
     Returns:
         Set[str]: Set of secondary friends IDs.
     """
     # Get direct friends
-    direct_friends = get_friends_by_user(db, user_id)
-    direct_friend_ids = set()
+    if direct_friend_ids is None:
+        direct_friend_ids = get_friend_ids(db, user_id)
+    if not direct_friend_ids:
+        return set()
+
+    # Get secondary friends (friends of direct friends) in a single query
+    rows = (
+        db.query(Friends.user_1, Friends.user_2)
+        .filter(Friends.user_1.in_(direct_friend_ids) | Friends.user_2.in_(direct_friend_ids))
+        .all()
+    )
+    secondary_friends = set()
+    for user_1, user_2 in rows:
+        secondary_friends.add(user_1)
+        secondary_friends.add(user_2)
 
-    for friend_record in direct_friends:
-        if friend_record.user_1 == user_id:
-            direct_friend_ids.add(friend_record.user_2)
-        else:
-            direct_friend_ids.add(friend_record.user_1)
+    # Don't include the original user or direct friends
+    secondary_friends.discard(user_id)
+    return secondary_friends - direct_friend_ids
 
-    # Get secondary friends (friends of direct friends)
-    secondary_friends = set()
-    for friend_id in direct_friend_ids:
-        friend_friends = get_friends_by_user(db, friend_id)
-        for friend_friend_record in friend_friends:
-            if friend_friend_record.user_1 == friend_id:
-                secondary_friend_id = friend_friend_record.user_2
-            else:
-                secondary_friend_id = friend_friend_record.user_1
-
-            # Don't include the original user or direct friends
-            if secondary_friend_id != user_id and secondary_friend_id not in direct_friend_ids:
-                secondary_friends.add(secondary_friend_id)
-
-    return secondary_friends
+
+# --------------------------------------------------------------------------------
+
+
+def get_network_signature(db: Session, user_id: str) -> tuple:
+    """
+    Get a change marker of the user's two-hop friendship network.
+
+    Friend and friend-of-friend counters depend on the friendships of the user and
+    of their direct friends; any friendship added or removed there changes the
+    returned aggregate.
+
+    Args:
+        db (Session): Database session.
+        user_id (str): User ID.
+
+    Returns:
+        tuple: (friendships count, latest friendship creation time).
+    """
+    members = get_friend_ids(db, user_id) | {user_id}
+    return tuple(
+        db.query(func.count(Friends.id), func.max(Friends.created_at))
+        .filter(Friends.user_1.in_(members) | Friends.user_2.in_(members))
+        .one()
+    )
+
+
+def get_friend_suggestions(
+    db: Session, user_id: str, *, limit: int = 20, cursor: Optional[str] = None
+) -> tuple[list[Row], Optional[str]]:
+    """
+    Get "people you may know": friends of friends ranked by mutual friend count.
+
+    One aggregate query walks both directions of the friendships two hops out
+    from the user, groups by candidate and joins the profile columns and avatar
+    URL, so only one page of candidates leaves the database. Pages are
+    keyset-paginated by (mutual friends desc, profile ID).
+
+    Args:
+        db (Session): Database session.
+        user_id (str): User ID.
+        limit (int): Page size.
+        cursor (Optional[str]): Cursor returned with the previous page.
+
+    Returns:
+        tuple[list[Row], Optional[str]]: Candidate rows with the Profile schema
+        attributes and `mutual_friends`, next cursor (None on the last page).
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    # Friendships are stored once per pair: expand them into directed edges
+    edges = union_all(
+        select(Friends.user_1.label("source"), Friends.user_2.label("target")),
+        select(Friends.user_2.label("source"), Friends.user_1.label("target")),
+    ).subquery("edges")
+    first_hop = edges.alias("first_hop")
+    second_hop = edges.alias("second_hop")
+    direct = edges.alias("direct")
+
+    mutual_friends = func.count().label("mutual_friends")
+    candidates = (
+        select(second_hop.c.target.label("candidate_id"), mutual_friends)
+        .select_from(first_hop.join(second_hop, second_hop.c.source == first_hop.c.target))
+        .where(
+            first_hop.c.source == user_id,
+            second_hop.c.target != user_id,
+            ~exists().where(direct.c.source == user_id, direct.c.target == second_hop.c.target),
+        )
+        .group_by(second_hop.c.target)
+        .subquery("candidates")
+    )
+
+    query = (
+        db.query(
+            *Profile.__table__.columns,
+            File.url.label("avatar_url"),
+            candidates.c.mutual_friends,
+        )
+        .select_from(candidates)
+        .join(Profile, Profile.id == candidates.c.candidate_id)
+        .outerjoin(File, File.id == Profile.avatar)
+    )
+    if cursor:
+        mutual, profile_id = _decode_friends_cursor(cursor, "mutual", 2)
+        if not mutual.isdigit():
+            raise ValueError("Invalid cursor")
+        query = query.filter(
+            (candidates.c.mutual_friends < int(mutual))
+            | ((candidates.c.mutual_friends == int(mutual)) & (Profile.id > profile_id))
+        )
+    rows = query.order_by(candidates.c.mutual_friends.desc(), Profile.id).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_friends_cursor("mutual", str(rows[-1].mutual_friends), rows[-1].id)
+    return rows, next_cursor
 
 
 def get_secondary_friends(db: Session, user_id: str) -> list[Profile]:
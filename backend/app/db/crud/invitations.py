@@ -10,6 +10,8 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
+from app.core.cache import response_cache
+from app.db.dialects import upsert_insert
 from app.db.models import Invitations
 
 # --------------------------------------------------------------------------------
@@ -56,21 +58,33 @@ def get_invitation_by_user(db: Session, user_id: str) -> Optional[Invitations]:
 # --------------------------------------------------------------------------------
 
 
-def get_or_create_invitation(db: Session, user_id: str) -> Invitations:
+def get_or_create_invitation_id(db: Session, user_id: str) -> str:
     """
-    Get existing invitation for a user or create a new one.
+    Get the ID of a user's invitation, creating the invitation if needed.
+
+    An `INSERT ... ON CONFLICT (user_id) DO NOTHING RETURNING id` against the
+    `uq_invitations_user` unique index creates it atomically, so concurrent
+    calls cannot produce duplicates; only when it already exists is it read by
+    the same index.
 
     Args:
         db (Session): Database session.
         user_id (str): User ID.
 
     Returns:
-        Invitations: Invitation instance.
+        str: Invitation ID.
     """
-    invitation = get_invitation_by_user(db, user_id)
-    if not invitation:
-        invitation = create_invitation(db, user_id)
-    return invitation
+    stmt = (
+        upsert_insert(db, Invitations)
+        .values(id=str(uuid.uuid4()), user_id=user_id)
+        .on_conflict_do_nothing(index_elements=[Invitations.user_id])
+        .returning(Invitations.id)
+    )
+    invitation_id = db.execute(stmt).scalar()
+    db.commit()
+    if invitation_id is None:
+        invitation_id = db.query(Invitations.id).filter(Invitations.user_id == user_id).scalar()
+    return invitation_id
 
 
 # --------------------------------------------------------------------------------
@@ -108,6 +122,7 @@ def delete_invitation(db: Session, invitation_id: str) -> Optional[Invitations]:
     if invitation:
         db.delete(invitation)
         db.commit()
+        response_cache.invalidate(f"invitation:{invitation.id}")
     return invitation
 
 
@@ -129,6 +144,7 @@ def delete_invitation_by_user(db: Session, user_id: str) -> Optional[Invitations
     if invitation:
         db.delete(invitation)
         db.commit()
+        response_cache.invalidate(f"invitation:{invitation.id}")
     return invitation
 
 
@@ -10,6 +10,7 @@ from typing import Optional
 
 from sqlalchemy.orm import Session, joinedload
 
+from app.core.cache import response_cache
 from app.db.models import Profile
 from app.schemas.profiles import ProfileCreate, ProfilePatch
 
@@ -169,6 +170,7 @@ def update_profile(db: Session, profile_id: str, obj_in: ProfilePatch) -> Option
         setattr(db_obj, field, value)
     db.commit()
     db.refresh(db_obj)
+    response_cache.invalidate(f"profile:{profile_id}")
     return db_obj
 
 
@@ -191,6 +193,7 @@ def remove_profile(db: Session, profile_id: str) -> Optional[Profile]:
         # defined in the models (if configured properly)
         db.delete(obj)
         db.commit()
+        response_cache.invalidate(f"profile:{profile_id}")
     return obj
 
 
@@ -6,36 +6,255 @@ CRUD operations for QRScan model in the database.
 # --------------------------------------------------------------------------------
 
 import uuid
+from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import case, distinct, exists, func, select
 from sqlalchemy.orm import Session
 
+from app.core.ranking import GOING_TYPES
+from app.db.dialects import upsert_insert
+from app.db.models.event import EventParticipation
 from app.db.models.qr_scan import QRScan
 
 # --------------------------------------------------------------------------------
 
+# Per-item results of a scan batch
+SCAN_RECORDED = "recorded"
+SCAN_DUPLICATE = "duplicate"  # the same participation is scanned earlier in the batch
+SCAN_ALREADY_SCANNED = "already_scanned"  # the participant checked in before (or meanwhile)
+SCAN_NOT_FOUND = "not_found"
+
+# --------------------------------------------------------------------------------
+
 
 def create_qr_scan(db: Session, participation_id: str, scanned_by_user_id: int) -> QRScan:
     """
     Create a new QR scan record.
 
+    A participant checks in once: scanning the participation again returns the
+    first record.
+
     Args:
         db (Session): Database session.
         participation_id (str): ID of the event participation record.
         scanned_by_user_id (int): Telegram ID of the user who scanned the QR code.
 
     Returns:
-        QRScan: Created QR scan instance.
+        QRScan: Created (or earlier) QR scan instance.
+    """
+    db.execute(
+        upsert_insert(db, QRScan)
+        .values(
+            id=str(uuid.uuid4()),
+            participation_id=participation_id,
+            scanned_by_user_id=scanned_by_user_id,
+        )
+        .on_conflict_do_nothing(index_elements=["participation_id"])
+    )
+    db.commit()
+    return db.query(QRScan).filter(QRScan.participation_id == participation_id).one()
+
+
+def _insert_first_scans(db: Session, rows: list[dict]) -> set[str]:
+    """
+    Insert the scans of participations that have none yet, in one statement.
+
+    The unique index on `participation_id` decides, so concurrent writers (the
+    batch endpoint, the buffered scans of other workers) never check a
+    participant in twice. Does not commit.
+
+    Args:
+        db (Session): Database session.
+        rows (list[dict]): QR scan rows, at most one per participation.
+
+    Returns:
+        set[str]: Participation IDs whose scan was inserted.
     """
-    db_obj = QRScan(
-        id=str(uuid.uuid4()),
-        participation_id=participation_id,
-        scanned_by_user_id=scanned_by_user_id,
+    if not rows:
+        return set()
+    statement = (
+        upsert_insert(db, QRScan)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["participation_id"])
+        .returning(QRScan.participation_id)
     )
-    db.add(db_obj)
+    return set(db.scalars(statement))
+
+
+def create_qr_scans(db: Session, scans: list[dict]) -> list[dict]:
+    """
+    Insert many QR scan records in one multi-row statement.
+
+    Scans of participations that no longer exist (the participant left after
+    the ticket was issued) are skipped, so they cannot fail the whole batch.
+    Only the earliest scan of a participation is kept, and none if it was
+    scanned before.
+
+    Args:
+        db (Session): Database session.
+        scans (list[dict]): Rows with participation_id, scanned_by_user_id and
+            scanned_at.
+
+    Returns:
+        list[dict]: Inserted rows, each with the participation's user_id and
+        event_id added.
+    """
+    participation_ids = {scan["participation_id"] for scan in scans}
+    targets = {
+        row.id: row
+        for row in db.execute(
+            select(
+                EventParticipation.id, EventParticipation.user_id, EventParticipation.event_id
+            ).where(EventParticipation.id.in_(participation_ids))
+        )
+    }
+    first: dict[str, dict] = {}
+    for scan in scans:
+        if scan["participation_id"] not in targets:
+            continue
+        kept = first.get(scan["participation_id"])
+        if kept is None or scan["scanned_at"] < kept["scanned_at"]:
+            first[scan["participation_id"]] = scan
+    rows = [{"id": str(uuid.uuid4()), **scan} for scan in first.values()]
+    inserted = _insert_first_scans(db, rows)
     db.commit()
-    db.refresh(db_obj)
-    return db_obj
+    return [
+        {
+            **row,
+            "user_id": targets[row["participation_id"]].user_id,
+            "event_id": targets[row["participation_id"]].event_id,
+        }
+        for row in rows
+        if row["participation_id"] in inserted
+    ]
+
+
+def create_qr_scan_batch(
+    db: Session, scans: list[tuple[str, datetime]], scanned_by_user_id: int
+) -> list[tuple[str, Optional[tuple[str, str]]]]:
+    """
+    Record a batch of scans made by one scanner, checking each participant in once.
+
+    All participations are validated in one query, which also tells which of
+    them already have a scan; of the repeat scans of a participation in the
+    batch only the earliest is kept. The new scans are written with one
+    multi-row insert that skips participations scanned meanwhile, so neither
+    re-sending a batch after a lost response nor a concurrent scanner checks a
+    participant in twice.
+
+    Args:
+        db (Session): Database session.
+        scans (list[tuple[str, datetime]]): Participation IDs with scan times.
+        scanned_by_user_id (int): Max ID of the scanning user.
+
+    Returns:
+        list[tuple[str, Optional[tuple[str, str]]]]: Per scan, in input order, its
+        status (one of the SCAN_* constants) and the participation's (user_id,
+        event_id), None if it does not exist.
+    """
+    participation_ids = {participation_id for participation_id, _scanned_at in scans}
+    scanned = exists().where(QRScan.participation_id == EventParticipation.id)
+    targets = {
+        row.id: row
+        for row in db.execute(
+            select(
+                EventParticipation.id,
+                EventParticipation.user_id,
+                EventParticipation.event_id,
+                scanned.label("scanned"),
+            ).where(EventParticipation.id.in_(participation_ids))
+        )
+    }
+
+    # The earliest scan of each new participation is the one recorded
+    first: dict[str, int] = {}
+    for index, (participation_id, scanned_at) in enumerate(scans):
+        target = targets.get(participation_id)
+        if target is None or target.scanned:
+            continue
+        kept = first.get(participation_id)
+        if kept is None or scanned_at < scans[kept][1]:
+            first[participation_id] = index
+
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "participation_id": scans[index][0],
+            "scanned_by_user_id": scanned_by_user_id,
+            "scanned_at": scans[index][1],
+        }
+        for index in sorted(first.values())
+    ]
+    inserted = _insert_first_scans(db, rows)
+    db.commit()
+
+    recorded = {index for index in first.values() if scans[index][0] in inserted}
+    results = []
+    for index, (participation_id, _scanned_at) in enumerate(scans):
+        target = targets.get(participation_id)
+        if target is None:
+            results.append((SCAN_NOT_FOUND, None))
+            continue
+        if index in recorded:
+            status = SCAN_RECORDED
+        elif target.scanned or participation_id not in inserted:
+            status = SCAN_ALREADY_SCANNED
+        else:
+            status = SCAN_DUPLICATE
+        results.append((status, (target.user_id, target.event_id)))
+    return results
+
+
+def get_checkin_counters(db: Session, event_ids: list[str]) -> dict[str, dict[str, int]]:
+    """
+    Count registered and checked-in participants of events in one query.
+
+    Args:
+        db (Session): Database session.
+        event_ids (list[str]): Event IDs.
+
+    Returns:
+        dict[str, dict[str, int]]: Per event ID, "registered" (going participants,
+        creator included) and "attended" (participants scanned at least once).
+    """
+    counters = {event_id: {"registered": 0, "attended": 0} for event_id in event_ids}
+    going = case((EventParticipation.participation_type.in_(GOING_TYPES), EventParticipation.id))
+    rows = db.execute(
+        select(
+            EventParticipation.event_id,
+            func.count(distinct(going)),
+            func.count(distinct(QRScan.participation_id)),
+        )
+        .outerjoin(QRScan, QRScan.participation_id == EventParticipation.id)
+        .where(EventParticipation.event_id.in_(event_ids))
+        .group_by(EventParticipation.event_id)
+    )
+    for event_id, registered, attended in rows:
+        counters[event_id] = {"registered": registered, "attended": attended}
+    return counters
+
+
+def get_recent_event_scans(db: Session, event_id: str, limit: int) -> list[dict]:
+    """
+    Get the latest scans of an event.
+
+    Args:
+        db (Session): Database session.
+        event_id (str): Event ID.
+        limit (int): Maximum number of scans.
+
+    Returns:
+        list[dict]: Scans with participation_id, user_id and scanned_at, oldest first.
+    """
+    rows = db.execute(
+        select(QRScan.participation_id, EventParticipation.user_id, QRScan.scanned_at)
+        .join(EventParticipation, EventParticipation.id == QRScan.participation_id)
+        .where(EventParticipation.event_id == event_id)
+        .order_by(QRScan.scanned_at.desc())
+        .limit(limit)
+    ).all()
+    return [dict(row._mapping) for row in reversed(rows)]
 
 
 def get_qr_scan(db: Session, scan_id: str) -> Optional[QRScan]:
@@ -0,0 +1,172 @@
+"""
+Event Reminder CRUD
+Enqueueing, claiming and completing reminders of upcoming events.
+"""
+
+# --------------------------------------------------------------------------------
+
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import literal, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.db.dialects import upsert_insert
+from app.db.models import Event, EventParticipation, EventReminder, Profile
+
+# --------------------------------------------------------------------------------
+
+# Events per INSERT ... SELECT when enqueueing
+CHUNK_SIZE = 500
+
+
+class ReminderJob(NamedTuple):
+    """A claimed reminder with everything needed to send it."""
+
+    participation_id: str
+    attempts: int  # including the current one
+    max_id: int
+    title: str
+    start_date: date
+    place: Optional[str]
+
+
+# --------------------------------------------------------------------------------
+
+
+def enqueue_reminders(db: Session, *, start: date, end: date) -> int:
+    """
+    Create pending reminders for the participants of events starting in a window.
+
+    The events are found through the `start_date` index; their participants
+    are inserted with one INSERT ... SELECT per chunk of events. Participations
+    that already have a reminder are skipped, so repeated runs are no-ops.
+    Creators are not reminded of their own events.
+
+    Args:
+        db (Session): Database session.
+        start (date): First start date of the window.
+        end (date): Last start date of the window.
+
+    Returns:
+        int: Number of reminders created.
+    """
+    event_ids = db.scalars(
+        select(Event.id).where(
+            Event.start_date >= start, Event.start_date <= end, Event.status == "A"
+        )
+    ).all()
+
+    created = 0
+    for offset in range(0, len(event_ids), CHUNK_SIZE):
+        participations = select(EventParticipation.id, literal("P"), literal(0)).where(
+            EventParticipation.event_id.in_(event_ids[offset : offset + CHUNK_SIZE]),
+            EventParticipation.participation_type == "P",
+        )
+        statement = (
+            upsert_insert(db, EventReminder)
+            .from_select(["participation_id", "status", "attempts"], participations)
+            .on_conflict_do_nothing(index_elements=["participation_id"])
+        )
+        created += db.execute(statement).rowcount
+        db.commit()
+    return created
+
+
+def claim_reminders(
+    db: Session, *, now: datetime, today: date, lease_until: datetime, limit: int
+) -> list[ReminderJob]:
+    """
+    Claim due pending reminders of events that have not started yet.
+
+    Claimed reminders are not due again until `lease_until`, so concurrent
+    dispatchers (one per worker) never send the same reminder; if the sender
+    dies the reminder becomes due again after the lease. Each claim counts as
+    an attempt.
+
+    Args:
+        db (Session): Database session.
+        now (datetime): Current time.
+        today (date): Current date; reminders of earlier events are not claimed.
+        lease_until (datetime): Time until which the claim holds.
+        limit (int): Maximum number of reminders.
+
+    Returns:
+        list[ReminderJob]: Claimed reminders.
+    """
+    due = (
+        select(EventReminder.participation_id)
+        .join(EventParticipation, EventParticipation.id == EventReminder.participation_id)
+        .join(Event, Event.id == EventParticipation.event_id)
+        .where(
+            EventReminder.status == "P",
+            or_(EventReminder.next_attempt_at.is_(None), EventReminder.next_attempt_at <= now),
+            Event.start_date >= today,
+        )
+        .limit(limit)
+        .with_for_update(skip_locked=True, of=EventReminder)
+    )
+    participation_ids = db.scalars(due).all()
+    if not participation_ids:
+        db.commit()
+        return []
+
+    db.execute(
+        update(EventReminder)
+        .where(EventReminder.participation_id.in_(participation_ids))
+        .values(next_attempt_at=lease_until, attempts=EventReminder.attempts + 1)
+    )
+    rows = db.execute(
+        select(
+            EventReminder.participation_id,
+            EventReminder.attempts,
+            Profile.max_id,
+            Event.title,
+            Event.start_date,
+            Event.place,
+        )
+        .join(EventParticipation, EventParticipation.id == EventReminder.participation_id)
+        .join(Event, Event.id == EventParticipation.event_id)
+        .join(Profile, Profile.id == EventParticipation.user_id)
+        .where(EventReminder.participation_id.in_(participation_ids))
+    ).all()
+    db.commit()
+    return [ReminderJob(*row) for row in rows]
+
+
+def finish_reminders(
+    db: Session,
+    *,
+    sent: list[str],
+    retry: dict[str, str],
+    failed: dict[str, str],
+    now: datetime,
+    retry_at: datetime,
+) -> None:
+    """
+    Record the outcome of claimed reminders with bulk updates.
+
+    Args:
+        db (Session): Database session.
+        sent (list[str]): Participation IDs of delivered reminders.
+        retry (dict[str, str]): Errors per participation ID of reminders to try again.
+        failed (dict[str, str]): Errors per participation ID of reminders given up.
+        now (datetime): Current time.
+        retry_at (datetime): Time of the next attempt of retried reminders.
+    """
+    rows = [
+        {"participation_id": participation_id, "status": "S", "sent_at": now, "last_error": None}
+        for participation_id in sent
+    ]
+    rows.extend(
+        {"participation_id": participation_id, "next_attempt_at": retry_at, "last_error": error}
+        for participation_id, error in retry.items()
+    )
+    rows.extend(
+        {"participation_id": participation_id, "status": "F", "last_error": error}
+        for participation_id, error in failed.items()
+    )
+    # Bulk UPDATE by primary key groups rows by the set of columns they change
+    if rows:
+        db.execute(update(EventReminder), rows)
+    db.commit()
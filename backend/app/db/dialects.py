@@ -0,0 +1,86 @@
+"""
+Dialect Helpers
+Dialect-specific SQL constructs shared by CRUD modules (PostgreSQL and SQLite).
+"""
+
+# --------------------------------------------------------------------------------
+
+from sqlalchemy import Connection, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# --------------------------------------------------------------------------------
+
+
+def is_postgresql(db: Session) -> bool:
+    """
+    Check whether the session is bound to PostgreSQL.
+
+    Args:
+        db (Session): Database session.
+
+    Returns:
+        bool: True for PostgreSQL, False otherwise (SQLite in tests).
+    """
+    return db.bind.dialect.name == "postgresql"
+
+
+# --------------------------------------------------------------------------------
+
+
+def upsert_insert(db: Session, model):
+    """
+    Build an INSERT construct supporting ON CONFLICT for the session dialect.
+
+    Both PostgreSQL and SQLite insert constructs expose `on_conflict_do_nothing`
+    and `on_conflict_do_update` with the same signature.
+
+    Args:
+        db (Session): Database session.
+        model: SQLAlchemy model or table to insert into.
+
+    Returns:
+        Insert: Dialect-specific insert statement.
+    """
+    if is_postgresql(db):
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+# --------------------------------------------------------------------------------
+
+
+def try_advisory_lock(connection: Connection, key: int) -> bool:
+    """
+    Try to take a session-level advisory lock without waiting.
+
+    The lock is held by the connection until `advisory_unlock` or until the
+    connection closes, so keep the same connection for the whole critical
+    section. SQLite (tests) runs in one process and always gets the lock.
+
+    Args:
+        connection (Connection): Dedicated database connection.
+        key (int): Lock ID, shared by all processes competing for it.
+
+    Returns:
+        bool: True if the lock was taken.
+    """
+    if connection.dialect.name != "postgresql":
+        return True
+    locked = connection.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})
+    connection.commit()
+    return bool(locked)
+
+
+def advisory_unlock(connection: Connection, key: int) -> None:
+    """
+    Release a lock taken with `try_advisory_lock`.
+
+    Args:
+        connection (Connection): Connection holding the lock.
+        key (int): Lock ID.
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+    connection.commit()
@@ -4,11 +4,14 @@ SQLAlchemy ORM models and database table definitions
 """
 
 from .event import Event, EventParticipation
+from .feed_candidate import FeedCandidate
 from .file import File, FileType
 from .friends import Friends
 from .invitations import Invitations
 from .profile import Profile
 from .qr_scan import QRScan
+from .reminder import EventReminder
+from .tag_count import EventTagCount
 
 __all__ = [
     "Profile",
@@ -19,4 +22,7 @@ __all__ = [
     "Event",
     "EventParticipation",
     "QRScan",
+    "EventTagCount",
+    "FeedCandidate",
+    "EventReminder",
 ]
@@ -1,10 +1,20 @@
 import json
 from uuid import uuid4
 
-from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, String, Text, TypeDecorator
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    TypeDecorator,
+)
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.db.base_class import Base
 
@@ -14,6 +24,8 @@ class TagsType(TypeDecorator):
 
     impl = String
     cache_ok = True
+    # Values are lists; lets ORM queries returning tags next to entities unique rows
+    hashable = False
 
     def load_dialect_impl(self, dialect):
         if dialect.name == "postgresql":
@@ -61,9 +73,23 @@ class Event(Base):
     registration_end_date = Column(DateTime, nullable=True)
     creator = Column(String, ForeignKey("profiles.id"), nullable=False)
     status = Column(String(1), nullable=False, default="A")  # A: ACTIVE, E: ENDED
+    # Bumped on every change visible in responses (update, participation, status sweep)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
 
+    __table_args__ = (
+        # GIN index backs the `tags && ARRAY[...]` overlap filter on PostgreSQL
+        Index("ix_events_tags_gin", "tags", postgresql_using="gin"),
+        # Partial index holding only the hot working set of the default feed
+        Index(
+            "ix_events_active_created_at",
+            "created_at",
+            "end_date",
+            postgresql_where=text("status = 'A'"),
+        ),
+    )
+
     # Relationships
     creator_profile = relationship("Profile", viewonly=True)
     photo_file = relationship("File", foreign_keys=[photo], post_update=True, viewonly=True)
@@ -87,17 +113,23 @@ class Event(Base):
         return self.participants_count
 
     @property
-    def is_registration_available(self) -> bool:
-        """Check if registration is currently available."""
+    def is_registration_window_open(self) -> bool:
+        """Check registration dates only (without the participants limit)."""
         from datetime import datetime
 
         now = datetime.now()
-
-        # Check registration dates
         if self.registration_start_date and now < self.registration_start_date:
             return False
         if self.registration_end_date and now > self.registration_end_date:
             return False
+        return True
+
+    @property
+    def is_registration_available(self) -> bool:
+        """Check if registration is currently available."""
+        # Check registration dates
+        if not self.is_registration_window_open:
+            return False
 
         # Check max participants
         if self.max_participants and self.participants_count >= self.max_participants:
@@ -0,0 +1,52 @@
+"""
+Feed Candidate Model
+SQLAlchemy model for precomputed per-user event feed scores.
+"""
+
+# --------------------------------------------------------------------------------
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+# --------------------------------------------------------------------------------
+
+
+class FeedCandidate(Base):
+    """
+    SQLAlchemy model for ranked feed candidates.
+
+    A row exists for every (user, event) pair where at least one friend or friend
+    of a friend of the user is going to the event. Counters are updated
+    incrementally when participations change.
+
+    Attributes:
+        user_id (str): ID of the feed owner.
+        event_id (str): ID of the candidate event.
+        friends_going (int): Friends of the user going to the event.
+        friends_of_friends_going (int): Friends of friends going to the event.
+        score (float): Ranking score derived from counters and tag affinity.
+        updated_at (datetime): Last refresh timestamp.
+    """
+
+    __tablename__ = "feed_candidates"
+
+    user_id = Column(String, ForeignKey("profiles.id"), primary_key=True)
+    event_id = Column(String, ForeignKey("events.id"), primary_key=True, index=True)
+    friends_going = Column(Integer, nullable=False, default=0)
+    friends_of_friends_going = Column(Integer, nullable=False, default=0)
+    score = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    # Serves the keyset-paginated "ORDER BY score DESC, event_id DESC" read
+    __table_args__ = (Index("ix_feed_candidates_user_score", "user_id", "score", "event_id"),)
+
+    def __repr__(self):
+        """
+        Return a string representation of the feed candidate.
+
+        Returns:
+            str: Human-readable representation of the feed candidate.
+        """
+        return f"<FeedCandidate {self.user_id} -> {self.event_id} ({self.score})>"
@@ -58,6 +58,11 @@ class Profile(Base):
     created_events = relationship("Event", foreign_keys="Event.creator", viewonly=True)
     event_participations = relationship("EventParticipation", viewonly=True)
 
+    @property
+    def avatar_url(self) -> str | None:
+        """Get the avatar URL from the related file."""
+        return self.avatar_file.url if self.avatar_file else None
+
     def __repr__(self):
         """
         Return a string representation of the profile.
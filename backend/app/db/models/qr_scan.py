@@ -28,8 +28,9 @@ class QRScan(Base):
     __tablename__ = "qr_scans"
 
     id = Column(String, primary_key=True, index=True)
+    # A participant checks in once: the first scan is the only record
     participation_id = Column(
-        String, ForeignKey("event_participations.id"), nullable=False, index=True
+        String, ForeignKey("event_participations.id"), nullable=False, index=True, unique=True
     )
     scanned_by_user_id = Column(BigInteger, nullable=False, index=True)  # Max user ID
     scanned_at = Column(DateTime, server_default=func.now(), nullable=False)
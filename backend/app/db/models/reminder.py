@@ -0,0 +1,56 @@
+"""
+Event Reminder Model
+SQLAlchemy model for reminders sent to participants before their events.
+"""
+
+# --------------------------------------------------------------------------------
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+# --------------------------------------------------------------------------------
+
+
+class EventReminder(Base):
+    """
+    SQLAlchemy model for event reminders.
+
+    One row per participation, so a participant is reminded of an event at most
+    once however many times the scheduler runs; the row is removed with the
+    participation.
+
+    Attributes:
+        participation_id (str): Reminded participation (primary key).
+        status (str): "P" pending, "S" sent, "F" failed.
+        attempts (int): Delivery attempts made.
+        next_attempt_at (datetime): Earliest time of the next attempt; None if due.
+        last_error (str): Error of the last failed attempt.
+        sent_at (datetime): Delivery time.
+        created_at (datetime): Enqueue time.
+    """
+
+    __tablename__ = "event_reminders"
+
+    participation_id = Column(
+        String, ForeignKey("event_participations.id", ondelete="CASCADE"), primary_key=True
+    )
+    status = Column(String(1), nullable=False, default="P")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    # Serves the "due pending reminders" read of the dispatcher
+    __table_args__ = (Index("ix_event_reminders_status_next", "status", "next_attempt_at"),)
+
+    def __repr__(self):
+        """
+        Return a string representation of the reminder.
+
+        Returns:
+            str: Human-readable representation of the reminder.
+        """
+        return f"<EventReminder {self.participation_id} ({self.status}, {self.attempts} attempts)>"
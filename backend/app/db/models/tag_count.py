@@ -0,0 +1,42 @@
+"""
+Event Tag Count Model
+SQLAlchemy model for the maintained events-per-tag aggregate.
+"""
+
+# --------------------------------------------------------------------------------
+
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+# --------------------------------------------------------------------------------
+
+
+class EventTagCount(Base):
+    """
+    SQLAlchemy model for events-per-tag counters.
+
+    Rows are adjusted by the events CRUD on every create, tag update and delete,
+    so `/events/tags/` never has to aggregate the events table.
+
+    Attributes:
+        tag (str): Tag name (primary key).
+        events_count (int): Number of events carrying the tag.
+        updated_at (datetime): Last counter change timestamp.
+    """
+
+    __tablename__ = "event_tag_counts"
+
+    tag = Column(String, primary_key=True)
+    events_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        """
+        Return a string representation of the tag counter.
+
+        Returns:
+            str: Human-readable representation of the tag counter.
+        """
+        return f"<EventTagCount {self.tag} - {self.events_count}>"
@@ -12,6 +12,8 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from ..core.config import settings
+from ..core.metrics import register_pool_collector
+from ..core.query_stats import instrument_engine
 
 if os.getenv("TESTING", "false").lower() == "true":
     SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -28,6 +30,8 @@ engine = create_engine(
     poolclass=poolclass,
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+register_pool_collector(engine)
+instrument_engine(engine)
 
 # --------------------------------------------------------------------------------
 
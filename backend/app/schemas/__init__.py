@@ -3,10 +3,14 @@ Schemas Package
 Pydantic schemas for data validation and serialization.
 """
 
+from .bootstrap import BootstrapResponse, EventTags
 from .events import (
+    CapacitySubscription,
     Event,
     EventBase,
+    EventCapacity,
     EventCreate,
+    EventFeedResponse,
     EventListResponse,
     EventParticipation,
     EventParticipationBase,
@@ -21,6 +25,7 @@ from .friends import (
     FriendsCreate,
     FriendsInDB,
     FriendsInDBBase,
+    FriendSuggestion,
     FriendsWithProfiles,
 )
 from .invitations import (
@@ -62,6 +67,7 @@ __all__ = [
     "Friends",
     "FriendsInDB",
     "FriendsWithProfiles",
+    "FriendSuggestion",
     "InvitationsBase",
     "InvitationsCreate",
     "InvitationsInDBBase",
@@ -75,7 +81,12 @@ __all__ = [
     "EventUpdate",
     "EventWithParticipation",
     "EventListResponse",
+    "EventFeedResponse",
+    "EventCapacity",
+    "CapacitySubscription",
     "EventParticipation",
     "EventParticipationCreate",
     "EventParticipationBase",
+    "EventTags",
+    "BootstrapResponse",
 ]
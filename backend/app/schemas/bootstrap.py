@@ -0,0 +1,53 @@
+"""
+Bootstrap Schemas
+Pydantic schemas for the mini-app's initial state returned in one request.
+"""
+
+# --------------------------------------------------------------------------------
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .events import EventListResponse
+from .profiles import Profile
+
+# --------------------------------------------------------------------------------
+
+
+class EventTags(BaseModel):
+    """
+    Schema for available event tags.
+
+    Attributes:
+        tags (list[str]): All tags that events may carry.
+        counts (dict[str, int]): Number of events per tag.
+    """
+
+    tags: list[str]
+    counts: dict[str, int]
+
+
+# --------------------------------------------------------------------------------
+
+
+class BootstrapResponse(BaseModel):
+    """
+    Schema for the mini-app's initial state.
+
+    Only the requested sections are present. Without a profile (the user has
+    not registered yet) `profile` is null and only `tags` may accompany it.
+
+    Attributes:
+        profile (Optional[Profile]): Current user's profile, as `/profiles/my`.
+        friends (Optional[list[Profile]]): Current user's friends, as `/friends/my`.
+        tags (Optional[EventTags]): Event tags with counts, as `/events/tags/`.
+        events (Optional[EventListResponse]): First page of `/events/global_events/`.
+        user_events (Optional[EventListResponse]): First page of `/events/user_events/`.
+    """
+
+    profile: Optional[Profile] = None
+    friends: Optional[list[Profile]] = None
+    tags: Optional[EventTags] = None
+    events: Optional[EventListResponse] = None
+    user_events: Optional[EventListResponse] = None
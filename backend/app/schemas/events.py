@@ -117,3 +117,21 @@ class EventListResponse(BaseModel):
     events: list[EventWithParticipation]
     total: int
     has_more: bool
+
+
+class EventFeedResponse(BaseModel):
+    events: list[EventWithParticipation]
+    has_more: bool
+    next_cursor: Optional[str] = None  # Opaque keyset cursor for the next page
+
+
+class EventCapacity(BaseModel):
+    participants: int
+    max_participants: Optional[int] = None
+    is_registration_available: bool
+
+
+class CapacitySubscription(BaseModel):
+    # Client message of the capacity WebSocket
+    subscribe: list[str] = Field(default_factory=list)
+    unsubscribe: list[str] = Field(default_factory=list)
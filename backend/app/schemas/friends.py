@@ -9,6 +9,8 @@ from datetime import datetime
 
 from pydantic import BaseModel
 
+from .profiles import Profile
+
 # --------------------------------------------------------------------------------
 
 
@@ -101,3 +103,17 @@ class FriendsWithProfiles(BaseModel):
     user_1_profile: dict
     user_2_profile: dict
     created_at: datetime
+
+
+# --------------------------------------------------------------------------------
+
+
+class FriendSuggestion(Profile):
+    """
+    Schema for a suggested friend ("people you may know").
+
+    Attributes:
+        mutual_friends (int): Number of friends the user and the candidate share.
+    """
+
+    mutual_friends: int
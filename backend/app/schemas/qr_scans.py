@@ -6,8 +6,13 @@ Pydantic schemas for QR scan data validation and serialization.
 # --------------------------------------------------------------------------------
 
 from datetime import datetime
+from typing import Literal, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+
+# --------------------------------------------------------------------------------
+
+MAX_SCAN_BATCH = 1000  # scans per batch request
 
 # --------------------------------------------------------------------------------
 
@@ -38,6 +43,113 @@ class QRScanResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class QRScanBatchItem(BaseModel):
+    """
+    Schema for one scan of a batch.
+
+    Attributes:
+        participation_id (str): ID of the event participation record.
+        scanned_at (Optional[datetime]): Time of the scan on the scanner; the
+            time the batch is received if omitted.
+    """
+
+    participation_id: str
+    scanned_at: Optional[datetime] = None
+
+
+class QRScanBatch(BaseModel):
+    """
+    Schema for a batch of scans collected by a scanner.
+
+    Attributes:
+        scans (list[QRScanBatchItem]): Scans in the order they were made.
+    """
+
+    scans: list[QRScanBatchItem] = Field(..., min_length=1, max_length=MAX_SCAN_BATCH)
+
+
+class QRScanBatchResult(BaseModel):
+    """
+    Schema for the result of one scan of a batch.
+
+    Attributes:
+        participation_id (str): ID of the event participation record.
+        status (str): "recorded", "duplicate" (repeated in the batch),
+            "already_scanned" (checked in before) or "not_found".
+        user_id (Optional[str]): ID of the registered user, None if not found.
+        event_id (Optional[str]): ID of the event, None if not found.
+    """
+
+    participation_id: str
+    status: Literal["recorded", "duplicate", "already_scanned", "not_found"]
+    user_id: Optional[str] = None
+    event_id: Optional[str] = None
+
+
+class QRScanBatchResponse(BaseModel):
+    """
+    Schema for the results of a scan batch.
+
+    Attributes:
+        recorded (int): Number of scans written.
+        results (list[QRScanBatchResult]): Per-scan results in request order.
+    """
+
+    recorded: int
+    results: list[QRScanBatchResult]
+
+
+class QRTicket(BaseModel):
+    """
+    Schema for a participant's signed check-in ticket.
+
+    Attributes:
+        ticket (str): Signed ticket to encode in the QR code.
+        expires_at (datetime): Time (UTC) after which the ticket is rejected.
+    """
+
+    ticket: str
+    expires_at: datetime
+
+
+class QRTicketKey(BaseModel):
+    """
+    Schema for an event's ticket key, for scanners that verify tickets offline.
+
+    Attributes:
+        event_id (str): ID of the event.
+        key (str): Base64url HMAC-SHA256 key signing the event's tickets.
+    """
+
+    event_id: str
+    key: str
+
+
+class QRTicketScan(BaseModel):
+    """
+    Schema for scanning a signed ticket.
+
+    Attributes:
+        ticket (str): Ticket read from the QR code.
+    """
+
+    ticket: str
+
+
+class QRTicketScanResponse(QRScanResponse):
+    """
+    Schema for a verified ticket scan.
+
+    The ticket's signature is verified; the scan is written later, and dropped
+    if the participation was removed after the ticket was issued.
+
+    Attributes:
+        participation_id (str): ID of the event participation record.
+    """
+
+    participation_id: str
+
+
 class QRScan(BaseModel):
     """
     Schema for QR scan entity.
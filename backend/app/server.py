@@ -0,0 +1,187 @@
+"""
+Production Server
+Gunicorn runner that preloads the app in the master and makes workers fork-safe.
+
+Usage:
+    python -m app.server
+
+The master imports the app, generates the OpenAPI asset and freezes the GC
+heap before forking, so workers boot in milliseconds and share that memory
+copy-on-write. Every worker then drops what must not be shared across
+processes: pooled database connections, the S3 client and the logging thread.
+"""
+
+# --------------------------------------------------------------------------------
+
+import gc
+import math
+import os
+from importlib.util import find_spec
+from pathlib import Path
+
+from gunicorn.app.base import BaseApplication
+
+try:
+    from uvicorn_worker import UvicornWorker
+except ImportError:  # pragma: no cover - uvicorn < 0.30 ships the worker itself
+    from uvicorn.workers import UvicornWorker
+
+from .core.config import settings
+
+# --------------------------------------------------------------------------------
+
+CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+CGROUP_V1_CPU_QUOTA = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+CGROUP_V1_CPU_PERIOD = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+
+
+def cpu_limit() -> float:
+    """
+    Get the number of CPUs the process may use.
+
+    The container's CFS quota (cgroup v2 or v1) is honored, since `os.cpu_count()`
+    reports the host's CPUs even when the container is limited to a fraction.
+
+    Returns:
+        float: CPUs available, possibly fractional.
+    """
+    cpus = float(len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else 1)
+    try:
+        quota, period = CGROUP_V2_CPU_MAX.read_text().split()
+        if quota != "max":
+            return min(cpus, int(quota) / int(period))
+        return cpus
+    except (OSError, ValueError):
+        pass
+    try:
+        quota_us = int(CGROUP_V1_CPU_QUOTA.read_text())
+        period_us = int(CGROUP_V1_CPU_PERIOD.read_text())
+        if quota_us > 0 and period_us > 0:
+            return min(cpus, quota_us / period_us)
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def worker_count() -> int:
+    """
+    Get the number of workers: GUNICORN_WORKERS, or one async worker per CPU.
+
+    Returns:
+        int: Number of workers, at least 1.
+    """
+    if settings.GUNICORN_WORKERS > 0:
+        return settings.GUNICORN_WORKERS
+    return max(1, math.ceil(cpu_limit()))
+
+
+# --------------------------------------------------------------------------------
+
+
+class Worker(UvicornWorker):
+    """Uvicorn worker preferring uvloop and httptools when they are installed."""
+
+    CONFIG_KWARGS = {
+        **UvicornWorker.CONFIG_KWARGS,
+        "loop": "uvloop" if find_spec("uvloop") else "asyncio",
+        "http": "httptools" if find_spec("httptools") else "h11",
+    }
+
+
+def post_fork(server, worker) -> None:
+    """
+    Drop resources inherited from the master in a new worker.
+
+    Args:
+        server: Gunicorn arbiter.
+        worker: New worker.
+    """
+    from .api.v1.endpoints.files import reset_s3_client
+    from .core.log_config import restart_logging_after_fork
+    from .db.session import engine
+
+    restart_logging_after_fork()
+    # close=False: the master's connections belong to the master; the worker
+    # only forgets them and opens its own
+    engine.dispose(close=False)
+    reset_s3_client()
+
+
+def child_exit(server, worker) -> None:
+    """
+    Fold the metrics snapshot of an exited worker into the totals (in the master).
+
+    Args:
+        server: Gunicorn arbiter.
+        worker: Exited worker.
+    """
+    from .core.metrics import registry
+
+    registry.mark_process_dead(worker.pid)
+
+
+class Server(BaseApplication):
+    """Gunicorn application configured from settings."""
+
+    def __init__(self, options: dict):
+        """
+        Initialize the application.
+
+        Args:
+            options (dict): Gunicorn settings.
+        """
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        """Apply the options to gunicorn's config."""
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        """
+        Import the app in the master (preload).
+
+        Returns:
+            FastAPI: ASGI application.
+        """
+        from .core.openapi import prepare_openapi
+        from .main import app
+
+        prepare_openapi(app)
+        # Move everything allocated so far out of the GC's reach, so collections
+        # in workers do not touch (and un-share) the preloaded pages
+        gc.collect()
+        gc.freeze()
+        return app
+
+
+def server_options() -> dict:
+    """
+    Build the gunicorn settings.
+
+    Returns:
+        dict: Gunicorn settings.
+    """
+    options = {
+        "bind": settings.GUNICORN_BIND,
+        "workers": worker_count(),
+        "worker_class": "app.server.Worker",
+        "preload_app": True,
+        "post_fork": post_fork,
+        "child_exit": child_exit,
+        "max_requests": settings.GUNICORN_MAX_REQUESTS,
+        "max_requests_jitter": settings.GUNICORN_MAX_REQUESTS_JITTER,
+        "timeout": settings.GUNICORN_TIMEOUT,
+        "graceful_timeout": settings.GUNICORN_GRACEFUL_TIMEOUT,
+    }
+    if os.path.isdir("/dev/shm"):
+        # Heartbeat files in RAM: a slow disk must not get workers killed
+        options["worker_tmp_dir"] = "/dev/shm"
+    return options
+
+
+# --------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    Server(server_options()).run()
@@ -0,0 +1,4 @@
+"""
+Background Tasks Package
+Periodic maintenance jobs started from the application lifespan.
+"""
@@ -0,0 +1,280 @@
+"""
+Capacity Updates
+Pushes coalesced participant counts and registration availability of events to
+WebSocket subscribers.
+"""
+
+# --------------------------------------------------------------------------------
+
+import asyncio
+from collections import deque
+from collections.abc import Iterable
+from typing import Optional
+
+from fastapi import WebSocket
+
+from ..core.config import settings
+from ..core.log_config import logger
+from ..core.pubsub import Publisher
+from ..db.crud import events as crud_events
+from ..db.session import SessionLocal, engine
+
+# --------------------------------------------------------------------------------
+
+# Changed event IDs, published by every worker to every worker
+capacity_publisher = Publisher("event_capacity", engine, queue_size=10000)
+CHANGES_KEY = "changes"
+
+SEND_TIMEOUT = 10.0  # seconds a client may take to accept one message
+MAX_NOTICES = 10  # queued error messages per connection
+
+
+def get_capacities(event_ids: Iterable[str]) -> dict[str, Optional[dict]]:
+    """
+    Read the capacity fields of events in a fresh session.
+
+    Args:
+        event_ids (Iterable[str]): Event IDs.
+
+    Returns:
+        dict[str, Optional[dict]]: Fields per event ID, None for missing events.
+    """
+    db = SessionLocal()
+    try:
+        return crud_events.event.get_capacities(db, list(event_ids))
+    finally:
+        db.close()
+
+
+def notify_capacity(event_ids: Iterable[str]) -> None:
+    """
+    Announce that the capacity of events changed, e.g. as a response background task.
+
+    Only the IDs are published; each worker reads the new values once per push
+    interval for all of its subscribers.
+
+    Args:
+        event_ids (Iterable[str]): Changed event IDs.
+    """
+    if not capacity_publisher.uses_notify:
+        if capacity_publisher.subscriber_count(CHANGES_KEY):
+            capacity_publisher.deliver(CHANGES_KEY, {"event_ids": list(event_ids)})
+        return
+    db = SessionLocal()
+    try:
+        capacity_publisher.publish(db, CHANGES_KEY, {"event_ids": list(event_ids)})
+        db.commit()
+    except Exception:
+        logger.error("Publishing capacity changes failed", exc_info=True)
+    finally:
+        db.close()
+
+
+# --------------------------------------------------------------------------------
+
+
+class CapacityConnection:
+    """
+    One WebSocket's subscriptions and outgoing updates.
+
+    Pending updates are kept per event, latest value wins, so the backlog of a
+    slow client is bounded by its subscriptions rather than by the update rate;
+    a client that does not accept a message within SEND_TIMEOUT is disconnected.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        """
+        Initialize the connection.
+
+        Args:
+            websocket (WebSocket): Accepted WebSocket.
+        """
+        self.websocket = websocket
+        self.event_ids: set[str] = set()
+        self._pending: dict[str, Optional[dict]] = {}
+        self._notices: deque[dict] = deque(maxlen=MAX_NOTICES)
+        self._ready = asyncio.Event()
+
+    def push(self, capacities: dict[str, Optional[dict]]) -> None:
+        """
+        Queue capacity values of subscribed events, replacing unsent ones.
+
+        Args:
+            capacities (dict[str, Optional[dict]]): Fields per event ID.
+        """
+        for event_id, capacity in capacities.items():
+            if event_id in self.event_ids:
+                self._pending[event_id] = capacity
+        if self._pending:
+            self._ready.set()
+
+    def notice(self, message: dict) -> None:
+        """
+        Queue a control message, e.g. an error; the oldest is dropped above the limit.
+
+        Args:
+            message (dict): Message.
+        """
+        self._notices.append(message)
+        self._ready.set()
+
+    async def send_forever(self) -> None:
+        """
+        Send queued messages until cancelled.
+
+        Raises:
+            TimeoutError: If the client stops reading.
+        """
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self._notices:
+                await asyncio.wait_for(
+                    self.websocket.send_json(self._notices.popleft()), SEND_TIMEOUT
+                )
+            if self._pending:
+                events, self._pending = self._pending, {}
+                await asyncio.wait_for(
+                    self.websocket.send_json({"type": "capacity", "events": events}), SEND_TIMEOUT
+                )
+
+
+# --------------------------------------------------------------------------------
+
+
+class CapacityHub:
+    """
+    Registry of WebSocket subscriptions per event, with a periodic push.
+
+    Change notifications mark events dirty; once per interval the dirty events
+    that have subscribers are read in one query and pushed to their connections.
+    Runs on the event loop of the connections.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._connections: dict[str, set[CapacityConnection]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._subscription = None
+
+    def connect(self, websocket: WebSocket) -> CapacityConnection:
+        """
+        Register a WebSocket, starting the push loop if needed.
+
+        Args:
+            websocket (WebSocket): Accepted WebSocket.
+
+        Returns:
+            CapacityConnection: Connection to subscribe with.
+        """
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            if self._subscription is not None:
+                # Left over from a stopped event loop
+                self._subscription.close()
+            self._subscription = capacity_publisher.subscribe(CHANGES_KEY)
+            self._task = loop.create_task(self._run(self._subscription))
+        return CapacityConnection(websocket)
+
+    def disconnect(self, connection: CapacityConnection) -> None:
+        """
+        Remove all subscriptions of a connection.
+
+        Args:
+            connection (CapacityConnection): Closed connection.
+        """
+        self.unsubscribe(connection, list(connection.event_ids))
+
+    def subscribe(self, connection: CapacityConnection, event_ids: Iterable[str]) -> list[str]:
+        """
+        Subscribe a connection to events.
+
+        Args:
+            connection (CapacityConnection): Connection.
+            event_ids (Iterable[str]): Event IDs.
+
+        Returns:
+            list[str]: Newly subscribed event IDs.
+
+        Raises:
+            ValueError: If the connection would exceed CAPACITY_MAX_SUBSCRIPTIONS.
+        """
+        added = [
+            event_id
+            for event_id in dict.fromkeys(event_ids)
+            if event_id not in connection.event_ids
+        ]
+        if len(connection.event_ids) + len(added) > settings.CAPACITY_MAX_SUBSCRIPTIONS:
+            raise ValueError(f"At most {settings.CAPACITY_MAX_SUBSCRIPTIONS} events per connection")
+        for event_id in added:
+            connection.event_ids.add(event_id)
+            self._connections.setdefault(event_id, set()).add(connection)
+        return added
+
+    def unsubscribe(self, connection: CapacityConnection, event_ids: Iterable[str]) -> None:
+        """
+        Unsubscribe a connection from events.
+
+        Args:
+            connection (CapacityConnection): Connection.
+            event_ids (Iterable[str]): Event IDs.
+        """
+        for event_id in event_ids:
+            connection.event_ids.discard(event_id)
+            connections = self._connections.get(event_id, set())
+            connections.discard(connection)
+            if not connections:
+                self._connections.pop(event_id, None)
+
+    async def flush(self) -> int:
+        """
+        Push the current values of changed events to their subscribers.
+
+        Returns:
+            int: Number of events pushed.
+        """
+        subscription = self._subscription
+        if subscription is None:
+            return 0
+        dirty: set[str] = set()
+        while not subscription.queue.empty():
+            dirty.update(subscription.queue.get_nowait()["event_ids"])
+        if subscription.dropped:
+            # Some changes were lost: refresh everything watched
+            subscription.dropped = 0
+            dirty.update(self._connections)
+        event_ids = dirty.intersection(self._connections)
+        if not event_ids:
+            return 0
+
+        capacities = await asyncio.to_thread(get_capacities, event_ids)
+        for event_id, capacity in capacities.items():
+            for connection in self._connections.get(event_id, ()):
+                connection.push({event_id: capacity})
+        return len(capacities)
+
+    async def _run(self, subscription) -> None:
+        """Flush once per push interval until cancelled."""
+        try:
+            while True:
+                await asyncio.sleep(settings.CAPACITY_PUSH_INTERVAL)
+                try:
+                    await self.flush()
+                except Exception:
+                    logger.error("Capacity push failed", exc_info=True)
+        finally:
+            subscription.close()
+
+    async def close(self) -> None:
+        """Stop the push loop."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            self._subscription = None
+
+
+# --------------------------------------------------------------------------------
+
+# Process-wide registry of the capacity WebSocket
+capacity_hub = CapacityHub()
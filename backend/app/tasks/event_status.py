@@ -0,0 +1,51 @@
+"""
+Event Status Task
+Periodically flips active events whose end date has passed to ended ("E").
+"""
+
+# --------------------------------------------------------------------------------
+
+import asyncio
+
+from ..core.log_config import logger
+from ..db.crud import events as crud_events
+from ..db.session import SessionLocal
+
+# --------------------------------------------------------------------------------
+
+
+def sweep_ended_events() -> int:
+    """
+    Run one sweep in a fresh session.
+
+    Returns:
+        int: Number of events marked as ended.
+    """
+    db = SessionLocal()
+    try:
+        return crud_events.event.end_past_events(db)
+    finally:
+        db.close()
+
+
+# --------------------------------------------------------------------------------
+
+
+async def run_event_status_sweeper(interval: float) -> None:
+    """
+    Sweep ended events forever, once per `interval` seconds.
+
+    The update is idempotent, so running it in every worker is safe; the blocking
+    database call is moved off the event loop.
+
+    Args:
+        interval (float): Seconds between sweeps.
+    """
+    while True:
+        try:
+            ended = await asyncio.to_thread(sweep_ended_events)
+            if ended:
+                logger.info(f"Marked {ended} past events as ended")
+        except Exception:
+            logger.error("Event status sweep failed", exc_info=True)
+        await asyncio.sleep(interval)
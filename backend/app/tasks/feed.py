@@ -0,0 +1,50 @@
+"""
+Feed Refresh Tasks
+Keeps precomputed ranked feeds in sync after a response has been sent.
+"""
+
+# --------------------------------------------------------------------------------
+
+from collections.abc import Iterable
+
+from ..core.log_config import logger
+from ..db.crud import feed as crud_feed
+from ..db.session import SessionLocal
+
+# --------------------------------------------------------------------------------
+
+
+def refresh_participation_feeds(user_id: str, event_id: str, delta: int) -> None:
+    """
+    Apply a participation change to the feeds of the user's network, e.g. as a
+    response background task.
+
+    Args:
+        user_id (str): ID of the user whose participation changed.
+        event_id (str): Event ID.
+        delta (int): +1 when the user started going, -1 when they stopped.
+    """
+    db = SessionLocal()
+    try:
+        crud_feed.refresh_for_participation(db, user_id=user_id, event_id=event_id, delta=delta)
+    except Exception:
+        logger.error(f"Feed refresh for event {event_id} failed", exc_info=True)
+    finally:
+        db.close()
+
+
+def rebuild_network_feeds(user_ids: Iterable[str]) -> None:
+    """
+    Rebuild the feeds affected by a friendship change, e.g. as a response
+    background task.
+
+    Args:
+        user_ids (Iterable[str]): Users whose friendship was created or removed.
+    """
+    db = SessionLocal()
+    try:
+        crud_feed.rebuild_network_feeds(db, list(user_ids))
+    except Exception:
+        logger.error("Feed rebuild after a friendship change failed", exc_info=True)
+    finally:
+        db.close()
@@ -0,0 +1,261 @@
+"""
+QR Scan Writer
+Buffers check-in scans in memory, persists them in batches off the request path and
+publishes live check-in counters to watching organizers.
+"""
+
+# --------------------------------------------------------------------------------
+
+import asyncio
+import threading
+from collections import deque
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.log_config import logger
+from ..core.pubsub import Publisher
+from ..db.crud import qr_scans as crud_qr_scans
+from ..db.session import SessionLocal, engine
+
+# --------------------------------------------------------------------------------
+
+
+class ScanBuffer:
+    """
+    Bounded, thread-safe queue of scans waiting to be written.
+
+    While the database is unreachable scans accumulate here; above `max_size`
+    the oldest are dropped (and counted) rather than growing without bound.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initialize the buffer.
+
+        Args:
+            max_size (int): Maximum number of pending scans.
+        """
+        self._scans: deque[dict] = deque()
+        self._lock = threading.Lock()
+        self.max_size = max_size
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._scans)
+
+    def add(self, participation_id: str, scanned_by_user_id: int) -> None:
+        """
+        Queue a scan made now.
+
+        Args:
+            participation_id (str): Scanned participation ID.
+            scanned_by_user_id (int): Max ID of the scanning user.
+        """
+        self.extend(
+            [
+                {
+                    "participation_id": participation_id,
+                    "scanned_by_user_id": scanned_by_user_id,
+                    "scanned_at": datetime.now(),
+                }
+            ]
+        )
+
+    def extend(self, scans: list[dict]) -> None:
+        """
+        Queue scans, dropping the oldest ones above the size limit.
+
+        Args:
+            scans (list[dict]): Scans as `create_qr_scans` rows.
+        """
+        with self._lock:
+            self._scans.extend(scans)
+            overflow = len(self._scans) - self.max_size
+            for _ in range(max(overflow, 0)):
+                self._scans.popleft()
+        if overflow > 0:
+            self.dropped += overflow
+            logger.warning(f"QR scan buffer full, dropped {overflow} scans")
+
+    def requeue(self, scans: list[dict]) -> None:
+        """
+        Put scans whose write failed back at the front of the queue.
+
+        Args:
+            scans (list[dict]): Scans taken by `drain`.
+        """
+        with self._lock:
+            self._scans.extendleft(reversed(scans[: max(self.max_size - len(self._scans), 0)]))
+
+    def drain(self, limit: int) -> list[dict]:
+        """
+        Take up to `limit` scans, oldest first.
+
+        Args:
+            limit (int): Maximum number of scans.
+
+        Returns:
+            list[dict]: Scans removed from the buffer.
+        """
+        with self._lock:
+            return [self._scans.popleft() for _ in range(min(limit, len(self._scans)))]
+
+
+# --------------------------------------------------------------------------------
+
+# Process-wide buffer filled by the check-in endpoints
+scan_buffer = ScanBuffer(max_size=settings.QR_SCAN_BUFFER_SIZE)
+
+FLUSH_BATCH_SIZE = 1000
+
+# Live check-in updates, keyed by event ID
+checkin_publisher = Publisher("event_checkins", engine)
+RECENT_SCANS = 20  # scans per message; keeps NOTIFY payloads small
+
+
+def checkin_message(message_type: str, event_id: str, counters: dict, scans: list) -> dict:
+    """
+    Build a live check-in message.
+
+    Args:
+        message_type (str): "counters" (snapshot), "checkin" or "registration".
+        event_id (str): Event ID.
+        counters (dict): "registered" and "attended" counts.
+        scans (list): Scans with participation_id, user_id and scanned_at, oldest first.
+
+    Returns:
+        dict: JSON-serializable message.
+    """
+    return {
+        "type": message_type,
+        "event_id": event_id,
+        **counters,
+        "scans": [
+            {
+                "participation_id": scan["participation_id"],
+                "user_id": scan["user_id"],
+                "scanned_at": scan["scanned_at"].isoformat(),
+            }
+            for scan in scans[-RECENT_SCANS:]
+        ],
+    }
+
+
+def publish_checkins(db: Session, event_ids: Iterable[str], scans: list[dict] = ()) -> None:
+    """
+    Publish fresh counters of events, with their new scans, to live watchers.
+
+    One counter query serves all events and, through NOTIFY, every watcher in
+    every worker. Without NOTIFY, events nobody watches are skipped.
+
+    Args:
+        db (Session): Database session; committed to send the notifications.
+        event_ids (Iterable[str]): Events whose registrations changed.
+        scans (list[dict]): New scans with participation_id, user_id, event_id
+            and scanned_at.
+    """
+    by_event: dict[str, list[dict]] = {event_id: [] for event_id in event_ids}
+    for scan in scans:
+        by_event.setdefault(scan["event_id"], []).append(scan)
+    if not checkin_publisher.uses_notify:
+        by_event = {
+            event_id: event_scans
+            for event_id, event_scans in by_event.items()
+            if checkin_publisher.subscriber_count(event_id)
+        }
+    if not by_event:
+        return
+
+    counters = crud_qr_scans.get_checkin_counters(db, list(by_event))
+    for event_id, event_scans in by_event.items():
+        message_type = "checkin" if event_scans else "registration"
+        checkin_publisher.publish(
+            db, event_id, checkin_message(message_type, event_id, counters[event_id], event_scans)
+        )
+    db.commit()
+
+
+def notify_checkins(event_ids: Iterable[str], scans: list[dict] = ()) -> None:
+    """
+    Publish check-in updates in a fresh session, e.g. as a response background task.
+
+    Args:
+        event_ids (Iterable[str]): Events whose registrations changed.
+        scans (list[dict]): New scans, as for `publish_checkins`.
+    """
+    db = SessionLocal()
+    try:
+        publish_checkins(db, event_ids, scans)
+    except Exception:
+        logger.error("Publishing check-in updates failed", exc_info=True)
+    finally:
+        db.close()
+
+
+def writer_enabled() -> bool:
+    """
+    Check whether the periodic writer runs in this process.
+
+    Returns:
+        bool: False if scans must be flushed by the request that made them.
+    """
+    return settings.BACKGROUND_TASKS_ENABLED and settings.QR_SCAN_FLUSH_INTERVAL > 0
+
+
+def flush_scans() -> int:
+    """
+    Write all buffered scans in batches, in a fresh session.
+
+    A failed batch is put back into the buffer for the next flush. The written
+    scans are published to live check-in watchers.
+
+    Returns:
+        int: Number of scans written.
+    """
+    written = []
+    db = SessionLocal()
+    try:
+        while batch := scan_buffer.drain(FLUSH_BATCH_SIZE):
+            try:
+                written.extend(crud_qr_scans.create_qr_scans(db, batch))
+            except Exception:
+                db.rollback()
+                scan_buffer.requeue(batch)
+                raise
+        if written:
+            try:
+                publish_checkins(db, (), written)
+            except Exception:
+                db.rollback()
+                logger.error("Publishing check-in updates failed", exc_info=True)
+    finally:
+        db.close()
+    return len(written)
+
+
+async def run_scan_writer(interval: float) -> None:
+    """
+    Flush buffered scans forever, once per `interval` seconds.
+
+    Args:
+        interval (float): Seconds between flushes.
+    """
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(flush_scans)
+            except Exception:
+                logger.error(
+                    f"QR scan flush failed, {len(scan_buffer)} scans pending", exc_info=True
+                )
+    finally:
+        # Shutting down: persist what is left
+        if len(scan_buffer):
+            try:
+                await asyncio.to_thread(flush_scans)
+            except Exception:
+                logger.error(f"QR scans lost on shutdown: {len(scan_buffer)}", exc_info=True)
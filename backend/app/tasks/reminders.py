@@ -0,0 +1,190 @@
+"""
+Reminder Scheduler
+Reminds participants of upcoming events through the Max bot.
+"""
+
+# --------------------------------------------------------------------------------
+
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import Connection
+
+from ..core.bot import BotAPIError, BotSender
+from ..core.config import settings
+from ..core.log_config import logger
+from ..db.crud import reminders as crud_reminders
+from ..db.dialects import advisory_unlock, try_advisory_lock
+from ..db.session import SessionLocal, engine
+
+# --------------------------------------------------------------------------------
+
+CLAIM_LEASE = timedelta(minutes=10)  # a claimed reminder is due again after this
+RETRY_DELAY = timedelta(minutes=15)  # between attempts of a reminder that failed transiently
+SCHEDULER_LOCK_KEY = 7_301_001  # advisory lock held by the worker running a pass
+
+
+def reminder_text(job: crud_reminders.ReminderJob) -> str:
+    """
+    Build the reminder message.
+
+    Args:
+        job (ReminderJob): Claimed reminder.
+
+    Returns:
+        str: Message text.
+    """
+    text = f"Напоминание: «{job.title}» {job.start_date.strftime('%d.%m.%Y')}"
+    if job.place:
+        text += f", {job.place}"
+    return text
+
+
+def in_send_hours(now: datetime) -> bool:
+    """
+    Check whether reminders may go out at this local time.
+
+    Args:
+        now (datetime): Current time.
+
+    Returns:
+        bool: True within REMINDER_SEND_FROM_HOUR..REMINDER_SEND_UNTIL_HOUR.
+    """
+    return settings.REMINDER_SEND_FROM_HOUR <= now.hour < settings.REMINDER_SEND_UNTIL_HOUR
+
+
+# --------------------------------------------------------------------------------
+
+
+def _enqueue(today: date) -> int:
+    db = SessionLocal()
+    try:
+        return crud_reminders.enqueue_reminders(
+            db, start=today, end=today + timedelta(days=settings.REMINDER_LEAD_DAYS)
+        )
+    finally:
+        db.close()
+
+
+def _claim(now: datetime, limit: int) -> list[crud_reminders.ReminderJob]:
+    db = SessionLocal()
+    try:
+        return crud_reminders.claim_reminders(
+            db, now=now, today=now.date(), lease_until=now + CLAIM_LEASE, limit=limit
+        )
+    finally:
+        db.close()
+
+
+def _finish(now: datetime, sent: list[str], retry: dict[str, str], failed: dict[str, str]):
+    db = SessionLocal()
+    try:
+        crud_reminders.finish_reminders(
+            db, sent=sent, retry=retry, failed=failed, now=now, retry_at=now + RETRY_DELAY
+        )
+    finally:
+        db.close()
+
+
+def _lead() -> Optional[Connection]:
+    """Take the scheduler lock, returning the connection holding it or None."""
+    connection = engine.connect()
+    locked = False
+    try:
+        locked = try_advisory_lock(connection, SCHEDULER_LOCK_KEY)
+    finally:
+        if not locked:
+            connection.close()
+    return connection if locked else None
+
+
+def _step_down(connection: Connection) -> None:
+    try:
+        advisory_unlock(connection, SCHEDULER_LOCK_KEY)
+    finally:
+        connection.close()
+
+
+async def _send(sender: BotSender, job: crud_reminders.ReminderJob) -> Optional[BotAPIError]:
+    """Send one reminder, returning the error instead of raising it."""
+    try:
+        await sender.send_message(job.max_id, reminder_text(job))
+    except BotAPIError as error:
+        return error
+    return None
+
+
+# --------------------------------------------------------------------------------
+
+
+async def dispatch_reminders(
+    sender: BotSender, *, now: Optional[datetime] = None, batch_size: Optional[int] = None
+) -> dict[str, int]:
+    """
+    Run one scheduler pass: enqueue new reminders and send every due one.
+
+    Reminders are claimed in batches, sent concurrently through the sender's
+    rate limiter and recorded with one bulk update per batch. Transient
+    failures are retried by a later pass until REMINDER_MAX_ATTEMPTS.
+
+    Args:
+        sender (BotSender): Bot API sender.
+        now (Optional[datetime]): Current time, for tests.
+        batch_size (Optional[int]): Reminders per batch, REMINDER_BATCH_SIZE by default.
+
+    Returns:
+        dict[str, int]: Numbers of reminders enqueued, sent, retried and failed.
+    """
+    now = now or datetime.now()
+    batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+    totals = {"enqueued": 0, "sent": 0, "retried": 0, "failed": 0}
+    if not in_send_hours(now):
+        return totals
+
+    totals["enqueued"] = await asyncio.to_thread(_enqueue, now.date())
+    while jobs := await asyncio.to_thread(_claim, now, batch_size):
+        errors = await asyncio.gather(*(_send(sender, job) for job in jobs))
+        sent, retry, failed = [], {}, {}
+        for job, error in zip(jobs, errors, strict=True):
+            if error is None:
+                sent.append(job.participation_id)
+            elif error.transient and job.attempts < settings.REMINDER_MAX_ATTEMPTS:
+                retry[job.participation_id] = str(error)
+            else:
+                failed[job.participation_id] = str(error)
+        await asyncio.to_thread(_finish, now, sent, retry, failed)
+        totals["sent"] += len(sent)
+        totals["retried"] += len(retry)
+        totals["failed"] += len(failed)
+    return totals
+
+
+async def run_reminder_scheduler(interval: float) -> None:
+    """
+    Dispatch reminders forever, once per `interval` seconds.
+
+    It runs in every worker, but a pass needs the scheduler lock, so one worker
+    at a time sends and the bot API sees at most REMINDER_RATE_LIMIT messages
+    per second. Claims are leased besides, so each reminder is sent once.
+
+    Args:
+        interval (float): Seconds between passes.
+    """
+    sender = BotSender(rate=settings.REMINDER_RATE_LIMIT)
+    try:
+        while True:
+            try:
+                leader = await asyncio.to_thread(_lead)
+                if leader is not None:
+                    try:
+                        totals = await dispatch_reminders(sender)
+                    finally:
+                        await asyncio.to_thread(_step_down, leader)
+                    if totals["sent"] or totals["failed"]:
+                        logger.info(f"Event reminders: {totals}")
+            except Exception:
+                logger.error("Event reminder pass failed", exc_info=True)
+            await asyncio.sleep(interval)
+    finally:
+        await sender.close()
@@ -8,6 +8,7 @@ Pytest configuration and fixtures for testing the application.
 import os
 
 os.environ["TESTING"] = "true"
+os.environ["BACKGROUND_TASKS_ENABLED"] = "false"
 
 import hashlib
 import hmac
@@ -228,6 +229,7 @@ def clean_db():
     """
     Clean database between tests.
     """
+    from ..core.cache import response_cache
     from ..db.crud.files import delete_all_files
     from ..db.crud.friends import delete_all_friends
     from ..db.crud.invitations import delete_all_invitations
@@ -235,6 +237,9 @@ def clean_db():
 
     db = SessionLocal()
     try:
+        # Deleted rows bypass the CRUD invalidation hooks
+        response_cache.clear()
+
         # Delete all data in reverse order of dependencies
         delete_all_friends(db)
         delete_all_invitations(db)
@@ -0,0 +1,153 @@
+"""
+Bootstrap Tests
+Test cases for the mini-app initial state endpoint.
+"""
+
+# --------------------------------------------------------------------------------
+
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.config import settings
+
+from ..db.session import engine
+from .conftest import create_test_init_data
+
+# --------------------------------------------------------------------------------
+
+BOOTSTRAP_URL = f"{settings.API_VERSION}/bootstrap"
+
+
+def _headers(max_id: int) -> dict:
+    return {"Authorization": f"tma {create_test_init_data(max_id, settings.BOT_TOKEN)}"}
+
+
+def _create_profile(client: TestClient, max_id: int) -> None:
+    profile_payload = {
+        "first_name": "John",
+        "last_name": "Doe",
+        "gender": "M",
+        "birth_date": "1995-05-15",
+        "university": "HSE University",
+        "max_id": max_id,
+    }
+    response = client.post(
+        f"{settings.API_VERSION}/profiles/", json=profile_payload, headers=_headers(max_id)
+    )
+    assert response.status_code == 201, response.text
+
+
+def _create_event(client: TestClient, max_id: int, title: str) -> str:
+    day = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    event_payload = {
+        "title": title,
+        "body": "Bootstrap event",
+        "tags": ["Спорт"],
+        "start_date": day,
+        "end_date": day,
+        "status": "A",
+    }
+    response = client.post(
+        f"{settings.API_VERSION}/events/global_events/",
+        json=event_payload,
+        headers=_headers(max_id),
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def _count_queries(client: TestClient, url: str, headers: dict) -> tuple[dict, int]:
+    statements = []
+
+    def count(*args) -> None:
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = client.get(url, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert response.status_code == 200, response.text
+    return response.json(), len(statements)
+
+
+# --------------------------------------------------------------------------------
+
+
+def test_bootstrap_matches_individual_endpoints(client: TestClient, clean_db) -> None:
+    """
+    Test that every section equals the response of the endpoint it replaces and
+    that the number of queries does not grow with the number of events.
+    Returns:
+        None
+    """
+    organizer, viewer = 123456789, 987654321
+    _create_profile(client, organizer)
+    _create_profile(client, viewer)
+
+    invitation = client.get(f"{settings.API_VERSION}/friends/new", headers=_headers(organizer))
+    response = client.post(
+        f"{settings.API_VERSION}/friends/new",
+        json={"invitation_id": invitation.json()["id"]},
+        headers=_headers(viewer),
+    )
+    assert response.status_code == 200, response.text
+
+    joined_id = _create_event(client, organizer, "Event 0")
+    response = client.post(
+        f"{settings.API_VERSION}/events/user_events/{joined_id}", headers=_headers(viewer)
+    )
+    assert response.status_code == 200, response.text
+
+    state, few_queries = _count_queries(client, BOOTSTRAP_URL, _headers(viewer))
+    for i in range(1, 6):
+        _create_event(client, organizer, f"Event {i}")
+    state, many_queries = _count_queries(client, BOOTSTRAP_URL, _headers(viewer))
+    assert many_queries == few_queries
+
+    expected = {
+        "profile": "/profiles/my",
+        "friends": "/friends/my",
+        "tags": "/events/tags/",
+        "events": "/events/global_events/",
+        "user_events": "/events/user_events/",
+    }
+    assert list(state) == list(expected)
+    for section, path in expected.items():
+        response = client.get(f"{settings.API_VERSION}{path}", headers=_headers(viewer))
+        assert state[section] == response.json(), section
+
+    assert len(state["events"]["events"]) == 6
+    joined = next(item for item in state["events"]["events"] if item["event"]["id"] == joined_id)
+    assert joined["participation_type"] == "P"
+    assert joined["event"]["participants"] == 2
+    assert all(item["friends_going"] == 1 for item in state["events"]["events"])
+    assert [item["event"]["id"] for item in state["user_events"]["events"]] == [joined_id]
+
+
+def test_bootstrap_sections_and_missing_profile(client: TestClient, clean_db) -> None:
+    """
+    Test section selection and the response for a user who has not registered yet.
+    Returns:
+        None
+    """
+    unregistered = _headers(555555555)
+    response = client.get(BOOTSTRAP_URL, headers=unregistered)
+    assert response.status_code == 200, response.text
+    assert list(response.json()) == ["profile", "tags"]
+    assert response.json()["profile"] is None
+
+    _create_profile(client, 555555555)
+    response = client.get(f"{BOOTSTRAP_URL}?sections=profile,events&limit=1", headers=unregistered)
+    assert response.status_code == 200, response.text
+    assert list(response.json()) == ["profile", "events"]
+    assert response.json()["profile"]["max_id"] == 555555555
+
+    response = client.get(f"{BOOTSTRAP_URL}?sections=profile,feed", headers=unregistered)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown sections: feed"
+
+    response = client.get(BOOTSTRAP_URL)
+    assert response.status_code == 403
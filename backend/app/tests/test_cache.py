@@ -0,0 +1,90 @@
+"""
+Cache tests
+Tests for response cache backends: TTL, LRU eviction and tag invalidation.
+"""
+
+# --------------------------------------------------------------------------------
+
+import time
+from typing import Optional
+
+import pytest
+
+from ..core.cache import CacheBackend, InMemoryLRUCache, ResponseCache
+
+# --------------------------------------------------------------------------------
+
+
+def test_lru_cache_eviction_ttl_and_tags() -> None:
+    """
+    Test LRU eviction order, TTL expiry and tag based invalidation.
+    Returns:
+        None
+    """
+    cache = InMemoryLRUCache(max_entries=2)
+    cache.set("a", b"1", ttl=60, tags=("profile:1",))
+    cache.set("b", b"2", ttl=60, tags=("profile:2",))
+    assert cache.get("a") == b"1"  # "a" becomes most recently used
+
+    cache.set("c", b"3", ttl=60, tags=("profile:1",))
+    assert cache.get("b") is None  # least recently used entry evicted
+    assert len(cache) == 2
+
+    cache.invalidate_tags(["profile:1"])
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+
+    cache.set("d", b"4", ttl=0)
+    time.sleep(0.01)
+    assert cache.get("d") is None
+
+
+def test_incomplete_backend_cannot_be_created() -> None:
+    """
+    Test that a backend missing interface methods fails when instantiated.
+    Returns:
+        None
+    """
+
+    class ReadOnlyCache(CacheBackend):
+        def get(self, key: str) -> Optional[bytes]:
+            return None
+
+    with pytest.raises(TypeError):
+        ReadOnlyCache()
+
+
+# --------------------------------------------------------------------------------
+
+
+def test_response_cache_counts_hits_and_misses() -> None:
+    """
+    Test per-route hit/miss counters and that builder errors are not cached.
+    Returns:
+        None
+    """
+    cache = ResponseCache(InMemoryLRUCache(), ttls={"tags": 60, "uncached": 0})
+    builds = []
+
+    def build() -> bytes:
+        builds.append(1)
+        return b"{}"
+
+    assert cache.get_or_set("tags", "all", build) == (b"{}", False)
+    assert cache.get_or_set("tags", "all", build) == (b"{}", True)
+    cache.get_or_set("uncached", "all", build)
+    cache.get_or_set("uncached", "all", build)
+    assert len(builds) == 3
+
+    def failing_build() -> bytes:
+        raise LookupError("not found")
+
+    for _ in range(2):
+        try:
+            cache.get_or_set("tags", "missing", failing_build)
+        except LookupError:
+            pass
+
+    stats = cache.stats()
+    assert stats["tags"] == {"hits": 1, "misses": 3, "hit_ratio": 0.25}
+    assert stats["uncached"]["misses"] == 2
@@ -220,6 +220,14 @@ class TestEventCRUD:
         # Creator should have participate_id since they participate
         assert retrieved_event["participate_id"] is not None
 
+        # The cached event body yields the same response
+        cached_response = client.get(
+            f"{settings.API_VERSION}/events/global_events/{event_id}",
+            headers={"Authorization": f"tma {init_data}"},
+        )
+        assert cached_response.headers["X-Cache"] == "HIT"
+        assert cached_response.json() == retrieved_event
+
     def test_update_event(self, client: TestClient, clean_db):
         """Test updating an event."""
         # Create valid init data
@@ -860,3 +868,954 @@ class TestEventFiltering:
             # If event is created by current user, they should have participate_id
             if event["event"]["creator"] == profile_id:
                 assert event["participate_id"] is not None
+
+    def test_filter_events_by_tags_and_tag_counts(self, client: TestClient, clean_db):
+        """Test exact tag filtering and the maintained events-per-tag counters."""
+        # Create valid init data
+        user_id = 123456789
+        init_data = create_test_init_data(user_id, settings.BOT_TOKEN)
+        headers = {"Authorization": f"tma {init_data}"}
+
+        # First, create a profile
+        profile_payload = {
+            "first_name": "John",
+            "last_name": "Doe",
+            "gender": "M",
+            "birth_date": "1995-05-15",
+            "avatar": None,
+            "university": "HSE University",
+            "bio": "Software engineer with passion for technology.",
+            "max_id": user_id,
+            "invited_by": None,
+        }
+        create_profile_response = client.post(
+            f"{settings.API_VERSION}/profiles/", json=profile_payload, headers=headers
+        )
+        assert create_profile_response.status_code == 201, create_profile_response.text
+
+        tags_before = client.get(f"{settings.API_VERSION}/events/tags/", headers=headers).json()
+
+        # Create events with different tags
+        event_ids = {}
+        for tag in ["Музей", "Природа"]:
+            event_payload = {
+                "title": f"{tag} Event",
+                "body": "Tagged event description",
+                "tags": [tag],
+                "start_date": (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d"),
+                "end_date": (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d"),
+                "status": "A",
+            }
+            create_event_response = client.post(
+                f"{settings.API_VERSION}/events/global_events/", json=event_payload, headers=headers
+            )
+            assert create_event_response.status_code == 200, create_event_response.text
+            event_ids[tag] = create_event_response.json()["id"]
+
+        # Filter by tag - only events carrying the tag are returned
+        get_events_response = client.get(
+            f"{settings.API_VERSION}/events/global_events/?tags=Музей&limit=100", headers=headers
+        )
+        assert get_events_response.status_code == 200, get_events_response.text
+        events = get_events_response.json()["events"]
+        assert event_ids["Музей"] in [event["event"]["id"] for event in events]
+        assert all("Музей" in event["event"]["tags"] for event in events)
+
+        # Counters are incremented on create
+        tags_after = client.get(f"{settings.API_VERSION}/events/tags/", headers=headers).json()
+        assert tags_after["tags"] == tags_before["tags"]
+        assert tags_after["counts"]["Музей"] == tags_before["counts"]["Музей"] + 1
+        assert tags_after["counts"]["Природа"] == tags_before["counts"]["Природа"] + 1
+
+        # Counters follow tag updates
+        update_response = client.patch(
+            f"{settings.API_VERSION}/events/global_events/{event_ids['Музей']}",
+            json={"tags": ["Лекция"]},
+            headers=headers,
+        )
+        assert update_response.status_code == 200, update_response.text
+        tags_updated = client.get(f"{settings.API_VERSION}/events/tags/", headers=headers).json()
+        assert tags_updated["counts"]["Музей"] == tags_before["counts"]["Музей"]
+        assert tags_updated["counts"]["Лекция"] == tags_before["counts"]["Лекция"] + 1
+
+        # Counters are decremented on delete
+        delete_response = client.delete(
+            f"{settings.API_VERSION}/events/global_events/{event_ids['Природа']}", headers=headers
+        )
+        assert delete_response.status_code == 200, delete_response.text
+        tags_deleted = client.get(f"{settings.API_VERSION}/events/tags/", headers=headers).json()
+        assert tags_deleted["counts"]["Природа"] == tags_before["counts"]["Природа"]
+
+    def test_get_events_by_period_and_status(self, client: TestClient, clean_db):
+        """Test server-side period/status filters and the ended events sweep."""
+        from app.db.crud import events as crud_events
+        from app.db.session import SessionLocal
+
+        # Create valid init data
+        user_id = 123456789
+        init_data = create_test_init_data(user_id, settings.BOT_TOKEN)
+        headers = {"Authorization": f"tma {init_data}"}
+
+        # First, create a profile
+        profile_payload = {
+            "first_name": "John",
+            "last_name": "Doe",
+            "gender": "M",
+            "birth_date": "1995-05-15",
+            "avatar": None,
+            "university": "HSE University",
+            "bio": "Software engineer with passion for technology.",
+            "max_id": user_id,
+            "invited_by": None,
+        }
+        create_profile_response = client.post(
+            f"{settings.API_VERSION}/profiles/", json=profile_payload, headers=headers
+        )
+        assert create_profile_response.status_code == 201, create_profile_response.text
+
+        # Create a past and an upcoming event
+        event_ids = {}
+        for name, days in [("past", -3), ("upcoming", 3)]:
+            event_payload = {
+                "title": f"{name} event",
+                "body": "Period filter event",
+                "tags": ["Спорт"],
+                "start_date": (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d"),
+                "end_date": (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d"),
+                "status": "A",
+            }
+            response = client.post(
+                f"{settings.API_VERSION}/events/global_events/", json=event_payload, headers=headers
+            )
+            assert response.status_code == 200, response.text
+            event_ids[name] = response.json()["id"]
+
+        def listed_ids(query: str) -> set[str]:
+            response = client.get(
+                f"{settings.API_VERSION}/events/global_events/?limit=100{query}", headers=headers
+            )
+            assert response.status_code == 200, response.text
+            return {event["event"]["id"] for event in response.json()["events"]}
+
+        # Default feed hides events that already ended
+        default_ids = listed_ids("")
+        assert event_ids["upcoming"] in default_ids
+        assert event_ids["past"] not in default_ids
+
+        assert event_ids["past"] in listed_ids("&period=past")
+        assert event_ids["past"] not in listed_ids("&period=upcoming")
+        assert {event_ids["past"], event_ids["upcoming"]} <= listed_ids("&period=all")
+
+        # Sweep flips the ended event to status "E"
+        db = SessionLocal()
+        try:
+            assert crud_events.event.end_past_events(db) >= 1
+        finally:
+            db.close()
+        ended_ids = listed_ids("&period=all&status=E")
+        assert event_ids["past"] in ended_ids
+        assert event_ids["upcoming"] not in ended_ids
+
+        invalid_response = client.get(
+            f"{settings.API_VERSION}/events/global_events/?period=someday", headers=headers
+        )
+        assert invalid_response.status_code == 422
+
+
+class TestRankedFeed:
+    """Test the personalized ranked feed."""
+
+    def test_feed_ranks_friends_events_with_cursor(self, client: TestClient, clean_db):
+        """Test that events created by friends appear in the feed with stable paging."""
+        organizer_init_data = create_test_init_data(123456789, settings.BOT_TOKEN)
+        viewer_init_data = create_test_init_data(987654321, settings.BOT_TOKEN)
+        organizer_headers = {"Authorization": f"tma {organizer_init_data}"}
+        viewer_headers = {"Authorization": f"tma {viewer_init_data}"}
+
+        # Create both profiles
+        for max_id, headers in [(123456789, organizer_headers), (987654321, viewer_headers)]:
+            profile_payload = {
+                "first_name": "John",
+                "last_name": "Doe",
+                "gender": "M",
+                "birth_date": "1995-05-15",
+                "avatar": None,
+                "university": "HSE University",
+                "bio": "Feed user.",
+                "max_id": max_id,
+                "invited_by": None,
+            }
+            response = client.post(
+                f"{settings.API_VERSION}/profiles/", json=profile_payload, headers=headers
+            )
+            assert response.status_code == 201, response.text
+
+        # Become friends through the organizer's invitation
+        invitation_response = client.get(
+            f"{settings.API_VERSION}/friends/new", headers=organizer_headers
+        )
+        assert invitation_response.status_code == 200, invitation_response.text
+        friends_response = client.post(
+            f"{settings.API_VERSION}/friends/new",
+            json={"invitation_id": invitation_response.json()["id"]},
+            headers=viewer_headers,
+        )
+        assert friends_response.status_code == 200, friends_response.text
+
+        # Organizer creates events after the friendship exists
+        created_ids = set()
+        for i in range(2):
+            event_payload = {
+                "title": f"Friend Event {i}",
+                "body": "Event organized by a friend",
+                "tags": ["Спорт"],
+                "start_date": (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d"),
+                "end_date": (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d"),
+                "status": "A",
+            }
+            response = client.post(
+                f"{settings.API_VERSION}/events/global_events/",
+                json=event_payload,
+                headers=organizer_headers,
+            )
+            assert response.status_code == 200, response.text
+            created_ids.add(response.json()["id"])
+
+        # First page
+        first_page = client.get(
+            f"{settings.API_VERSION}/events/feed/?limit=1", headers=viewer_headers
+        ).json()
+        assert len(first_page["events"]) == 1
+        assert first_page["has_more"] is True
+        assert first_page["next_cursor"]
+        assert first_page["events"][0]["friends_going"] == 1
+
+        # Second page continues after the cursor
+        second_page = client.get(
+            f"{settings.API_VERSION}/events/feed/?limit=1&cursor={first_page['next_cursor']}",
+            headers=viewer_headers,
+        ).json()
+        assert len(second_page["events"]) == 1
+        assert second_page["has_more"] is False
+        assert second_page["next_cursor"] is None
+
+        seen_ids = {page["events"][0]["event"]["id"] for page in [first_page, second_page]}
+        assert seen_ids == created_ids
+
+        # Organizer's own feed has no candidates from their own events
+        own_feed = client.get(f"{settings.API_VERSION}/events/feed/", headers=organizer_headers)
+        assert own_feed.status_code == 200, own_feed.text
+        assert own_feed.json()["events"] == []
+
+        # Malformed cursor is rejected
+        bad_cursor = client.get(
+            f"{settings.API_VERSION}/events/feed/?cursor=not-a-cursor", headers=viewer_headers
+        )
+        assert bad_cursor.status_code == 400
+
+        # Joining rescores the viewer's existing candidates (tags are list values)
+        join_response = client.post(
+            f"{settings.API_VERSION}/events/user_events/{first_page['events'][0]['event']['id']}",
+            headers=viewer_headers,
+        )
+        assert join_response.status_code == 200, join_response.text
+
+    def test_friendship_changes_update_friends_of_friends(self, client: TestClient, clean_db):
+        """Test that a new or removed friendship updates the feeds of both users' friends."""
+        headers = {}
+        profile_ids = {}
+        for name, max_id in [("alice", 111111111), ("bob", 222222222), ("carol", 333333333)]:
+            init_data = create_test_init_data(max_id, settings.BOT_TOKEN)
+            headers[name] = {"Authorization": f"tma {init_data}"}
+            profile_payload = {
+                "first_name": name.title(),
+                "last_name": "Doe",
+                "gender": "F",
+                "birth_date": "1995-05-15",
+                "avatar": None,
+                "university": "HSE University",
+                "bio": "Feed user.",
+                "max_id": max_id,
+                "invited_by": None,
+            }
+            response = client.post(
+                f"{settings.API_VERSION}/profiles/", json=profile_payload, headers=headers[name]
+            )
+            assert response.status_code == 201, response.text
+            profile_ids[name] = response.json()["id"]
+
+        def befriend(inviter: str, invitee: str) -> None:
+            invitation = client.get(f"{settings.API_VERSION}/friends/new", headers=headers[inviter])
+            assert invitation.status_code == 200, invitation.text
+            response = client.post(
+                f"{settings.API_VERSION}/friends/new",
+                json={"invitation_id": invitation.json()["id"]},
+                headers=headers[invitee],
+            )
+            assert response.status_code == 200, response.text
+
+        def feed(name: str) -> list:
+            response = client.get(f"{settings.API_VERSION}/events/feed/", headers=headers[name])
+            assert response.status_code == 200, response.text
+            return response.json()["events"]
+
+        # Carol is Alice's friend; Bob, a stranger to both, organizes an event
+        befriend("alice", "carol")
+        event_payload = {
+            "title": "Bob's Event",
+            "body": "Event organized by a friend of a friend",
+            "tags": ["Спорт"],
+            "start_date": (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d"),
+            "end_date": (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d"),
+            "status": "A",
+        }
+        response = client.post(
+            f"{settings.API_VERSION}/events/global_events/",
+            json=event_payload,
+            headers=headers["bob"],
+        )
+        assert response.status_code == 200, response.text
+        event_id = response.json()["id"]
+        assert feed("carol") == []
+
+        # Alice and Bob become friends: Bob is now a friend of a friend of Carol
+        befriend("alice", "bob")
+        carol_feed = feed("carol")
+        assert [item["event"]["id"] for item in carol_feed] == [event_id]
+        assert carol_feed[0]["friends_going"] == 0
+        assert carol_feed[0]["friends_of_friends_going"] == 1
+
+        # Removing the friendship takes the event out of Carol's feed again
+        response = client.delete(
+            f"{settings.API_VERSION}/friends/{profile_ids['bob']}", headers=headers["alice"]
+        )
+        assert response.status_code == 204, response.text
+        assert feed("carol") == []
+
+        # Later participation deltas start from the rebuilt counters
+        response = client.post(
+            f"{settings.API_VERSION}/events/user_events/{event_id}", headers=headers["alice"]
+        )
+        assert response.status_code == 200, response.text
+        carol_feed = feed("carol")
+        assert carol_feed[0]["friends_going"] == 1
+        assert carol_feed[0]["friends_of_friends_going"] == 0
+
+        # A refresh whose session holds a stale row still adds to the current counter
+        from app.db.crud import feed as crud_feed
+        from app.db.models import FeedCandidate
+        from app.db.session import SessionLocal
+
+        key = (profile_ids["carol"], event_id)
+        stale, other = SessionLocal(), SessionLocal()
+        try:
+            stale_row = stale.get(FeedCandidate, key)
+            assert stale_row.friends_going == 1
+            for db in (other, stale):
+                crud_feed.refresh_for_participation(
+                    db, user_id=profile_ids["alice"], event_id=event_id, delta=1
+                )
+            other.expire_all()
+            assert other.get(FeedCandidate, key).friends_going == 3
+        finally:
+            stale.close()
+            other.close()
+
+
+class TestConditionalRequests:
+    """Test ETag based conditional GET for event endpoints."""
+
+    def test_event_etags(self, client: TestClient, clean_db):
+        """Test 304 responses and ETag invalidation on participation changes."""
+        organizer_init_data = create_test_init_data(123456789, settings.BOT_TOKEN)
+        viewer_init_data = create_test_init_data(987654321, settings.BOT_TOKEN)
+        organizer_headers = {"Authorization": f"tma {organizer_init_data}"}
+        viewer_headers = {"Authorization": f"tma {viewer_init_data}"}
+
+        # Create both profiles
+        for max_id, headers in [(123456789, organizer_headers), (987654321, viewer_headers)]:
+            profile_payload = {
+                "first_name": "John",
+                "last_name": "Doe",
+                "gender": "M",
+                "birth_date": "1995-05-15",
+                "avatar": None,
+                "university": "HSE University",
+                "bio": "ETag user.",
+                "max_id": max_id,
+                "invited_by": None,
+            }
+            response = client.post(
+                f"{settings.API_VERSION}/profiles/", json=profile_payload, headers=headers
+            )
+            assert response.status_code == 201, response.text
+
+        event_payload = {
+            "title": "Polled Event",
+            "body": "Event polled by clients",
+            "tags": ["Спорт"],
+            "start_date": (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d"),
+            "end_date": (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d"),
+            "status": "A",
+        }
+        response = client.post(
+            f"{settings.API_VERSION}/events/global_events/",
+            json=event_payload,
+            headers=organizer_headers,
+        )
+        assert response.status_code == 200, response.text
+        event_id = response.json()["id"]
+        detail_url = f"{settings.API_VERSION}/events/global_events/{event_id}"
+        list_url = f"{settings.API_VERSION}/events/global_events/"
+
+        # Detail: validator headers, then 304 on revalidation
+        first = client.get(detail_url, headers=viewer_headers)
+        assert first.status_code == 200, first.text
+        etag = first.headers["ETag"]
+        assert etag.startswith('W/"')
+        assert first.headers["Cache-Control"] == "private, no-cache"
+
+        revalidated = client.get(detail_url, headers={**viewer_headers, "If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["ETag"] == etag
+        assert revalidated.content == b""
+
+        # The ETag is per viewer
+        organizer_view = client.get(detail_url, headers=organizer_headers)
+        assert organizer_view.headers["ETag"] != etag
+
+        # List: 304 on revalidation
+        listed = client.get(list_url, headers=viewer_headers)
+        assert listed.status_code == 200, listed.text
+        list_etag = listed.headers["ETag"]
+        assert (
+            client.get(list_url, headers={**viewer_headers, "If-None-Match": list_etag}).status_code
+            == 304
+        )
+
+        # Another user joins - both representations change
+        response = client.post(
+            f"{settings.API_VERSION}/events/user_events/{event_id}", headers=viewer_headers
+        )
+        assert response.status_code == 200, response.text
+
+        changed = client.get(detail_url, headers={**viewer_headers, "If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+        assert changed.json()["participation_type"] == "P"
+
+        relisted = client.get(list_url, headers={**viewer_headers, "If-None-Match": list_etag})
+        assert relisted.status_code == 200
+        assert relisted.headers["ETag"] != list_etag
+
+
+class TestQRTickets:
+    """Test signed check-in tickets."""
+
+    def test_ticket_scan_is_verified_without_database(
+        self, client: TestClient, clean_db, monkeypatch
+    ):
+        """Test issuing, offline and server verification, and deferred scan records."""
+        import base64
+        import hashlib
+        import hmac
+
+        from sqlalchemy import event as sa_event
+
+        from app.core import tickets
+        from app.db.crud import qr_scans as crud_qr_scans
+        from app.db.session import SessionLocal, engine
+        from app.tasks import qr_scans as scan_tasks
+
+        organizer_headers = {
+            "Authorization": f"tma {create_test_init_data(123456789, settings.BOT_TOKEN)}"
+        }
+        participant_headers = {
+            "Authorization": f"tma {create_test_init_data(987654321, settings.BOT_TOKEN)}"
+        }
+        for max_id, headers in [(123456789, organizer_headers), (987654321, participant_headers)]:
+            profile_payload = {
+                "first_name": "John",
+                "last_name": "Doe",
+                "gender": "M",
+                "birth_date": "1995-05-15",
+                "university": "HSE University",
+                "max_id": max_id,
+            }
+            response = client.post(
+                f"{settings.API_VERSION}/profiles/", json=profile_payload, headers=headers
+            )
+            assert response.status_code == 201, response.text
+
+        event_payload = {
+            "title": "Gate Event",
+            "body": "Check-in by ticket",
+            "tags": [],
+            "start_date": datetime.now().strftime("%Y-%m-%d"),
+            "end_date": datetime.now().strftime("%Y-%m-%d"),
+            "status": "A",
+        }
+        event_id = client.post(
+            f"{settings.API_VERSION}/events/global_events/",
+            json=event_payload,
+            headers=organizer_headers,
+        ).json()["id"]
+        ticket_url = f"{settings.API_VERSION}/events/user_events/{event_id}/ticket"
+
+        # Only participants get a ticket
+        assert client.get(ticket_url, headers=participant_headers).status_code == 404
+        client.post(
+            f"{settings.API_VERSION}/events/user_events/{event_id}", headers=participant_headers
+        )
+        response = client.get(ticket_url, headers=participant_headers)
+        assert response.status_code == 200, response.text
+        ticket_response = response.json()
+        ticket = ticket_response["ticket"]
+
+        # A scanner holding the event key verifies the signature offline
+        key_url = f"{settings.API_VERSION}/events/global_events/{event_id}/ticket_key"
+        assert client.get(key_url, headers=participant_headers).status_code == 403
+        key = client.get(key_url, headers=organizer_headers).json()["key"]
+        signed, signature = ticket.rsplit(".", 1)
+        digest = hmac.new(
+            base64.urlsafe_b64decode(key + "=="), signed.encode(), hashlib.sha256
+        ).digest()
+        assert base64.urlsafe_b64encode(digest[:16]).decode().rstrip("=") == signature
+
+        # With the periodic writer running, a scan makes no database query at all
+        monkeypatch.setattr(scan_tasks, "writer_enabled", lambda: True)
+        monkeypatch.setattr("app.api.v1.endpoints.events.writer_enabled", scan_tasks.writer_enabled)
+        statements = []
+
+        def count(*args):
+            statements.append(args[2])
+
+        sa_event.listen(engine, "before_cursor_execute", count)
+        try:
+            response = client.post(
+                f"{settings.API_VERSION}/events/scan_ticket",
+                json={"ticket": ticket},
+                headers=organizer_headers,
+            )
+        finally:
+            sa_event.remove(engine, "before_cursor_execute", count)
+        assert response.status_code == 200, response.text
+        assert response.json()["event_id"] == event_id
+        assert statements == []
+
+        participation_id = response.json()["participation_id"]
+        assert scan_tasks.flush_scans() == 1
+        db = SessionLocal()
+        try:
+            scans = crud_qr_scans.get_qr_scans_by_participation(db, participation_id)
+            assert [scan.scanned_by_user_id for scan in scans] == [123456789]
+        finally:
+            db.close()
+
+        # Forged and expired tickets are rejected
+        forged = ticket[:-2] + ("AA" if not ticket.endswith("AA") else "BB")
+        response = client.post(
+            f"{settings.API_VERSION}/events/scan_ticket",
+            json={"ticket": forged},
+            headers=organizer_headers,
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "INVALID_TICKET"
+        contents = tickets.verify_ticket(ticket)
+        # The expiry is an explicit UTC instant, independent of the host's zone
+        expires_at = datetime.fromisoformat(ticket_response["expires_at"])
+        assert expires_at.utcoffset() == timedelta(0)
+        assert expires_at.timestamp() == contents.expires_at
+        assert (expires_at.hour, expires_at.minute) == (0, 0)
+        try:
+            tickets.verify_ticket(ticket, now=contents.expires_at + 1)
+            raise AssertionError("expired ticket accepted")
+        except tickets.TicketError as error:
+            assert str(error) == "EXPIRED_TICKET"
+
+
+class TestQRScanBatch:
+    """Test batch ingestion of QR scans."""
+
+    def test_scan_batch_deduplicates_and_is_idempotent(self, client: TestClient, clean_db):
+        """Test per-item results, deduplication, client timestamps and re-sending."""
+        from app.db.crud import events as crud_events
+        from app.db.crud import profiles as crud_profiles
+        from app.db.crud import qr_scans as crud_qr_scans
+        from app.db.session import SessionLocal
+
+        organizer_headers = {
+            "Authorization": f"tma {create_test_init_data(123456789, settings.BOT_TOKEN)}"
+        }
+        participant_headers = {
+            "Authorization": f"tma {create_test_init_data(987654321, settings.BOT_TOKEN)}"
+        }
+        for max_id, headers in [(123456789, organizer_headers), (987654321, participant_headers)]:
+            profile_payload = {
+                "first_name": "John",
+                "last_name": "Doe",
+                "gender": "M",
+                "birth_date": "1995-05-15",
+                "university": "HSE University",
+                "max_id": max_id,
+            }
+            response = client.post(
+                f"{settings.API_VERSION}/profiles/", json=profile_payload, headers=headers
+            )
+            assert response.status_code == 201, response.text
+
+        event_payload = {
+            "title": "Gate Event",
+            "body": "Batch check-in",
+            "tags": [],
+            "start_date": datetime.now().strftime("%Y-%m-%d"),
+            "end_date": datetime.now().strftime("%Y-%m-%d"),
+            "status": "A",
+        }
+        event_id = client.post(
+            f"{settings.API_VERSION}/events/global_events/",
+            json=event_payload,
+            headers=organizer_headers,
+        ).json()["id"]
+        client.post(
+            f"{settings.API_VERSION}/events/user_events/{event_id}", headers=participant_headers
+        )
+
+        db = SessionLocal()
+        try:
+            organizer, participant = (
+                crud_profiles.get_profile_by_max_id(db, max_id) for max_id in (123456789, 987654321)
+            )
+            organizer_id, participant_id = organizer.id, participant.id
+            organizer_participation, participant_participation = (
+                crud_events.event.get_user_participation(db, event_id=event_id, user_id=user_id).id
+                for user_id in (organizer_id, participant_id)
+            )
+        finally:
+            db.close()
+
+        first_scan = datetime.now() - timedelta(minutes=10)
+        batch = {
+            "scans": [
+                {
+                    "participation_id": participant_participation,
+                    "scanned_at": (first_scan + timedelta(minutes=1)).isoformat(),
+                },
+                {"participation_id": organizer_participation},
+                {
+                    "participation_id": participant_participation,
+                    "scanned_at": first_scan.isoformat(),
+                },
+                {"participation_id": "missing"},
+            ]
+        }
+        url = f"{settings.API_VERSION}/events/scan_qr/batch"
+        response = client.post(url, json=batch, headers=organizer_headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["recorded"] == 2
+        assert [(result["status"], result["user_id"]) for result in response.json()["results"]] == [
+            ("duplicate", participant_id),
+            ("recorded", organizer_id),
+            ("recorded", participant_id),
+            ("not_found", None),
+        ]
+
+        db = SessionLocal()
+        try:
+            scans = crud_qr_scans.get_qr_scans_by_participation(db, participant_participation)
+            assert [(scan.scanned_at, scan.scanned_by_user_id) for scan in scans] == [
+                (first_scan, 123456789)
+            ]
+        finally:
+            db.close()
+
+        # Re-sending the batch records nothing twice
+        response = client.post(url, json=batch, headers=organizer_headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["recorded"] == 0
+        assert [result["status"] for result in response.json()["results"]] == [
+            "already_scanned",
+            "already_scanned",
+            "already_scanned",
+            "not_found",
+        ]
+
+        response = client.post(url, json={"scans": []}, headers=organizer_headers)
+        assert response.status_code == 422
+
+    def test_buffered_scans_check_in_once(self, client: TestClient, clean_db):
+        """Test that buffered scans keep the first scan of a participation only."""
+        from app.db.crud import events as crud_events
+        from app.db.crud import profiles as crud_profiles
+        from app.db.crud import qr_scans as crud_qr_scans
+        from app.db.session import SessionLocal
+
+        headers = {"Authorization": f"tma {create_test_init_data(123456789, settings.BOT_TOKEN)}"}
+        profile_payload = {
+            "first_name": "John",
+            "last_name": "Doe",
+            "gender": "M",
+            "birth_date": "1995-05-15",
+            "university": "HSE University",
+            "max_id": 123456789,
+        }
+        response = client.post(
+            f"{settings.API_VERSION}/profiles/", json=profile_payload, headers=headers
+        )
+        assert response.status_code == 201, response.text
+        event_payload = {
+            "title": "Buffered Gate",
+            "body": "Buffered check-in",
+            "tags": [],
+            "start_date": datetime.now().strftime("%Y-%m-%d"),
+            "end_date": datetime.now().strftime("%Y-%m-%d"),
+            "status": "A",
+        }
+        event_id = client.post(
+            f"{settings.API_VERSION}/events/global_events/", json=event_payload, headers=headers
+        ).json()["id"]
+
+        db = SessionLocal()
+        try:
+            organizer = crud_profiles.get_profile_by_max_id(db, 123456789)
+            participation_id = crud_events.event.get_user_participation(
+                db, event_id=event_id, user_id=organizer.id
+            ).id
+            first_scan = datetime.now() - timedelta(minutes=10)
+            scans = [
+                {
+                    "participation_id": participation_id,
+                    "scanned_by_user_id": 123456789,
+                    "scanned_at": scanned_at,
+                }
+                for scanned_at in (first_scan + timedelta(minutes=1), first_scan)
+            ]
+            inserted = crud_qr_scans.create_qr_scans(db, scans)
+            assert [(row["scanned_at"], row["user_id"]) for row in inserted] == [
+                (first_scan, organizer.id)
+            ]
+
+            # A later flush, or another worker's, does not record the participant again
+            assert crud_qr_scans.create_qr_scans(db, scans) == []
+            batch = crud_qr_scans.create_qr_scan_batch(
+                db, [(participation_id, datetime.now())], scanned_by_user_id=123456789
+            )
+            assert batch == [("already_scanned", (organizer.id, event_id))]
+            scans = crud_qr_scans.get_qr_scans_by_participation(db, participation_id)
+            assert [scan.scanned_at for scan in scans] == [first_scan]
+        finally:
+            db.close()
+
+
+class TestCheckinStream:
+    """Test the live check-in counter stream."""
+
+    def test_checkin_stream_pushes_counters(self, client: TestClient, clean_db):
+        """Test the snapshot, registration and scan updates, and access control."""
+        import asyncio
+        import json
+        from types import SimpleNamespace
+
+        from app.api.v1.endpoints.events import stream_checkins
+        from app.db.crud import events as crud_events
+        from app.db.crud import profiles as crud_profiles
+        from app.db.session import SessionLocal
+        from app.tasks.qr_scans import checkin_publisher
+
+        organizer_headers = {
+            "Authorization": f"tma {create_test_init_data(123456789, settings.BOT_TOKEN)}"
+        }
+        participant_headers = {
+            "Authorization": f"tma {create_test_init_data(987654321, settings.BOT_TOKEN)}"
+        }
+        for max_id, headers in [(123456789, organizer_headers), (987654321, participant_headers)]:
+            profile_payload = {
+                "first_name": "John",
+                "last_name": "Doe",
+                "gender": "M",
+                "birth_date": "1995-05-15",
+                "university": "HSE University",
+                "max_id": max_id,
+            }
+            response = client.post(
+                f"{settings.API_VERSION}/profiles/", json=profile_payload, headers=headers
+            )
+            assert response.status_code == 201, response.text
+
+        event_payload = {
+            "title": "Live Event",
+            "body": "Watched check-in",
+            "tags": [],
+            "start_date": datetime.now().strftime("%Y-%m-%d"),
+            "end_date": datetime.now().strftime("%Y-%m-%d"),
+            "status": "A",
+        }
+        event_id = client.post(
+            f"{settings.API_VERSION}/events/global_events/",
+            json=event_payload,
+            headers=organizer_headers,
+        ).json()["id"]
+
+        response = client.get(
+            f"{settings.API_VERSION}/events/global_events/{event_id}/checkins",
+            headers=participant_headers,
+        )
+        assert response.status_code == 403
+        assert checkin_publisher.subscriber_count(event_id) == 0
+
+        def parse(chunk: bytes) -> tuple[str, dict]:
+            event_line, data_line = chunk.decode().strip().split("\n")
+            return event_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))
+
+        async def watch() -> tuple[list[tuple[str, dict]], str]:
+            # The test client buffers whole bodies, so the stream is read directly
+            request = SimpleNamespace(state=SimpleNamespace(user_id=123456789))
+            response = await stream_checkins(request=request, event_id=event_id)
+            assert response.media_type == "text/event-stream"
+            stream = response.body_iterator
+            messages = [parse(await stream.__anext__())]
+
+            response = await asyncio.to_thread(
+                client.post,
+                f"{settings.API_VERSION}/events/user_events/{event_id}",
+                headers=participant_headers,
+            )
+            assert response.status_code == 200, response.text
+            messages.append(parse(await asyncio.wait_for(stream.__anext__(), 5)))
+
+            db = SessionLocal()
+            try:
+                participant = crud_profiles.get_profile_by_max_id(db, 987654321)
+                participation_id = crud_events.event.get_user_participation(
+                    db, event_id=event_id, user_id=participant.id
+                ).id
+            finally:
+                db.close()
+            response = await asyncio.to_thread(
+                client.post,
+                f"{settings.API_VERSION}/events/scan_qr/batch",
+                json={"scans": [{"participation_id": participation_id}]},
+                headers=organizer_headers,
+            )
+            assert response.status_code == 200, response.text
+            messages.append(parse(await asyncio.wait_for(stream.__anext__(), 5)))
+
+            assert checkin_publisher.subscriber_count(event_id) == 1
+            await stream.aclose()
+            assert checkin_publisher.subscriber_count(event_id) == 0
+            return messages, participation_id
+
+        messages, participation_id = asyncio.run(watch())
+        assert [(kind, data["registered"], data["attended"]) for kind, data in messages] == [
+            ("counters", 1, 0),
+            ("registration", 2, 0),
+            ("checkin", 2, 1),
+        ]
+        assert [scan["participation_id"] for scan in messages[2][1]["scans"]] == [participation_id]
+
+
+class TestCapacityUpdates:
+    """Test the capacity WebSocket."""
+
+    def test_capacity_updates_are_pushed_and_coalesced(
+        self, client: TestClient, clean_db, monkeypatch
+    ):
+        """Test authentication, snapshots, coalesced pushes and subscription limits."""
+        import pytest
+        from starlette.websockets import WebSocketDisconnect
+
+        from app.tasks.capacity import capacity_hub
+
+        # Pushes happen only when the test flushes the hub
+        monkeypatch.setattr(settings, "CAPACITY_PUSH_INTERVAL", 3600.0)
+        monkeypatch.setattr(settings, "CAPACITY_MAX_SUBSCRIPTIONS", 3)
+
+        max_ids = [123456789, 987654321, 555555555]
+        headers = {
+            max_id: {"Authorization": f"tma {create_test_init_data(max_id, settings.BOT_TOKEN)}"}
+            for max_id in max_ids
+        }
+        for max_id in max_ids:
+            profile_payload = {
+                "first_name": "John",
+                "last_name": "Doe",
+                "gender": "M",
+                "birth_date": "1995-05-15",
+                "university": "HSE University",
+                "max_id": max_id,
+            }
+            response = client.post(
+                f"{settings.API_VERSION}/profiles/", json=profile_payload, headers=headers[max_id]
+            )
+            assert response.status_code == 201, response.text
+
+        event_payload = {
+            "title": "Popular Event",
+            "body": "Few seats",
+            "tags": [],
+            "start_date": datetime.now().strftime("%Y-%m-%d"),
+            "end_date": datetime.now().strftime("%Y-%m-%d"),
+            "max_participants": 2,
+            "status": "A",
+        }
+        event_id = client.post(
+            f"{settings.API_VERSION}/events/global_events/",
+            json=event_payload,
+            headers=headers[max_ids[0]],
+        ).json()["id"]
+        url = f"{settings.API_VERSION}/events/capacity"
+
+        # Without the header, the first message must authenticate
+        for message in ({"subscribe": [event_id]}, {"auth": "tma invalid"}):
+            with pytest.raises(WebSocketDisconnect) as error:
+                with client.websocket_connect(url) as websocket:
+                    websocket.send_json(message)
+                    websocket.receive_json()
+            assert error.value.code == 1008
+
+        with client.websocket_connect(url) as websocket:
+            websocket.send_json({"auth": headers[max_ids[0]]["Authorization"]})
+            websocket.send_json({"subscribe": [event_id, "missing"]})
+            assert websocket.receive_json() == {
+                "type": "capacity",
+                "events": {
+                    event_id: {
+                        "participants": 1,
+                        "max_participants": 2,
+                        "is_registration_available": True,
+                    },
+                    "missing": None,
+                },
+            }
+
+            # Two changes between pushes arrive as one update
+            for max_id in max_ids[1:]:
+                client.post(
+                    f"{settings.API_VERSION}/events/user_events/{event_id}",
+                    headers=headers[max_id],
+                )
+            assert client.portal.call(capacity_hub.flush) == 1
+            assert websocket.receive_json() == {
+                "type": "capacity",
+                "events": {
+                    event_id: {
+                        "participants": 2,
+                        "max_participants": 2,
+                        "is_registration_available": False,
+                    }
+                },
+            }
+            assert client.portal.call(capacity_hub.flush) == 0
+
+            websocket.send_json({"subscribe": ["a", "b", "c"]})
+            assert websocket.receive_json() == {
+                "type": "error",
+                "detail": "At most 3 events per connection",
+            }
+            websocket.send_json({"subscribe": "not a list"})
+            assert websocket.receive_json()["type"] == "error"
+
+        # Clients that can set headers skip the auth message
+        with client.websocket_connect(url, headers=headers[max_ids[1]]) as websocket:
+            websocket.send_json({"subscribe": [event_id]})
+            assert websocket.receive_json()["events"][event_id]["participants"] == 2
@@ -5,10 +5,21 @@ Test cases for friends and invitations API endpoints.
 
 # --------------------------------------------------------------------------------
 
+from datetime import date
+
 from fastapi.testclient import TestClient
 
 from app.core.config import settings
 
+from ..db.crud import files as crud_files
+from ..db.crud import friends as crud_friends
+from ..db.crud import invitations as crud_invitations
+from ..db.crud import profiles as crud_profiles
+from ..db.session import SessionLocal
+from ..schemas.files import FileCreate
+from ..schemas.profiles import ProfileCreate
+from .test_max_auth import create_test_init_data
+
 # --------------------------------------------------------------------------------
 
 
@@ -126,3 +137,211 @@ def test_delete_friends_endpoint_requires_auth(client: TestClient) -> None:
     )
     assert response.status_code == 403
     assert "Invalid or expired Max init data" in response.json()["detail"]
+
+
+def _create_profile(db, max_id: int, first_name: str, last_name: str, avatar=None):
+    profile_in = ProfileCreate(
+        first_name=first_name,
+        last_name=last_name,
+        gender="M",
+        birth_date=date(1995, 5, 15),
+        university="HSE University",
+        avatar=avatar,
+    )
+    return crud_profiles.create_profile(db, profile_in, max_id=max_id, invited_by=None)
+
+
+def test_friends_list_pages_by_name_and_time(client: TestClient, clean_db) -> None:
+    """
+    Test keyset pagination of the friends list, the paging headers and that
+    avatar URLs are returned.
+    """
+    db = SessionLocal()
+    try:
+        owner = _create_profile(db, 100, "Owner", "Zeta")
+        avatar = crud_files.create_file(
+            db, FileCreate(name="a.webp", type="avatar"), 101, "https://storage/a.webp"
+        )
+        names = ["Borisov", "Antonov", "Dmitriev", "Antonov", "Vasiliev"]
+        friends = [
+            _create_profile(db, 101 + i, f"Name{i}", last_name, avatar.id if i == 0 else None)
+            for i, last_name in enumerate(names)
+        ]
+        for friend in friends:
+            crud_friends.create_friends(db, owner.id, friend.id)
+        expected_by_name = sorted(friends, key=lambda p: (p.last_name, p.first_name, p.id))
+        expected_by_name = [friend.id for friend in expected_by_name]
+    finally:
+        db.close()
+
+    headers = {"Authorization": f"tma {create_test_init_data(100, settings.BOT_TOKEN)}"}
+    url = f"{settings.API_VERSION}/friends/my"
+
+    for order in ("name", "created_at"):
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"order": order, "limit": 2, "with_total": "true"}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get(url, params=params, headers=headers)
+            assert response.status_code == 200, response.text
+            assert response.headers["X-Total-Count"] == "5"
+            seen += response.json()
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert pages == 3
+        assert sorted(friend["id"] for friend in seen) == sorted(friend.id for friend in friends)
+        if order == "name":
+            assert [friend["id"] for friend in seen] == expected_by_name
+            assert seen[2]["avatar_url"] == "https://storage/a.webp"
+
+    # Without paging parameters: the whole (small) list, no paging headers
+    response = client.get(url, headers=headers)
+    assert len(response.json()) == 5
+    assert "X-Next-Cursor" not in response.headers
+    assert "X-Total-Count" not in response.headers
+
+    # A cursor is bound to its order
+    first = client.get(url, params={"limit": 1}, headers=headers)
+    response = client.get(
+        url,
+        params={"order": "created_at", "cursor": first.headers["X-Next-Cursor"]},
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+
+def test_friends_list_without_paging_returns_all(client: TestClient, clean_db) -> None:
+    """
+    Test that clients that do not page get every friend, also beyond one page,
+    from /friends/my and from bootstrap.
+    """
+    db = SessionLocal()
+    try:
+        owner = _create_profile(db, 300, "Owner", "Test")
+        for i in range(105):
+            friend = _create_profile(db, 301 + i, f"Friend{i}", "Test")
+            crud_friends.create_friends(db, owner.id, friend.id)
+    finally:
+        db.close()
+
+    headers = {"Authorization": f"tma {create_test_init_data(300, settings.BOT_TOKEN)}"}
+    response = client.get(f"{settings.API_VERSION}/friends/my", headers=headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == 105
+    assert "X-Next-Cursor" not in response.headers
+
+    # The bootstrap section is the same list
+    bootstrap = client.get(f"{settings.API_VERSION}/bootstrap?sections=friends", headers=headers)
+    assert bootstrap.status_code == 200, bootstrap.text
+    assert bootstrap.json()["friends"] == response.json()
+
+
+def test_friend_suggestions_ranked_by_mutual_friends(client: TestClient, clean_db) -> None:
+    """
+    Test that suggestions exclude the user and direct friends, are ranked by
+    mutual friend count and are paginated.
+    """
+    db = SessionLocal()
+    try:
+        me, a, b, x, y, z = (
+            _create_profile(db, 200 + i, name, "Test")
+            for i, name in enumerate(["Me", "A", "B", "X", "Y", "Z"])
+        )
+        for first, second in [(me, a), (me, b), (a, b), (a, x), (b, x), (a, y), (b, z)]:
+            crud_friends.create_friends(db, first.id, second.id)
+        expected = [(x.id, 2)] + sorted([(y.id, 1), (z.id, 1)])
+    finally:
+        db.close()
+
+    headers = {"Authorization": f"tma {create_test_init_data(200, settings.BOT_TOKEN)}"}
+    url = f"{settings.API_VERSION}/friends/suggestions"
+
+    first_page = client.get(url, params={"limit": 2}, headers=headers)
+    assert first_page.status_code == 200, first_page.text
+    second_page = client.get(
+        url, params={"limit": 2, "cursor": first_page.headers["X-Next-Cursor"]}, headers=headers
+    )
+    assert "X-Next-Cursor" not in second_page.headers
+
+    suggestions = first_page.json() + second_page.json()
+    assert [(item["id"], item["mutual_friends"]) for item in suggestions] == expected
+    assert suggestions[0]["first_name"] == "X"
+
+    response = client.get(url, params={"cursor": "bm90LWEtY3Vyc29y"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_accepting_invitation_is_idempotent(client: TestClient, clean_db) -> None:
+    """
+    Test that accepting an invitation twice succeeds without a second friendship
+    and that invalid acceptances are still rejected.
+    """
+    db = SessionLocal()
+    try:
+        inviter_id = _create_profile(db, 300, "Inviter", "Test").id
+        _create_profile(db, 301, "Invitee", "Test")
+    finally:
+        db.close()
+
+    inviter_headers = {"Authorization": f"tma {create_test_init_data(300, settings.BOT_TOKEN)}"}
+    invitee_headers = {"Authorization": f"tma {create_test_init_data(301, settings.BOT_TOKEN)}"}
+    invitation_id = client.get(
+        f"{settings.API_VERSION}/friends/new", headers=inviter_headers
+    ).json()["id"]
+
+    url = f"{settings.API_VERSION}/friends/new"
+    for _ in range(2):
+        response = client.post(url, json={"invitation_id": invitation_id}, headers=invitee_headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["id"] == invitation_id
+
+    db = SessionLocal()
+    try:
+        assert len(crud_friends.get_friends_by_user(db, inviter_id)) == 1
+    finally:
+        db.close()
+
+    response = client.post(url, json={"invitation_id": invitation_id}, headers=inviter_headers)
+    assert response.status_code == 400
+    response = client.post(url, json={"invitation_id": "missing"}, headers=invitee_headers)
+    assert response.status_code == 404
+    unregistered = {"Authorization": f"tma {create_test_init_data(302, settings.BOT_TOKEN)}"}
+    response = client.post(url, json={"invitation_id": invitation_id}, headers=unregistered)
+    assert response.status_code == 404
+
+
+def test_invitation_id_is_stable_and_cached(client: TestClient, clean_db) -> None:
+    """
+    Test that a user always gets the same invitation, served from the cache
+    after the first call, and a new one once it is deleted.
+    """
+    db = SessionLocal()
+    try:
+        profile_id = _create_profile(db, 400, "Inviter", "Test").id
+    finally:
+        db.close()
+
+    headers = {"Authorization": f"tma {create_test_init_data(400, settings.BOT_TOKEN)}"}
+    url = f"{settings.API_VERSION}/friends/new"
+
+    first = client.get(url, headers=headers)
+    second = client.get(url, headers=headers)
+    assert first.status_code == 200, first.text
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+
+    db = SessionLocal()
+    try:
+        # Issuing again bypassing the cache hits the unique index, not a new row
+        assert crud_invitations.get_or_create_invitation_id(db, profile_id) == first.json()["id"]
+        crud_invitations.delete_invitation_by_user(db, profile_id)
+    finally:
+        db.close()
+
+    third = client.get(url, headers=headers)
+    assert third.headers["X-Cache"] == "MISS"
+    assert third.json()["id"] != first.json()["id"]
@@ -108,6 +108,31 @@ def test_max_auth_middleware_public_endpoints(client: TestClient):
     assert response.status_code == 401  # Docs auth required, not max auth
 
 
+def test_openapi_served_precompressed_with_etag(client: TestClient):
+    """Test that the OpenAPI schema is served from the gzipped asset and revalidated by ETag."""
+    import base64
+    import gzip
+
+    credentials = f"{settings.DOCS_USERNAME}:{settings.DOCS_PASSWORD}".encode()
+    headers = {"Authorization": f"Basic {base64.b64encode(credentials).decode()}"}
+
+    response = client.get("/openapi.json", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert int(response.headers["Content-Length"]) < len(response.content)
+    schema = response.json()
+    assert schema["openapi"] == "3.0.2"
+    assert f"{settings.API_VERSION}/events/global_events/" in schema["paths"]
+    assert gzip.decompress(client.app.state.openapi_asset.gzipped) == response.content
+
+    response = client.get(
+        "/openapi.json", headers={**headers, "If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 304
+
+    assert client.get("/docs", headers=headers).status_code == 200
+
+
 def test_profile_creation_with_max_auth(client: TestClient, clean_db):
     """Test profile creation with valid Max authorization."""
     user_id = 123456789
@@ -0,0 +1,120 @@
+"""
+Metrics tests
+Tests for the metrics registry, multiprocess aggregation and the metrics endpoint.
+"""
+
+# --------------------------------------------------------------------------------
+
+import json
+
+from fastapi.testclient import TestClient
+
+from ..core.config import settings
+from ..core.metrics import MetricsRegistry
+from .conftest import create_test_init_data
+
+# --------------------------------------------------------------------------------
+
+
+def test_registry_aggregates_worker_snapshots(tmp_path) -> None:
+    """
+    Test that counters and histograms from other (even exited) workers are summed
+    while gauges of exited workers are dropped.
+    Returns:
+        None
+    """
+    registry = MetricsRegistry(str(tmp_path), flush_interval=3600)
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    in_flight = registry.gauge("in_flight", "In flight")
+
+    requests.inc(("/a",))
+    latency.observe(0.05)
+    latency.observe(5.0)
+    in_flight.inc()
+
+    # Snapshot left behind by an exited worker (PIDs are never this large)
+    (tmp_path / "999999999.json").write_text(
+        json.dumps(
+            {
+                "requests_total": {'["/a"]': 2.0},
+                "latency_seconds": {"[]": [0, 1, 0.5, 1]},
+                "in_flight": {"[]": 7.0},
+            }
+        )
+    )
+
+    text = registry.render()
+    assert 'requests_total{route="/a"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert "in_flight 1" in text
+
+
+def test_exited_worker_snapshots_are_folded(tmp_path) -> None:
+    """
+    Test that the snapshot of an exited worker is folded into the exited-workers
+    file, so its counters survive and its PID can be reused.
+    Returns:
+        None
+    """
+    registry = MetricsRegistry(str(tmp_path), flush_interval=3600)
+    registry.counter("requests_total", "Requests", ("route",))
+    registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    registry.gauge("in_flight", "In flight")
+
+    for _ in range(2):
+        # The same PID exits twice (a recycled worker whose PID was reused)
+        (tmp_path / "999999999.json").write_text(
+            json.dumps(
+                {
+                    "requests_total": {'["/a"]': 2.0},
+                    "latency_seconds": {"[]": [1, 0, 0.05, 1]},
+                    "in_flight": {"[]": 7.0},
+                }
+            )
+        )
+        registry.mark_process_dead(999999999)
+
+    assert [path.name for path in tmp_path.glob("*.json")] == ["exited.json"]
+
+    text = registry.render()
+    assert 'requests_total{route="/a"} 4' in text
+    assert "latency_seconds_count 2" in text
+    assert "in_flight 7" not in text
+
+
+# --------------------------------------------------------------------------------
+
+
+def test_metrics_endpoint_reports_route_templates(
+    client: TestClient, clean_db, monkeypatch
+) -> None:
+    """
+    Test that the metrics endpoint is protected and labels requests by route template.
+    Returns:
+        None
+    """
+    init_data = create_test_init_data(123456789, settings.BOT_TOKEN)
+    client.get(
+        f"{settings.API_VERSION}/profiles/missing-profile",
+        headers={"Authorization": f"tma {init_data}"},
+    )
+
+    # Disabled without a token
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert client.get("/internal/metrics").status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "secret")
+    assert client.get("/internal/metrics").status_code == 401
+    response = client.get("/internal/metrics", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    text = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'route="/v1/profiles/{profile_id}",status="404"' in text
+    assert "missing-profile" not in text
+    assert "http_requests_in_flight" in text
@@ -0,0 +1,187 @@
+"""
+Middleware tests
+Tests for request logging: body preview capture, access log sampling, context and
+per-request query accounting.
+"""
+
+# --------------------------------------------------------------------------------
+
+import json
+import logging
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from ..core.log_config import CustomFormatter, RequestContextFilter, logger
+from ..core.middleware import RequestLoggingMiddleware
+from ..core.query_stats import instrument_engine
+
+# --------------------------------------------------------------------------------
+
+
+def _make_client(**options) -> TestClient:
+    """
+    Build a test client for an echo app wrapped in RequestLoggingMiddleware.
+
+    Returns:
+        TestClient: Test client.
+    """
+    app = FastAPI()
+
+    @app.post("/{path:path}")
+    async def echo(request: Request) -> dict:
+        body = await request.body()
+        return {"size": len(body), "request_id": request.state.request_id}
+
+    app.add_middleware(RequestLoggingMiddleware, **options)
+    return TestClient(app)
+
+
+def _previews(caplog) -> list:
+    """Collect body previews from completed request log records."""
+    return [
+        getattr(record, "body_preview", None)
+        for record in caplog.records
+        if record.getMessage().startswith("Request completed")
+    ]
+
+
+# --------------------------------------------------------------------------------
+
+
+def test_body_preview_is_teed_and_truncated(caplog) -> None:
+    """
+    Test that JSON bodies are previewed up to the limit and reach the endpoint intact.
+    Returns:
+        None
+    """
+    client = _make_client(preview_bytes=10, sample_rate=1.0, route_rules={})
+    payload = '{"title": "' + "x" * 100 + '"}'
+
+    with caplog.at_level(logging.INFO):
+        response = client.post(
+            "/events",
+            content=payload,
+            headers={"Content-Type": "application/json", "X-Request-Id": "req-1"},
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {"size": len(payload), "request_id": "req-1"}
+    assert response.headers["X-Request-Id"] == "req-1"
+    assert _previews(caplog) == [payload[:10] + "..."]
+
+
+def test_body_preview_skips_multipart_and_disabled_routes(caplog) -> None:
+    """
+    Test that multipart uploads and routes with a zero limit are never previewed.
+    Returns:
+        None
+    """
+    client = _make_client(
+        preview_bytes=1000, sample_rate=1.0, route_rules={"/v1/private/": (0, 1.0)}
+    )
+
+    with caplog.at_level(logging.INFO):
+        upload = client.post("/v1/files/upload", files={"file": ("a.bin", b"\x00" * 2048)})
+        private = client.post(
+            "/v1/private/token",
+            content='{"secret": 1}',
+            headers={"Content-Type": "application/json"},
+        )
+
+    assert upload.status_code == 200 and upload.json()["size"] > 2048
+    assert private.status_code == 200
+    assert _previews(caplog) == [None, None]
+
+
+# --------------------------------------------------------------------------------
+
+
+def test_access_log_sampling_and_request_context(caplog) -> None:
+    """
+    Test that unsampled routes skip access lines and that records emitted inside
+    a request carry the bound request_id.
+    Returns:
+        None
+    """
+    app = FastAPI()
+
+    @app.post("/hot")
+    async def hot() -> dict:
+        logger.info("Inside hot endpoint")
+        return {}
+
+    @app.post("/boom")
+    async def boom() -> dict:
+        raise RuntimeError("boom")
+
+    app.add_middleware(
+        RequestLoggingMiddleware,
+        access_log_sample_rate=1.0,
+        access_log_routes={"/hot": 0.0, "/boom": 0.0},
+    )
+    client = TestClient(app, raise_server_exceptions=False)
+    caplog.handler.addFilter(RequestContextFilter())
+
+    with caplog.at_level(logging.INFO):
+        assert client.post("/hot", headers={"X-Request-Id": "hot-1"}).status_code == 200
+        assert client.post("/boom", headers={"X-Request-Id": "boom-1"}).status_code == 500
+
+    messages = [
+        (record.getMessage(), getattr(record, "request_id", None)) for record in caplog.records
+    ]
+    assert ("Inside hot endpoint", "hot-1") in messages
+    assert not any(message.startswith("Request") and rid == "hot-1" for message, rid in messages)
+    # Failures are logged even on unsampled routes
+    assert ("Request failed", "boom-1") in messages
+
+    # The JSON formatter renders the structured fields
+    record = next(r for r in caplog.records if r.getMessage() == "Request failed")
+    entry = json.loads(CustomFormatter().format(record))
+    assert entry["request_id"] == "boom-1"
+    assert entry["error"] == "boom"
+    assert "RuntimeError" in entry["exc_info"]
+
+
+# --------------------------------------------------------------------------------
+
+
+def test_query_stats_and_n_plus_one_warning(caplog) -> None:
+    """
+    Test that statements are counted per request, exposed via Server-Timing and
+    the completed log line, and that repeated shapes are reported with the route.
+    Returns:
+        None
+    """
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int) -> dict:
+        with engine.connect() as connection:
+            for i in range(item_id):
+                connection.execute(text("SELECT :value"), {"value": i})
+            connection.execute(text("SELECT 1 WHERE 1 IN (:a, :b)"), {"a": 1, "b": 2})
+        return {}
+
+    app.add_middleware(RequestLoggingMiddleware, query_stats=True, n_plus_one_threshold=5)
+    client = TestClient(app)
+
+    with caplog.at_level(logging.INFO):
+        few = client.get("/items/2")
+        many = client.get("/items/6")
+
+    assert 'desc="3 queries"' in few.headers["Server-Timing"]
+    assert 'desc="7 queries"' in many.headers["Server-Timing"]
+
+    completed = [r for r in caplog.records if r.getMessage() == "Request completed"]
+    assert [r.db_queries for r in completed] == [3, 7]
+    assert all(r.db_time >= 0 for r in completed)
+
+    warnings = [r for r in caplog.records if r.getMessage() == "Probable N+1 query"]
+    assert len(warnings) == 1
+    assert warnings[0].route == "GET /items/{item_id}"
+    assert warnings[0].statement_count == 6
+    assert warnings[0].statement == "SELECT ?"
@@ -0,0 +1,89 @@
+"""
+Profiler tests
+Tests for on-demand request profiling, profile rotation and retrieval.
+"""
+
+# --------------------------------------------------------------------------------
+
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from ..api import internal
+from ..core.config import settings
+from ..core.middleware import ProfilerMiddleware
+from ..core.profiler import ProfileStore
+
+# --------------------------------------------------------------------------------
+
+
+def busy_endpoint_work(seconds: float) -> int:
+    """Spin on the CPU so the sampler sees this frame."""
+    deadline = time.perf_counter() + seconds
+    iterations = 0
+    while time.perf_counter() < deadline:
+        iterations += 1
+    return iterations
+
+
+def test_profiler_header_trigger_and_rotation(tmp_path) -> None:
+    """
+    Test that only requests with the privileged header are profiled, that the
+    profile contains the endpoint frames and that old profiles are rotated out.
+    Returns:
+        None
+    """
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+    app = FastAPI()
+
+    @app.get("/slow")
+    def slow() -> dict:
+        return {"iterations": busy_endpoint_work(0.05)}
+
+    app.add_middleware(
+        ProfilerMiddleware, token="secret", route_rates={}, interval=0.001, store=store
+    )
+    client = TestClient(app)
+
+    assert "X-Profile-Id" not in client.get("/slow").headers
+    assert "X-Profile-Id" not in client.get("/slow", headers={"X-Profile": "wrong"}).headers
+
+    profile_ids = [
+        client.get("/slow", headers={"X-Profile": "secret"}).headers["X-Profile-Id"]
+        for _ in range(3)
+    ]
+
+    stored = [profile["id"] for profile in store.list_profiles()]
+    assert len(stored) == 2 and profile_ids[0] not in stored
+
+    profile = store.get(profile_ids[-1])
+    assert "busy_endpoint_work" in profile
+    # Collapsed stack format: "frame;frame;... <count>"
+    stack, count = profile.splitlines()[0].rsplit(" ", 1)
+    assert ";" in stack and int(count) > 0
+
+
+def test_profiles_endpoint_requires_token(client: TestClient, monkeypatch, tmp_path) -> None:
+    """
+    Test that stored profiles are served to holders of the profiler token only.
+    Returns:
+        None
+    """
+    store = ProfileStore(str(tmp_path), max_profiles=10)
+    store.save("0" * 32, "main;handler 3\n")
+    monkeypatch.setattr(internal, "profile_store", store)
+
+    monkeypatch.setattr(settings, "PROFILER_TOKEN", "")
+    assert client.get("/internal/profiles/" + "0" * 32).status_code == 404
+
+    monkeypatch.setattr(settings, "PROFILER_TOKEN", "secret")
+    headers = {"Authorization": "Bearer secret"}
+    assert (
+        client.get("/internal/profiles", headers={"Authorization": "Bearer x"}).status_code == 401
+    )
+    assert [p["id"] for p in client.get("/internal/profiles", headers=headers).json()] == ["0" * 32]
+
+    response = client.get("/internal/profiles/" + "0" * 32, headers=headers)
+    assert response.status_code == 200 and response.text == "main;handler 3\n"
+    assert client.get("/internal/profiles/../secret", headers=headers).status_code == 404
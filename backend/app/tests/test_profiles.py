@@ -616,3 +616,100 @@ def test_patch_profile_not_found(client: TestClient, clean_db) -> None:
         headers={"Authorization": f"tma {init_data}"},
     )
     assert response.status_code == 404, response.text
+
+
+# --------------------------------------------------------------------------------
+
+
+def test_get_profile_cached_until_update(client: TestClient, clean_db) -> None:
+    """
+    Test that profile reads are served from the response cache and that an
+    update invalidates the cached body.
+    Args:
+        client (TestClient): FastAPI test client.
+    Returns:
+        None
+    """
+    user_id = 777888999
+    init_data = create_test_init_data(user_id, settings.BOT_TOKEN)
+    headers = {"Authorization": f"tma {init_data}"}
+
+    payload = {
+        "first_name": "Cache",
+        "last_name": "Reader",
+        "gender": "F",
+        "birth_date": "1998-03-10",
+        "avatar": None,
+        "university": "HSE University",
+        "bio": "Before update.",
+        "max_id": user_id,
+        "invited_by": None,
+    }
+    create_response = client.post(
+        f"{settings.API_VERSION}/profiles/", json=payload, headers=headers
+    )
+    assert create_response.status_code == 201, create_response.text
+    profile_id = create_response.json()["id"]
+
+    first = client.get(f"{settings.API_VERSION}/profiles/{profile_id}", headers=headers)
+    assert first.status_code == 200, first.text
+    assert first.headers["X-Cache"] == "MISS"
+
+    second = client.get(f"{settings.API_VERSION}/profiles/{profile_id}", headers=headers)
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+
+    # Update invalidates the cached body
+    patch_response = client.patch(
+        f"{settings.API_VERSION}/profiles/", json={"bio": "After update."}, headers=headers
+    )
+    assert patch_response.status_code == 200, patch_response.text
+
+    third = client.get(f"{settings.API_VERSION}/profiles/{profile_id}", headers=headers)
+    assert third.headers["X-Cache"] == "MISS"
+    assert third.json()["bio"] == "After update."
+
+    # Missing profiles are not cached
+    for _ in range(2):
+        missing = client.get(f"{settings.API_VERSION}/profiles/missing-id", headers=headers)
+        assert missing.status_code == 404
+
+
+# --------------------------------------------------------------------------------
+
+
+def test_profile_responses_render_every_schema_field(client: TestClient, clean_db) -> None:
+    """
+    Test that profiles serialized from ORM objects (bypassing FastAPI's response
+    validation) still render every field of the Profile schema.
+    Args:
+        client (TestClient): FastAPI test client.
+    Returns:
+        None
+    """
+    from ..schemas.profiles import Profile
+
+    user_id = 555666777
+    init_data = create_test_init_data(user_id, settings.BOT_TOKEN)
+    headers = {"Authorization": f"tma {init_data}"}
+
+    payload = {
+        "first_name": "Single",
+        "last_name": "Path",
+        "gender": "M",
+        "birth_date": "1997-07-07",
+        "university": "HSE University",
+    }
+    create_response = client.post(
+        f"{settings.API_VERSION}/profiles/", json=payload, headers=headers
+    )
+    assert create_response.status_code == 201, create_response.text
+    assert create_response.headers["content-type"] == "application/json"
+
+    for url in ("/profiles/my", f"/profiles/{create_response.json()['id']}"):
+        response = client.get(f"{settings.API_VERSION}{url}", headers=headers)
+        assert response.status_code == 200, response.text
+        data = response.json()
+        assert set(data) == set(Profile.model_fields)
+        assert data["avatar_url"] is None
+        assert data["is_superuser"] is False
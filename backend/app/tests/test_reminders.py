@@ -0,0 +1,252 @@
+"""
+Reminder Tests
+Test cases for the event reminder scheduler and the bot sender.
+"""
+
+# --------------------------------------------------------------------------------
+
+import asyncio
+import json
+import threading
+import urllib.parse
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from uuid import uuid4
+
+import pytest
+
+from ..core.bot import BotSender
+from ..db.models import Event, EventParticipation, EventReminder, Profile
+from ..db.session import SessionLocal
+from ..tasks import reminders
+from ..tasks.reminders import dispatch_reminders, in_send_hours
+
+# --------------------------------------------------------------------------------
+
+
+def start_bot_api(responses: dict[int, list[int]]):
+    """
+    Start a local stub of the bot API.
+
+    Args:
+        responses (dict[int, list[int]]): Status codes to answer, in turn, per
+            recipient; 200 once they run out.
+
+    Returns:
+        tuple: Server and the list of received requests.
+    """
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            user_id = int(query["user_id"][0])
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            received.append((user_id, self.headers["Authorization"], body["text"]))
+            queued = responses.get(user_id, [])
+            status = queued.pop(0) if queued else 200
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, received
+
+
+def dispatch(base_url: str, now: datetime, **options) -> dict[str, int]:
+    """Run one scheduler pass through a new sender, closed afterwards."""
+
+    async def run() -> dict[str, int]:
+        sender = BotSender(token="bot-token", base_url=base_url, rate=100, backoff=0, **options)
+        try:
+            return await dispatch_reminders(sender, now=now)
+        finally:
+            await sender.close()
+
+    return asyncio.run(run())
+
+
+def create_profile(db, max_id: int) -> Profile:
+    profile = Profile(id=str(uuid4()), first_name="Test", last_name="User", max_id=max_id)
+    db.add(profile)
+    return profile
+
+
+def create_event(db, creator: Profile, start_date: date, participants: list[Profile]) -> Event:
+    event = Event(
+        title="Reminder test",
+        body="Body",
+        place="Main hall",
+        start_date=start_date,
+        end_date=start_date,
+        creator=creator.id,
+    )
+    db.add(event)
+    db.flush()
+    db.add(EventParticipation(user_id=creator.id, event_id=event.id, participation_type="C"))
+    for profile in participants:
+        db.add(EventParticipation(user_id=profile.id, event_id=event.id, participation_type="P"))
+    return event
+
+
+def delete_events(creator_id: str) -> None:
+    """Delete the events of a creator with their participations and reminders."""
+    db = SessionLocal()
+    event_ids = [event_id for (event_id,) in db.query(Event.id).filter(Event.creator == creator_id)]
+    participations = db.query(EventParticipation.id).filter(
+        EventParticipation.event_id.in_(event_ids)
+    )
+    db.query(EventReminder).filter(EventReminder.participation_id.in_(participations)).delete()
+    db.query(EventParticipation).filter(EventParticipation.event_id.in_(event_ids)).delete()
+    db.query(Event).filter(Event.id.in_(event_ids)).delete()
+    db.commit()
+    db.close()
+
+
+# --------------------------------------------------------------------------------
+
+
+def test_dispatch_reminders_sends_once_and_records_outcomes(clean_db) -> None:
+    """
+    Test that participants of upcoming events are reminded once, transient
+    errors are retried and permanent ones recorded.
+    """
+    now = datetime.combine(date.today(), datetime.min.time()).replace(hour=12)
+    db = SessionLocal()
+    creator = create_profile(db, 9100)
+    delivered = create_profile(db, 9101)
+    throttled = create_profile(db, 9102)
+    blocked = create_profile(db, 9103)
+    later = create_profile(db, 9104)
+    create_event(db, creator, now.date() + timedelta(days=1), [delivered, throttled])
+    create_event(db, creator, now.date(), [blocked])
+    create_event(db, creator, now.date() + timedelta(days=7), [later])
+    db.commit()
+    creator_id = creator.id
+    db.close()
+
+    server, received = start_bot_api({9102: [429], 9103: [403]})
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        totals = dispatch(base_url, now)
+        assert totals["enqueued"] >= 3
+        assert (totals["sent"], totals["retried"], totals["failed"]) == (2, 0, 1)
+
+        # The throttled request was retried; the creator and later events were skipped
+        assert sorted(user_id for user_id, _, _ in received) == [9101, 9102, 9102, 9103]
+        assert {token for _, token, _ in received} == {"bot-token"}
+        text = next(text for user_id, _, text in received if user_id == 9101)
+        assert "Reminder test" in text
+        assert (now.date() + timedelta(days=1)).strftime("%d.%m.%Y") in text
+        assert "Main hall" in text
+
+        db = SessionLocal()
+        statuses = {
+            max_id: (status, last_error)
+            for max_id, status, last_error in db.query(
+                Profile.max_id, EventReminder.status, EventReminder.last_error
+            )
+            .join(EventParticipation, EventParticipation.user_id == Profile.id)
+            .join(EventReminder, EventReminder.participation_id == EventParticipation.id)
+        }
+        db.close()
+        assert statuses[9101] == ("S", None)
+        assert statuses[9102] == ("S", None)
+        assert statuses[9103][0] == "F"
+        assert "403" in statuses[9103][1]
+
+        # A second pass enqueues and sends nothing
+        received.clear()
+        totals = dispatch(base_url, now + timedelta(minutes=5))
+        assert totals == {"enqueued": 0, "sent": 0, "retried": 0, "failed": 0}
+        assert received == []
+    finally:
+        server.shutdown()
+        server.server_close()
+        delete_events(creator_id)
+
+
+def test_dispatch_reminders_retries_transient_errors_later(clean_db) -> None:
+    """
+    Test that a reminder failing with server errors is retried by later passes
+    and given up after the maximum number of attempts.
+    """
+    now = datetime.combine(date.today(), datetime.min.time()).replace(hour=12)
+    db = SessionLocal()
+    creator = create_profile(db, 9200)
+    participant = create_profile(db, 9201)
+    create_event(db, creator, now.date() + timedelta(days=1), [participant])
+    db.commit()
+    creator_id, participant_id = creator.id, participant.id
+    db.close()
+
+    server, received = start_bot_api({9201: [500] * 100})
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        totals = dispatch(base_url, now, retries=0)
+        assert totals["retried"] == 1
+        assert len(received) == 1
+
+        # Not due again until the retry delay passes
+        totals = dispatch(base_url, now + timedelta(minutes=1), retries=0)
+        assert totals["retried"] == 0
+        assert len(received) == 1
+
+        passes = 1
+        while totals["failed"] == 0:
+            now += timedelta(minutes=20)
+            totals = dispatch(base_url, now, retries=0)
+            passes += 1
+            assert passes <= 10
+        db = SessionLocal()
+        reminder = (
+            db.query(EventReminder)
+            .join(EventParticipation, EventParticipation.id == EventReminder.participation_id)
+            .filter(EventParticipation.user_id == participant_id)
+            .one()
+        )
+        db.close()
+        assert reminder.status == "F"
+        assert reminder.attempts == passes == len(received)
+    finally:
+        server.shutdown()
+        server.server_close()
+        delete_events(creator_id)
+
+
+def test_reminders_only_go_out_in_send_hours() -> None:
+    """
+    Test that no reminders are sent at night.
+    """
+    today = datetime.combine(date.today(), datetime.min.time())
+    assert not in_send_hours(today.replace(hour=3))
+    assert in_send_hours(today.replace(hour=12))
+    assert not in_send_hours(today.replace(hour=23))
+
+
+def test_scheduler_passes_need_the_lock(monkeypatch) -> None:
+    """
+    Test that a worker runs no pass while another worker holds the scheduler
+    lock.
+    """
+    passes = []
+
+    async def dispatch_stub(sender: BotSender) -> dict[str, int]:
+        passes.append(sender)
+        return {"enqueued": 0, "sent": 0, "retried": 0, "failed": 0}
+
+    monkeypatch.setattr(reminders, "dispatch_reminders", dispatch_stub)
+    for locked in (False, True):
+        monkeypatch.setattr(
+            reminders, "try_advisory_lock", lambda connection, key, locked=locked: locked
+        )
+        with pytest.raises(TimeoutError):
+            asyncio.run(asyncio.wait_for(reminders.run_reminder_scheduler(3600), timeout=0.2))
+    assert len(passes) == 1
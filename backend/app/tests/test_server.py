@@ -0,0 +1,79 @@
+"""
+Production server tests
+Tests for worker sizing from the CPU quota and fork-safe worker setup.
+"""
+
+# --------------------------------------------------------------------------------
+
+import os
+
+from .. import server
+from ..api.v1.endpoints import files
+from ..core.config import settings
+
+# --------------------------------------------------------------------------------
+
+
+def test_worker_count_follows_cpu_quota(tmp_path, monkeypatch) -> None:
+    """
+    Test that the container's cgroup CPU quota caps the worker count and that
+    GUNICORN_WORKERS overrides it.
+    Returns:
+        None
+    """
+    cpu_max = tmp_path / "cpu.max"
+    monkeypatch.setattr(server, "CGROUP_V2_CPU_MAX", cpu_max)
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(16)), raising=False)
+    monkeypatch.setattr(settings, "GUNICORN_WORKERS", 0)
+
+    cpu_max.write_text("150000 100000\n")
+    assert server.cpu_limit() == 1.5
+    assert server.worker_count() == 2
+
+    cpu_max.write_text("max 100000\n")
+    assert server.worker_count() == 16
+
+    # No cgroup files at all: the CPUs the process may run on
+    monkeypatch.setattr(server, "CGROUP_V2_CPU_MAX", tmp_path / "missing")
+    monkeypatch.setattr(server, "CGROUP_V1_CPU_QUOTA", tmp_path / "missing")
+    assert server.worker_count() == 16
+
+    monkeypatch.setattr(settings, "GUNICORN_WORKERS", 3)
+    assert server.worker_count() == 3
+
+    options = server.server_options()
+    assert options["preload_app"] is True
+    assert options["workers"] == 3
+    assert options["max_requests_jitter"] == settings.GUNICORN_MAX_REQUESTS_JITTER
+
+
+def test_post_fork_drops_inherited_resources(monkeypatch) -> None:
+    """
+    Test that a new worker forgets the master's pooled connections and S3 client.
+    Returns:
+        None
+    """
+    from ..core import log_config
+    from ..db.session import engine
+
+    # The test process has a live listener thread; a forked worker would not
+    restarted = []
+    monkeypatch.setattr(log_config, "restart_logging_after_fork", lambda: restarted.append(True))
+    disposed = []
+    monkeypatch.setattr(engine, "dispose", lambda close=True: disposed.append(close))
+    created = []
+    monkeypatch.setattr(
+        files, "create_s3_client", lambda **kwargs: created.append(kwargs) or object()
+    )
+    files.reset_s3_client()
+
+    first = files.get_s3_client()
+    assert files.get_s3_client() is first
+
+    server.post_fork(None, None)
+
+    assert restarted == [True]
+    assert disposed == [False]
+    assert files.get_s3_client() is not first
+    assert len(created) == 2
+    files.reset_s3_client()
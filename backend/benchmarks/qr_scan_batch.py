@@ -0,0 +1,228 @@
+"""
+QR Scan Batch Benchmark
+Measures check-in throughput of batch scan ingestion against one request per scan.
+
+Usage:
+    python -m benchmarks.qr_scan_batch --scans 2000 --batch-size 200
+
+Runs the database work of both paths in-process. The single-scan path is what
+`POST /events/scan_qr` costs per scan: a participation lookup, an insert and a
+commit. The batch path is `POST /events/scan_qr/batch`: one validation query and
+one multi-row insert per batch. By default a temporary SQLite file is used;
+pass --database-url to run against a scratch PostgreSQL database (the tables are
+created if missing and the benchmark's rows are deleted afterwards).
+"""
+
+# --------------------------------------------------------------------------------
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.base_class import Base
+from app.db.crud import qr_scans as crud_qr_scans
+from app.db.models import Event, EventParticipation, Profile, QRScan
+
+# --------------------------------------------------------------------------------
+
+SCANNER_ID = 1
+
+
+def seed(db: Session, participations: int) -> tuple[str, list[str], list[str]]:
+    """
+    Create an event with participants, split between the two paths.
+
+    Args:
+        db (Session): Database session.
+        participations (int): Participations per path.
+
+    Returns:
+        tuple[str, list[str], list[str]]: Event ID, participation IDs of the
+        single-scan path and of the batch path.
+    """
+    profile_ids = [str(uuid.uuid4()) for _ in range(2 * participations)]
+    event_id = str(uuid.uuid4())
+    db.execute(
+        insert(Profile),
+        [
+            {"id": profile_id, "first_name": "Bench", "last_name": str(i), "max_id": i}
+            for i, profile_id in enumerate(profile_ids)
+        ],
+    )
+    db.execute(
+        insert(Event),
+        [
+            {
+                "id": event_id,
+                "title": "Benchmark",
+                "body": "Gate check-in",
+                "start_date": date.today(),
+                "end_date": date.today(),
+                "creator": profile_ids[0],
+                "status": "A",
+            }
+        ],
+    )
+    participation_ids = [str(uuid.uuid4()) for _ in profile_ids]
+    db.execute(
+        insert(EventParticipation),
+        [
+            {
+                "id": participation_id,
+                "user_id": profile_id,
+                "event_id": event_id,
+                "participation_type": "P",
+            }
+            for participation_id, profile_id in zip(participation_ids, profile_ids, strict=True)
+        ],
+    )
+    db.commit()
+    return event_id, participation_ids[:participations], participation_ids[participations:]
+
+
+def cleanup(db: Session, event_id: str, participation_ids: list[str]) -> None:
+    """
+    Delete the benchmark's rows.
+
+    Args:
+        db (Session): Database session.
+        event_id (str): Benchmark event ID.
+        participation_ids (list[str]): All benchmark participation IDs.
+    """
+    profile_ids = db.scalars(
+        select(EventParticipation.user_id).where(EventParticipation.event_id == event_id)
+    ).all()
+    db.execute(delete(QRScan).where(QRScan.participation_id.in_(participation_ids)))
+    db.execute(delete(EventParticipation).where(EventParticipation.event_id == event_id))
+    db.execute(delete(Event).where(Event.id == event_id))
+    db.execute(delete(Profile).where(Profile.id.in_(profile_ids)))
+    db.commit()
+
+
+# --------------------------------------------------------------------------------
+
+
+def make_scans(participation_ids: list[str], repeat: float, seed: int) -> list[str]:
+    """
+    Build a scan stream in which a share of the participants is scanned twice.
+
+    Args:
+        participation_ids (list[str]): Scanned participations.
+        repeat (float): Share of scans that repeat an earlier one.
+        seed (int): Random seed.
+
+    Returns:
+        list[str]: Participation IDs in scan order.
+    """
+    rng = random.Random(seed)
+    scans = []
+    for participation_id in participation_ids:
+        scans.append(participation_id)
+        if rng.random() < repeat:
+            scans.append(participation_id)
+    return scans
+
+
+def single_path(db: Session, scans: list[str]) -> float:
+    """
+    Record scans one request at a time.
+
+    Args:
+        db (Session): Database session.
+        scans (list[str]): Participation IDs in scan order.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    started = time.perf_counter()
+    for participation_id in scans:
+        participation = (
+            db.query(EventParticipation).filter(EventParticipation.id == participation_id).first()
+        )
+        if participation is not None:
+            crud_qr_scans.create_qr_scan(db, participation_id, SCANNER_ID)
+    return time.perf_counter() - started
+
+
+def batch_path(db: Session, scans: list[str], batch_size: int) -> float:
+    """
+    Record scans in batches.
+
+    Args:
+        db (Session): Database session.
+        scans (list[str]): Participation IDs in scan order.
+        batch_size (int): Scans per batch.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    scanned_at = datetime.now() - timedelta(hours=1)
+    started = time.perf_counter()
+    for offset in range(0, len(scans), batch_size):
+        batch = [
+            (participation_id, scanned_at + timedelta(milliseconds=offset + index))
+            for index, participation_id in enumerate(scans[offset : offset + batch_size])
+        ]
+        crud_qr_scans.create_qr_scan_batch(db, batch, SCANNER_ID)
+    return time.perf_counter() - started
+
+
+# --------------------------------------------------------------------------------
+
+
+def main() -> int:
+    """
+    Run the benchmark and print the throughput of both paths.
+
+    Returns:
+        int: Process exit code (1 if batching is not faster).
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--database-url", default=None, help="scratch database (default SQLite)")
+    parser.add_argument("--scans", type=int, default=2000, help="participants scanned per path")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--repeat", type=float, default=0.1, help="share of repeated scans")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            event_id, single_ids, batch_ids = seed(db, args.scans)
+            try:
+                single_scans = make_scans(single_ids, args.repeat, args.seed)
+                batch_scans = make_scans(batch_ids, args.repeat, args.seed)
+                single_seconds = single_path(db, single_scans)
+                batch_seconds = batch_path(db, batch_scans, args.batch_size)
+            finally:
+                cleanup(db, event_id, single_ids + batch_ids)
+        engine.dispose()
+
+    print(f"database={engine.dialect.name} scans={len(single_scans)} batch={args.batch_size}")
+    print(f"{'path':<20}{'seconds':>10}{'scans/s':>12}")
+    for name, scans, seconds in [
+        ("single (before)", single_scans, single_seconds),
+        ("batch (after)", batch_scans, batch_seconds),
+    ]:
+        print(f"{name:<20}{seconds:>10.3f}{len(scans) / seconds:>12.0f}")
+
+    if batch_seconds >= single_seconds:
+        print("FAIL: batch ingestion is not faster", file=sys.stderr)
+        return 1
+    return 0
+
+
+# --------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Serialization Benchmark
+Measures the time to serialize a 100-event page through the single serialization
+path, compared to the previous build, re-validate and encode path.
+
+Usage:
+    python -m benchmarks.serialization --events 100 --rounds 200
+
+Runs in-process on ORM-like objects; no database is needed. The previous path
+is reproduced as FastAPI runs it for a returned model with `response_model`:
+dump the model to a dict, validate the dict against the response field, make it
+JSON-compatible with `jsonable_encoder` and encode it with `json.dumps`.
+"""
+
+# --------------------------------------------------------------------------------
+
+import argparse
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.config import ALL_TAGS
+from app.core.serialization import json_response
+from app.schemas.events import Event, EventListResponse, EventWithParticipation
+
+# --------------------------------------------------------------------------------
+
+
+def make_events(count: int) -> list[SimpleNamespace]:
+    """
+    Build ORM-like events with every field of the Event schema set.
+
+    Args:
+        count (int): Number of events.
+
+    Returns:
+        list[SimpleNamespace]: Events.
+    """
+    start = date(2025, 9, 1)
+    created = datetime(2025, 8, 1, 12, 0)
+    return [
+        SimpleNamespace(
+            id=f"00000000-0000-4000-8000-{index:012d}",
+            title=f"Событие {index}",
+            body="Описание события " * 10,
+            photo=f"10000000-0000-4000-8000-{index:012d}",
+            photo_url=f"https://cdn.example.com/files/{index}.jpg",
+            tags=ALL_TAGS[index % len(ALL_TAGS) : index % len(ALL_TAGS) + 3],
+            place=f"Площадка {index % 50}",
+            start_date=start + timedelta(days=index),
+            end_date=start + timedelta(days=index + 1),
+            max_participants=100,
+            registration_start_date=created,
+            registration_end_date=created + timedelta(days=30),
+            status="A",
+            creator=f"20000000-0000-4000-8000-{index:012d}",
+            participants=index,
+            is_registration_available=True,
+            created_at=created + timedelta(minutes=index),
+            updated_at=None,
+        )
+        for index in range(count)
+    ]
+
+
+def build_page(events: list[SimpleNamespace]) -> EventListResponse:
+    """
+    Build the response model of a page as the endpoints do: each event is
+    validated once from its ORM object.
+
+    Args:
+        events (list[SimpleNamespace]): ORM-like events.
+
+    Returns:
+        EventListResponse: Page.
+    """
+    return EventListResponse(
+        events=[
+            EventWithParticipation(
+                event=Event.model_validate(event, from_attributes=True),
+                friends_going=3,
+                friends_of_friends_going=7,
+                participation_type="V",
+            )
+            for event in events
+        ],
+        total=len(events),
+        has_more=False,
+    )
+
+
+# --------------------------------------------------------------------------------
+
+
+def previous_path(events: list[SimpleNamespace], field: TypeAdapter) -> bytes:
+    """Build, dump to dict, re-validate, make JSON-compatible and encode."""
+    content = build_page(events).model_dump()
+    value = field.validate_python(content)
+    return json.dumps(
+        jsonable_encoder(field.dump_python(value)),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def single_path(events: list[SimpleNamespace], _field: TypeAdapter) -> bytes:
+    """Build once and encode with the precompiled adapter."""
+    return json_response(EventListResponse, build_page(events)).body
+
+
+def measure(serialize, events: list[SimpleNamespace], rounds: int) -> dict:
+    """
+    Serialize the page repeatedly.
+
+    Args:
+        serialize: Serialization path.
+        events (list[SimpleNamespace]): ORM-like events.
+        rounds (int): Number of repetitions.
+
+    Returns:
+        dict: Median and mean milliseconds per page, and the last body.
+    """
+    field = TypeAdapter(EventListResponse)
+    timings = []
+    body = b""
+    for _ in range(rounds):
+        started = time.perf_counter()
+        body = serialize(events, field)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "median_ms": timings[len(timings) // 2],
+        "mean_ms": sum(timings) / len(timings),
+        "body": body,
+    }
+
+
+# --------------------------------------------------------------------------------
+
+
+def main() -> int:
+    """
+    Run the benchmark and print a comparison table.
+
+    Returns:
+        int: Process exit code (1 if bodies differ or the single path is slower).
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--events", type=int, default=100, help="events per page")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    events = make_events(args.events)
+
+    results = {
+        "re-validate (before)": measure(previous_path, events, args.rounds),
+        "single path (after)": measure(single_path, events, args.rounds),
+    }
+
+    print(f"events={args.events} rounds={args.rounds}")
+    print(f"{'path':<22}{'median ms':>12}{'mean ms':>12}{'bytes':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<22}{result['median_ms']:>12.2f}{result['mean_ms']:>12.2f}"
+            f"{len(result['body']):>10}"
+        )
+
+    before, after = results["re-validate (before)"], results["single path (after)"]
+    if json.loads(before["body"]) != json.loads(after["body"]):
+        print("FAIL: serialization paths render different bodies", file=sys.stderr)
+        return 1
+    if after["median_ms"] >= before["median_ms"]:
+        print("FAIL: single path is not faster", file=sys.stderr)
+        return 1
+    return 0
+
+
+# --------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Tag Filter Benchmark
+Measures the events tag-overlap filter with and without the GIN index on synthetic data
+and verifies via EXPLAIN that the indexed plan is actually chosen.
+
+Usage:
+    python -m benchmarks.tag_filter --rows 200000 --vocabulary 50
+
+Requires a PostgreSQL database (settings.DATABASE_URL or --database-url). All data is
+written to a temporary table and disappears with the connection.
+"""
+
+# --------------------------------------------------------------------------------
+
+import argparse
+import io
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import psycopg2
+
+from app.core.config import ALL_TAGS, settings
+
+# --------------------------------------------------------------------------------
+
+INDEX_NAME = "bench_events_tags_gin"
+
+PAGE_QUERY = (
+    "SELECT id FROM bench_events WHERE tags && %s::varchar[] ORDER BY created_at DESC LIMIT 21"
+)
+COUNT_QUERY = "SELECT count(*) FROM bench_events WHERE tags && %s::varchar[]"
+
+
+# --------------------------------------------------------------------------------
+
+
+def build_vocabulary(size: int) -> list[str]:
+    """
+    Build the tag vocabulary: real tags first, synthetic ones after.
+
+    Args:
+        size (int): Total number of tags.
+
+    Returns:
+        list[str]: Tag names ordered from most to least popular.
+    """
+    vocabulary = list(ALL_TAGS)
+    vocabulary.extend(f"tag_{i}" for i in range(max(0, size - len(vocabulary))))
+    return vocabulary[:size]
+
+
+def generate_rows(rows: int, vocabulary: list[str], seed: int) -> io.StringIO:
+    """
+    Generate synthetic events as a COPY text buffer.
+
+    Tag popularity follows a Zipf-like distribution, so the head tags match a large
+    share of events and the tail tags are selective.
+
+    Args:
+        rows (int): Number of events.
+        vocabulary (list[str]): Tag vocabulary.
+        seed (int): Random seed.
+
+    Returns:
+        io.StringIO: Tab-separated COPY payload.
+    """
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    start = datetime(2025, 1, 1)
+    buffer = io.StringIO()
+    for i in range(rows):
+        tags = set(rng.choices(vocabulary, weights=weights, k=rng.randint(0, 3)))
+        array = "{" + ",".join(f'"{tag}"' for tag in sorted(tags)) + "}"
+        created_at = start + timedelta(seconds=i * 60)
+        buffer.write(f"{i}\t{array}\t{created_at.isoformat()}\n")
+    buffer.seek(0)
+    return buffer
+
+
+# --------------------------------------------------------------------------------
+
+
+def plan_index_names(plan: dict) -> set[str]:
+    """
+    Collect index names used anywhere in an EXPLAIN (FORMAT JSON) plan tree.
+
+    Args:
+        plan (dict): Plan node.
+
+    Returns:
+        set[str]: Index names.
+    """
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= plan_index_names(child)
+    return names
+
+
+def explain(cursor, query: str, tags: list[str]) -> dict:
+    """
+    Run EXPLAIN ANALYZE for a query and return the root plan node.
+
+    Args:
+        cursor: psycopg2 cursor.
+        query (str): SQL query with a single array parameter.
+        tags (list[str]): Tags to filter by.
+
+    Returns:
+        dict: Root plan node including execution time.
+    """
+    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", (tags,))
+    result = cursor.fetchone()[0]
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]
+
+
+def time_query(cursor, query: str, tags: list[str], repeat: int) -> float:
+    """
+    Measure the median wall time of a query.
+
+    Args:
+        cursor: psycopg2 cursor.
+        query (str): SQL query with a single array parameter.
+        tags (list[str]): Tags to filter by.
+        repeat (int): Number of runs.
+
+    Returns:
+        float: Median time in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(query, (tags,))
+        cursor.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def measure(cursor, cases: dict[str, list[str]], repeat: int) -> dict[str, dict]:
+    """
+    Measure every case for both the page query and the count query.
+
+    Args:
+        cursor: psycopg2 cursor.
+        cases (dict[str, list[str]]): Case name to tag list.
+        repeat (int): Number of runs per query.
+
+    Returns:
+        dict[str, dict]: Timings and used indexes per case.
+    """
+    results = {}
+    for name, tags in cases.items():
+        plan = explain(cursor, COUNT_QUERY, tags)
+        results[name] = {
+            "page_ms": time_query(cursor, PAGE_QUERY, tags, repeat),
+            "count_ms": time_query(cursor, COUNT_QUERY, tags, repeat),
+            "indexes": plan_index_names(plan["Plan"]),
+        }
+    return results
+
+
+# --------------------------------------------------------------------------------
+
+
+def main() -> int:
+    """
+    Run the benchmark.
+
+    Returns:
+        int: Process exit code (1 if the selective query does not use the GIN index).
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--vocabulary", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    vocabulary = build_vocabulary(args.vocabulary)
+    cases = {
+        "common (1 head tag)": vocabulary[:1],
+        "mixed (head + tail)": [vocabulary[0], vocabulary[-1]],
+        "selective (2 tail tags)": vocabulary[-2:],
+    }
+
+    connection = psycopg2.connect(args.database_url)
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            "CREATE TEMP TABLE bench_events ("
+            "id varchar PRIMARY KEY, tags varchar[], created_at timestamp NOT NULL)"
+        )
+        cursor.copy_expert(
+            "COPY bench_events (id, tags, created_at) FROM STDIN",
+            generate_rows(args.rows, vocabulary, args.seed),
+        )
+        cursor.execute("ANALYZE bench_events")
+        before = measure(cursor, cases, args.repeat)
+
+        cursor.execute(f"CREATE INDEX {INDEX_NAME} ON bench_events USING gin (tags)")
+        cursor.execute("ANALYZE bench_events")
+        after = measure(cursor, cases, args.repeat)
+    finally:
+        connection.close()
+
+    print(f"rows={args.rows} vocabulary={args.vocabulary} repeat={args.repeat}")
+    print(f"{'case':<26}{'page ms':>18}{'count ms':>20}  gin used")
+    for name in cases:
+        print(
+            f"{name:<26}"
+            f"{before[name]['page_ms']:>8.2f} -> {after[name]['page_ms']:>6.2f}"
+            f"{before[name]['count_ms']:>10.2f} -> {after[name]['count_ms']:>6.2f}"
+            f"  {INDEX_NAME in after[name]['indexes']}"
+        )
+
+    if INDEX_NAME not in after["selective (2 tail tags)"]["indexes"]:
+        print("FAIL: selective tag filter does not use the GIN index", file=sys.stderr)
+        return 1
+    return 0
+
+
+# --------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Upload Memory Benchmark
+Measures peak Python memory while concurrent 10MB multipart uploads pass through
+the request logging middleware, compared to the previous body-buffering version.
+
+Usage:
+    python -m benchmarks.upload_memory --uploads 8 --size-mb 10
+
+Runs in-process against a minimal app with an UploadFile endpoint; no database,
+storage or network is needed. Memory is traced with tracemalloc.
+"""
+
+# --------------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from fastapi import FastAPI, File, Request, UploadFile
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.middleware import RequestLoggingMiddleware
+
+# --------------------------------------------------------------------------------
+
+BOUNDARY = "benchmarkboundary"
+CHUNK_SIZE = 64 * 1024
+
+
+class BufferingLoggingMiddleware(BaseHTTPMiddleware):
+    """Previous behavior: read the whole body to build a 1000-character preview."""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            body = await request.body()
+            request.state.body_preview = body[:1000].decode(errors="replace")
+        return await call_next(request)
+
+
+def build_app(middleware) -> FastAPI:
+    """
+    Build an app with an upload endpoint that streams the file in chunks.
+
+    Args:
+        middleware: Middleware class to install.
+
+    Returns:
+        FastAPI: Application.
+    """
+    app = FastAPI()
+
+    @app.post("/files/upload")
+    async def upload(file: UploadFile = File(...)) -> dict:
+        size = 0
+        while chunk := await file.read(CHUNK_SIZE):
+            size += len(chunk)
+        return {"size": size}
+
+    app.add_middleware(middleware)
+    return app
+
+
+# --------------------------------------------------------------------------------
+
+
+async def upload(app: FastAPI, size: int) -> int:
+    """
+    Send one multipart upload through the ASGI app, streaming it in chunks.
+
+    Args:
+        app (FastAPI): Application.
+        size (int): File size in bytes.
+
+    Returns:
+        int: Response status code.
+    """
+    head = (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="photo.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+    chunk = b"\xff" * CHUNK_SIZE
+    total = len(head) + size + len(tail)
+
+    async def chunks():
+        yield head
+        sent = 0
+        while sent < size:
+            yield chunk[: min(CHUNK_SIZE, size - sent)]
+            sent += CHUNK_SIZE
+        yield tail
+
+    stream = chunks()
+    pending = [await stream.__anext__()]
+
+    async def receive():
+        body = pending.pop() if pending else b""
+        try:
+            pending.append(await stream.__anext__())
+            more = True
+        except StopAsyncIteration:
+            more = False
+        await asyncio.sleep(0)
+        return {"type": "http.request", "body": body, "more_body": more}
+
+    status = 0
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/files/upload",
+        "raw_path": b"/files/upload",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode()),
+            (b"content-length", str(total).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(middleware, uploads: int, size: int) -> dict:
+    """
+    Run concurrent uploads and record peak traced memory.
+
+    Args:
+        middleware: Middleware class to install.
+        uploads (int): Number of concurrent uploads.
+        size (int): File size in bytes.
+
+    Returns:
+        dict: Peak memory in MB and wall time in seconds.
+    """
+    app = build_app(middleware)
+    tracemalloc.start()
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*(upload(app, size) for _ in range(uploads)))
+    elapsed = time.perf_counter() - started
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if set(statuses) != {200}:
+        raise RuntimeError(f"Unexpected statuses: {statuses}")
+    return {"peak_mb": peak / 2**20, "seconds": elapsed}
+
+
+# --------------------------------------------------------------------------------
+
+
+def main() -> int:
+    """
+    Run the benchmark and print a comparison table.
+
+    Returns:
+        int: Process exit code (1 if streaming does not beat buffering).
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--uploads", type=int, default=8, help="concurrent uploads")
+    parser.add_argument("--size-mb", type=int, default=10, help="file size in MB")
+    args = parser.parse_args()
+    size = args.size_mb * 2**20
+
+    results = {
+        "buffering (before)": asyncio.run(measure(BufferingLoggingMiddleware, args.uploads, size)),
+        "streaming (after)": asyncio.run(measure(RequestLoggingMiddleware, args.uploads, size)),
+    }
+
+    print(f"uploads={args.uploads} size={args.size_mb}MB")
+    print(f"{'middleware':<22}{'peak MB':>10}{'time s':>10}")
+    for name, result in results.items():
+        print(f"{name:<22}{result['peak_mb']:>10.1f}{result['seconds']:>10.2f}")
+
+    if results["streaming (after)"]["peak_mb"] >= results["buffering (before)"]["peak_mb"]:
+        print("FAIL: streaming middleware does not reduce peak memory", file=sys.stderr)
+        return 1
+    return 0
+
+
+# --------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    sys.exit(main())
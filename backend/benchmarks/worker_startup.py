@@ -0,0 +1,140 @@
+"""
+Worker Startup Benchmark
+Measures per-worker boot time (importing the app) and the cost of the first
+/openapi.json request, with the OpenAPI asset and lazy heavy imports compared
+to the previous eager behavior.
+
+Usage:
+    python -m benchmarks.worker_startup --runs 5
+
+Every sample runs in a fresh interpreter, like a gunicorn worker started
+without --preload. "before" imports boto3 and Pillow ahead of the app (as the
+S3 client and image modules used to) and generates the schema on the first
+request; "after" serves the asset written by `python -m app.core.openapi`.
+"""
+
+# --------------------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# --------------------------------------------------------------------------------
+
+HEAVY_MODULES = ("boto3", "PIL.Image")
+
+# Runs inside the fresh interpreter and prints one JSON line
+WORKER_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+for module in {eager!r}:
+    __import__(module)
+from app.main import app
+booted = time.perf_counter()
+from app.core.openapi import prepare_openapi
+prepare_openapi(app).gzipped
+served = time.perf_counter()
+print(json.dumps({{
+    "boot_ms": (booted - started) * 1000,
+    "openapi_ms": (served - booted) * 1000,
+    "heavy": [name for name in ("boto3", "PIL") if name in sys.modules],
+}}))
+"""
+
+
+def sample(eager: tuple[str, ...], asset_path: str) -> dict:
+    """
+    Boot one worker in a fresh interpreter.
+
+    Args:
+        eager (tuple[str, ...]): Modules imported before the app.
+        asset_path (str): OpenAPI asset path, empty to generate the schema.
+
+    Returns:
+        dict: Boot and first-schema times in ms and the heavy modules loaded.
+    """
+    env = {**os.environ, "OPENAPI_ASSET_PATH": asset_path, "BACKGROUND_TASKS_ENABLED": "false"}
+    result = subprocess.run(
+        [sys.executable, "-c", WORKER_SCRIPT.format(eager=eager)],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).resolve().parent.parent,
+        env=env,
+        text=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(eager: tuple[str, ...], asset_path: str, runs: int) -> dict:
+    """
+    Boot several workers and take the medians.
+
+    Args:
+        eager (tuple[str, ...]): Modules imported before the app.
+        asset_path (str): OpenAPI asset path, empty to generate the schema.
+        runs (int): Number of workers.
+
+    Returns:
+        dict: Median boot and first-schema times and the heavy modules loaded.
+    """
+    samples = [sample(eager, asset_path) for _ in range(runs)]
+    return {
+        "boot_ms": statistics.median(item["boot_ms"] for item in samples),
+        "openapi_ms": statistics.median(item["openapi_ms"] for item in samples),
+        "heavy": samples[-1]["heavy"],
+    }
+
+
+# --------------------------------------------------------------------------------
+
+
+def main() -> int:
+    """
+    Run the benchmark and print a comparison table.
+
+    Returns:
+        int: Process exit code (1 if the new boot is not faster).
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=5, help="fresh workers per variant")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        asset_path = str(Path(directory) / "openapi.json")
+        subprocess.run(
+            [sys.executable, "-m", "app.core.openapi", asset_path],
+            capture_output=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent.parent,
+        )
+        results = {
+            "eager, lazy schema (before)": measure(HEAVY_MODULES, "", args.runs),
+            "lazy, lazy schema": measure((), "", args.runs),
+            "lazy, asset (after)": measure((), asset_path, args.runs),
+        }
+
+    print(f"runs={args.runs} (medians)")
+    print(f"{'variant':<30}{'boot ms':>10}{'openapi ms':>12}{'total ms':>10}  heavy modules")
+    for name, result in results.items():
+        total = result["boot_ms"] + result["openapi_ms"]
+        print(
+            f"{name:<30}{result['boot_ms']:>10.0f}{result['openapi_ms']:>12.1f}{total:>10.0f}"
+            f"  {', '.join(result['heavy']) or '-'}"
+        )
+
+    before, after = results["eager, lazy schema (before)"], results["lazy, asset (after)"]
+    if after["boot_ms"] + after["openapi_ms"] >= before["boot_ms"] + before["openapi_ms"]:
+        print("FAIL: worker boot is not faster", file=sys.stderr)
+        return 1
+    return 0
+
+
+# --------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+"""
+Load Testing
+Seeded synthetic world and replayed mini-app sessions against a running backend.
+
+Usage:
+    python -m loadtest seed --profiles 10000 --events 2000
+    python -m loadtest generate --profiles 1000000 --events 100000 --participations 10
+    python -m loadtest run --base-url http://localhost:8000 --profiles 10000 --users 100
+"""
@@ -0,0 +1,148 @@
+"""
+Load Test CLI
+Seed or bulk-generate a synthetic world, or replay sessions against a running backend.
+"""
+
+# --------------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import sys
+import time
+
+from sqlalchemy import create_engine
+
+from app.core.config import settings
+
+from .copy_loader import copy_world, reset_tables
+from .runner import run_load
+from .seed import reset_world, seed_world
+from .stats import dump_report, format_report
+from .world import WorldConfig
+
+# --------------------------------------------------------------------------------
+
+
+def _world_config(args: argparse.Namespace) -> WorldConfig:
+    """Build the world config from the shared arguments."""
+    return WorldConfig(
+        profiles=args.profiles,
+        attachments=args.attachments,
+        events=args.events,
+        participations_per_profile=args.participations,
+        scan_rate=args.scan_rate,
+        invitation_rate=args.invitation_rate,
+        seed=args.seed,
+    )
+
+
+def seed(args: argparse.Namespace) -> int:
+    """Seed the database through the models."""
+    engine = create_engine(args.database_url or settings.DATABASE_URL)
+    if args.reset:
+        reset_world(engine)
+    seed_world(
+        engine, _world_config(args), batch_size=args.batch_size, build_feeds=not args.skip_feeds
+    )
+    return 0
+
+
+def generate(args: argparse.Namespace) -> int:
+    """Bulk load the world into PostgreSQL with COPY."""
+    import psycopg2
+
+    connection = psycopg2.connect(args.database_url or settings.DATABASE_URL)
+    try:
+        if args.reset:
+            reset_tables(connection)
+        started = time.perf_counter()
+        tables = set(args.tables.split(",")) if args.tables else None
+        counts = copy_world(connection, _world_config(args), tables=tables)
+        print(f"{sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
+    finally:
+        connection.close()
+    return 0
+
+
+def run(args: argparse.Namespace) -> int:
+    """Replay sessions and print the report."""
+    report = asyncio.run(
+        run_load(
+            args.base_url,
+            profiles=args.profiles,
+            users=args.users,
+            duration=args.duration,
+            bot_token=args.bot_token or settings.BOT_TOKEN,
+            actions=args.actions,
+            think_time=args.think_time,
+            seed=args.seed,
+        )
+    )
+    print(format_report(report))
+    if args.json:
+        dump_report(report, args.json)
+    if report["total"]["failures"]:
+        print(f"FAIL: {report['total']['failures']} failed requests", file=sys.stderr)
+        return 1
+    return 0
+
+
+# --------------------------------------------------------------------------------
+
+
+def _add_world_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the world size, seed and target database arguments."""
+    parser.add_argument("--profiles", type=int, default=10000)
+    parser.add_argument("--attachments", type=int, default=4, help="friendships per new profile")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--participations", type=float, default=5.0, help="mean per profile")
+    parser.add_argument("--scan-rate", type=float, default=0.3)
+    parser.add_argument("--invitation-rate", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default="", help="defaults to settings")
+    parser.add_argument("--reset", action="store_true", help="delete existing rows first")
+
+
+def main() -> int:
+    """
+    Parse arguments and run a subcommand.
+
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description=__doc__.split("\n")[1])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = subparsers.add_parser("seed", help="write a synthetic world to the database")
+    _add_world_arguments(seed_parser)
+    seed_parser.add_argument("--batch-size", type=int, default=1000)
+    seed_parser.add_argument("--skip-feeds", action="store_true", help="skip feed candidates")
+    seed_parser.set_defaults(handler=seed)
+
+    generate_parser = subparsers.add_parser(
+        "generate", help="bulk load a large world into PostgreSQL with COPY"
+    )
+    _add_world_arguments(generate_parser)
+    generate_parser.add_argument("--tables", default="", help="comma-separated subset to load")
+    generate_parser.set_defaults(handler=generate)
+
+    run_parser = subparsers.add_parser("run", help="replay sessions against a running backend")
+    run_parser.add_argument("--base-url", default="http://localhost:8000")
+    run_parser.add_argument("--profiles", type=int, default=10000, help="as used for seeding")
+    run_parser.add_argument("--users", type=int, default=50, help="concurrent virtual users")
+    run_parser.add_argument("--duration", type=float, default=60.0, help="seconds")
+    run_parser.add_argument("--actions", type=int, default=10, help="max actions per session")
+    run_parser.add_argument("--think-time", type=float, default=0.5, help="mean seconds")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--bot-token", default="", help="defaults to settings.BOT_TOKEN")
+    run_parser.add_argument("--json", default="", help="write the report to this file")
+    run_parser.set_defaults(handler=run)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+# --------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+COPY Loader
+Bulk load of the synthetic world into PostgreSQL with COPY from streaming generators.
+"""
+
+# --------------------------------------------------------------------------------
+
+import time
+from collections.abc import Iterator
+from datetime import date, datetime
+from typing import Optional
+
+from .seed import WORLD_TABLES
+from .world import WorldConfig
+
+# --------------------------------------------------------------------------------
+
+# COPY text format escapes (https://www.postgresql.org/docs/current/sql-copy.html)
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+_ARRAY_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"'})
+
+# Bytes handed to the driver per read() call
+READ_CHUNK = 1 << 20
+
+
+def _encode_text(value: str) -> str:
+    """Escape a string unless it is free of special characters (the common case)."""
+    if "\\" in value or "\t" in value or "\n" in value or "\r" in value:
+        return value.translate(_COPY_ESCAPES)
+    return value
+
+
+def _encode_array(value: list) -> str:
+    """Encode a list of strings as an array literal."""
+    items = ",".join(f'"{str(item).translate(_ARRAY_ESCAPES)}"' for item in value)
+    return _encode_text("{" + items + "}")
+
+
+# Encoders by exact type; generators only produce these types
+_ENCODERS = {
+    str: _encode_text,
+    int: str,
+    float: repr,
+    bool: lambda value: "t" if value else "f",
+    date: date.isoformat,
+    datetime: datetime.isoformat,
+    list: _encode_array,
+    type(None): lambda value: "\\N",
+}
+
+
+def encode_copy_value(value) -> str:
+    """
+    Encode one value in the COPY text format.
+
+    Args:
+        value: Column value (None, bool, number, str, date/datetime or list of str).
+
+    Returns:
+        str: Encoded field.
+    """
+    return _ENCODERS[type(value)](value)
+
+
+class CopyStream:
+    """
+    File-like reader producing COPY text lines from a row generator on demand,
+    so no table is ever materialized in memory.
+    """
+
+    def __init__(self, rows: Iterator[dict], columns: list[str]):
+        """
+        Initialize the stream.
+
+        Args:
+            rows (Iterator[dict]): Rows keyed by column name.
+            columns (list[str]): Column order of the COPY statement.
+        """
+        self.rows = rows
+        self.columns = columns
+        self.count = 0
+
+    def read(self, size: int = READ_CHUNK) -> bytes:
+        """
+        Read the next encoded lines.
+
+        Args:
+            size (int): Approximate number of bytes to return.
+
+        Returns:
+            bytes: Whole encoded lines, empty at the end of the rows.
+        """
+        limit = size if size and size > 0 else READ_CHUNK
+        columns = self.columns
+        encoders = _ENCODERS
+        lines = []
+        length = 0
+        for row in self.rows:
+            values = [row[column] for column in columns]
+            line = "\t".join([encoders[type(value)](value) for value in values]) + "\n"
+            line = line.encode()
+            lines.append(line)
+            length += len(line)
+            self.count += 1
+            if length >= limit:
+                break
+        return b"".join(lines)
+
+
+# --------------------------------------------------------------------------------
+
+
+def reset_tables(connection) -> None:
+    """
+    Truncate the world's tables and their derived tables.
+
+    Args:
+        connection: psycopg2 connection.
+    """
+    names = [table.name for table, _generate in WORLD_TABLES]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"TRUNCATE {', '.join(names)}, feed_candidates, event_tag_counts RESTART IDENTITY"
+        )
+    connection.commit()
+
+
+def copy_world(
+    connection, config: WorldConfig, *, tables: Optional[set[str]] = None
+) -> dict[str, int]:
+    """
+    Load the world table by table with COPY, then refresh the tag counters and
+    planner statistics.
+
+    Constraints and indexes stay in place, so every row is checked against the
+    existing foreign keys and unique indexes; tables are loaded in dependency
+    order. Feed candidates are not built (see `python -m loadtest seed`).
+
+    Args:
+        connection: psycopg2 connection.
+        config (WorldConfig): World config.
+        tables (Optional[set[str]]): Subset of table names to load, all by default.
+
+    Returns:
+        dict[str, int]: Table name to number of loaded rows.
+    """
+    counts: dict[str, int] = {}
+    for table, generate in WORLD_TABLES:
+        if tables is not None and table.name not in tables:
+            continue
+        started = time.perf_counter()
+        rows = generate(config)
+        first = next(rows, None)
+        if first is None:
+            counts[table.name] = 0
+            continue
+        columns = list(first)
+        stream = CopyStream(_prepend(first, rows), columns)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", stream, size=READ_CHUNK
+            )
+        connection.commit()
+        counts[table.name] = stream.count
+        elapsed = time.perf_counter() - started
+        print(
+            f"{table.name:<22}{stream.count:>12} rows {elapsed:>8.1f}s "
+            f"{stream.count / elapsed if elapsed else 0:>12.0f} rows/s"
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM event_tag_counts")
+        cursor.execute(
+            """
+            INSERT INTO event_tag_counts (tag, events_count)
+            SELECT tag, count(DISTINCT events.id)
+            FROM events, unnest(tags) AS tag
+            GROUP BY tag
+            """
+        )
+    connection.commit()
+
+    # ANALYZE cannot run inside a transaction block
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        for table, _generate in WORLD_TABLES:
+            cursor.execute(f"ANALYZE {table.name}")
+    connection.autocommit = False
+    return counts
+
+
+def _prepend(first: dict, rows: Iterator[dict]) -> Iterator[dict]:
+    """Yield a peeked row followed by the rest of the stream."""
+    yield first
+    yield from rows
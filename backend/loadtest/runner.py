@@ -0,0 +1,96 @@
+"""
+Load Runner
+Drives concurrent virtual users through replayed mini-app sessions.
+"""
+
+# --------------------------------------------------------------------------------
+
+import asyncio
+import random
+import time
+
+import httpx
+
+from .sessions import MiniAppSession, SharedState
+from .stats import LoadStats
+from .world import profile_max_id
+
+# --------------------------------------------------------------------------------
+
+
+async def _virtual_user(
+    client: httpx.AsyncClient,
+    stats: LoadStats,
+    shared: SharedState,
+    rng: random.Random,
+    *,
+    profiles: int,
+    bot_token: str,
+    deadline: float,
+    actions: int,
+    think_time: float,
+) -> None:
+    """Run sessions of random profiles until the deadline."""
+    while time.monotonic() < deadline:
+        # Active users are skewed towards the hubs of the friendship graph
+        profile = min(int(profiles * rng.random() ** 2), profiles - 1)
+        session = MiniAppSession(
+            client, stats, shared, rng, max_id=profile_max_id(profile), bot_token=bot_token
+        )
+        await session.run(rng.randint(1, actions), think_time)
+
+
+async def run_load(
+    base_url: str,
+    *,
+    profiles: int,
+    users: int,
+    duration: float,
+    bot_token: str,
+    actions: int = 10,
+    think_time: float = 0.5,
+    seed: int = 42,
+    timeout: float = 30.0,
+) -> dict:
+    """
+    Replay sessions against a running backend and summarize the results.
+
+    Args:
+        base_url (str): Backend base URL, e.g. http://localhost:8000.
+        profiles (int): Number of seeded profiles to sign in as.
+        users (int): Concurrent virtual users.
+        duration (float): Run time in seconds; started sessions are finished.
+        bot_token (str): Bot token of the backend under test.
+        actions (int): Maximum actions per session after opening the app.
+        think_time (float): Mean pause between actions in seconds.
+        seed (int): Random seed of the virtual users.
+        timeout (float): Request timeout in seconds.
+
+    Returns:
+        dict: Report from `LoadStats.report`.
+    """
+    stats = LoadStats()
+    shared = SharedState()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    started = time.monotonic()
+    deadline = started + duration
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        await asyncio.gather(
+            *(
+                _virtual_user(
+                    client,
+                    stats,
+                    shared,
+                    random.Random(f"{seed}:user:{user}"),
+                    profiles=profiles,
+                    bot_token=bot_token,
+                    deadline=deadline,
+                    actions=actions,
+                    think_time=think_time,
+                )
+                for user in range(users)
+            )
+        )
+
+    return stats.report(time.monotonic() - started)
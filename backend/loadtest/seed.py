@@ -0,0 +1,128 @@
+"""
+World Seeding
+Write a synthetic world into the database through the application's models.
+"""
+
+# --------------------------------------------------------------------------------
+
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+
+from sqlalchemy import Table, delete, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.crud import feed as crud_feed
+from app.db.models.event import Event, EventParticipation
+from app.db.models.feed_candidate import FeedCandidate
+from app.db.models.friends import Friends
+from app.db.models.invitations import Invitations
+from app.db.models.profile import Profile
+from app.db.models.qr_scan import QRScan
+from app.db.models.tag_count import EventTagCount
+
+from .world import (
+    WorldConfig,
+    generate_events,
+    generate_friendships,
+    generate_invitations,
+    generate_participations,
+    generate_profiles,
+    generate_qr_scans,
+)
+
+# --------------------------------------------------------------------------------
+
+# Tables in foreign key order; the reverse order is used for cleanup
+WORLD_TABLES: list[tuple[Table, Callable[[WorldConfig], Iterator[dict]]]] = [
+    (Profile.__table__, generate_profiles),
+    (Event.__table__, generate_events),
+    (EventParticipation.__table__, generate_participations),
+    (Friends.__table__, generate_friendships),
+    (Invitations.__table__, generate_invitations),
+    (QRScan.__table__, generate_qr_scans),
+]
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    """Split a row stream into lists of at most `size` rows."""
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def reset_world(engine: Engine) -> None:
+    """
+    Delete all rows of the tables the world is written to.
+
+    Args:
+        engine (Engine): Target database engine.
+    """
+    with engine.begin() as connection:
+        for table in (FeedCandidate.__table__, EventTagCount.__table__):
+            connection.execute(delete(table))
+        for table, _generate in reversed(WORLD_TABLES):
+            connection.execute(delete(table))
+
+
+# --------------------------------------------------------------------------------
+
+
+def seed_world(
+    engine: Engine, config: WorldConfig, *, batch_size: int = 1000, build_feeds: bool = True
+) -> dict[str, int]:
+    """
+    Insert the world and rebuild the derived tables (tag counters, feed candidates).
+
+    Args:
+        engine (Engine): Target database engine.
+        config (WorldConfig): World config.
+        batch_size (int): Rows per multi-row INSERT.
+        build_feeds (bool): Whether to precompute feed candidates of every profile.
+
+    Returns:
+        dict[str, int]: Table name to number of inserted rows.
+    """
+    counts: dict[str, int] = {}
+    tag_counts: Counter[str] = Counter()
+
+    for table, generate in WORLD_TABLES:
+        started = time.perf_counter()
+        rows = generate(config)
+        if table is Event.__table__:
+            rows = _count_tags(rows, tag_counts)
+        inserted = 0
+        with engine.begin() as connection:
+            for batch in _batches(rows, batch_size):
+                connection.execute(table.insert(), batch)
+                inserted += len(batch)
+        counts[table.name] = inserted
+        print(f"{table.name:<22}{inserted:>10} rows {time.perf_counter() - started:>8.1f}s")
+
+    if tag_counts:
+        with engine.begin() as connection:
+            connection.execute(
+                EventTagCount.__table__.insert(),
+                [{"tag": tag, "events_count": count} for tag, count in tag_counts.items()],
+            )
+
+    if build_feeds:
+        started = time.perf_counter()
+        with Session(engine) as db:
+            profile_ids = db.scalars(select(Profile.id)).all()
+            candidates = sum(crud_feed.rebuild_user_feed(db, user_id) for user_id in profile_ids)
+        counts[FeedCandidate.__tablename__] = candidates
+        print(
+            f"{FeedCandidate.__tablename__:<22}{candidates:>10} rows "
+            f"{time.perf_counter() - started:>8.1f}s"
+        )
+    return counts
+
+
+def _count_tags(rows: Iterable[dict], tag_counts: Counter) -> Iterator[dict]:
+    """Pass event rows through while counting their tags."""
+    for row in rows:
+        tag_counts.update(row["tags"] or ())
+        yield row
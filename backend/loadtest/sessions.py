@@ -0,0 +1,284 @@
+"""
+Mini-App Sessions
+Replayed user sessions: the request sequences the mini-app sends while a user
+opens it, browses events, manages friends, joins events and scans tickets.
+"""
+
+# --------------------------------------------------------------------------------
+
+import asyncio
+import io
+import random
+import time
+from collections import deque
+from typing import Optional
+
+import httpx
+
+from app.core.config import ALL_TAGS
+
+from .auth import authorization_header
+from .stats import LoadStats
+
+# --------------------------------------------------------------------------------
+
+API = "/v1"
+
+# Participation IDs of joined events; organizers of other sessions scan them
+TICKET_POOL_SIZE = 1000
+
+
+class SharedState:
+    """State shared by all virtual users of a run."""
+
+    def __init__(self):
+        self.tickets: deque[str] = deque(maxlen=TICKET_POOL_SIZE)
+        self._avatar: Optional[bytes] = None
+
+    @property
+    def avatar(self) -> bytes:
+        """A small JPEG for avatar uploads (exercises image conversion and S3)."""
+        if self._avatar is None:
+            from PIL import Image
+
+            buffer = io.BytesIO()
+            Image.new("RGB", (256, 256), (200, 120, 40)).save(buffer, format="JPEG")
+            self._avatar = buffer.getvalue()
+        return self._avatar
+
+
+# --------------------------------------------------------------------------------
+
+
+class MiniAppSession:
+    """
+    One user session of the mini-app.
+
+    The session signs its own init data, opens the app (profile, tags, feed and
+    event list) and then performs weighted random actions with think time
+    between them, like a user tapping through the app.
+    """
+
+    # Action name -> relative weight
+    ACTIONS = {
+        "browse_events": 30,
+        "event_detail": 25,
+        "my_events": 10,
+        "friends": 12,
+        "friend_profile": 8,
+        "join_event": 8,
+        "scan_ticket": 5,
+        "upload_avatar": 2,
+    }
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        stats: LoadStats,
+        shared: SharedState,
+        rng: random.Random,
+        *,
+        max_id: int,
+        bot_token: str,
+    ):
+        """
+        Initialize the session.
+
+        Args:
+            client (httpx.AsyncClient): Client bound to the backend base URL.
+            stats (LoadStats): Stats to record requests into.
+            shared (SharedState): State shared between sessions.
+            rng (random.Random): Random generator of the virtual user.
+            max_id (int): Max user ID of the session's profile.
+            bot_token (str): Bot token of the backend under test.
+        """
+        self.client = client
+        self.stats = stats
+        self.shared = shared
+        self.rng = rng
+        self.headers = authorization_header(max_id, bot_token)
+        self.event_ids: list[str] = []
+        self.friend_ids: list[str] = []
+        self.last_event_id: Optional[str] = None
+        self.events_etag: Optional[str] = None
+
+    # --------------------------------------------------------------------------------
+
+    async def request(
+        self, endpoint: str, method: str, url: str, **kwargs
+    ) -> Optional[httpx.Response]:
+        """
+        Send a timed request.
+
+        Args:
+            endpoint (str): Route template used as the stats key.
+            method (str): HTTP method.
+            url (str): Request URL.
+            **kwargs: Extra arguments for httpx.
+
+        Returns:
+            Optional[httpx.Response]: Response, None on transport errors.
+        """
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(f"{method} {endpoint}", time.perf_counter() - started, None)
+            return None
+        self.stats.record(
+            f"{method} {endpoint}", time.perf_counter() - started, response.status_code
+        )
+        return response
+
+    async def run(self, actions: int, think_time: float) -> None:
+        """
+        Open the app and perform random actions.
+
+        Args:
+            actions (int): Number of actions after opening the app.
+            think_time (float): Mean pause between actions in seconds.
+        """
+        await self.open_app()
+        names = list(self.ACTIONS)
+        weights = list(self.ACTIONS.values())
+        for _ in range(actions):
+            if think_time > 0:
+                await asyncio.sleep(self.rng.expovariate(1 / think_time))
+            await getattr(self, self.rng.choices(names, weights=weights)[0])()
+
+    def _remember_events(self, response: Optional[httpx.Response]) -> None:
+        """Keep the event IDs of a list response for later actions."""
+        if response is None or response.status_code != 200:
+            return
+        events = response.json().get("events", [])
+        self.event_ids = [item["event"]["id"] for item in events] or self.event_ids
+        self.last_event_id = events[-1]["event"]["id"] if events else None
+
+    # --------------------------------------------------------------------------------
+
+    async def open_app(self) -> None:
+        """Requests of the start screen."""
+        await self.request("/v1/profiles/my", "GET", f"{API}/profiles/my")
+        await self.request("/v1/events/tags/", "GET", f"{API}/events/tags/")
+        await self.request("/v1/events/feed/", "GET", f"{API}/events/feed/", params={"limit": 20})
+        response = await self.request(
+            "/v1/events/global_events/",
+            "GET",
+            f"{API}/events/global_events/",
+            params={"limit": 20},
+        )
+        self._remember_events(response)
+        if response is not None:
+            self.events_etag = response.headers.get("ETag")
+
+    async def browse_events(self) -> None:
+        """Refresh the event list (conditionally), page further or filter by tag."""
+        choice = self.rng.random()
+        if choice < 0.4 and self.events_etag:
+            response = await self.request(
+                "/v1/events/global_events/",
+                "GET",
+                f"{API}/events/global_events/",
+                params={"limit": 20},
+                headers={"If-None-Match": self.events_etag},
+            )
+            if response is not None and response.status_code == 200:
+                self.events_etag = response.headers.get("ETag")
+                self._remember_events(response)
+            return
+
+        params: dict = {"limit": 20}
+        if choice < 0.7 and self.last_event_id:
+            params["last_event_id"] = self.last_event_id
+        else:
+            params["tags"] = self.rng.choice(ALL_TAGS)
+        response = await self.request(
+            "/v1/events/global_events/", "GET", f"{API}/events/global_events/", params=params
+        )
+        self._remember_events(response)
+
+    async def event_detail(self) -> Optional[dict]:
+        """Open an event card."""
+        if not self.event_ids:
+            return None
+        return await self.event_detail_by_id(self.rng.choice(self.event_ids))
+
+    async def my_events(self) -> None:
+        """Open the user's events tab."""
+        await self.request(
+            "/v1/events/user_events/",
+            "GET",
+            f"{API}/events/user_events/",
+            params={"filter_type": self.rng.choice(("all", "actual", "past"))},
+        )
+
+    async def friends(self) -> None:
+        """Open the friends tab."""
+        response = await self.request("/v1/friends/my", "GET", f"{API}/friends/my")
+        if response is not None and response.status_code == 200:
+            self.friend_ids = [profile["id"] for profile in response.json()]
+        await self.request("/v1/friends/secondary", "GET", f"{API}/friends/secondary")
+
+    async def friend_profile(self) -> None:
+        """Open a friend's profile and their friends."""
+        if not self.friend_ids:
+            await self.friends()
+            return
+        profile_id = self.rng.choice(self.friend_ids)
+        await self.request("/v1/profiles/{profile_id}", "GET", f"{API}/profiles/{profile_id}")
+        await self.request(
+            "/v1/friends/list/{profile_id}", "GET", f"{API}/friends/list/{profile_id}"
+        )
+
+    async def join_event(self) -> None:
+        """Register for an event; the ticket goes to the shared pool, some users leave again."""
+        detail = await self.event_detail()
+        if detail is None or detail["participation_type"] != "V":
+            return
+        event_id = detail["event"]["id"]
+        response = await self.request(
+            "/v1/events/user_events/{event_id}",
+            "POST",
+            f"{API}/events/user_events/{event_id}",
+        )
+        if response is None or response.status_code != 200:
+            return
+        detail = await self.event_detail_by_id(event_id)
+        if detail and detail.get("participate_id"):
+            self.shared.tickets.append(detail["participate_id"])
+        if self.rng.random() < 0.2:
+            await self.request(
+                "/v1/events/user_events/{event_id}",
+                "DELETE",
+                f"{API}/events/user_events/{event_id}",
+            )
+
+    async def event_detail_by_id(self, event_id: str) -> Optional[dict]:
+        """Open a specific event card."""
+        response = await self.request(
+            "/v1/events/global_events/{event_id}",
+            "GET",
+            f"{API}/events/global_events/{event_id}",
+        )
+        if response is None or response.status_code != 200:
+            return None
+        return response.json()
+
+    async def scan_ticket(self) -> None:
+        """Scan a ticket of another session, as an organizer at the entrance."""
+        if not self.shared.tickets:
+            return
+        ticket = self.rng.choice(self.shared.tickets)
+        await self.request(
+            "/v1/events/scan_qr", "POST", f"{API}/events/scan_qr", json={"participation_id": ticket}
+        )
+
+    async def upload_avatar(self) -> None:
+        """Upload an avatar image."""
+        await self.request(
+            "/v1/files/upload",
+            "POST",
+            f"{API}/files/upload",
+            files={"file": ("avatar.jpg", self.shared.avatar, "image/jpeg")},
+        )
@@ -0,0 +1,145 @@
+"""
+Load Test Stats
+Per-endpoint latency recording and throughput/percentile reports.
+"""
+
+# --------------------------------------------------------------------------------
+
+import json
+import math
+from collections import defaultdict
+from typing import Optional
+
+# --------------------------------------------------------------------------------
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """
+    Get a nearest-rank percentile.
+
+    Args:
+        sorted_values (list[float]): Values in ascending order.
+        percent (float): Percentile (0 - 100).
+
+    Returns:
+        float: Percentile value, 0.0 for no values.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LoadStats:
+    """
+    Latencies and status codes recorded per endpoint.
+
+    Endpoints are named by method and route template (e.g.
+    `GET /v1/events/global_events/{event_id}`), never by the concrete URL.
+    """
+
+    def __init__(self):
+        self.latencies: defaultdict[str, list[float]] = defaultdict(list)
+        self.statuses: defaultdict[str, defaultdict[str, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+
+    def record(self, endpoint: str, seconds: float, status: Optional[int]) -> None:
+        """
+        Record one request.
+
+        Args:
+            endpoint (str): Endpoint name.
+            seconds (float): Latency in seconds.
+            status (Optional[int]): HTTP status, None for transport errors.
+        """
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][str(status) if status is not None else "error"] += 1
+
+    # --------------------------------------------------------------------------------
+
+    def report(self, duration: float) -> dict:
+        """
+        Summarize the run.
+
+        Failures are transport errors and 5xx responses; 4xx answers (e.g. a
+        registration that is already closed) are expected in replayed sessions.
+
+        Args:
+            duration (float): Wall time of the run in seconds.
+
+        Returns:
+            dict: Per-endpoint and total count, failures, rps and latency
+            percentiles in milliseconds.
+        """
+        endpoints = {
+            endpoint: self._summarize(latencies, self.statuses[endpoint], duration)
+            for endpoint, latencies in sorted(self.latencies.items())
+        }
+        total_statuses: defaultdict[str, int] = defaultdict(int)
+        for statuses in self.statuses.values():
+            for status, count in statuses.items():
+                total_statuses[status] += count
+        all_latencies = [value for latencies in self.latencies.values() for value in latencies]
+        return {
+            "duration": round(duration, 2),
+            "endpoints": endpoints,
+            "total": self._summarize(all_latencies, total_statuses, duration),
+        }
+
+    @staticmethod
+    def _summarize(latencies: list[float], statuses: dict[str, int], duration: float) -> dict:
+        """Summarize the latencies and statuses of one endpoint."""
+        values = sorted(latencies)
+        failures = sum(
+            count
+            for status, count in statuses.items()
+            if status == "error" or status.startswith("5")
+        )
+        summary = {
+            "count": len(values),
+            "failures": failures,
+            "rps": round(len(values) / duration, 2) if duration > 0 else 0.0,
+            "statuses": dict(sorted(statuses.items())),
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent}"] = round(percentile(values, percent) * 1000, 2)
+        summary["max"] = round(values[-1] * 1000, 2) if values else 0.0
+        return summary
+
+
+# --------------------------------------------------------------------------------
+
+
+def format_report(report: dict) -> str:
+    """
+    Render a report as a fixed-width table.
+
+    Args:
+        report (dict): Result of `LoadStats.report`.
+
+    Returns:
+        str: Table text.
+    """
+    columns = ["count", "failures", "rps"] + [f"p{p}" for p in PERCENTILES] + ["max"]
+    width = max([len(name) for name in report["endpoints"]] + [len("endpoint"), len("total")])
+    lines = [f"{'endpoint':<{width}}" + "".join(f"{column:>10}" for column in columns)]
+    rows = list(report["endpoints"].items()) + [("total", report["total"])]
+    for name, summary in rows:
+        lines.append(f"{name:<{width}}" + "".join(f"{summary[c]:>10}" for c in columns))
+    lines.append(f"duration {report['duration']}s, latencies in ms")
+    return "\n".join(lines)
+
+
+def dump_report(report: dict, path: str) -> None:
+    """
+    Write a report as JSON, e.g. to compare runs before and after a change.
+
+    Args:
+        report (dict): Result of `LoadStats.report`.
+        path (str): Output file path.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
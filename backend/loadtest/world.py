@@ -0,0 +1,345 @@
+"""
+Synthetic World
+Deterministic generators of profiles, a power-law friendship graph, events,
+participations, invitations and QR scans for load tests.
+"""
+
+# --------------------------------------------------------------------------------
+
+import random
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from functools import cache, cached_property
+from typing import NamedTuple, Optional
+
+from app.core.config import ALL_TAGS
+
+# --------------------------------------------------------------------------------
+
+# Max user ID of profile i is MAX_ID_BASE + i, so sessions can sign init data
+# for any profile without reading the database
+MAX_ID_BASE = 9_000_000_000
+
+ID_NAMESPACE = uuid.UUID("6f1c9a52-3d4e-4b7a-9c61-2f0e8d5a7b13")
+ID_MULTIPLIER = 0x9E3779B97F4B  # odd, so index -> index * ID_MULTIPLIER is a bijection
+ID_INDEX_MASK = (1 << 48) - 1
+
+FIRST_NAMES = ["Анна", "Иван", "Мария", "Пётр", "Ольга", "Дмитрий", "Елена", "Алексей"]
+LAST_NAMES = ["Иванова", "Смирнов", "Кузнецова", "Попов", "Соколова", "Лебедев", "Новикова"]
+UNIVERSITIES = ["МГУ", "СПбГУ", "ВШЭ", "МФТИ", "ИТМО"]
+
+# Zipf-like tag popularity: the first tags are the most common
+TAG_WEIGHTS = [1 / (rank + 1) for rank in range(len(ALL_TAGS))]
+
+
+@dataclass(frozen=True)
+class WorldConfig:
+    """
+    Size and shape of the synthetic world.
+
+    Attributes:
+        profiles (int): Number of profiles.
+        attachments (int): Friendships each new profile creates in the
+            preferential attachment graph (average degree is about twice this).
+        events (int): Number of events.
+        participations_per_profile (float): Mean number of events a profile joins.
+        scan_rate (float): Share of participations in started events that were
+            scanned at the entrance.
+        invitation_rate (float): Share of profiles with an open invitation link.
+        seed (int): Random seed; the same config always yields the same rows.
+        anchor (date): "Today" of the world; event dates are spread around it.
+    """
+
+    profiles: int = 10000
+    attachments: int = 4
+    events: int = 2000
+    participations_per_profile: float = 5.0
+    scan_rate: float = 0.3
+    invitation_rate: float = 0.3
+    seed: int = 42
+    anchor: date = field(default_factory=date.today)
+
+    def rng(self, stream: str) -> random.Random:
+        """
+        Get an independent random stream, so each table can be regenerated alone.
+
+        Args:
+            stream (str): Stream name.
+
+        Returns:
+            random.Random: Seeded generator.
+        """
+        return random.Random(f"{self.seed}:{stream}")
+
+    def entity_id(self, kind: str, index: int) -> str:
+        """
+        Get the deterministic UUID of the index-th entity of a kind.
+
+        The first 80 bits identify the seed and kind; the last 48 bits are the
+        index scrambled by an odd multiplier (a bijection), so IDs are unique
+        but land in primary key indexes in random order like uuid4 values.
+
+        Args:
+            kind (str): Entity kind, e.g. "profile".
+            index (int): Entity index.
+
+        Returns:
+            str: UUID string.
+        """
+        return f"{_id_prefix(self.seed, kind)}{(index * ID_MULTIPLIER) & ID_INDEX_MASK:012x}"
+
+    @cached_property
+    def event_plan(self) -> list["PlannedEvent"]:
+        """Creators and dates of all events, shared by the dependent tables."""
+        rng = self.rng("event_plan")
+        plan = []
+        for index in range(self.events):
+            # Early profiles are the hubs of the friendship graph; they organize more
+            creator = min(int(self.profiles * rng.random() ** 3), self.profiles - 1)
+            start_date = self.anchor + timedelta(days=rng.randint(-60, 60))
+            end_date = start_date + timedelta(days=rng.choice((0, 0, 0, 1, 2)))
+            plan.append(PlannedEvent(self.entity_id("event", index), creator, start_date, end_date))
+        return plan
+
+
+class PlannedEvent(NamedTuple):
+    """Event attributes other tables depend on."""
+
+    id: str
+    creator: int
+    start_date: date
+    end_date: date
+
+
+@cache
+def _id_prefix(seed: int, kind: str) -> str:
+    """Get the seed- and kind-specific first 24 characters of entity IDs."""
+    return str(uuid.uuid5(ID_NAMESPACE, f"{seed}:{kind}"))[:24]
+
+
+def profile_max_id(index: int) -> int:
+    """
+    Get the Max user ID of a synthetic profile.
+
+    Args:
+        index (int): Profile index.
+
+    Returns:
+        int: Max user ID.
+    """
+    return MAX_ID_BASE + index
+
+
+# --------------------------------------------------------------------------------
+
+
+def generate_profiles(config: WorldConfig) -> Iterator[dict]:
+    """
+    Generate profile rows.
+
+    Args:
+        config (WorldConfig): World config.
+
+    Yields:
+        dict: Row of the profiles table.
+    """
+    rng = config.rng("profiles")
+    created = datetime.combine(config.anchor, time()) - timedelta(days=365)
+    for index in range(config.profiles):
+        yield {
+            "id": config.entity_id("profile", index),
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "gender": rng.choice(("M", "F")),
+            "birth_date": date(1990, 1, 1) + timedelta(days=rng.randint(0, 5000)),
+            "avatar": None,
+            "university": rng.choice(UNIVERSITIES),
+            "bio": None,
+            "max_id": profile_max_id(index),
+            "invited_by": None,
+            "is_superuser": False,
+            "created_at": created + timedelta(seconds=index * 60),
+        }
+
+
+def generate_friendships(config: WorldConfig) -> Iterator[dict]:
+    """
+    Generate a friendship graph with a power-law degree distribution.
+
+    Uses preferential attachment: every new profile befriends `attachments`
+    existing profiles picked proportionally to their current degree. Pairs are
+    stored canonically with `user_1 < user_2`.
+
+    Args:
+        config (WorldConfig): World config.
+
+    Yields:
+        dict: Row of the friends table.
+    """
+    rng = config.rng("friends")
+    created = datetime.combine(config.anchor, time()) - timedelta(days=300)
+    # Every profile appears here once per friendship, so a uniform pick from the
+    # list is a degree-proportional pick of a profile
+    endpoints: list[int] = []
+    edge = 0
+    for index in range(1, config.profiles):
+        if index <= config.attachments:
+            targets = set(range(index))
+        else:
+            targets = set()
+            while len(targets) < config.attachments:
+                targets.add(rng.choice(endpoints))
+        for target in sorted(targets):
+            user_1, user_2 = sorted(
+                (config.entity_id("profile", index), config.entity_id("profile", target))
+            )
+            yield {
+                "id": config.entity_id("friend", edge),
+                "user_1": user_1,
+                "user_2": user_2,
+                "created_at": created + timedelta(seconds=edge),
+            }
+            endpoints.extend((index, target))
+            edge += 1
+
+
+def generate_events(config: WorldConfig) -> Iterator[dict]:
+    """
+    Generate event rows.
+
+    Args:
+        config (WorldConfig): World config.
+
+    Yields:
+        dict: Row of the events table.
+    """
+    rng = config.rng("events")
+    created = datetime.combine(config.anchor, time()) - timedelta(days=90)
+    for index, planned in enumerate(config.event_plan):
+        tags = sorted(set(rng.choices(ALL_TAGS, weights=TAG_WEIGHTS, k=rng.randint(0, 3))))
+        registration_start: Optional[datetime] = None
+        registration_end: Optional[datetime] = None
+        if rng.random() < 0.5:
+            registration_end = datetime.combine(planned.start_date, time())
+            registration_start = registration_end - timedelta(days=30)
+        yield {
+            "id": planned.id,
+            "title": f"Событие {index}",
+            "body": f"Описание события {index}",
+            "photo": None,
+            "tags": tags or None,
+            "place": f"Площадка {rng.randint(1, 50)}",
+            "start_date": planned.start_date,
+            "end_date": planned.end_date,
+            "max_participants": rng.choice((None, None, None, 50, 100, 500)),
+            "registration_start_date": registration_start,
+            "registration_end_date": registration_end,
+            "creator": config.entity_id("profile", planned.creator),
+            "status": "E" if planned.end_date < config.anchor else "A",
+            "version": 1,
+            "created_at": created + timedelta(seconds=index * 60),
+        }
+
+
+def generate_participations(config: WorldConfig) -> Iterator[dict]:
+    """
+    Generate participation rows: one creator row per event, then participants.
+
+    Profiles join a geometric-like number of events; event popularity is skewed
+    so a few events gather most participants.
+
+    Args:
+        config (WorldConfig): World config.
+
+    Yields:
+        dict: Row of the event_participations table.
+    """
+    rng = config.rng("participations")
+    plan = config.event_plan
+    created = datetime.combine(config.anchor, time()) - timedelta(days=60)
+    row = 0
+
+    for planned in plan:
+        yield {
+            "id": config.entity_id("participation", row),
+            "user_id": config.entity_id("profile", planned.creator),
+            "event_id": planned.id,
+            "participation_type": "C",
+            "created_at": created,
+        }
+        row += 1
+
+    if not plan or config.participations_per_profile <= 0:
+        return
+    for profile in range(config.profiles):
+        joins = min(int(rng.expovariate(1 / config.participations_per_profile)), len(plan))
+        chosen: set[int] = set()
+        for _ in range(joins * 2):
+            if len(chosen) >= joins:
+                break
+            event = int(len(plan) * rng.random() ** 2)
+            if plan[event].creator != profile:
+                chosen.add(event)
+        user_id = config.entity_id("profile", profile)
+        for event in sorted(chosen):
+            yield {
+                "id": config.entity_id("participation", row),
+                "user_id": user_id,
+                "event_id": plan[event].id,
+                "participation_type": "P",
+                "created_at": created + timedelta(seconds=row),
+            }
+            row += 1
+
+
+def generate_qr_scans(config: WorldConfig) -> Iterator[dict]:
+    """
+    Generate QR scans of participants of events that have already started,
+    scanned by the event creator.
+
+    Args:
+        config (WorldConfig): World config.
+
+    Yields:
+        dict: Row of the qr_scans table.
+    """
+    rng = config.rng("qr_scans")
+    events = {planned.id: planned for planned in config.event_plan}
+    scan = 0
+    for participation in generate_participations(config):
+        if participation["participation_type"] != "P":
+            continue
+        planned = events[participation["event_id"]]
+        if planned.start_date > config.anchor or rng.random() >= config.scan_rate:
+            continue
+        yield {
+            "id": config.entity_id("qr_scan", scan),
+            "participation_id": participation["id"],
+            "scanned_by_user_id": profile_max_id(planned.creator),
+            "scanned_at": datetime.combine(planned.start_date, time(18))
+            + timedelta(seconds=rng.randint(0, 3600)),
+        }
+        scan += 1
+
+
+def generate_invitations(config: WorldConfig) -> Iterator[dict]:
+    """
+    Generate open invitation links, at most one per profile.
+
+    Args:
+        config (WorldConfig): World config.
+
+    Yields:
+        dict: Row of the invitations table.
+    """
+    rng = config.rng("invitations")
+    created = datetime.combine(config.anchor, time()) - timedelta(days=30)
+    for index in range(config.profiles):
+        if rng.random() < config.invitation_rate:
+            yield {
+                "id": config.entity_id("invitation", index),
+                "user_id": config.entity_id("profile", index),
+                "created_at": created + timedelta(seconds=index),
+            }
@@ -15,6 +15,12 @@ echo "Database is ready!"
 echo "Running database migrations..."
 alembic upgrade head
 
+# Shared directory for per-worker metrics snapshots (cleared on every start)
+export METRICS_MULTIPROC_DIR=${METRICS_MULTIPROC_DIR:-/tmp/max-events-metrics}
+rm -rf "${METRICS_MULTIPROC_DIR}"
+mkdir -p "${METRICS_MULTIPROC_DIR}"
+
 # Start the application
 echo "Starting max-events application..."
-exec gunicorn app.main:app --workers 4 --worker-class uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000
+# Preloaded gunicorn master; workers, bind and restarts come from GUNICORN_* settings
+exec python -m app.server